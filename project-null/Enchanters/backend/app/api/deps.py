@@ -3,9 +3,12 @@ from fastapi import Depends, Header
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from sqlalchemy.orm import selectinload
 from app.database import async_session_factory
 from app.models.farmer import Farmer
 from app.models.agent import Agent
+from app.schemas.farmer import FarmerPrincipal
+from app.services.principal_service import get_farmer_principal
 from app.core.security import decode_token
 from app.core.exceptions import UnauthorizedException, ForbiddenException
 import logging
@@ -27,10 +30,7 @@ async def get_db():
             await session.close()
 
 
-async def get_current_farmer(
-    credentials: HTTPAuthorizationCredentials = Depends(security_scheme),
-    db: AsyncSession = Depends(get_db),
-) -> Farmer:
+def _farmer_uuid_from_token(credentials: HTTPAuthorizationCredentials) -> UUID:
     token = credentials.credentials
     payload = decode_token(token)
     if not payload:
@@ -47,17 +47,41 @@ async def get_current_farmer(
         raise UnauthorizedException("Invalid token payload")
 
     try:
-        uid = UUID(farmer_uuid)
+        return UUID(farmer_uuid)
     except ValueError:
         raise UnauthorizedException("Invalid token payload")
 
-    from sqlalchemy.orm import selectinload
+
+async def get_current_principal(
+    credentials: HTTPAuthorizationCredentials = Depends(security_scheme),
+    db: AsyncSession = Depends(get_db),
+) -> FarmerPrincipal:
+    """Authenticated farmer's identity only, served from the principal cache."""
+    uid = _farmer_uuid_from_token(credentials)
+    principal = await get_farmer_principal(db, uid)
+    if not principal:
+        raise UnauthorizedException("Farmer not found")
+    return principal
+
+
+async def get_current_farmer_id(
+    principal: FarmerPrincipal = Depends(get_current_principal),
+) -> UUID:
+    return principal.id
+
+
+async def get_current_farmer(
+    credentials: HTTPAuthorizationCredentials = Depends(security_scheme),
+    db: AsyncSession = Depends(get_db),
+) -> Farmer:
+    """Full Farmer row with profile and crops, for eligibility and form generation."""
+    uid = _farmer_uuid_from_token(credentials)
+
     result = await db.execute(
         select(Farmer)
         .options(
             selectinload(Farmer.profile),
             selectinload(Farmer.crops),
-            selectinload(Farmer.documents),
         )
         .where(Farmer.id == uid)
     )
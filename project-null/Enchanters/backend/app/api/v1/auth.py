@@ -33,8 +33,8 @@ async def verify_otp(body: VerifyOTPRequest, db: AsyncSession = Depends(get_db))
 
 
 @router.post("/login", response_model=LoginResponse)
-async def login(body: LoginRequest):
-    result = await auth_service.login_farmer(body.phone)
+async def login(body: LoginRequest, db: AsyncSession = Depends(get_db)):
+    result = await auth_service.login_farmer(db, body.phone)
     return result
 
 
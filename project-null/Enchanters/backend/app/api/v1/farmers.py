@@ -1,15 +1,14 @@
 from uuid import UUID
-from fastapi import APIRouter, Depends, UploadFile, File, Form
+from fastapi import APIRouter, BackgroundTasks, Depends, UploadFile, File, Form
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.api.deps import get_db, get_current_farmer
+from app.api.deps import get_db, get_current_farmer_id, get_current_principal
 from app.schemas.farmer import (
     FarmerResponse, FarmerUpdate, FarmerProfileCreate, FarmerProfileResponse,
     FarmerCropCreate, FarmerCropResponse, FarmerDocumentResponse,
-    AccessLogEntry, GeneratedFormResponse,
+    AccessLogEntry, GeneratedFormResponse, FarmerPrincipal,
 )
-from app.services import farmer_service
-from app.services.document_service import upload_document
-from app.models.farmer import Farmer
+from app.services import content_store, farmer_service
+from app.services.document_service import upload_document, is_image_document
 from app.core.constants import DocType
 
 router = APIRouter(prefix="/farmers", tags=["Farmers"])
@@ -17,30 +16,29 @@ router = APIRouter(prefix="/farmers", tags=["Farmers"])
 
 @router.get("/me", response_model=FarmerResponse)
 async def get_me(
-    farmer: Farmer = Depends(get_current_farmer),
+    farmer_uuid: UUID = Depends(get_current_farmer_id),
     db: AsyncSession = Depends(get_db),
 ):
-    full = await farmer_service.get_farmer_full(db, farmer.id)
-    return full
+    return await farmer_service.get_farmer_full(db, farmer_uuid)
 
 
 @router.patch("/me", response_model=FarmerResponse)
 async def update_me(
     body: FarmerUpdate,
-    farmer: Farmer = Depends(get_current_farmer),
+    farmer_uuid: UUID = Depends(get_current_farmer_id),
     db: AsyncSession = Depends(get_db),
 ):
     data = body.model_dump(exclude_none=True)
     if "land_unit" in data and data["land_unit"]:
         data["land_unit"] = data["land_unit"].value if hasattr(data["land_unit"], 'value') else data["land_unit"]
-    updated = await farmer_service.update_farmer(db, farmer.id, data)
+    updated = await farmer_service.update_farmer(db, farmer_uuid, data)
     return updated
 
 
 @router.put("/me/profile", response_model=FarmerProfileResponse)
 async def upsert_profile(
     body: FarmerProfileCreate,
-    farmer: Farmer = Depends(get_current_farmer),
+    farmer_uuid: UUID = Depends(get_current_farmer_id),
     db: AsyncSession = Depends(get_db),
 ):
     data = body.model_dump(exclude_none=True)
@@ -48,75 +46,85 @@ async def upsert_profile(
         data["irrigation_type"] = data["irrigation_type"].value if hasattr(data["irrigation_type"], 'value') else data["irrigation_type"]
     if "ownership_type" in data and data["ownership_type"]:
         data["ownership_type"] = data["ownership_type"].value if hasattr(data["ownership_type"], 'value') else data["ownership_type"]
-    profile = await farmer_service.create_or_update_profile(db, farmer.id, data)
+    profile = await farmer_service.create_or_update_profile(db, farmer_uuid, data)
     return profile
 
 
 @router.get("/me/crops", response_model=list[FarmerCropResponse])
 async def list_crops(
-    farmer: Farmer = Depends(get_current_farmer),
+    farmer_uuid: UUID = Depends(get_current_farmer_id),
     db: AsyncSession = Depends(get_db),
 ):
-    return await farmer_service.list_crops(db, farmer.id)
+    return await farmer_service.list_crops(db, farmer_uuid)
 
 
 @router.post("/me/crops", response_model=FarmerCropResponse, status_code=201)
 async def add_crop(
     body: FarmerCropCreate,
-    farmer: Farmer = Depends(get_current_farmer),
+    farmer_uuid: UUID = Depends(get_current_farmer_id),
     db: AsyncSession = Depends(get_db),
 ):
-    return await farmer_service.add_crop(db, farmer.id, body.crop_name, body.season.value, body.year)
+    return await farmer_service.add_crop(db, farmer_uuid, body.crop_name, body.season.value, body.year)
 
 
 @router.delete("/me/crops/{crop_id}")
 async def remove_crop(
     crop_id: UUID,
-    farmer: Farmer = Depends(get_current_farmer),
+    farmer_uuid: UUID = Depends(get_current_farmer_id),
     db: AsyncSession = Depends(get_db),
 ):
-    return await farmer_service.remove_crop(db, farmer.id, crop_id)
+    return await farmer_service.remove_crop(db, farmer_uuid, crop_id)
 
 
 @router.post("/me/documents", response_model=FarmerDocumentResponse, status_code=201)
 async def upload_doc(
     doc_type: DocType = Form(...),
     file: UploadFile = File(...),
-    farmer: Farmer = Depends(get_current_farmer),
+    farmer: FarmerPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     doc = await upload_document(db, farmer.id, farmer.farmer_id, doc_type, file)
+    if is_image_document(doc) and doc.processed_at is None:
+        # Commit first so the worker can see the row.
+        await db.commit()
+        from app.tasks.document_tasks import process_document_image
+        process_document_image.delay(str(doc.id))
     return doc
 
 
 @router.get("/me/documents", response_model=list[FarmerDocumentResponse])
 async def list_docs(
-    farmer: Farmer = Depends(get_current_farmer),
+    farmer_uuid: UUID = Depends(get_current_farmer_id),
     db: AsyncSession = Depends(get_db),
 ):
-    return await farmer_service.list_documents(db, farmer.id)
+    return await farmer_service.list_documents(db, farmer_uuid)
 
 
 @router.delete("/me/documents/{doc_id}")
 async def delete_doc(
     doc_id: UUID,
-    farmer: Farmer = Depends(get_current_farmer),
+    background_tasks: BackgroundTasks,
+    farmer_uuid: UUID = Depends(get_current_farmer_id),
     db: AsyncSession = Depends(get_db),
 ):
-    return await farmer_service.delete_document(db, farmer.id, doc_id)
+    unreferenced = await farmer_service.delete_document(db, farmer_uuid, doc_id)
+    if unreferenced:
+        # Background tasks run after get_db has committed, so no row points at these any more.
+        background_tasks.add_task(content_store.delete_objects, unreferenced)
+    return {"message": "Document deleted"}
 
 
 @router.get("/me/access-log", response_model=list[AccessLogEntry])
 async def access_log(
-    farmer: Farmer = Depends(get_current_farmer),
+    farmer_uuid: UUID = Depends(get_current_farmer_id),
     db: AsyncSession = Depends(get_db),
 ):
-    return await farmer_service.get_access_log(db, farmer.id)
+    return await farmer_service.get_access_log(db, farmer_uuid)
 
 
 @router.get("/me/forms", response_model=list[GeneratedFormResponse])
 async def list_forms(
-    farmer: Farmer = Depends(get_current_farmer),
+    farmer_uuid: UUID = Depends(get_current_farmer_id),
     db: AsyncSession = Depends(get_db),
 ):
-    return await farmer_service.list_generated_forms(db, farmer.id)
+    return await farmer_service.list_generated_forms(db, farmer_uuid)
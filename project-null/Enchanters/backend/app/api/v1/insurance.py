@@ -1,11 +1,14 @@
 from uuid import UUID
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.api.deps import get_db, get_current_farmer
+from app.api.deps import get_db, get_current_farmer, get_current_principal
+from app.core.constants import MAX_PAGE_SIZE
+from app.core.pagination import decode_cursor, parse_fields, paginated_response
 from app.schemas.insurance import (
     InsurancePlanResponse, PremiumCalculateRequest, PremiumCalculateResponse,
 )
 from app.schemas.scheme import FormGenerateResponse
+from app.schemas.farmer import FarmerPrincipal
 from app.services import insurance_service
 from app.models.farmer import Farmer
 
@@ -14,16 +17,21 @@ router = APIRouter(prefix="/insurance", tags=["Insurance"])
 
 @router.get("/plans", response_model=list[InsurancePlanResponse])
 async def list_plans(
-    farmer: Farmer = Depends(get_current_farmer),
+    cursor: str | None = Query(None),
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    fields: str | None = Query(None, description="Comma-separated fields to return"),
+    farmer: FarmerPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
-    return await insurance_service.list_plans(db)
+    projection = parse_fields(fields, InsurancePlanResponse)
+    plans = await insurance_service.list_plans(db, after=decode_cursor(cursor), limit=limit)
+    return paginated_response(plans, InsurancePlanResponse, limit, insurance_service.page_key, projection)
 
 
 @router.get("/plans/{plan_id}", response_model=InsurancePlanResponse)
 async def get_plan(
     plan_id: UUID,
-    farmer: Farmer = Depends(get_current_farmer),
+    farmer: FarmerPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     return await insurance_service.get_plan(db, plan_id)
@@ -32,13 +40,14 @@ async def get_plan(
 @router.post("/calculate-premium", response_model=PremiumCalculateResponse)
 async def calculate_premium(
     body: PremiumCalculateRequest,
-    farmer: Farmer = Depends(get_current_farmer),
+    farmer: FarmerPrincipal = Depends(get_current_principal),
 ):
     return await insurance_service.calculate_premium(
         crop=body.crop,
         season=body.season.value,
         district=body.district,
         land_area=body.land_area,
+        state=body.state or farmer.state,
     )
 
 
@@ -1,12 +1,36 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.deps import get_db
+from app.core.constants import LOCATION_SEARCH_MAX_RESULTS
 from app.services import location_service
 
 router = APIRouter(prefix="/location", tags=["Location"])
 
 
 @router.get("/pin/{pincode}")
-async def pin_lookup(pincode: str):
-    return await location_service.get_pin_details(pincode)
+async def pin_lookup(pincode: str, db: AsyncSession = Depends(get_db)):
+    return await location_service.get_pin_details(db, pincode)
+
+
+@router.get("/pins")
+async def search_pins(
+    prefix: str = Query(..., min_length=2, max_length=6, pattern=r"^\d+$"),
+    limit: int = Query(20, ge=1, le=LOCATION_SEARCH_MAX_RESULTS),
+):
+    return {"prefix": prefix, "results": await location_service.search_pins(prefix, limit)}
+
+
+@router.get("/search")
+async def search_locations(
+    q: str = Query(..., min_length=1, max_length=100),
+    level: str | None = Query(None, pattern="^(state|district|sub_district|village)$"),
+    state: str | None = Query(None),
+    sub_district_code: int | None = Query(None),
+    limit: int = Query(20, ge=1, le=LOCATION_SEARCH_MAX_RESULTS),
+    db: AsyncSession = Depends(get_db),
+):
+    results = await location_service.search_locations(db, q, level, state, sub_district_code, limit)
+    return {"query": q, "results": results}
 
 
 @router.get("/states")
@@ -18,3 +42,9 @@ async def list_states():
 async def list_districts(state: str):
     districts = await location_service.list_districts(state)
     return {"state": state, "districts": districts}
+
+
+@router.get("/sub-districts/{state}/{district}")
+async def list_sub_districts(state: str, district: str):
+    sub_districts = await location_service.list_sub_districts(state, district)
+    return {"state": state, "district": district, "sub_districts": sub_districts}
@@ -6,6 +6,7 @@ from app.api.v1.insurance import router as insurance_router
 from app.api.v1.subsidies import router as subsidies_router
 from app.api.v1.location import router as location_router
 from app.api.v1.service import router as service_router
+from app.api.v1.webhooks import router as webhooks_router
 
 api_v1_router = APIRouter(prefix="/api/v1")
 
@@ -16,3 +17,4 @@ api_v1_router.include_router(insurance_router)
 api_v1_router.include_router(subsidies_router)
 api_v1_router.include_router(location_router)
 api_v1_router.include_router(service_router)
+api_v1_router.include_router(webhooks_router)
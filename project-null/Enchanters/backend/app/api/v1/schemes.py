@@ -1,11 +1,14 @@
 from uuid import UUID
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.api.deps import get_db, get_current_farmer
+from app.api.deps import get_db, get_current_farmer, get_current_principal
+from app.core.constants import MAX_PAGE_SIZE
+from app.core.pagination import decode_cursor, parse_fields, paginated_response
 from app.schemas.scheme import (
     SchemeListItem, SchemeDetail, EligibilityBreakdown,
     SchemeRemindRequest, FormGenerateResponse,
 )
+from app.schemas.farmer import FarmerPrincipal
 from app.services import scheme_service
 from app.models.farmer import Farmer
 
@@ -18,19 +21,24 @@ async def list_schemes(
     season: str | None = Query(None),
     state: str | None = Query(None),
     land_area: float | None = Query(None),
-    farmer: Farmer = Depends(get_current_farmer),
+    cursor: str | None = Query(None),
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    fields: str | None = Query(None, description="Comma-separated fields to return"),
+    farmer: FarmerPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
+    projection = parse_fields(fields, SchemeListItem)
     results = await scheme_service.list_schemes_with_eligibility(
-        db, farmer, crop=crop, season=season, state=state, land_area=land_area
+        db, farmer, crop=crop, season=season, state=state, land_area=land_area,
+        after=decode_cursor(cursor), limit=limit,
     )
-    return results
+    return paginated_response(results, SchemeListItem, limit, scheme_service.page_key, projection)
 
 
 @router.get("/{scheme_id}", response_model=SchemeDetail)
 async def get_scheme(
     scheme_id: UUID,
-    farmer: Farmer = Depends(get_current_farmer),
+    farmer: FarmerPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     return await scheme_service.get_scheme_detail(db, scheme_id, farmer)
@@ -39,7 +47,7 @@ async def get_scheme(
 @router.get("/{scheme_id}/eligibility", response_model=EligibilityBreakdown)
 async def check_eligibility(
     scheme_id: UUID,
-    farmer: Farmer = Depends(get_current_farmer),
+    farmer: FarmerPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     return await scheme_service.get_eligibility_breakdown(db, scheme_id, farmer)
@@ -58,7 +66,7 @@ async def generate_form(
 async def set_reminder(
     scheme_id: UUID,
     body: SchemeRemindRequest,
-    farmer: Farmer = Depends(get_current_farmer),
+    farmer: FarmerPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     return await scheme_service.create_scheme_reminder(
@@ -1,5 +1,6 @@
 from uuid import UUID
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.api.deps import get_db, get_current_agent
 from app.schemas.agent import (
@@ -8,9 +9,14 @@ from app.schemas.agent import (
     RequestAccessRequest, RequestAccessResponse,
     VerifyAccessRequest, VerifyAccessResponse,
     AgentSessionDetail, AgentActivityItem,
+    TaskQueuedResponse, TaskStatusResponse,
 )
 from app.schemas.farmer import FarmerResponse
-from app.schemas.scheme import FormGenerateResponse
+from app.schemas.insurance import BulkPremiumQuoteRequest
+from app.schemas.scheme import (
+    FormGenerateResponse, BatchEligibilityRequest,
+    BatchEligibilityResponse, BatchFormJobRequest,
+)
 from app.services import agent_service, scheme_service, insurance_service
 from app.models.agent import Agent
 
@@ -110,3 +116,63 @@ async def get_activity(
     db: AsyncSession = Depends(get_db),
 ):
     return await agent_service.get_activity(db, agent.id)
+
+
+@router.post("/eligibility/batch", response_model=BatchEligibilityResponse)
+async def batch_eligibility(
+    body: BatchEligibilityRequest,
+    agent: Agent = Depends(get_current_agent),
+    db: AsyncSession = Depends(get_db),
+):
+    await agent_service.require_consent(db, agent.id, body.farmer_ids)
+    return await scheme_service.evaluate_eligibility_batch(db, body.farmer_ids, body.scheme_ids)
+
+
+@router.post("/forms/batch", response_model=TaskQueuedResponse, status_code=202)
+async def queue_batch_forms(
+    body: BatchFormJobRequest,
+    agent: Agent = Depends(get_current_agent),
+    db: AsyncSession = Depends(get_db),
+):
+    from app.tasks.pdf_tasks import queue_batch_forms as queue
+    sessions = await agent_service.require_consent(db, agent.id, body.farmer_ids)
+    result = queue(
+        body.farmer_ids, str(body.scheme_id), "agent", agent.name,
+        agent_sessions={kid: str(sid) for kid, sid in sessions.items()},
+        bundle=body.bundle,
+    )
+    await agent_service.record_task_owner(result.id, agent.id)
+    return {"task_id": result.id, "status": "queued"}
+
+
+@router.post("/insurance/quotes")
+async def bulk_premium_quotes(
+    body: BulkPremiumQuoteRequest,
+    format: str = Query("json", pattern="^(json|csv)$"),
+    agent: Agent = Depends(get_current_agent),
+):
+    rows = [row.model_dump(mode="json") for row in body.rows]
+    if format == "csv":
+        return StreamingResponse(
+            await insurance_service.stream_bulk_quotes(rows, "csv"),
+            media_type="text/csv",
+            headers={"Content-Disposition": 'attachment; filename="premium_quotes.csv"'},
+        )
+    return StreamingResponse(await insurance_service.stream_bulk_quotes(rows, "json"), media_type="application/json")
+
+
+@router.get("/tasks/{task_id}", response_model=TaskStatusResponse)
+async def get_task_status(
+    task_id: str,
+    agent: Agent = Depends(get_current_agent),
+):
+    from celery.result import AsyncResult
+    from app.tasks.celery_app import celery_app
+    await agent_service.check_task_owner(task_id, agent.id)
+    result = AsyncResult(task_id, app=celery_app)
+    response = {"task_id": task_id, "status": result.status.lower()}
+    if result.successful():
+        response["result"] = result.result
+    elif result.failed():
+        response["error"] = str(result.result)
+    return response
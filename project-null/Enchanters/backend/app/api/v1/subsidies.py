@@ -1,12 +1,14 @@
 from uuid import UUID
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.api.deps import get_db, get_current_farmer
+from app.api.deps import get_db, get_current_principal
+from app.core.constants import MAX_PAGE_SIZE
+from app.core.pagination import decode_cursor, parse_fields, paginated_response
 from app.schemas.subsidy import (
     SubsidyListItem, SubsidyDetail, SubsidyCalendarItem, SubsidyRemindRequest,
 )
+from app.schemas.farmer import FarmerPrincipal
 from app.services import subsidy_service
-from app.models.farmer import Farmer
 
 router = APIRouter(prefix="/subsidies", tags=["Subsidies"])
 
@@ -15,18 +17,26 @@ router = APIRouter(prefix="/subsidies", tags=["Subsidies"])
 async def list_subsidies(
     category: str | None = Query(None),
     state: str | None = Query(None),
-    status: str | None = Query(None),
-    farmer: Farmer = Depends(get_current_farmer),
+    status: str | None = Query(None, pattern="^(open|closed|upcoming)$"),
+    cursor: str | None = Query(None),
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    fields: str | None = Query(None, description="Comma-separated fields to return"),
+    farmer: FarmerPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
-    return await subsidy_service.list_subsidies(db, category=category, state=state, status_filter=status)
+    projection = parse_fields(fields, SubsidyListItem)
+    results = await subsidy_service.list_subsidies(
+        db, category=category, state=state, status_filter=status,
+        after=decode_cursor(cursor), limit=limit,
+    )
+    return paginated_response(results, SubsidyListItem, limit, subsidy_service.page_key, projection)
 
 
 @router.get("/calendar", response_model=list[SubsidyCalendarItem])
 async def calendar(
     month: int = Query(..., ge=1, le=12),
     year: int = Query(..., ge=2020, le=2100),
-    farmer: Farmer = Depends(get_current_farmer),
+    farmer: FarmerPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     return await subsidy_service.get_calendar(db, month, year)
@@ -35,7 +45,7 @@ async def calendar(
 @router.get("/{subsidy_id}", response_model=SubsidyDetail)
 async def get_subsidy(
     subsidy_id: UUID,
-    farmer: Farmer = Depends(get_current_farmer),
+    farmer: FarmerPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     return await subsidy_service.get_subsidy(db, subsidy_id)
@@ -45,7 +55,7 @@ async def get_subsidy(
 async def set_reminder(
     subsidy_id: UUID,
     body: SubsidyRemindRequest,
-    farmer: Farmer = Depends(get_current_farmer),
+    farmer: FarmerPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     return await subsidy_service.create_subsidy_reminder(
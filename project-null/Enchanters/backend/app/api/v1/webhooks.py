@@ -0,0 +1,27 @@
+import hmac
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.deps import get_db
+from app.config import settings
+from app.core.exceptions import ForbiddenException
+from app.schemas.notification import Msg91DeliveryWebhook, DeliveryReportAck
+from app.services import sms_delivery
+
+router = APIRouter(prefix="/webhooks", tags=["Webhooks"])
+
+
+@router.post("/msg91/dlr", response_model=DeliveryReportAck)
+async def msg91_delivery_reports(
+    body: Msg91DeliveryWebhook,
+    token: str = Query(""),
+    db: AsyncSession = Depends(get_db),
+):
+    if not settings.MSG91_WEBHOOK_TOKEN or not hmac.compare_digest(token, settings.MSG91_WEBHOOK_TOKEN):
+        raise ForbiddenException("Invalid webhook token")
+    reports = [
+        {"request_id": item.request_id, "number": entry.number, "status": entry.status, "desc": entry.desc}
+        for item in body.data
+        for entry in item.report
+    ]
+    applied = await sms_delivery.apply_delivery_reports(db, reports)
+    return {"applied": applied}
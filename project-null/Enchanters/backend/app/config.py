@@ -30,6 +30,14 @@ class Settings(BaseSettings):
     S3_SECRET_KEY: str = "minioadmin"
     S3_BUCKET_NAME: str = "kisaanseva"
     S3_REGION: str = "ap-south-1"
+    # Upload threads and pooled connections per process
+    S3_MAX_POOL_CONNECTIONS: int = 20
+    S3_READ_TIMEOUT_SECONDS: int = 60
+
+    # Form rendering process pool, per API process
+    PDF_RENDER_WORKERS: int = 2
+    PDF_RENDER_MAX_PENDING: int = 16
+    PDF_RENDER_QUEUE_TIMEOUT_SECONDS: float = 10.0
 
     INDIA_POST_API_URL: str = "https://api.postalpincode.in/pincode"
     DATA_GOV_API_KEY: str = ""
@@ -41,12 +49,28 @@ class Settings(BaseSettings):
     MSG91_AUTH_KEY: str = ""
     MSG91_SENDER_ID: str = "KSSEVA"
     MSG91_TEMPLATE_ID: str = ""
+    MSG91_API_URL: str = "https://api.msg91.com/api/v5"
+    # Flow templates per message kind; empty falls back to MSG91_TEMPLATE_ID
+    MSG91_REMINDER_TEMPLATE_ID: str = ""
+    MSG91_AGENT_ACCESS_TEMPLATE_ID: str = ""
+    # Shared secret MSG91 appends to delivery report webhook calls
+    MSG91_WEBHOOK_TOKEN: str = ""
+    # Bulk send throughput per process, as agreed with the provider
+    SMS_MAX_MESSAGES_PER_SECOND: int = 200
 
     SMTP_HOST: str = "smtp.gmail.com"
     SMTP_PORT: int = 587
     SMTP_USER: str = ""
     SMTP_PASSWORD: str = ""
     EMAIL_FROM: str = "noreply@kisaanseva.in"
+    SMTP_USE_TLS: bool = True
+    SMTP_TIMEOUT_SECONDS: float = 30.0
+    # Persistent connections (and send threads) per process
+    SMTP_POOL_SIZE: int = 4
+
+    # "index" ranks schemes in-process from the compiled rule index;
+    # "sql" pushes evaluation, ranking and pagination into PostgreSQL.
+    SCHEME_EVALUATION_MODE: str = "index"
 
     CORS_ORIGINS: str = "http://localhost:3000,http://app.kisaanseva.in,http://service.kisaanseva.in"
 
@@ -98,6 +98,24 @@ class GeneratedByType(str, enum.Enum):
     AGENT = "agent"
 
 
+class SmsDeliveryStatus(str, enum.Enum):
+    SENT = "sent"
+    DELIVERED = "delivered"
+    FAILED = "failed"
+
+
+class OutboxKind(str, enum.Enum):
+    OTP_SMS = "otp_sms"
+    OTP_EMAIL = "otp_email"
+    AGENT_ACCESS_SMS = "agent_access_sms"
+
+
+class OutboxStatus(str, enum.Enum):
+    PENDING = "pending"
+    SENT = "sent"
+    DEAD = "dead"
+
+
 class EligibilityStatus(str, enum.Enum):
     ELIGIBLE = "eligible"
     PARTIAL = "partial"
@@ -112,6 +130,33 @@ LAND_CONVERSION = {
 
 ALLOWED_DOC_EXTENSIONS = {".pdf", ".jpg", ".jpeg", ".png"}
 MAX_FILE_SIZE_BYTES = 5 * 1024 * 1024  # 5MB
+# Multi-page land record scans are allowed to be larger.
+DOC_MAX_FILE_SIZE_BYTES = {
+    DocType.LAND_PROOF: 25 * 1024 * 1024,
+}
+# Leading bytes each allowed extension must start with.
+DOC_FILE_SIGNATURES = {
+    ".pdf": b"%PDF-",
+    ".jpg": b"\xff\xd8\xff",
+    ".jpeg": b"\xff\xd8\xff",
+    ".png": b"\x89PNG\r\n\x1a\n",
+}
+DOC_CONTENT_TYPES = {
+    ".pdf": "application/pdf",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".png": "image/png",
+}
+UPLOAD_READ_CHUNK_BYTES = 1024 * 1024
+# Bump when the PDF layout changes so stored forms are re-rendered.
+PDF_FORM_TEMPLATE_VERSION = 1
+# Photos are re-encoded in the background; PDFs are stored as uploaded.
+DOC_IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png"}
+DOC_IMAGE_MAX_DIMENSION = 2000  # px, long edge; keeps Aadhaar/passbook text legible
+DOC_IMAGE_JPEG_QUALITY = 80
+DOC_THUMBNAIL_DIMENSION = 320
+DOC_THUMBNAIL_JPEG_QUALITY = 70
+S3_MULTIPART_PART_BYTES = 8 * 1024 * 1024  # S3 minimum part size is 5MB
 
 OTP_LENGTH = 6
 OTP_TTL_SECONDS = 300  # 5 minutes
@@ -120,6 +165,80 @@ OTP_LOCKOUT_SECONDS = 900  # 15 minutes
 OTP_RATE_LIMIT_PER_HOUR = 5
 
 AGENT_SESSION_TTL_MINUTES = 30
+AGENT_TASK_OWNER_TTL_SECONDS = 86400  # matches Celery's default result_expires
+
+REMINDER_DISPATCH_CHUNK_SIZE = 500  # reminders locked, sent and marked per transaction
+# Reminders go out in hourly slots between these hours (IST); the last slot starts an hour before the end.
+REMINDER_DELIVERY_START_HOUR = 9
+REMINDER_DELIVERY_END_HOUR = 20
+REMINDER_SLOT_INTERVAL_MINUTES = 5  # how often due slots are processed
+REMINDER_SMS_RATE_SHARE = 0.5  # share of SMS_MAX_MESSAGES_PER_SECOND reminders may use; the rest is for OTPs
+REMINDER_EMAILS_PER_RUN = 5000
+REMINDER_MAX_ATTEMPTS = 3  # then the reminder is given up (failed_at is set)
+REMINDER_RETRY_DELAY_MINUTES = 60  # times the attempt number, kept inside the delivery window
+
+OUTBOX_BATCH_SIZE = 200  # notifications locked and sent per dispatcher pass
+OUTBOX_MAX_ATTEMPTS = 5  # then the row is dead-lettered
+OUTBOX_RETRY_BASE_SECONDS = 2  # exponential backoff with jitter between attempts
+OUTBOX_RETRY_MAX_SECONDS = 60
+OUTBOX_POLL_INTERVAL_SECONDS = 2  # API dispatcher; commits that enqueue also wake it
+OUTBOX_STALE_AFTER_SECONDS = 300  # an OTP nobody can use any more is dead-lettered unsent
+
+SMTP_BATCH_SIZE = 50  # emails sent back-to-back on one pooled connection
+SMTP_MAX_MESSAGES_PER_CONNECTION = 100  # Gmail and most relays cap messages per session
+SMTP_IDLE_TIMEOUT_SECONDS = 60  # idle connections older than this are closed, not reused
+
+SMS_BULK_BATCH_SIZE = 1000  # recipients per MSG91 flow call
+SMS_BULK_MAX_RETRIES = 3
+SMS_RETRY_BASE_SECONDS = 0.5  # full-jitter exponential backoff between retries
+SMS_RETRY_MAX_SECONDS = 8.0
+# MSG91 delivery report status codes; codes not listed are still pending.
+MSG91_DLR_STATUS = {
+    "1": SmsDeliveryStatus.DELIVERED,
+    "2": SmsDeliveryStatus.FAILED,
+    "9": SmsDeliveryStatus.FAILED,  # NDNC
+    "16": SmsDeliveryStatus.FAILED,  # rejected
+    "17": SmsDeliveryStatus.FAILED,  # blocked
+    "25": SmsDeliveryStatus.FAILED,  # rejected by operator
+    "26": SmsDeliveryStatus.FAILED,  # NDNC after submission
+}
+
+PRINCIPAL_CACHE_TTL_SECONDS = 60  # Redis copy of the authenticated farmer's identity
+PRINCIPAL_LOCAL_CACHE_TTL_SECONDS = 15  # per-process copy; bounds staleness across workers
+PRINCIPAL_LOCAL_CACHE_MAXSIZE = 10_000
+
+PINCODE_CACHE_TTL_SECONDS = 30 * 86400  # PIN -> district/state mappings rarely change
+PINCODE_NEGATIVE_CACHE_TTL_SECONDS = 900  # unknown PINs / API failures served from the prefix fallback
+PINCODE_LOCAL_CACHE_TTL_SECONDS = 3600
+PINCODE_LOCAL_CACHE_MAXSIZE = 20_000
+
+CIRCUIT_FAILURE_THRESHOLD = 5  # consecutive upstream failures before a breaker opens
+CIRCUIT_RESET_SECONDS = 30  # open time before a single probe is let through
+CIRCUIT_SHARED_STATE_REFRESH_SECONDS = 2  # how often each process re-reads the Redis copy
+
+LOCATION_DIRECTORY_REFRESH_SECONDS = 3600  # per-process reload of the LGD/PIN directory
+LOCATION_DIRECTORY_RETRY_SECONDS = 60  # after a failed load
+LOCATION_SEARCH_MAX_RESULTS = 50
+
+INSURANCE_RATE_SNAPSHOT_REFRESH_SECONDS = 900  # per-process reload of synced PMFBY rates
+INSURANCE_RATE_SNAPSHOT_RETRY_SECONDS = 60
+
+PREMIUM_QUOTE_MAX_ROWS = 50_000  # rows per bulk quote request
+PREMIUM_QUOTE_STREAM_CHUNK = 1000  # rows serialized per streamed chunk
+
+MAX_PAGE_SIZE = 200  # upper bound for ?limit= on list endpoints
+
+ELIGIBILITY_FINGERPRINT_TTL_SECONDS = 5  # how stale the in-process catalogue index may be after an edit
+ELIGIBILITY_BATCH_CHUNK_SIZE = 1000  # farmers loaded + evaluated per pass
+# Every farmer in a batch needs a live OTP-verified session with the agent
+# (AGENT_SESSION_TTL_MINUTES), so a batch is sized to one camp sitting.
+ELIGIBILITY_BATCH_MAX_FARMERS = 200
+BATCH_FORM_CHUNK_SIZE = 50  # forms rendered per Celery chord member
+BATCH_FORM_MAX_FARMERS = 200  # same consent bound as ELIGIBILITY_BATCH_MAX_FARMERS
+BATCH_FORM_TRANSFER_CONCURRENCY = 16  # concurrent S3 uploads/downloads per chunk
+BATCH_FORM_ZIP_SPOOL_BYTES = 64 * 1024 * 1024  # batch ZIP moves to a temp file past this
+BATCH_FORM_ZIP_TTL_SECONDS = AGENT_TASK_OWNER_TTL_SECONDS  # a batch ZIP lives as long as the task result linking it
+ELIGIBILITY_CACHE_TTL_SECONDS = 86400  # 24 hours; entries also go stale on farmer/catalogue change
 
 INDIAN_STATES = [
     "Andhra Pradesh", "Arunachal Pradesh", "Assam", "Bihar", "Chhattisgarh",
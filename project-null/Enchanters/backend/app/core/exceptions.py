@@ -39,6 +39,11 @@ class RateLimitException(KisaanSevaException):
         super().__init__(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail=detail)
 
 
+class ServiceBusyException(KisaanSevaException):
+    def __init__(self, detail: str = "Service is busy, please try again shortly"):
+        super().__init__(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=detail)
+
+
 class OTPExpiredException(BadRequestException):
     def __init__(self):
         super().__init__(detail="OTP has expired or is invalid")
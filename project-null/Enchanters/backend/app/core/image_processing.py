@@ -0,0 +1,42 @@
+import io
+from PIL import Image, ImageOps
+from app.core.constants import (
+    DOC_IMAGE_MAX_DIMENSION, DOC_IMAGE_JPEG_QUALITY, DOC_THUMBNAIL_DIMENSION, DOC_THUMBNAIL_JPEG_QUALITY,
+)
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _open(data: bytes, max_dimension: int) -> Image.Image:
+    img = Image.open(io.BytesIO(data))
+    # JPEGs decode directly at a reduced scale when far larger than needed.
+    img.draft("RGB", (max_dimension, max_dimension))
+    img = ImageOps.exif_transpose(img)
+    if img.mode not in ("RGB", "L"):
+        background = Image.new("RGB", img.size, "white")
+        rgba = img.convert("RGBA")
+        background.paste(rgba, mask=rgba.getchannel("A"))
+        img = background
+    return img
+
+
+def _encode_jpeg(img: Image.Image, max_dimension: int, quality: int) -> bytes:
+    img.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+    out = io.BytesIO()
+    # EXIF (GPS location of the farmer's house, device) is dropped.
+    img.save(out, format="JPEG", quality=quality, optimize=True, progressive=True)
+    return out.getvalue()
+
+
+def compress_image(data: bytes) -> tuple[bytes, bytes]:
+    """Re-encode a document photo for storage and render its thumbnail.
+
+    Returns (compressed JPEG, thumbnail JPEG). Orientation from EXIF is
+    applied and transparency is flattened onto white.
+    """
+    img = _open(data, DOC_IMAGE_MAX_DIMENSION)
+    thumb_source = img.copy()
+    compressed = _encode_jpeg(img, DOC_IMAGE_MAX_DIMENSION, DOC_IMAGE_JPEG_QUALITY)
+    thumbnail = _encode_jpeg(thumb_source, DOC_THUMBNAIL_DIMENSION, DOC_THUMBNAIL_JPEG_QUALITY)
+    return compressed, thumbnail
@@ -0,0 +1,66 @@
+"""
+Keyset pagination and field projection for list endpoints.
+
+A cursor is the opaque, URL-safe encoding of the sort key of the last item on
+the previous page; services return the items that sort strictly after it. The
+next cursor is sent in the ``X-Next-Cursor`` response header so list bodies
+stay plain JSON arrays.
+"""
+
+import base64
+import binascii
+import json
+from typing import Callable, Iterable
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from app.core.exceptions import BadRequestException
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(key: list) -> str:
+    raw = json.dumps(key, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str | None) -> list | None:
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        key = json.loads(raw)
+    except (binascii.Error, ValueError):
+        raise BadRequestException("Invalid cursor")
+    if not isinstance(key, list):
+        raise BadRequestException("Invalid cursor")
+    return key
+
+
+def parse_fields(fields: str | None, model: type[BaseModel]) -> set[str] | None:
+    """Parse a comma-separated `fields` query value against a response model."""
+    if not fields:
+        return None
+    requested = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = requested - set(model.model_fields)
+    if unknown:
+        raise BadRequestException(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return requested
+
+
+def paginated_response(
+    items: Iterable,
+    model: type[BaseModel],
+    limit: int | None,
+    page_key: Callable[[BaseModel], list],
+    fields: set[str] | None = None,
+) -> JSONResponse:
+    """Validate items against `model`, project them to `fields`, and attach the
+    next-page cursor when the page is full."""
+    rows = [model.model_validate(item) for item in items]
+    headers = {}
+    if limit is not None and rows and len(rows) >= limit:
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(page_key(rows[-1]))
+    return JSONResponse(
+        content=[row.model_dump(mode="json", include=fields) for row in rows],
+        headers=headers,
+    )
@@ -1,4 +1,18 @@
+"""
+Pre-filled scheme and insurance application PDFs.
+
+Paragraph styles, table styles and the static flowables every form shares
+(titles, section headings, rules, signature line, disclaimer) are compiled
+once per thread by ``_template()``, with the static paragraphs' line breaks
+cached after their first layout; a render only builds and lays out the
+farmer- and scheme-specific paragraphs and tables. ReportLab flowables keep layout state
+while a document is built, so the cache is thread-local rather than global.
+
+``benchmarks/pdf_render.py`` compares cold and warm render throughput.
+"""
+
 import io
+import threading
 import uuid
 from datetime import datetime
 from reportlab.lib.pagesizes import A4
@@ -6,21 +20,120 @@ from reportlab.lib.units import cm
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, HRFlowable
 from reportlab.lib import colors
-from reportlab.lib.enums import TA_CENTER, TA_LEFT
+from reportlab.lib.enums import TA_CENTER
 import logging
 
 logger = logging.getLogger(__name__)
 
+_CELL_PADDING = [
+    ("LEFTPADDING", (0, 0), (-1, -1), 8),
+    ("TOPPADDING", (0, 0), (-1, -1), 4),
+    ("BOTTOMPADDING", (0, 0), (-1, -1), 4),
+]
 
-def build_scheme_form_pdf(
-    farmer_data: dict,
-    scheme_data: dict,
-    generated_by: str = "farmer",
-    agent_name: str | None = None,
-) -> tuple[bytes, str]:
-    """Generate a pre-filled scheme application form PDF. Returns (pdf_bytes, filename)."""
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(
+
+class _StaticParagraph(Paragraph):
+    """A paragraph whose text never changes, so its line breaks are computed
+    once per frame width and reused by every later render."""
+
+    _wrapped = None
+
+    def wrap(self, availWidth, availHeight):
+        if self._wrapped is not None and self._wrapped[0] == availWidth:
+            _, self.width, self.height, self.blPara, self._wrapWidths = self._wrapped
+            return self.width, self.height
+        size = super().wrap(availWidth, availHeight)
+        self._wrapped = (availWidth, self.width, self.height, self.blPara, self._wrapWidths)
+        return size
+
+
+class _Template:
+    """Everything in a form that does not depend on the farmer or scheme."""
+
+    def __init__(self):
+        styles = getSampleStyleSheet()
+        self.normal = styles["Normal"]
+        self.title = ParagraphStyle(
+            "CustomTitle", parent=styles["Heading1"], alignment=TA_CENTER, fontSize=16, spaceAfter=12
+        )
+        self.subtitle = ParagraphStyle(
+            "Subtitle", parent=styles["Heading2"], alignment=TA_CENTER, fontSize=12, spaceAfter=8
+        )
+        self.plan_subtitle = ParagraphStyle("Sub", parent=styles["Heading2"], alignment=TA_CENTER)
+        self.bold = ParagraphStyle("BoldStyle", parent=self.normal, fontName="Helvetica-Bold")
+        disclaimer = ParagraphStyle("Disclaimer", parent=self.normal, fontSize=8, textColor=colors.grey)
+
+        self.applicant_table = TableStyle([
+            ("BACKGROUND", (0, 0), (0, -1), colors.Color(0.9, 0.95, 0.9)),
+            ("TEXTCOLOR", (0, 0), (-1, -1), colors.black),
+            ("FONTNAME", (0, 0), (0, -1), "Helvetica-Bold"),
+            ("FONTSIZE", (0, 0), (-1, -1), 10),
+            ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+            ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+            ("LEFTPADDING", (0, 0), (-1, -1), 8),
+            ("RIGHTPADDING", (0, 0), (-1, -1), 8),
+            ("TOPPADDING", (0, 0), (-1, -1), 4),
+            ("BOTTOMPADDING", (0, 0), (-1, -1), 4),
+        ])
+        self.crop_table = TableStyle([
+            ("BACKGROUND", (0, 0), (-1, 0), colors.Color(0.2, 0.5, 0.2)),
+            ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+            ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+            ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+            ("FONTSIZE", (0, 0), (-1, -1), 10),
+            *_CELL_PADDING,
+        ])
+        self.scheme_table = TableStyle([
+            ("BACKGROUND", (0, 0), (0, -1), colors.Color(0.9, 0.9, 0.95)),
+            ("FONTNAME", (0, 0), (0, -1), "Helvetica-Bold"),
+            ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+            ("FONTSIZE", (0, 0), (-1, -1), 10),
+            *_CELL_PADDING,
+        ])
+        self.insurance_table = TableStyle([
+            ("BACKGROUND", (0, 0), (0, -1), colors.Color(0.9, 0.95, 0.9)),
+            ("FONTNAME", (0, 0), (0, -1), "Helvetica-Bold"),
+            ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+            ("FONTSIZE", (0, 0), (-1, -1), 10),
+            *_CELL_PADDING,
+        ])
+
+        self.scheme_heading = _StaticParagraph("KisaanSeva - Government Scheme Application", self.title)
+        self.insurance_heading = _StaticParagraph("KisaanSeva - Insurance Enrollment Form", self.title)
+        self.sections = {
+            name: _StaticParagraph(name, self.bold)
+            for name in ("APPLICANT DETAILS", "CROPS", "SCHEME DETAILS", "DOCUMENTS REQUIRED")
+        }
+        self.rule = HRFlowable(width="100%", thickness=1, color=colors.black)
+        self.thin_rule = HRFlowable(width="100%", thickness=0.5, color=colors.grey)
+        self.gap = Spacer(1, 0.5 * cm)
+        self.small_gap = Spacer(1, 0.3 * cm)
+        self.large_gap = Spacer(1, 1 * cm)
+        self.signature = _StaticParagraph("Applicant Signature: ____________________", self.normal)
+        self.disclaimer = _StaticParagraph(
+            "This form was auto-generated by KisaanSeva platform. "
+            "Please verify all details before submission.",
+            disclaimer,
+        )
+
+
+_local = threading.local()
+
+
+def _template() -> _Template:
+    template = getattr(_local, "template", None)
+    if template is None:
+        template = _local.template = _Template()
+    return template
+
+
+def clear_template_cache() -> None:
+    """Drop this thread's compiled template (used by the benchmark)."""
+    _local.__dict__.pop("template", None)
+
+
+def _document(buffer: io.BytesIO) -> SimpleDocTemplate:
+    return SimpleDocTemplate(
         buffer,
         pagesize=A4,
         rightMargin=2 * cm,
@@ -29,29 +142,36 @@ def build_scheme_form_pdf(
         bottomMargin=2 * cm,
     )
 
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        "CustomTitle", parent=styles["Heading1"], alignment=TA_CENTER, fontSize=16, spaceAfter=12
-    )
-    subtitle_style = ParagraphStyle(
-        "Subtitle", parent=styles["Heading2"], alignment=TA_CENTER, fontSize=12, spaceAfter=8
-    )
-    normal_style = styles["Normal"]
-    bold_style = ParagraphStyle("BoldStyle", parent=normal_style, fontName="Helvetica-Bold")
 
-    elements = []
+def _render(elements: list) -> bytes:
+    buffer = io.BytesIO()
+    _document(buffer).build(elements)
+    return buffer.getvalue()
 
-    elements.append(Paragraph("KisaanSeva - Government Scheme Application", title_style))
-    elements.append(Paragraph(f"Scheme: {scheme_data.get('name_en', 'N/A')}", subtitle_style))
-    elements.append(HRFlowable(width="100%", thickness=1, color=colors.black))
-    elements.append(Spacer(1, 0.5 * cm))
 
-    elements.append(Paragraph(f"Date: {datetime.now().strftime('%d-%m-%Y')}", normal_style))
-    elements.append(Paragraph(f"Application Reference: KS-{uuid.uuid4().hex[:8].upper()}", normal_style))
-    elements.append(Spacer(1, 0.5 * cm))
+def _today() -> str:
+    return datetime.now().strftime('%d-%m-%Y')
 
-    elements.append(Paragraph("APPLICANT DETAILS", bold_style))
-    elements.append(Spacer(1, 0.3 * cm))
+
+def build_scheme_form_pdf(
+    farmer_data: dict,
+    scheme_data: dict,
+    generated_by: str = "farmer",
+    agent_name: str | None = None,
+) -> tuple[bytes, str]:
+    """Generate a pre-filled scheme application form PDF. Returns (pdf_bytes, filename)."""
+    t = _template()
+    elements = [
+        t.scheme_heading,
+        Paragraph(f"Scheme: {scheme_data.get('name_en', 'N/A')}", t.subtitle),
+        t.rule,
+        t.gap,
+        Paragraph(f"Date: {_today()}", t.normal),
+        Paragraph(f"Application Reference: KS-{uuid.uuid4().hex[:8].upper()}", t.normal),
+        t.gap,
+        t.sections["APPLICANT DETAILS"],
+        t.small_gap,
+    ]
 
     farmer_table_data = [
         ["Farmer ID", farmer_data.get("farmer_id", "N/A")],
@@ -72,25 +192,12 @@ def build_scheme_form_pdf(
     if farmer_data.get("irrigation_type"):
         farmer_table_data.append(["Irrigation", farmer_data["irrigation_type"]])
 
-    table = Table(farmer_table_data, colWidths=[5 * cm, 10 * cm])
-    table.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (0, -1), colors.Color(0.9, 0.95, 0.9)),
-        ("TEXTCOLOR", (0, 0), (-1, -1), colors.black),
-        ("FONTNAME", (0, 0), (0, -1), "Helvetica-Bold"),
-        ("FONTSIZE", (0, 0), (-1, -1), 10),
-        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-        ("LEFTPADDING", (0, 0), (-1, -1), 8),
-        ("RIGHTPADDING", (0, 0), (-1, -1), 8),
-        ("TOPPADDING", (0, 0), (-1, -1), 4),
-        ("BOTTOMPADDING", (0, 0), (-1, -1), 4),
-    ]))
-    elements.append(table)
-    elements.append(Spacer(1, 0.5 * cm))
+    elements.append(Table(farmer_table_data, colWidths=[5 * cm, 10 * cm], style=t.applicant_table))
+    elements.append(t.gap)
 
     if farmer_data.get("crops"):
-        elements.append(Paragraph("CROPS", bold_style))
-        elements.append(Spacer(1, 0.3 * cm))
+        elements.append(t.sections["CROPS"])
+        elements.append(t.small_gap)
         crop_rows = [["Crop", "Season", "Year"]]
         for crop in farmer_data["crops"]:
             crop_rows.append([
@@ -98,66 +205,39 @@ def build_scheme_form_pdf(
                 crop.get("season", "N/A"),
                 str(crop.get("year", "N/A")),
             ])
-        crop_table = Table(crop_rows, colWidths=[5 * cm, 5 * cm, 5 * cm])
-        crop_table.setStyle(TableStyle([
-            ("BACKGROUND", (0, 0), (-1, 0), colors.Color(0.2, 0.5, 0.2)),
-            ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
-            ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-            ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-            ("FONTSIZE", (0, 0), (-1, -1), 10),
-            ("LEFTPADDING", (0, 0), (-1, -1), 8),
-            ("TOPPADDING", (0, 0), (-1, -1), 4),
-            ("BOTTOMPADDING", (0, 0), (-1, -1), 4),
-        ]))
-        elements.append(crop_table)
-        elements.append(Spacer(1, 0.5 * cm))
+        elements.append(Table(crop_rows, colWidths=[5 * cm, 5 * cm, 5 * cm], style=t.crop_table))
+        elements.append(t.gap)
 
-    elements.append(Paragraph("SCHEME DETAILS", bold_style))
-    elements.append(Spacer(1, 0.3 * cm))
+    elements.append(t.sections["SCHEME DETAILS"])
+    elements.append(t.small_gap)
     scheme_info = [
         ["Scheme Name", scheme_data.get("name_en", "N/A")],
         ["Ministry", scheme_data.get("ministry", "N/A")],
         ["Benefit Type", scheme_data.get("benefit_type", "N/A")],
         ["Benefit Amount", scheme_data.get("benefit_amount", "N/A")],
     ]
-    scheme_table = Table(scheme_info, colWidths=[5 * cm, 10 * cm])
-    scheme_table.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (0, -1), colors.Color(0.9, 0.9, 0.95)),
-        ("FONTNAME", (0, 0), (0, -1), "Helvetica-Bold"),
-        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-        ("FONTSIZE", (0, 0), (-1, -1), 10),
-        ("LEFTPADDING", (0, 0), (-1, -1), 8),
-        ("TOPPADDING", (0, 0), (-1, -1), 4),
-        ("BOTTOMPADDING", (0, 0), (-1, -1), 4),
-    ]))
-    elements.append(scheme_table)
-    elements.append(Spacer(1, 0.5 * cm))
+    elements.append(Table(scheme_info, colWidths=[5 * cm, 10 * cm], style=t.scheme_table))
+    elements.append(t.gap)
 
     docs_required = scheme_data.get("documents_required", [])
     if docs_required:
-        elements.append(Paragraph("DOCUMENTS REQUIRED", bold_style))
-        elements.append(Spacer(1, 0.3 * cm))
-        for doc in docs_required:
-            elements.append(Paragraph(f"☐  {doc.replace('_', ' ').title()}", normal_style))
-        elements.append(Spacer(1, 0.5 * cm))
+        elements.append(t.sections["DOCUMENTS REQUIRED"])
+        elements.append(t.small_gap)
+        for required in docs_required:
+            elements.append(Paragraph(f"☐  {required.replace('_', ' ').title()}", t.normal))
+        elements.append(t.gap)
 
-    elements.append(HRFlowable(width="100%", thickness=0.5, color=colors.grey))
-    elements.append(Spacer(1, 0.3 * cm))
+    elements.append(t.thin_rule)
+    elements.append(t.small_gap)
 
     if generated_by == "agent" and agent_name:
-        elements.append(Paragraph(f"Generated by Agent: {agent_name}", normal_style))
+        elements.append(Paragraph(f"Generated by Agent: {agent_name}", t.normal))
 
-    elements.append(Paragraph("Applicant Signature: ____________________", normal_style))
-    elements.append(Spacer(1, 0.5 * cm))
-    elements.append(Paragraph(
-        "This form was auto-generated by KisaanSeva platform. "
-        "Please verify all details before submission.",
-        ParagraphStyle("Disclaimer", parent=normal_style, fontSize=8, textColor=colors.grey),
-    ))
+    elements.append(t.signature)
+    elements.append(t.gap)
+    elements.append(t.disclaimer)
 
-    doc.build(elements)
-    pdf_bytes = buffer.getvalue()
-    buffer.close()
+    pdf_bytes = _render(elements)
 
     scheme_slug = scheme_data.get("name_en", "scheme").replace(" ", "_")[:30]
     filename = f"{farmer_data.get('farmer_id', 'farmer')}_{scheme_slug}_{datetime.now().strftime('%Y%m%d')}.pdf"
@@ -168,23 +248,7 @@ def build_scheme_form_pdf(
 
 def build_insurance_form_pdf(farmer_data: dict, plan_data: dict) -> tuple[bytes, str]:
     """Generate a pre-filled insurance enrollment form PDF."""
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=2 * cm, leftMargin=2 * cm, topMargin=2 * cm, bottomMargin=2 * cm)
-
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle("Title2", parent=styles["Heading1"], alignment=TA_CENTER, fontSize=16, spaceAfter=12)
-    normal_style = styles["Normal"]
-    bold_style = ParagraphStyle("Bold2", parent=normal_style, fontName="Helvetica-Bold")
-
-    elements = []
-    elements.append(Paragraph("KisaanSeva - Insurance Enrollment Form", title_style))
-    elements.append(Paragraph(f"Plan: {plan_data.get('name_en', 'N/A')}", ParagraphStyle("Sub", parent=styles["Heading2"], alignment=TA_CENTER)))
-    elements.append(HRFlowable(width="100%", thickness=1, color=colors.black))
-    elements.append(Spacer(1, 0.5 * cm))
-
-    elements.append(Paragraph(f"Date: {datetime.now().strftime('%d-%m-%Y')}", normal_style))
-    elements.append(Spacer(1, 0.5 * cm))
-
+    t = _template()
     info = [
         ["Farmer ID", farmer_data.get("farmer_id", "N/A")],
         ["Name", farmer_data.get("name", "N/A")],
@@ -194,23 +258,17 @@ def build_insurance_form_pdf(farmer_data: dict, plan_data: dict) -> tuple[bytes,
         ["Land Area", f"{farmer_data.get('land_area', 'N/A')} {farmer_data.get('land_unit', 'acre')}"],
         ["Plan Type", plan_data.get("plan_type", "N/A")],
     ]
-    table = Table(info, colWidths=[5 * cm, 10 * cm])
-    table.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (0, -1), colors.Color(0.9, 0.95, 0.9)),
-        ("FONTNAME", (0, 0), (0, -1), "Helvetica-Bold"),
-        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-        ("FONTSIZE", (0, 0), (-1, -1), 10),
-        ("LEFTPADDING", (0, 0), (-1, -1), 8),
-        ("TOPPADDING", (0, 0), (-1, -1), 4),
-        ("BOTTOMPADDING", (0, 0), (-1, -1), 4),
-    ]))
-    elements.append(table)
-    elements.append(Spacer(1, 1 * cm))
-    elements.append(Paragraph("Applicant Signature: ____________________", normal_style))
-
-    doc.build(elements)
-    pdf_bytes = buffer.getvalue()
-    buffer.close()
+    pdf_bytes = _render([
+        t.insurance_heading,
+        Paragraph(f"Plan: {plan_data.get('name_en', 'N/A')}", t.plan_subtitle),
+        t.rule,
+        t.gap,
+        Paragraph(f"Date: {_today()}", t.normal),
+        t.gap,
+        Table(info, colWidths=[5 * cm, 10 * cm], style=t.insurance_table),
+        t.large_gap,
+        t.signature,
+    ])
 
     filename = f"{farmer_data.get('farmer_id', 'farmer')}_insurance_{plan_data.get('plan_type', 'plan')}_{datetime.now().strftime('%Y%m%d')}.pdf"
     return pdf_bytes, filename
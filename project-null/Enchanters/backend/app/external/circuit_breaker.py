@@ -0,0 +1,139 @@
+"""
+Per-upstream circuit breakers.
+
+After `failure_threshold` consecutive failures a breaker opens and callers skip
+the upstream (serving their local fallback) for `reset_seconds`. It then lets
+a single probe through: success closes it, failure opens it again.
+
+The open state is also written to Redis so every API worker and Celery
+process stops calling a dead upstream as soon as any one of them notices;
+each process re-reads the shared state at most every
+CIRCUIT_SHARED_STATE_REFRESH_SECONDS.
+"""
+
+import time
+from app.core.constants import (
+    CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_SECONDS, CIRCUIT_SHARED_STATE_REFRESH_SECONDS,
+)
+from app.core.metrics import counter, gauge
+from app.core.otp import get_redis
+import logging
+
+logger = logging.getLogger(__name__)
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+_STATE_VALUES = {CLOSED: 0, OPEN: 1, HALF_OPEN: 2}
+
+CIRCUIT_STATE = gauge(
+    "kisaanseva_circuit_state", "Circuit breaker state (0 closed, 1 open, 2 half-open)", ("upstream",),
+)
+CIRCUIT_SHORT_CIRCUITS = counter(
+    "kisaanseva_circuit_short_circuits_total", "Calls skipped because the circuit was open", ("upstream",),
+)
+CIRCUIT_TRIPS = counter(
+    "kisaanseva_circuit_trips_total", "Times a circuit breaker opened", ("upstream",),
+)
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        reset_seconds: float = CIRCUIT_RESET_SECONDS,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._failures = 0
+        self._opened_until = 0.0  # time.monotonic(); 0 when closed
+        self._probe_in_flight = False
+        self._shared_checked_at = float("-inf")
+        CIRCUIT_STATE.set(0, upstream=name)
+
+    @property
+    def _redis_key(self) -> str:
+        return f"circuit:{self.name}:open_until"
+
+    @property
+    def state(self) -> str:
+        if not self._opened_until:
+            return CLOSED
+        return OPEN if time.monotonic() < self._opened_until else HALF_OPEN
+
+    async def allow(self) -> bool:
+        """Whether the caller may try the upstream now."""
+        await self._sync_shared_state()
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            CIRCUIT_STATE.set(_STATE_VALUES[HALF_OPEN], upstream=self.name)
+            return True
+        CIRCUIT_SHORT_CIRCUITS.inc(upstream=self.name)
+        return False
+
+    async def record_success(self) -> None:
+        was_open = bool(self._opened_until)
+        self._failures = 0
+        self._opened_until = 0.0
+        self._probe_in_flight = False
+        CIRCUIT_STATE.set(_STATE_VALUES[CLOSED], upstream=self.name)
+        if was_open:
+            logger.info("Circuit %s closed", self.name)
+            try:
+                r = await get_redis()
+                await r.delete(self._redis_key)
+            except Exception as e:
+                logger.warning("Circuit %s: failed to clear shared state: %s", self.name, e)
+
+    async def record_failure(self) -> None:
+        self._failures += 1
+        if self._probe_in_flight or self._failures >= self.failure_threshold:
+            await self.trip()
+
+    async def trip(self) -> None:
+        """Open the circuit here and in every other process."""
+        self._opened_until = time.monotonic() + self.reset_seconds
+        self._probe_in_flight = False
+        CIRCUIT_STATE.set(_STATE_VALUES[OPEN], upstream=self.name)
+        CIRCUIT_TRIPS.inc(upstream=self.name)
+        logger.warning(
+            "Circuit %s opened for %.0fs after %d consecutive failures",
+            self.name, self.reset_seconds, self._failures,
+        )
+        try:
+            r = await get_redis()
+            await r.set(self._redis_key, time.time() + self.reset_seconds, ex=max(1, int(self.reset_seconds)))
+        except Exception as e:
+            logger.warning("Circuit %s: failed to publish open state: %s", self.name, e)
+
+    async def _sync_shared_state(self) -> None:
+        now = time.monotonic()
+        if now - self._shared_checked_at < CIRCUIT_SHARED_STATE_REFRESH_SECONDS:
+            return
+        self._shared_checked_at = now
+        try:
+            r = await get_redis()
+            raw = await r.get(self._redis_key)
+        except Exception as e:
+            logger.debug("Circuit %s: shared state unavailable: %s", self.name, e)
+            return
+        if raw is None:
+            return
+        remaining = float(raw) - time.time()
+        if remaining > 0 and now + remaining > self._opened_until:
+            self._opened_until = now + remaining
+            self._probe_in_flight = False
+            CIRCUIT_STATE.set(_STATE_VALUES[OPEN], upstream=self.name)
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    breaker = _breakers.get(name)
+    if breaker is None:
+        breaker = _breakers[name] = CircuitBreaker(name)
+    return breaker
@@ -1,5 +1,6 @@
 import httpx
 from app.config import settings
+from app.external.http import get_client
 import logging
 
 logger = logging.getLogger(__name__)
@@ -17,13 +18,13 @@ async def fetch_agriculture_data(resource_id: str, filters: dict | None = None,
             for k, v in filters.items():
                 params[f"filters[{k}]"] = v
 
-        async with httpx.AsyncClient(timeout=15.0) as client:
-            response = await client.get(
-                f"{settings.DATA_GOV_API_URL}/{resource_id}",
-                params=params,
-            )
-            response.raise_for_status()
-            return response.json()
+        client = get_client("data_gov")
+        response = await client.get(
+            f"{settings.DATA_GOV_API_URL}/{resource_id}",
+            params=params,
+        )
+        response.raise_for_status()
+        return response.json()
 
     except httpx.HTTPError as e:
         logger.warning("data.gov.in API failed: %s", str(e))
@@ -1,45 +1,232 @@
+"""
+Email over a pool of persistent SMTP connections.
+
+Opening a connection, STARTTLS and AUTH used to happen for every message.
+The pool keeps up to SMTP_POOL_SIZE authenticated connections per process
+and reuses them; a connection is replaced after SMTP_MAX_MESSAGES_PER_CONNECTION
+messages (providers cap this) or once it has idled past
+SMTP_IDLE_TIMEOUT_SECONDS (servers drop idle sessions). smtplib is blocking,
+so sends run on a dedicated thread pool of the same size, never on the
+default executor. ``send_bulk_email`` sends batches of SMTP_BATCH_SIZE
+messages per connection.
+
+Like ``app.external.storage`` nothing here is bound to an event loop, so
+Celery tasks share the pool across their per-task loops.
+"""
+
+import asyncio
+import queue
 import smtplib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-import asyncio
+from typing import NamedTuple
 from app.config import settings
+from app.core.constants import (
+    SMTP_BATCH_SIZE, SMTP_MAX_MESSAGES_PER_CONNECTION, SMTP_IDLE_TIMEOUT_SECONDS,
+)
+from app.core.metrics import counter
 import logging
 
 logger = logging.getLogger(__name__)
 
+SMTP_CONNECTIONS_OPENED = counter(
+    "kisaanseva_smtp_connections_opened_total", "SMTP connections opened (handshake + login)",
+)
+EMAILS_SENT = counter(
+    "kisaanseva_emails_total", "Emails handed to the SMTP server by outcome", ("outcome",),
+)
+
+
+class EmailMessage(NamedTuple):
+    to: str
+    subject: str
+    body_html: str
+
+
+class _Connection:
+    def __init__(self, smtp: smtplib.SMTP):
+        self.smtp = smtp
+        self.sent = 0
+        self.last_used = time.monotonic()
+
+    def close(self) -> None:
+        try:
+            self.smtp.quit()
+        except Exception:
+            self.smtp.close()
+
+
+class SmtpPool:
+    """Authenticated SMTP connections shared by the send threads."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self._idle: queue.LifoQueue[_Connection] = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def _connect(self) -> _Connection:
+        smtp = smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT, timeout=settings.SMTP_TIMEOUT_SECONDS)
+        try:
+            if settings.SMTP_USE_TLS:
+                smtp.starttls()
+            if settings.SMTP_USER:
+                smtp.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
+        except Exception:
+            smtp.close()
+            raise
+        SMTP_CONNECTIONS_OPENED.inc()
+        return _Connection(smtp)
+
+    def _checkout(self) -> _Connection:
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                return self._connect()
+            if time.monotonic() - conn.last_used < SMTP_IDLE_TIMEOUT_SECONDS:
+                return conn
+            conn.close()
+
+    def _checkin(self, conn: _Connection) -> None:
+        if conn.sent >= SMTP_MAX_MESSAGES_PER_CONNECTION:
+            conn.close()
+        else:
+            conn.last_used = time.monotonic()
+            self._idle.put(conn)
+
+    def send(self, messages: list[EmailMessage]) -> list[bool]:
+        """Send messages over one pooled connection (blocking)."""
+        results = []
+        with self._slots:
+            conn = None
+            try:
+                for msg in messages:
+                    if conn is None:
+                        conn = self._checkout()
+                    try:
+                        results.append(self._send_one(conn, msg))
+                    except smtplib.SMTPServerDisconnected:
+                        # Dropped between sends; reconnect once and retry this message.
+                        conn.smtp.close()
+                        conn = self._connect()
+                        results.append(self._send_one(conn, msg))
+                    if conn.sent >= SMTP_MAX_MESSAGES_PER_CONNECTION:
+                        conn.close()
+                        conn = None
+            except Exception as e:
+                logger.error("SMTP send failed: %s", str(e))
+                if conn is not None:
+                    conn.smtp.close()
+                    conn = None
+                results.extend([False] * (len(messages) - len(results)))
+            finally:
+                if conn is not None:
+                    self._checkin(conn)
+        EMAILS_SENT.inc(sum(results), outcome="sent")
+        EMAILS_SENT.inc(len(results) - sum(results), outcome="failed")
+        return results
+
+    def _send_one(self, conn: _Connection, message: EmailMessage) -> bool:
+        try:
+            conn.smtp.sendmail(settings.EMAIL_FROM, message.to, _build_mime(message))
+        except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError) as e:
+            # Refused message; the session is still usable.
+            logger.warning("Email to %s refused: %s", message.to, e)
+            return False
+        finally:
+            conn.sent += 1
+        logger.info("Email sent to %s", message.to)
+        return True
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+def _build_mime(message: EmailMessage) -> str:
+    msg = MIMEMultipart("alternative")
+    msg["Subject"] = message.subject
+    msg["From"] = settings.EMAIL_FROM
+    msg["To"] = message.to
+    msg.attach(MIMEText(message.body_html, "html"))
+    return msg.as_string()
+
+
+_pool: SmtpPool | None = None
+_executor: ThreadPoolExecutor | None = None
+_lock = threading.Lock()
+
+
+def _get_pool() -> tuple[SmtpPool, ThreadPoolExecutor]:
+    global _pool, _executor
+    if _pool is None:
+        with _lock:
+            if _pool is None:
+                _executor = ThreadPoolExecutor(max_workers=settings.SMTP_POOL_SIZE, thread_name_prefix="smtp")
+                _pool = SmtpPool(settings.SMTP_POOL_SIZE)
+    return _pool, _executor
+
+
+def _configured() -> bool:
+    return bool(settings.SMTP_USER and settings.SMTP_PASSWORD)
+
+
+async def send_bulk_email(messages: list[EmailMessage]) -> list[bool]:
+    """Send many emails, SMTP_BATCH_SIZE per pooled connection. Returns a
+    success flag per message, in order."""
+    if not messages:
+        return []
+    if not _configured():
+        logger.info("SMTP not configured. %d emails (dev mode)", len(messages))
+        return [True] * len(messages)
+
+    pool, executor = _get_pool()
+    loop = asyncio.get_running_loop()
+    batches = [messages[i:i + SMTP_BATCH_SIZE] for i in range(0, len(messages), SMTP_BATCH_SIZE)]
+    outcomes = await asyncio.gather(*(loop.run_in_executor(executor, pool.send, batch) for batch in batches))
+    return [ok for batch in outcomes for ok in batch]
+
 
 async def send_email(to: str, subject: str, body_html: str) -> bool:
-    """Send email via SMTP (runs in thread pool to avoid blocking)."""
-    if not settings.SMTP_USER or not settings.SMTP_PASSWORD:
+    """Send email via SMTP (runs on the SMTP thread pool to avoid blocking)."""
+    if not _configured():
         logger.info("SMTP not configured. Email (dev mode): to=%s, subject=%s", to, subject)
         return True
 
+    pool, executor = _get_pool()
     try:
-        result = await asyncio.get_event_loop().run_in_executor(
-            None, _send_email_sync, to, subject, body_html
+        results = await asyncio.get_running_loop().run_in_executor(
+            executor, pool.send, [EmailMessage(to, subject, body_html)],
         )
-        return result
+        return results[0]
     except Exception as e:
         logger.error("Failed to send email to %s: %s", to, str(e))
         return False
 
 
-def _send_email_sync(to: str, subject: str, body_html: str) -> bool:
-    msg = MIMEMultipart("alternative")
-    msg["Subject"] = subject
-    msg["From"] = settings.EMAIL_FROM
-    msg["To"] = to
-    msg.attach(MIMEText(body_html, "html"))
+def init_email() -> None:
+    if _configured():
+        _get_pool()
+        logger.info("SMTP pool ready (size=%d)", settings.SMTP_POOL_SIZE)
 
-    with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT) as server:
-        server.starttls()
-        server.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
-        server.sendmail(settings.EMAIL_FROM, to, msg.as_string())
-        logger.info("Email sent to %s", to)
-    return True
 
+def close_email() -> None:
+    global _pool, _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
+    if _pool is not None:
+        _pool.close()
+        _pool = None
 
-async def send_otp_email(to: str, otp: str) -> bool:
+
+def otp_email(to: str, otp: str) -> EmailMessage:
     subject = "KisaanSeva - Email Verification OTP"
     body = f"""
     <html>
@@ -53,10 +240,10 @@ async def send_otp_email(to: str, otp: str) -> bool:
     </body>
     </html>
     """
-    return await send_email(to, subject, body)
+    return EmailMessage(to, subject, body)
 
 
-async def send_reminder_email(to: str, reminder_type: str, item_name: str, deadline: str) -> bool:
+def reminder_email(to: str, reminder_type: str, item_name: str, deadline: str) -> EmailMessage:
     subject = f"KisaanSeva - Reminder: {item_name}"
     body = f"""
     <html>
@@ -71,4 +258,12 @@ async def send_reminder_email(to: str, reminder_type: str, item_name: str, deadl
     </body>
     </html>
     """
-    return await send_email(to, subject, body)
+    return EmailMessage(to, subject, body)
+
+
+async def send_otp_email(to: str, otp: str) -> bool:
+    return await send_email(*otp_email(to, otp))
+
+
+async def send_reminder_email(to: str, reminder_type: str, item_name: str, deadline: str) -> bool:
+    return await send_email(*reminder_email(to, reminder_type, item_name, deadline))
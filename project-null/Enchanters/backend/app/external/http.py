@@ -0,0 +1,82 @@
+"""
+Shared, pooled httpx clients for external integrations.
+
+One AsyncClient per upstream keeps TCP/TLS connections alive between calls
+instead of paying a handshake on every request. Each upstream gets its own
+connection limits and timeouts so a slow government API cannot exhaust the
+pool used for OTP SMS. HTTP/2 is enabled when the optional ``h2`` package is
+installed.
+
+Clients are bound to the event loop that created them. The API process
+creates them in the FastAPI lifespan; Celery tasks, which run each task on a
+fresh loop, get clients lazily and close them when the task's loop finishes.
+"""
+
+import asyncio
+import httpx
+from app.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# name -> (timeout seconds, max connections, max keep-alive connections)
+UPSTREAMS: dict[str, tuple[float, int, int]] = {
+    "india_post": (10.0, 50, 20),
+    "lgd": (10.0, 10, 5),
+    "pmfby": (10.0, 20, 10),
+    "data_gov": (15.0, 10, 5),
+    "msg91": (10.0, 100, 40),
+}
+
+KEEPALIVE_EXPIRY_SECONDS = 30.0
+
+_clients: dict[str, tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]] = {}
+
+
+def _build_client(name: str) -> httpx.AsyncClient:
+    timeout, max_connections, max_keepalive = UPSTREAMS[name]
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(timeout, connect=min(timeout, 5.0)),
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=KEEPALIVE_EXPIRY_SECONDS,
+        ),
+        http2=HTTP2_AVAILABLE,
+        headers={"User-Agent": f"{settings.APP_NAME}/1.0"},
+    )
+
+
+def get_client(name: str) -> httpx.AsyncClient:
+    """Return the pooled client for an upstream, creating it for the running loop if needed."""
+    loop = asyncio.get_running_loop()
+    entry = _clients.get(name)
+    if entry is not None:
+        client_loop, client = entry
+        if client_loop is loop and not client.is_closed:
+            return client
+
+    client = _build_client(name)
+    _clients[name] = (loop, client)
+    return client
+
+
+async def init_http_clients() -> None:
+    for name in UPSTREAMS:
+        get_client(name)
+    logger.info("HTTP clients ready for %d upstreams (http2=%s)", len(UPSTREAMS), HTTP2_AVAILABLE)
+
+
+async def close_http_clients() -> None:
+    """Close every client created on the running loop."""
+    loop = asyncio.get_running_loop()
+    for name, (client_loop, client) in list(_clients.items()):
+        if client_loop is loop:
+            await client.aclose()
+            del _clients[name]
@@ -1,40 +1,135 @@
+"""
+India Post PIN code lookup.
+
+Lookups go through three tiers before the India Post API: a bounded
+per-process LRU, Redis (shared by every worker and surviving restarts), and
+the ``pin_codes`` directory table loaded by ``scraper/prewarm_pincodes.py``.
+API results are written back to the local cache and Redis. PINs the API does
+not know, or cannot answer for, are cached as their prefix-based fallback for
+a short time so repeated signups with the same PIN do not each wait on it.
+"""
+
+import json
+import re
 import httpx
-from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.config import settings
-from app.core.exceptions import ExternalAPIException
+from app.core.cache import TTLCache
+from app.core.constants import (
+    PINCODE_CACHE_TTL_SECONDS, PINCODE_NEGATIVE_CACHE_TTL_SECONDS,
+    PINCODE_LOCAL_CACHE_TTL_SECONDS, PINCODE_LOCAL_CACHE_MAXSIZE,
+)
+from app.core.otp import get_redis
+from app.external.circuit_breaker import get_breaker
+from app.external.http import get_client
+from app.external.singleflight import SingleFlight
+from app.models.location import PinCode
+from app.services.location_directory import current_directory
 import logging
 
 logger = logging.getLogger(__name__)
 
-PINCODE_CACHE: dict[str, dict] = {}
+PINCODE_CACHE = TTLCache(maxsize=PINCODE_LOCAL_CACHE_MAXSIZE, ttl=PINCODE_LOCAL_CACHE_TTL_SECONDS)
+
+# Concurrent misses for the same PIN (e.g. a registration camp) share one API call.
+_pincode_flight = SingleFlight("india_post")
+breaker = get_breaker("india_post")
+
+_PINCODE_PATTERN = re.compile(r"^\d{6}$")
+
 
+def _redis_key(pincode: str) -> str:
+    return f"pincode:{pincode}"
 
-async def lookup_pincode(pincode: str) -> dict:
-    """Look up district, state, and post offices from Indian PIN code using India Post API."""
-    if pincode in PINCODE_CACHE:
-        logger.debug("PIN code %s found in cache", pincode)
-        return PINCODE_CACHE[pincode]
+
+def pincode_result(pincode: str, district: str, state: str, post_offices: list[dict]) -> dict:
+    return {
+        "pincode": pincode,
+        "district": district,
+        "state": state,
+        "country": "India",
+        "post_offices": post_offices,
+    }
+
+
+async def lookup_pincode(pincode: str, db: AsyncSession | None = None) -> dict:
+    """Look up district, state, and post offices from Indian PIN code.
+
+    Pass `db` to consult the prewarmed ``pin_codes`` directory before calling
+    the India Post API.
+    """
+    if not _PINCODE_PATTERN.match(pincode):
+        return _fallback_pincode(pincode)
+
+    cached = PINCODE_CACHE.get(pincode)
+    if cached is not None:
+        logger.debug("PIN code %s found in local cache", pincode)
+        return cached
 
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(f"{settings.INDIA_POST_API_URL}/{pincode}")
-            response.raise_for_status()
-            data = response.json()
+        r = await get_redis()
+        raw = await r.get(_redis_key(pincode))
+        if raw:
+            result = json.loads(raw)
+            PINCODE_CACHE.set(pincode, result)
+            return result
+    except Exception as e:
+        logger.warning("PIN cache read failed for %s: %s", pincode, e)
+
+    if db is not None:
+        row = await db.get(PinCode, pincode)
+        if row is not None:
+            result = pincode_result(row.pincode, row.district, row.state, row.post_offices or [])
+            await _remember(pincode, result, PINCODE_CACHE_TTL_SECONDS)
+            return result
+
+    return await _pincode_flight.do(pincode, lambda: _resolve_from_api(pincode))
+
+
+async def _resolve_from_api(pincode: str) -> dict:
+    result = await _fetch_pincode(pincode)
+    if result is None:
+        result = _fallback_pincode(pincode)
+        await _remember(pincode, result, PINCODE_NEGATIVE_CACHE_TTL_SECONDS)
+    else:
+        await _remember(pincode, result, PINCODE_CACHE_TTL_SECONDS)
+    return result
+
+
+async def _remember(pincode: str, result: dict, ttl: int) -> None:
+    PINCODE_CACHE.set(pincode, result)
+    try:
+        r = await get_redis()
+        await r.set(_redis_key(pincode), json.dumps(result), ex=ttl)
+    except Exception as e:
+        logger.warning("PIN cache write failed for %s: %s", pincode, e)
+
+
+async def _fetch_pincode(pincode: str) -> dict | None:
+    """Query the India Post API; None when the PIN is unknown or the API fails."""
+    if not await breaker.allow():
+        return None
+    try:
+        client = get_client("india_post")
+        response = await client.get(f"{settings.INDIA_POST_API_URL}/{pincode}")
+        response.raise_for_status()
+        data = response.json()
+        await breaker.record_success()
 
         if not data or data[0].get("Status") != "Success":
-            return _fallback_pincode(pincode)
+            return None
 
-        post_offices = data[0].get("PostOffice", [])
+        post_offices = data[0].get("PostOffice") or []
         if not post_offices:
-            return _fallback_pincode(pincode)
+            return None
 
         first = post_offices[0]
-        result = {
-            "pincode": pincode,
-            "district": first.get("District", ""),
-            "state": first.get("State", ""),
-            "country": first.get("Country", "India"),
-            "post_offices": [
+        return pincode_result(
+            pincode,
+            first.get("District", ""),
+            first.get("State", ""),
+            [
                 {
                     "name": po.get("Name", ""),
                     "branch_type": po.get("BranchType", ""),
@@ -45,20 +140,29 @@ async def lookup_pincode(pincode: str) -> dict:
                 }
                 for po in post_offices
             ],
-        }
-        PINCODE_CACHE[pincode] = result
-        return result
+        )
 
     except httpx.HTTPError as e:
         logger.warning("India Post API failed for PIN %s: %s", pincode, str(e))
-        return _fallback_pincode(pincode)
+        await breaker.record_failure()
+        return None
     except Exception as e:
         logger.error("Unexpected error in India Post lookup: %s", str(e))
-        return _fallback_pincode(pincode)
+        await breaker.record_failure()
+        return None
 
 
 def _fallback_pincode(pincode: str) -> dict:
-    """Fallback with basic state mapping when API is unavailable."""
+    """Fallback when the API is unavailable or does not know the PIN.
+
+    Uses the location directory's nearest known PIN prefix when one places the
+    PIN unambiguously, otherwise a state guessed from the first two digits.
+    """
+    located = current_directory().locate_pin(pincode)
+    if located is not None:
+        district, state = located
+        return pincode_result(pincode, district, state, [])
+
     prefix_to_state = {
         "11": "Delhi", "12": "Haryana", "13": "Punjab", "14": "Himachal Pradesh",
         "15": "Jammu and Kashmir", "16": "Punjab", "17": "Himachal Pradesh",
@@ -88,10 +192,4 @@ def _fallback_pincode(pincode: str) -> dict:
     }
     prefix = pincode[:2]
     state = prefix_to_state.get(prefix, "")
-    return {
-        "pincode": pincode,
-        "district": "",
-        "state": state,
-        "country": "India",
-        "post_offices": [],
-    }
+    return pincode_result(pincode, "", state, [])
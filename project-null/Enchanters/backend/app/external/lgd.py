@@ -1,5 +1,5 @@
-import httpx
 from app.config import settings
+from app.external.http import get_client
 from app.core.constants import INDIAN_STATES
 import logging
 
@@ -31,14 +31,14 @@ STATE_DISTRICTS: dict[str, list[str]] = {
 async def get_districts_from_api(state: str) -> list[str]:
     """Try LGD API for districts, fall back to local data."""
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(
-                f"{settings.LGD_API_URL}/districts",
-                params={"state": state},
-            )
-            if response.status_code == 200:
-                data = response.json()
-                return [d.get("name", "") for d in data.get("districts", [])]
+        client = get_client("lgd")
+        response = await client.get(
+            f"{settings.LGD_API_URL}/districts",
+            params={"state": state},
+        )
+        if response.status_code == 200:
+            data = response.json()
+            return [d.get("name", "") for d in data.get("districts", [])]
     except Exception as e:
         logger.warning("LGD API failed for state %s: %s", state, str(e))
 
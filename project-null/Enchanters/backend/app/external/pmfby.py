@@ -1,5 +1,7 @@
-import httpx
+import zlib
 from app.config import settings
+from app.external.http import get_client
+from app.external.circuit_breaker import OPEN, get_breaker
 import logging
 
 logger = logging.getLogger(__name__)
@@ -24,6 +26,10 @@ SUM_INSURED_PER_HECTARE = {
 
 COMMERCIAL_CROPS = {"sugarcane", "cotton", "jute", "tobacco", "mango", "banana", "apple", "orange", "grape", "guava", "tea", "coffee", "rubber", "coconut"}
 
+DEFAULT_SUM_INSURED_PER_HECTARE = 30_000
+DEFAULT_PREMIUM_RATE = 2.0
+ACRES_PER_HECTARE = 2.47105
+
 INSURANCE_COMPANIES = [
     "Agriculture Insurance Company of India",
     "ICICI Lombard General Insurance",
@@ -34,59 +40,78 @@ INSURANCE_COMPANIES = [
 ]
 
 
-async def calculate_premium_from_api(crop: str, season: str, district: str, land_area_hectares: float) -> dict | None:
-    """Try to calculate premium from PMFBY API. Returns None if API unavailable."""
+breaker = get_breaker("pmfby")
+
+
+async def fetch_rate_notifications(season: str, year: int) -> list[dict] | None:
+    """Download every district × crop rate notified for a season.
+
+    Returns None if PMFBY fails part-way, so a partial download never replaces
+    a complete set. Called by the rate sync, not on user requests; it always
+    tries the API and reports the outcome to the PMFBY circuit breaker.
+    """
+    client = get_client("pmfby")
+    rates: list[dict] = []
+    page = 1
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.post(
-                f"{settings.PMFBY_API_URL}/premium-calculator",
-                json={
-                    "crop": crop,
-                    "season": season,
-                    "district": district,
-                    "area_hectares": land_area_hectares,
-                },
+        while page:
+            response = await client.get(
+                f"{settings.PMFBY_API_URL}/rate-notifications",
+                params={"season": season, "year": year, "page": page},
             )
-            if response.status_code == 200:
-                data = response.json()
-                return {
-                    "sum_insured": data.get("sum_insured", 0),
-                    "farmer_premium": data.get("farmer_premium", 0),
-                    "govt_subsidy": data.get("govt_subsidy", 0),
-                    "insurance_company": data.get("insurance_company", ""),
-                    "premium_rate_percent": data.get("premium_rate", 0),
-                    "source": "pmfby_api",
-                }
+            response.raise_for_status()
+            data = response.json()
+            for item in data.get("rates", []):
+                rates.append({
+                    "state": item.get("state", ""),
+                    "district": item.get("district", ""),
+                    "crop": item.get("crop", ""),
+                    "sum_insured_per_hectare": item.get("sum_insured_per_hectare"),
+                    "farmer_premium_rate": item.get("farmer_premium_rate"),
+                    "actuarial_rate": item.get("actuarial_rate"),
+                    "insurance_company": item.get("insurance_company"),
+                })
+            page = data.get("next_page")
     except Exception as e:
-        logger.warning("PMFBY API unavailable: %s", str(e))
+        logger.warning("PMFBY rate download failed for %s %s: %s", season, year, str(e))
+        if breaker.state != OPEN:
+            await breaker.trip()
+        return None
 
-    return None
+    await breaker.record_success()
+    return rates
 
 
-def calculate_premium_local(crop: str, season: str, district: str, land_area_hectares: float) -> dict:
-    """Local fallback premium calculation based on standard PMFBY rates."""
-    crop_lower = crop.lower()
-    season_lower = season.lower()
+def assign_company(crop: str, season: str, district: str) -> str:
+    """Stable insurer for a crop/season/district, so repeated quotes agree."""
+    key = f"{crop.strip().lower()}|{season.strip().lower()}|{district.strip().lower()}"
+    return INSURANCE_COMPANIES[zlib.crc32(key.encode()) % len(INSURANCE_COMPANIES)]
 
-    si_per_ha = SUM_INSURED_PER_HECTARE.get(crop_lower, 30_000)
-    total_sum_insured = si_per_ha * land_area_hectares
 
+def standard_rates(crop: str, season: str) -> tuple[float, float]:
+    """(farmer premium %, government subsidy %) of sum insured from the standard rate tables."""
+    crop_lower = crop.lower()
     is_commercial = crop_lower in COMMERCIAL_CROPS
     crop_category = "commercial_horticultural" if is_commercial else "food_grains_oilseeds"
-    season_rates = PREMIUM_RATES.get(season_lower, PREMIUM_RATES["kharif"])
-    rate = season_rates.get(crop_category, 2.0)
+    season_rates = PREMIUM_RATES.get(season.lower(), PREMIUM_RATES["kharif"])
+    rate = season_rates.get(crop_category, DEFAULT_PREMIUM_RATE)
+    return rate, (min(rate, 5.0) if is_commercial else rate) * 1.5
 
-    farmer_premium = total_sum_insured * (rate / 100)
-    govt_subsidy = total_sum_insured * ((min(rate, 5.0) if is_commercial else rate) / 100) * 1.5
 
-    import random
-    company = random.choice(INSURANCE_COMPANIES)
+def calculate_premium_local(crop: str, season: str, district: str, land_area_hectares: float) -> dict:
+    """Local fallback premium calculation based on standard PMFBY rates."""
+    si_per_ha = SUM_INSURED_PER_HECTARE.get(crop.lower(), DEFAULT_SUM_INSURED_PER_HECTARE)
+    total_sum_insured = si_per_ha * land_area_hectares
+
+    rate, subsidy_rate = standard_rates(crop, season)
+    farmer_premium = total_sum_insured * (rate / 100)
+    govt_subsidy = total_sum_insured * (subsidy_rate / 100)
 
     return {
         "sum_insured": round(total_sum_insured, 2),
         "farmer_premium": round(farmer_premium, 2),
         "govt_subsidy": round(govt_subsidy, 2),
-        "insurance_company": company,
+        "insurance_company": assign_company(crop, season, district),
         "premium_rate_percent": rate,
         "source": "local_calculation",
     }
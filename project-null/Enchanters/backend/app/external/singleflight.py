@@ -0,0 +1,49 @@
+"""
+Request coalescing for external lookups.
+
+Concurrent calls with the same key share one in-flight upstream request: the
+first caller starts it, later callers await the same task. The work runs as
+its own task, so a caller that is cancelled (client disconnect) does not
+cancel it for the others. Nothing is cached once the task finishes; pair this
+with the caller's own cache.
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Hashable, TypeVar
+from app.core.metrics import counter
+
+T = TypeVar("T")
+
+SINGLEFLIGHT_CALLS = counter(
+    "kisaanseva_singleflight_calls_total",
+    "External lookups by single-flight role (leader made the call, coalesced shared it)",
+    ("group", "role"),
+)
+
+
+class SingleFlight:
+    def __init__(self, group: str):
+        self.group = group
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the outcome as retrieved even if every waiter was cancelled.
+        if not task.cancelled():
+            task.exception()
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        loop = asyncio.get_running_loop()
+        task = self._inflight.get(key)
+        if task is not None and task.get_loop() is loop and not task.done():
+            SINGLEFLIGHT_CALLS.inc(group=self.group, role="coalesced")
+        else:
+            task = loop.create_task(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+            SINGLEFLIGHT_CALLS.inc(group=self.group, role="leader")
+        return await asyncio.shield(task)
+
+    def in_flight(self) -> int:
+        return len(self._inflight)
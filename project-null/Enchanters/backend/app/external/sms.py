@@ -1,59 +1,216 @@
+"""
+SMS delivery through MSG91.
+
+Single messages (OTPs) go out as one flow call each. ``send_bulk_sms`` sends
+one flow template to many recipients in calls of SMS_BULK_BATCH_SIZE, paced
+to SMS_MAX_MESSAGES_PER_SECOND per process, retrying failed calls with
+jittered exponential backoff. Each accepted call returns an MSG91 request id;
+delivery reports for it arrive on the DLR webhook (see ``sms_delivery``).
+"""
+
+import asyncio
+import random
+import time
+from typing import NamedTuple
 import httpx
 from app.config import settings
+from app.core.constants import (
+    SMS_BULK_BATCH_SIZE, SMS_BULK_MAX_RETRIES, SMS_RETRY_BASE_SECONDS, SMS_RETRY_MAX_SECONDS,
+)
+from app.core.metrics import counter
+from app.external.http import get_client
 import logging
 
 logger = logging.getLogger(__name__)
 
+SMS_MESSAGES = counter(
+    "kisaanseva_sms_messages_total", "SMS recipients handed to the provider", ("mode", "outcome"),
+)
+SMS_PROVIDER_CALLS = counter(
+    "kisaanseva_sms_provider_calls_total", "SMS provider API calls", ("outcome",),
+)
+
+DEV_REQUEST_ID = "dev"
+
+
+class SmsRecipient(NamedTuple):
+    phone: str
+    variables: dict
+
+
+class RateLimiter:
+    """Spaces sends to `rate` messages per second.
+
+    Each call reserves its slot synchronously before sleeping, so concurrent
+    callers queue in order without a lock tied to one event loop.
+    """
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self._next_free = 0.0
+
+    def reserve(self, n: int = 1) -> float:
+        """Book `n` messages and return how long to wait before sending them."""
+        now = time.monotonic()
+        start = max(now, self._next_free)
+        self._next_free = start + n / self.rate
+        return start - now
+
+    async def acquire(self, n: int = 1) -> None:
+        delay = self.reserve(n)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+_limiters: dict[str, RateLimiter] = {}
+
+
+def get_rate_limiter(provider: str) -> RateLimiter:
+    limiter = _limiters.get(provider)
+    if limiter is None:
+        limiter = _limiters[provider] = RateLimiter(settings.SMS_MAX_MESSAGES_PER_SECOND)
+    return limiter
+
+
+def template_id(kind: str) -> str:
+    """Flow template for a message kind, falling back to the default template."""
+    templates = {
+        "reminder": settings.MSG91_REMINDER_TEMPLATE_ID,
+        "agent_access": settings.MSG91_AGENT_ACCESS_TEMPLATE_ID,
+    }
+    return templates.get(kind) or settings.MSG91_TEMPLATE_ID
+
+
+def _retry_delay(attempt: int) -> float:
+    return random.uniform(0, min(SMS_RETRY_MAX_SECONDS, SMS_RETRY_BASE_SECONDS * 2 ** attempt))
+
+
+async def _post_flow(template: str, recipients: list[SmsRecipient]) -> tuple[str | None, bool]:
+    """One MSG91 flow call. Returns (request id or None, whether a retry may help)."""
+    try:
+        client = get_client("msg91")
+        response = await client.post(
+            f"{settings.MSG91_API_URL.rstrip('/')}/flow/",
+            headers={
+                "authkey": settings.MSG91_AUTH_KEY,
+                "Content-Type": "application/json",
+            },
+            json={
+                "template_id": template,
+                "sender": settings.MSG91_SENDER_ID,
+                "short_url": "0",
+                "recipients": [{"mobiles": f"91{r.phone}", **r.variables} for r in recipients],
+            },
+        )
+    except httpx.HTTPError as e:
+        SMS_PROVIDER_CALLS.inc(outcome="error")
+        logger.warning("MSG91 call failed: %s", str(e))
+        return None, True
+
+    if response.status_code == 200:
+        try:
+            body = response.json()
+        except ValueError:
+            body = {}
+        if body.get("type") != "error":
+            SMS_PROVIDER_CALLS.inc(outcome="ok")
+            return str(body.get("message") or ""), False
+
+    retryable = response.status_code == 429 or response.status_code >= 500
+    SMS_PROVIDER_CALLS.inc(outcome="retryable" if retryable else "rejected")
+    logger.error("MSG91 returned %d: %s", response.status_code, response.text)
+    return None, retryable
+
+
+async def _send_batch(template: str, batch: list[SmsRecipient]) -> str | None:
+    limiter = get_rate_limiter(settings.SMS_PROVIDER)
+    for attempt in range(SMS_BULK_MAX_RETRIES + 1):
+        await limiter.acquire(len(batch))
+        request_id, retryable = await _post_flow(template, batch)
+        if request_id is not None or not retryable:
+            return request_id
+        if attempt < SMS_BULK_MAX_RETRIES:
+            await asyncio.sleep(_retry_delay(attempt))
+    return None
+
+
+async def send_bulk_sms(template: str, recipients: list[SmsRecipient]) -> list[str | None]:
+    """Send one flow template to many recipients.
+
+    Returns, for each recipient in order, the request id of the provider call
+    that carried it, or None if that call failed after its retries. Calls are
+    independent, so one failing batch does not hold back the others.
+    """
+    if not recipients:
+        return []
+    if settings.SMS_PROVIDER != "msg91":
+        logger.warning("Unknown SMS provider: %s. %d SMS not sent.", settings.SMS_PROVIDER, len(recipients))
+        return [None] * len(recipients)
+    if not settings.MSG91_AUTH_KEY:
+        logger.info("MSG91 auth key not configured. Bulk SMS (dev mode): %d recipients", len(recipients))
+        return [DEV_REQUEST_ID] * len(recipients)
+
+    batches = [recipients[i:i + SMS_BULK_BATCH_SIZE] for i in range(0, len(recipients), SMS_BULK_BATCH_SIZE)]
+    request_ids = await asyncio.gather(*(_send_batch(template, batch) for batch in batches))
+
+    results = []
+    for batch, request_id in zip(batches, request_ids):
+        SMS_MESSAGES.inc(len(batch), mode="bulk", outcome="accepted" if request_id is not None else "failed")
+        results.extend([request_id] * len(batch))
+    logger.info(
+        "Bulk SMS: %d/%d recipients accepted in %d calls",
+        sum(r is not None for r in results), len(results), len(batches),
+    )
+    return results
+
 
 async def send_sms(phone: str, message: str) -> bool:
     """Send SMS via MSG91 or configured provider."""
+    return await send_templated_sms(settings.MSG91_TEMPLATE_ID, SmsRecipient(phone, {"OTP": message}))
+
+
+async def send_templated_sms(template: str, recipient: SmsRecipient) -> bool:
     if settings.SMS_PROVIDER == "msg91":
-        return await _send_via_msg91(phone, message)
+        return await _send_via_msg91(template, recipient)
     else:
         logger.warning("Unknown SMS provider: %s. SMS not sent.", settings.SMS_PROVIDER)
         return False
 
 
-async def _send_via_msg91(phone: str, message: str) -> bool:
+async def _send_via_msg91(template: str, recipient: SmsRecipient) -> bool:
+    phone = recipient.phone
     if not settings.MSG91_AUTH_KEY:
-        logger.info("MSG91 auth key not configured. SMS (dev mode): phone=%s, message=%s", phone, message)
+        logger.info("MSG91 auth key not configured. SMS (dev mode): phone=%s, variables=%s", phone, recipient.variables)
         return True
 
-    try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.post(
-                "https://api.msg91.com/api/v5/flow/",
-                headers={
-                    "authkey": settings.MSG91_AUTH_KEY,
-                    "Content-Type": "application/json",
-                },
-                json={
-                    "template_id": settings.MSG91_TEMPLATE_ID,
-                    "sender": settings.MSG91_SENDER_ID,
-                    "short_url": "0",
-                    "mobiles": f"91{phone}",
-                    "OTP": message,
-                },
-            )
-            if response.status_code == 200:
-                logger.info("SMS sent to %s***%s", phone[:2], phone[-2:])
-                return True
-            else:
-                logger.error("MSG91 returned %d: %s", response.status_code, response.text)
-                return False
-    except Exception as e:
-        logger.error("Failed to send SMS: %s", str(e))
+    request_id, _ = await _post_flow(template, [recipient])
+    SMS_MESSAGES.inc(mode="single", outcome="accepted" if request_id is not None else "failed")
+    if request_id is None:
         return False
+    logger.info("SMS sent to %s***%s", phone[:2], phone[-2:])
+    return True
 
 
-async def send_otp_sms(phone: str, otp: str) -> bool:
+def otp_sms(phone: str, otp: str) -> tuple[str, SmsRecipient]:
     message = f"Your KisaanSeva OTP is {otp}. Valid for 5 minutes. Do not share."
-    return await send_sms(phone, message)
+    return settings.MSG91_TEMPLATE_ID, SmsRecipient(phone, {"OTP": message})
 
 
-async def send_agent_access_sms(phone: str, otp: str, agent_name: str, center: str, purpose: str) -> bool:
+def agent_access_sms(phone: str, otp: str, agent_name: str, center: str, purpose: str) -> tuple[str, SmsRecipient]:
+    if settings.MSG91_AGENT_ACCESS_TEMPLATE_ID:
+        return settings.MSG91_AGENT_ACCESS_TEMPLATE_ID, SmsRecipient(
+            phone, {"agent": agent_name, "center": center, "purpose": purpose, "OTP": otp},
+        )
     message = (
         f"Agent {agent_name} at {center} requests access to your KisaanSeva account "
         f"for: {purpose}. OTP: {otp}. Valid for 5 minutes."
     )
-    return await send_sms(phone, message)
+    return settings.MSG91_TEMPLATE_ID, SmsRecipient(phone, {"OTP": message})
+
+
+async def send_otp_sms(phone: str, otp: str) -> bool:
+    return await send_templated_sms(*otp_sms(phone, otp))
+
+
+async def send_agent_access_sms(phone: str, otp: str, agent_name: str, center: str, purpose: str) -> bool:
+    return await send_templated_sms(*agent_access_sms(phone, otp, agent_name, center, purpose))
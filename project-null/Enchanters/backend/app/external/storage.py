@@ -0,0 +1,176 @@
+"""
+Async object storage (S3 / MinIO).
+
+boto3 is synchronous, so every S3 call runs on a dedicated thread pool
+instead of the event loop; a large upload no longer stalls the other requests
+on the worker. One boto3 client is shared by all threads (boto3 clients are
+thread-safe) and its urllib3 pool is sized to the thread pool, so each worker
+thread keeps its own keep-alive connection and credentials/endpoint
+resolution happen once per process instead of once per call.
+
+Unlike the httpx clients in ``app.external.http`` the client is not bound to
+an event loop, so Celery tasks share it across their per-task loops.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import boto3
+from botocore.config import Config as BotoConfig
+from app.config import settings
+from app.core.constants import S3_MULTIPART_PART_BYTES
+import logging
+
+logger = logging.getLogger(__name__)
+
+_client = None
+_executor: ThreadPoolExecutor | None = None
+_lock = threading.Lock()
+
+
+def get_s3_client():
+    """The process-wide boto3 S3 client."""
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                _client = boto3.client(
+                    "s3",
+                    endpoint_url=settings.S3_ENDPOINT_URL,
+                    aws_access_key_id=settings.S3_ACCESS_KEY,
+                    aws_secret_access_key=settings.S3_SECRET_KEY,
+                    region_name=settings.S3_REGION,
+                    config=BotoConfig(
+                        signature_version="s3v4",
+                        max_pool_connections=settings.S3_MAX_POOL_CONNECTIONS,
+                        connect_timeout=5,
+                        read_timeout=settings.S3_READ_TIMEOUT_SECONDS,
+                        retries={"max_attempts": 3, "mode": "standard"},
+                    ),
+                )
+    return _client
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.S3_MAX_POOL_CONNECTIONS, thread_name_prefix="s3",
+                )
+    return _executor
+
+
+async def _run(fn, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), partial(fn, *args, **kwargs))
+
+
+async def put_object(key: str, body: bytes, content_type: str = "application/octet-stream") -> None:
+    s3 = get_s3_client()
+    await _run(s3.put_object, Bucket=settings.S3_BUCKET_NAME, Key=key, Body=body, ContentType=content_type)
+
+
+async def get_object(key: str) -> bytes:
+    s3 = get_s3_client()
+
+    def _read() -> bytes:
+        response = s3.get_object(Bucket=settings.S3_BUCKET_NAME, Key=key)
+        return response["Body"].read()
+
+    return await _run(_read)
+
+
+async def delete_object(key: str) -> None:
+    s3 = get_s3_client()
+    await _run(s3.delete_object, Bucket=settings.S3_BUCKET_NAME, Key=key)
+
+
+class StreamingUpload:
+    """Write an object in chunks without holding it in memory.
+
+    Data is buffered up to ``part_size`` and sent as S3 multipart parts; an
+    object that never fills one part is sent with a single PUT on
+    ``complete()``. ``abort()`` discards any parts already uploaded.
+    """
+
+    def __init__(self, key: str, content_type: str, part_size: int | None = None):
+        self.key = key
+        self.content_type = content_type
+        self.part_size = part_size or S3_MULTIPART_PART_BYTES
+        self._buffer = bytearray()
+        self._upload_id: str | None = None
+        self._parts: list[dict] = []
+
+    async def write(self, data: bytes) -> None:
+        self._buffer += data
+        while len(self._buffer) >= self.part_size:
+            part = bytes(self._buffer[:self.part_size])
+            del self._buffer[:self.part_size]
+            await self._upload_part(part)
+
+    async def _upload_part(self, body: bytes) -> None:
+        s3 = get_s3_client()
+        if self._upload_id is None:
+            response = await _run(
+                s3.create_multipart_upload,
+                Bucket=settings.S3_BUCKET_NAME, Key=self.key, ContentType=self.content_type,
+            )
+            self._upload_id = response["UploadId"]
+        part_number = len(self._parts) + 1
+        response = await _run(
+            s3.upload_part,
+            Bucket=settings.S3_BUCKET_NAME, Key=self.key, UploadId=self._upload_id,
+            PartNumber=part_number, Body=body,
+        )
+        self._parts.append({"PartNumber": part_number, "ETag": response["ETag"]})
+
+    async def complete(self) -> None:
+        if self._upload_id is None:
+            await put_object(self.key, bytes(self._buffer), self.content_type)
+        else:
+            if self._buffer:
+                await self._upload_part(bytes(self._buffer))
+            await _run(
+                get_s3_client().complete_multipart_upload,
+                Bucket=settings.S3_BUCKET_NAME, Key=self.key, UploadId=self._upload_id,
+                MultipartUpload={"Parts": self._parts},
+            )
+        self._buffer.clear()
+
+    async def abort(self) -> None:
+        self._buffer.clear()
+        if self._upload_id is None:
+            return
+        try:
+            await _run(
+                get_s3_client().abort_multipart_upload,
+                Bucket=settings.S3_BUCKET_NAME, Key=self.key, UploadId=self._upload_id,
+            )
+        except Exception as e:
+            logger.warning("Failed to abort multipart upload %s: %s", self.key, e)
+        self._upload_id = None
+
+
+def presigned_get_url(key: str, expiration: int = 3600) -> str:
+    """Presigning is local signing with cached credentials, so it stays on the loop."""
+    return get_s3_client().generate_presigned_url(
+        "get_object",
+        Params={"Bucket": settings.S3_BUCKET_NAME, "Key": key},
+        ExpiresIn=expiration,
+    )
+
+
+def init_storage() -> None:
+    get_s3_client()
+    _get_executor()
+    logger.info("Object storage client ready (pool=%d)", settings.S3_MAX_POOL_CONNECTIONS)
+
+
+def close_storage() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
@@ -1,10 +1,12 @@
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from app.config import settings
 from app.api.v1.router import api_v1_router
 from app.core.exceptions import KisaanSevaException
+from app.core.metrics import render_metrics
+from app.core.pagination import NEXT_CURSOR_HEADER
 import logging
 import time
 
@@ -26,9 +28,34 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.warning("Redis not available: %s", str(e))
 
+    from app.external.http import init_http_clients, close_http_clients
+    await init_http_clients()
+
+    from app.external.storage import init_storage, close_storage
+    init_storage()
+
+    from app.external.email import init_email, close_email
+    init_email()
+
+    from app.services.pdf_renderer import start_pdf_renderer, stop_pdf_renderer
+    start_pdf_renderer()
+
+    from app.services.outbox import start_outbox_dispatcher, stop_outbox_dispatcher
+    start_outbox_dispatcher()
+
+    from app.services.location_directory import ensure_location_directory
+    from app.services.insurance_rates import get_rate_snapshot
+    await ensure_location_directory()
+    await get_rate_snapshot()
+
     yield
 
     logger.info("Shutting down %s", settings.APP_NAME)
+    await stop_outbox_dispatcher()
+    await close_http_clients()
+    close_storage()
+    close_email()
+    stop_pdf_renderer()
     from app.core.otp import _redis_client
     if _redis_client:
         await _redis_client.close()
@@ -49,6 +76,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 app.include_router(api_v1_router)
@@ -89,3 +117,8 @@ async def generic_exception_handler(request: Request, exc: Exception):
 @app.get("/health")
 async def health():
     return {"status": "ok", "app": settings.APP_NAME, "version": "1.0.0"}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
@@ -1,15 +1,19 @@
 from app.models.farmer import Farmer, FarmerProfile, FarmerCrop, FarmerDocument
-from app.models.scheme import Scheme, SchemeEligibility, SchemeDeadline
-from app.models.insurance import InsurancePlan
+from app.models.scheme import Scheme, SchemeEligibility, SchemeDeadline, FarmerEligibilityCache
+from app.models.insurance import InsurancePlan, InsuranceRate
 from app.models.subsidy import Subsidy
 from app.models.agent import Agent, AgentSession
-from app.models.notification import Reminder, GeneratedForm
+from app.models.location import PinCode, LgdState, LgdDistrict, LgdSubDistrict, LgdVillage
+from app.models.notification import Reminder, GeneratedForm, SmsDelivery, NotificationOutbox
+from app.models.storage import StoredObject
 
 __all__ = [
     "Farmer", "FarmerProfile", "FarmerCrop", "FarmerDocument",
-    "Scheme", "SchemeEligibility", "SchemeDeadline",
-    "InsurancePlan",
+    "Scheme", "SchemeEligibility", "SchemeDeadline", "FarmerEligibilityCache",
+    "InsurancePlan", "InsuranceRate",
     "Subsidy",
     "Agent", "AgentSession",
-    "Reminder", "GeneratedForm",
+    "PinCode", "LgdState", "LgdDistrict", "LgdSubDistrict", "LgdVillage",
+    "Reminder", "GeneratedForm", "SmsDelivery", "NotificationOutbox",
+    "StoredObject",
 ]
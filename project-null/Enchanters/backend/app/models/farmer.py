@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime, timezone
 from sqlalchemy import (
-    Column, String, Boolean, Numeric, ForeignKey, DateTime, Enum, Text,
+    Column, String, Boolean, Numeric, BigInteger, Integer, ForeignKey, DateTime, Enum, Text,
 )
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
@@ -25,6 +25,8 @@ class Farmer(Base):
     land_area = Column(Numeric(10, 2), nullable=False)
     land_unit = Column(Enum(LandUnit, name="land_unit_enum"), default=LandUnit.ACRE)
     language_pref = Column(String(10), default="hi")
+    # Bumped with every change that affects scheme eligibility; part of the cached listing's version.
+    eligibility_version = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
     updated_at = Column(
         DateTime(timezone=True),
@@ -75,6 +77,12 @@ class FarmerDocument(Base):
     doc_type = Column(Enum(DocType, name="doc_type_enum"), nullable=False)
     file_key = Column(String(500), nullable=False)
     file_name = Column(String(255), nullable=False)
+    size_bytes = Column(BigInteger, nullable=True)
+    checksum_sha256 = Column(String(64), nullable=True, index=True)
+    # Set by the background image pipeline; size_bytes stays the original size.
+    compressed_size_bytes = Column(BigInteger, nullable=True)
+    thumbnail_key = Column(String(500), nullable=True)
+    processed_at = Column(DateTime(timezone=True), nullable=True)
     uploaded_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
     verified = Column(Boolean, default=False)
 
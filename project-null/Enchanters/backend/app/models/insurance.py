@@ -1,5 +1,6 @@
 import uuid
-from sqlalchemy import Column, String, Boolean, Enum, Text
+from datetime import datetime, timezone
+from sqlalchemy import Column, String, Boolean, Enum, Text, Integer, Numeric, DateTime, Index
 from sqlalchemy.dialects.postgresql import UUID
 from app.database import Base
 from app.core.constants import InsurancePlanType
@@ -19,3 +20,28 @@ class InsurancePlan(Base):
     eligibility = Column(Text)
     how_to_enroll = Column(Text)
     is_active = Column(Boolean, default=True)
+
+
+class InsuranceRate(Base):
+    """PMFBY rate notification for one district × crop in a season, synced by
+    ``sync_tasks.sync_insurance_rates``. Each (season, year) is replaced as a
+    whole on sync, so one season's rates are one version."""
+    __tablename__ = "insurance_rates"
+    __table_args__ = (
+        Index(
+            "ux_insurance_rates_season_year_state_district_crop",
+            "season", "year", "state", "district", "crop", unique=True,
+        ),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    season = Column(String(10), nullable=False)
+    year = Column(Integer, nullable=False)
+    state = Column(String(100), nullable=False)
+    district = Column(String(100), nullable=False)
+    crop = Column(String(100), nullable=False)
+    sum_insured_per_hectare = Column(Numeric(12, 2), nullable=False)
+    farmer_premium_rate = Column(Numeric(5, 2), nullable=False)  # % of sum insured paid by the farmer
+    actuarial_rate = Column(Numeric(5, 2))  # full notified rate; the rest is government subsidy
+    insurance_company = Column(String(200))
+    synced_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
@@ -0,0 +1,66 @@
+from datetime import datetime, timezone
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Index, func
+from sqlalchemy.dialects.postgresql import JSONB
+from app.database import Base
+
+
+class PinCode(Base):
+    """India Post PIN directory entry, loaded in bulk by scraper/prewarm_pincodes.py."""
+    __tablename__ = "pin_codes"
+    __table_args__ = (
+        Index("ix_pin_codes_pincode_prefix", "pincode", postgresql_ops={"pincode": "varchar_pattern_ops"}),
+    )
+
+    pincode = Column(String(6), primary_key=True)
+    district = Column(String(100), nullable=False, default="")
+    state = Column(String(100), nullable=False, default="")
+    post_offices = Column(JSONB, nullable=False, default=list)
+    updated_at = Column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
+
+
+# LGD (Local Government Directory) hierarchy, loaded by scraper/import_locations.py.
+# Primary keys are the LGD codes themselves.
+
+class LgdState(Base):
+    __tablename__ = "lgd_states"
+
+    code = Column(Integer, primary_key=True, autoincrement=False)
+    name = Column(String(100), nullable=False)
+
+
+class LgdDistrict(Base):
+    __tablename__ = "lgd_districts"
+
+    code = Column(Integer, primary_key=True, autoincrement=False)
+    state_code = Column(Integer, ForeignKey("lgd_states.code", ondelete="CASCADE"), nullable=False, index=True)
+    name = Column(String(100), nullable=False)
+
+
+class LgdSubDistrict(Base):
+    __tablename__ = "lgd_sub_districts"
+
+    code = Column(Integer, primary_key=True, autoincrement=False)
+    district_code = Column(Integer, ForeignKey("lgd_districts.code", ondelete="CASCADE"), nullable=False, index=True)
+    name = Column(String(100), nullable=False)
+
+
+class LgdVillage(Base):
+    __tablename__ = "lgd_villages"
+
+    code = Column(Integer, primary_key=True, autoincrement=False)
+    sub_district_code = Column(
+        Integer, ForeignKey("lgd_sub_districts.code", ondelete="CASCADE"), nullable=False, index=True,
+    )
+    name = Column(String(150), nullable=False)
+
+
+# Village autocomplete filters on lower(name) LIKE 'prefix%'.
+Index(
+    "ix_lgd_villages_name_prefix",
+    func.lower(LgdVillage.name).label("name_lower"),
+    postgresql_ops={"name_lower": "varchar_pattern_ops"},
+)
@@ -1,12 +1,14 @@
 import uuid
 from datetime import datetime, timezone
 from sqlalchemy import (
-    Column, String, Boolean, ForeignKey, DateTime, Enum, Date,
+    Column, String, Boolean, ForeignKey, DateTime, Enum, Date, Index, Integer, text,
 )
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from app.database import Base
-from app.core.constants import ReminderType, ReminderChannel, GeneratedByType
+from app.core.constants import (
+    ReminderType, ReminderChannel, GeneratedByType, SmsDeliveryStatus, OutboxStatus,
+)
 
 
 class Reminder(Base):
@@ -18,11 +20,23 @@ class Reminder(Base):
     reference_id = Column(UUID(as_uuid=True), nullable=False)
     remind_date = Column(Date, nullable=False)
     channel = Column(Enum(ReminderChannel, name="reminder_channel_enum"), nullable=False)
+    # Start of the hourly delivery slot (see notification_service.reminder_send_at).
+    send_at = Column(DateTime(timezone=True), nullable=False)
     sent = Column(Boolean, default=False)
     sent_at = Column(DateTime(timezone=True))
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    # Set once REMINDER_MAX_ATTEMPTS sends have failed; the reminder is not retried.
+    failed_at = Column(DateTime(timezone=True), nullable=True)
 
     farmer = relationship("Farmer", back_populates="reminders")
 
+    __table_args__ = (
+        Index(
+            "ix_reminders_unsent_send_at", "send_at", "id",
+            postgresql_where=text("sent = false AND failed_at IS NULL"),
+        ),
+    )
+
 
 class GeneratedForm(Base):
     __tablename__ = "generated_forms"
@@ -35,7 +49,61 @@ class GeneratedForm(Base):
     generated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
     generated_by = Column(Enum(GeneratedByType, name="generated_by_type_enum"), nullable=False)
     agent_session_id = Column(UUID(as_uuid=True), ForeignKey("agent_sessions.id", ondelete="SET NULL"), nullable=True)
+    # Hash of the form inputs; a repeat request with the same hash reuses this row.
+    content_hash = Column(String(64), nullable=True)
 
     farmer = relationship("Farmer", back_populates="generated_forms")
     scheme = relationship("Scheme")
     agent_session = relationship("AgentSession")
+
+    __table_args__ = (
+        Index("ix_generated_forms_farmer_content_hash", "farmer_id", "content_hash"),
+    )
+
+
+class SmsDelivery(Base):
+    """One recipient of a provider call, updated from MSG91 delivery reports."""
+
+    __tablename__ = "sms_deliveries"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    request_id = Column(String(64), nullable=False)
+    phone = Column(String(15), nullable=False)
+    template_id = Column(String(64), nullable=True)
+    # What the message was about, e.g. the reminder it delivered
+    reference_id = Column(UUID(as_uuid=True), nullable=True)
+    status = Column(String(20), nullable=False, default=SmsDeliveryStatus.SENT.value)
+    status_detail = Column(String(255), nullable=True)
+    sent_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    delivered_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_sms_deliveries_request_phone", "request_id", "phone"),
+        Index("ix_sms_deliveries_reference_id", "reference_id"),
+    )
+
+
+class NotificationOutbox(Base):
+    """A notification written in the same transaction as the change that
+    caused it, and sent afterwards by the outbox dispatcher."""
+
+    __tablename__ = "notification_outbox"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    kind = Column(String(30), nullable=False)
+    recipient = Column(String(255), nullable=False)
+    # Message variables; cleared once the row is sent or dead so OTPs don't linger
+    payload = Column(JSONB, nullable=False, default=dict)
+    status = Column(String(20), nullable=False, default=OutboxStatus.PENDING.value)
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    last_error = Column(String(500), nullable=True)
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index(
+            "ix_notification_outbox_pending", "next_attempt_at",
+            postgresql_where=text("status = 'pending'"),
+        ),
+    )
@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime, timezone
 from sqlalchemy import (
-    Column, String, Boolean, ForeignKey, DateTime, Enum, Text, Date, Integer,
+    Column, String, Boolean, ForeignKey, DateTime, Enum, Text, Date, Integer, Index,
 )
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
@@ -40,16 +40,24 @@ class SchemeEligibility(Base):
     __tablename__ = "scheme_eligibility"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    scheme_id = Column(UUID(as_uuid=True), ForeignKey("schemes.id", ondelete="CASCADE"), nullable=False)
+    scheme_id = Column(UUID(as_uuid=True), ForeignKey("schemes.id", ondelete="CASCADE"), nullable=False, index=True)
     rule_type = Column(Enum(RuleType, name="rule_type_enum"), nullable=False)
     rule_value = Column(String(200), nullable=False)
     is_mandatory = Column(Boolean, default=True)
+    updated_at = Column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
 
     scheme = relationship("Scheme", back_populates="eligibility_rules")
 
 
 class SchemeDeadline(Base):
     __tablename__ = "scheme_deadlines"
+    __table_args__ = (
+        Index("ix_scheme_deadlines_scheme_id_close_date", "scheme_id", "close_date"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     scheme_id = Column(UUID(as_uuid=True), ForeignKey("schemes.id", ondelete="CASCADE"), nullable=False)
@@ -58,5 +66,20 @@ class SchemeDeadline(Base):
     open_date = Column(Date)
     close_date = Column(Date)
     state = Column(String(100))
+    updated_at = Column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
 
     scheme = relationship("Scheme", back_populates="deadlines")
+
+
+class FarmerEligibilityCache(Base):
+    """Last computed scheme listing for a farmer, tagged with the catalogue version."""
+    __tablename__ = "farmer_eligibility_cache"
+
+    farmer_id = Column(UUID(as_uuid=True), ForeignKey("farmers.id", ondelete="CASCADE"), primary_key=True)
+    catalogue_version = Column(String(64), nullable=False)
+    results = Column(JSONB, nullable=False)
+    computed_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
@@ -0,0 +1,23 @@
+from datetime import datetime, timezone
+from sqlalchemy import Column, String, Integer, BigInteger, DateTime, Index, text
+from app.database import Base
+
+
+class StoredObject(Base):
+    """One S3 object shared by every document or form whose content hashes the same."""
+
+    __tablename__ = "stored_objects"
+
+    content_hash = Column(String(64), primary_key=True)
+    file_key = Column(String(500), nullable=False, unique=True)
+    thumbnail_key = Column(String(500), nullable=True)
+    content_type = Column(String(100), nullable=False)
+    size_bytes = Column(BigInteger, nullable=False)
+    ref_count = Column(Integer, nullable=False, default=1)
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    # Set for objects nothing references long-term (batch ZIPs); deleted once past.
+    expires_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_stored_objects_expires_at", "expires_at", postgresql_where=text("expires_at IS NOT NULL")),
+    )
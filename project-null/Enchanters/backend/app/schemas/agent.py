@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Optional, List, Any
 from uuid import UUID
 from datetime import datetime
 
@@ -78,3 +78,15 @@ class AgentActivityItem(BaseModel):
     session_end: Optional[datetime] = None
     status: str
     forms_count: int = 0
+
+
+class TaskQueuedResponse(BaseModel):
+    task_id: str
+    status: str = "queued"
+
+
+class TaskStatusResponse(BaseModel):
+    task_id: str
+    status: str
+    result: Optional[Any] = None
+    error: Optional[str] = None
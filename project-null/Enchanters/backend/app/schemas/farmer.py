@@ -5,6 +5,19 @@ from datetime import datetime
 from app.core.constants import LandUnit, IrrigationType, OwnershipType, DocType, Season
 
 
+class FarmerPrincipal(BaseModel):
+    """Identity of the authenticated farmer, cached between requests."""
+    id: UUID
+    farmer_id: str
+    name: str
+    phone: str
+    district: Optional[str] = None
+    state: Optional[str] = None
+    language_pref: Optional[str] = None
+
+    model_config = {"from_attributes": True}
+
+
 class FarmerCropCreate(BaseModel):
     crop_name: str = Field(..., min_length=1, max_length=100)
     season: Season
@@ -26,6 +39,9 @@ class FarmerDocumentResponse(BaseModel):
     doc_type: str
     file_key: str
     file_name: str
+    size_bytes: Optional[int] = None
+    compressed_size_bytes: Optional[int] = None
+    thumbnail_key: Optional[str] = None
     uploaded_at: datetime
     verified: bool
 
@@ -1,7 +1,7 @@
 from pydantic import BaseModel, Field
 from typing import Optional
 from uuid import UUID
-from app.core.constants import Season
+from app.core.constants import Season, LandUnit, PREMIUM_QUOTE_MAX_ROWS
 
 
 class InsurancePlanResponse(BaseModel):
@@ -25,6 +25,7 @@ class PremiumCalculateRequest(BaseModel):
     season: Season
     district: str = Field(..., min_length=1, max_length=100)
     land_area: float = Field(..., gt=0)
+    state: Optional[str] = Field(None, max_length=100)  # defaults to the farmer's state
 
 
 class PremiumCalculateResponse(BaseModel):
@@ -37,4 +38,16 @@ class PremiumCalculateResponse(BaseModel):
     govt_subsidy: float
     insurance_company: str
     premium_rate_percent: float
-    source: str  # "pmfby_api" or "local_calculation"
+    source: str  # "pmfby_rates" (synced notification) or "local_calculation"
+
+
+class PremiumQuoteRow(BaseModel):
+    crop: str = Field(..., min_length=1, max_length=100)
+    season: Season
+    district: str = Field(..., min_length=1, max_length=100)
+    land_area: float = Field(..., gt=0)
+    land_unit: LandUnit = LandUnit.ACRE
+
+
+class BulkPremiumQuoteRequest(BaseModel):
+    rows: list[PremiumQuoteRow] = Field(..., min_length=1, max_length=PREMIUM_QUOTE_MAX_ROWS)
@@ -0,0 +1,22 @@
+from pydantic import BaseModel, Field
+from typing import Optional, List
+
+
+class Msg91ReportEntry(BaseModel):
+    number: str
+    status: str
+    desc: Optional[str] = None
+    date: Optional[str] = None
+
+
+class Msg91DeliveryReport(BaseModel):
+    request_id: str = Field(..., alias="requestId")
+    report: List[Msg91ReportEntry] = []
+
+
+class Msg91DeliveryWebhook(BaseModel):
+    data: List[Msg91DeliveryReport] = []
+
+
+class DeliveryReportAck(BaseModel):
+    applied: int
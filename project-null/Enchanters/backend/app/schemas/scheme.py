@@ -2,7 +2,10 @@ from pydantic import BaseModel, Field
 from typing import Optional, List
 from uuid import UUID
 from datetime import date, datetime
-from app.core.constants import BenefitType, ReminderChannel, EligibilityStatus
+from app.core.constants import (
+    BenefitType, ReminderChannel, EligibilityStatus,
+    ELIGIBILITY_BATCH_MAX_FARMERS, BATCH_FORM_MAX_FARMERS,
+)
 
 
 class SchemeEligibilityRule(BaseModel):
@@ -36,6 +39,7 @@ class SchemeListItem(BaseModel):
     match_score: Optional[float] = None
     matched_rules: List[str] = []
     unmatched_rules: List[str] = []
+    nearest_deadline: Optional[date] = None
 
     model_config = {"from_attributes": True}
 
@@ -85,3 +89,34 @@ class FormGenerateResponse(BaseModel):
     file_name: str
     download_url: Optional[str] = None
     message: str
+
+
+class BatchEligibilityRequest(BaseModel):
+    farmer_ids: List[str] = Field(..., min_length=1, max_length=ELIGIBILITY_BATCH_MAX_FARMERS)
+    scheme_ids: Optional[List[UUID]] = None
+
+
+class BatchFormJobRequest(BaseModel):
+    farmer_ids: List[str] = Field(..., min_length=1, max_length=BATCH_FORM_MAX_FARMERS)
+    scheme_id: UUID
+    bundle: bool = True  # also build one ZIP of every form for the agent
+
+
+class PartialEligibilityMatch(BaseModel):
+    farmer_id: str
+    score: float
+
+
+class SchemeEligibilityCohort(BaseModel):
+    scheme_id: UUID
+    scheme_name: str
+    eligible_count: int
+    partial_count: int
+    eligible_farmer_ids: List[str] = []
+    partial_farmers: List[PartialEligibilityMatch] = []
+
+
+class BatchEligibilityResponse(BaseModel):
+    farmers_evaluated: int
+    missing_farmer_ids: List[str] = []
+    schemes: List[SchemeEligibilityCohort] = []
@@ -6,13 +6,16 @@ from sqlalchemy.orm import selectinload
 from app.models.agent import Agent, AgentSession
 from app.models.farmer import Farmer
 from app.core.security import verify_password, create_access_token
-from app.core.otp import send_and_store_otp, verify_otp
-from app.core.constants import AgentSessionStatus, AGENT_SESSION_TTL_MINUTES
+from app.core.otp import get_redis, send_and_store_otp, verify_otp
+from app.core.constants import (
+    AgentSessionStatus, OutboxKind, AGENT_SESSION_TTL_MINUTES, AGENT_TASK_OWNER_TTL_SECONDS,
+    ELIGIBILITY_BATCH_CHUNK_SIZE,
+)
 from app.core.exceptions import (
     NotFoundException, UnauthorizedException, ForbiddenException,
     BadRequestException, SessionExpiredException,
 )
-from app.external.sms import send_agent_access_sms
+from app.services import outbox
 import logging
 
 logger = logging.getLogger(__name__)
@@ -96,8 +99,9 @@ async def request_access(
     await db.flush()
 
     otp = await send_and_store_otp(farmer.phone, "agent_access")
-    await send_agent_access_sms(
-        farmer.phone, otp, agent.name, agent.center_name or "Service Center", purpose
+    outbox.enqueue(
+        db, OutboxKind.AGENT_ACCESS_SMS, farmer.phone,
+        otp=otp, agent_name=agent.name, center=agent.center_name or "Service Center", purpose=purpose,
     )
 
     logger.info("Access requested by agent %s for farmer %s", agent.name, farmer.farmer_id)
@@ -220,6 +224,30 @@ async def get_farmer_for_session(db: AsyncSession, session_id: UUID, agent_id: U
     return farmer
 
 
+async def log_session_form(
+    db: AsyncSession,
+    session_id: UUID,
+    file_key: str,
+    reused: bool,
+    scheme_id: UUID | None = None,
+    plan_id: UUID | None = None,
+) -> None:
+    """Record a form handed out in an agent session, whether it was rendered
+    now or an unchanged earlier form was reused."""
+    session = await db.get(AgentSession, session_id)
+    if session is None:
+        return
+    action = {"action": "form_generated", "file_key": file_key, "reused": reused}
+    if scheme_id:
+        action["scheme_id"] = str(scheme_id)
+    if plan_id:
+        action["plan_id"] = str(plan_id)
+    action["at"] = datetime.now(timezone.utc).isoformat()
+    session.forms_downloaded = (session.forms_downloaded or []) + [file_key]
+    session.actions_taken = (session.actions_taken or []) + [action]
+    await db.flush()
+
+
 async def end_session(db: AsyncSession, session_id: UUID, agent_id: UUID) -> dict:
     result = await db.execute(
         select(AgentSession).where(AgentSession.id == session_id, AgentSession.agent_id == agent_id)
@@ -258,3 +286,52 @@ async def get_activity(db: AsyncSession, agent_id: UUID) -> list[dict]:
         }
         for session, fid, fname in rows
     ]
+
+
+async def consented_farmer_sessions(db: AsyncSession, agent_id: UUID, farmer_ids: list[str]) -> dict[str, UUID]:
+    """The agent's active, OTP-verified sessions for the given farmers, by KisaanSeva ID."""
+    cutoff = datetime.now(timezone.utc) - timedelta(minutes=AGENT_SESSION_TTL_MINUTES)
+    farmer_ids = list(dict.fromkeys(farmer_ids))
+    sessions: dict[str, UUID] = {}
+    for start in range(0, len(farmer_ids), ELIGIBILITY_BATCH_CHUNK_SIZE):
+        result = await db.execute(
+            select(Farmer.farmer_id, AgentSession.id)
+            .join(Farmer, AgentSession.farmer_id == Farmer.id)
+            .where(
+                AgentSession.agent_id == agent_id,
+                AgentSession.status == AgentSessionStatus.ACTIVE,
+                AgentSession.otp_verified_at.isnot(None),
+                AgentSession.session_start > cutoff,
+                Farmer.farmer_id.in_(farmer_ids[start:start + ELIGIBILITY_BATCH_CHUNK_SIZE]),
+            )
+            .order_by(AgentSession.session_start)
+        )
+        sessions.update(result.all())  # latest session per farmer wins
+    return sessions
+
+
+async def require_consent(db: AsyncSession, agent_id: UUID, farmer_ids: list[str]) -> dict[str, UUID]:
+    """Session per farmer for a batch request; every farmer must have granted
+    this agent access through the OTP flow."""
+    sessions = await consented_farmer_sessions(db, agent_id, farmer_ids)
+    missing = [kid for kid in dict.fromkeys(farmer_ids) if kid not in sessions]
+    if missing:
+        shown = ", ".join(missing[:10]) + (" ..." if len(missing) > 10 else "")
+        raise ForbiddenException(f"No active consented session for {len(missing)} farmer(s): {shown}")
+    return sessions
+
+
+def _task_owner_key(task_id: str) -> str:
+    return f"agent_task:{task_id}"
+
+
+async def record_task_owner(task_id: str, agent_id: UUID) -> None:
+    r = await get_redis()
+    await r.set(_task_owner_key(task_id), str(agent_id), ex=AGENT_TASK_OWNER_TTL_SECONDS)
+
+
+async def check_task_owner(task_id: str, agent_id: UUID) -> None:
+    """Only the agent who queued a task may read its result."""
+    r = await get_redis()
+    if await r.get(_task_owner_key(task_id)) != str(agent_id):
+        raise NotFoundException("Task")
@@ -8,8 +8,8 @@ from app.core.exceptions import (
     BadRequestException, NotFoundException, UnauthorizedException, ConflictException,
 )
 from app.external.india_post import lookup_pincode
-from app.external.sms import send_otp_sms
-from app.external.email import send_otp_email
+from app.core.constants import OutboxKind
+from app.services import outbox
 import logging
 
 logger = logging.getLogger(__name__)
@@ -28,7 +28,7 @@ async def signup_farmer(
     if existing.scalar_one_or_none():
         raise ConflictException("A farmer with this phone number already exists")
 
-    location = await lookup_pincode(pin_code)
+    location = await lookup_pincode(pin_code, db)
     district = location.get("district", "")
     state = location.get("state", "")
 
@@ -51,11 +51,11 @@ async def signup_farmer(
     await db.flush()
 
     otp = await send_and_store_otp(phone, "phone")
-    await send_otp_sms(phone, otp)
+    outbox.enqueue(db, OutboxKind.OTP_SMS, phone, otp=otp)
 
     if email:
         email_otp = await send_and_store_otp(phone, "email")
-        await send_otp_email(email, email_otp)
+        outbox.enqueue(db, OutboxKind.OTP_EMAIL, email, otp=email_otp)
 
     logger.info("Farmer signed up: %s (farmer_id=%s)", phone[-4:], farmer_id)
     return {"message": "Signup successful. OTP sent to your phone.", "farmer_id": farmer_id}
@@ -79,9 +79,9 @@ async def verify_farmer_otp(db: AsyncSession, phone: str, otp: str, otp_type: st
     return {"verified": True}
 
 
-async def login_farmer(phone: str) -> dict:
+async def login_farmer(db: AsyncSession, phone: str) -> dict:
     otp = await send_and_store_otp(phone, "login")
-    await send_otp_sms(phone, otp)
+    outbox.enqueue(db, OutboxKind.OTP_SMS, phone, otp=otp)
     logger.info("Login OTP sent to %s***%s", phone[:2], phone[-2:])
     return {"message": "OTP sent to your phone"}
 
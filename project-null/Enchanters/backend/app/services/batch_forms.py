@@ -0,0 +1,227 @@
+"""
+Bulk scheme form generation for CSC village drives.
+
+``pdf_tasks.queue_batch_forms`` splits the farmer list into chunks of
+BATCH_FORM_CHUNK_SIZE and renders them as a Celery chord: every chunk runs
+``render_form_chunk`` in its own worker process (render + concurrent upload),
+and ``record_batch_forms`` then inserts all new ``GeneratedForm`` rows in one
+statement and optionally bundles the PDFs into a single ZIP for the agent.
+The ZIP is not shared with anything, so it is registered in ``content_store``
+with an expiry of BATCH_FORM_ZIP_TTL_SECONDS (as long as the task result that
+links it) and removed by ``pdf_tasks.delete_expired_objects``.
+
+Forms whose content hash already exists for the farmer are reused rather
+than rendered again (see ``content_store``).
+"""
+
+import asyncio
+import tempfile
+import uuid
+import zipfile
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+from sqlalchemy import select, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from app.core.constants import (
+    GeneratedByType, BATCH_FORM_TRANSFER_CONCURRENCY, BATCH_FORM_ZIP_SPOOL_BYTES, BATCH_FORM_ZIP_TTL_SECONDS,
+    UPLOAD_READ_CHUNK_BYTES,
+)
+from app.core.pdf_builder import build_scheme_form_pdf
+from app.external import storage
+from app.models.agent import AgentSession
+from app.models.farmer import Farmer
+from app.models.notification import GeneratedForm
+from app.models.scheme import Scheme
+from app.services import content_store
+from app.services.scheme_service import scheme_form_inputs, scheme_form_hash
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+async def _gather_limited(coros: list, limit: int = BATCH_FORM_TRANSFER_CONCURRENCY) -> list:
+    results = []
+    for start in range(0, len(coros), limit):
+        results.extend(await asyncio.gather(*coros[start:start + limit], return_exceptions=True))
+    return results
+
+
+async def render_form_chunk(
+    db: AsyncSession,
+    farmer_ids: list[str],
+    scheme_id: UUID,
+    generated_by: str = "agent",
+    agent_name: str | None = None,
+) -> list[dict]:
+    """Render and upload the forms for one chunk of farmers (by KisaanSeva ID).
+
+    Returns one entry per farmer with status generated, reused, not_found or
+    failed. Nothing is written to the database here.
+    """
+    scheme = await db.get(Scheme, scheme_id)
+    if scheme is None:
+        return [{"farmer_id": kid, "status": "failed", "error": "Scheme not found"} for kid in farmer_ids]
+
+    result = await db.execute(
+        select(Farmer)
+        .options(selectinload(Farmer.crops), selectinload(Farmer.profile))
+        .where(Farmer.farmer_id.in_(farmer_ids))
+    )
+    farmers = {f.farmer_id: f for f in result.scalars().all()}
+
+    inputs = {}
+    for kid, farmer in farmers.items():
+        farmer_data, scheme_data = scheme_form_inputs(farmer, scheme)
+        inputs[kid] = (farmer, farmer_data, scheme_data, scheme_form_hash(farmer_data, scheme_data, generated_by, agent_name))
+
+    existing = {}
+    if inputs:
+        rows = await db.execute(
+            select(GeneratedForm.farmer_id, GeneratedForm.content_hash, GeneratedForm.file_key, GeneratedForm.file_name)
+            .where(
+                GeneratedForm.farmer_id.in_([v[0].id for v in inputs.values()]),
+                GeneratedForm.content_hash.in_([v[3] for v in inputs.values()]),
+            )
+        )
+        existing = {(r.farmer_id, r.content_hash): r for r in rows.all()}
+
+    entries: dict[str, dict] = {}
+    uploads: list[tuple[str, bytes]] = []
+    for kid in farmer_ids:
+        if kid not in inputs:
+            entries[kid] = {"farmer_id": kid, "status": "not_found"}
+            continue
+        farmer, farmer_data, scheme_data, content_hash = inputs[kid]
+        entry = {"farmer_id": kid, "farmer_uuid": str(farmer.id), "content_hash": content_hash}
+        form = existing.get((farmer.id, content_hash))
+        if form is not None:
+            entries[kid] = {**entry, "status": "reused", "file_key": form.file_key, "file_name": form.file_name}
+            continue
+        try:
+            pdf_bytes, filename = build_scheme_form_pdf(farmer_data, scheme_data, generated_by, agent_name)
+        except Exception as e:
+            logger.error("Batch form render failed for %s: %s", kid, e)
+            entries[kid] = {"farmer_id": kid, "status": "failed", "error": "Render failed"}
+            continue
+        file_key = f"forms/{kid}/schemes/{scheme_id}/{content_hash}.pdf"
+        entries[kid] = {
+            **entry, "status": "generated", "file_key": file_key, "file_name": filename,
+            "size_bytes": len(pdf_bytes),
+        }
+        uploads.append((kid, pdf_bytes))
+
+    outcomes = await _gather_limited([
+        storage.put_object(entries[kid]["file_key"], pdf_bytes, "application/pdf") for kid, pdf_bytes in uploads
+    ])
+    for (kid, _), outcome in zip(uploads, outcomes):
+        if isinstance(outcome, Exception):
+            logger.error("Batch form upload failed for %s: %s", kid, outcome)
+            entries[kid] = {"farmer_id": kid, "status": "failed", "error": "Upload failed"}
+
+    return [entries[kid] for kid in dict.fromkeys(farmer_ids)]
+
+
+async def bundle_forms(entries: list[dict], scheme_id: UUID) -> tuple[str, int]:
+    """Copy the given forms into one ZIP object and return (key, size). The ZIP
+    spools to disk past BATCH_FORM_ZIP_SPOOL_BYTES and is uploaded in parts."""
+    # Expires with the batch's task result; see record_batch_forms.
+    zip_key = f"forms/batches/{scheme_id}/{uuid.uuid4()}.zip"
+    with tempfile.SpooledTemporaryFile(max_size=BATCH_FORM_ZIP_SPOOL_BYTES) as spool:
+        # PDFs are already compressed; storing them avoids recompressing for nothing.
+        with zipfile.ZipFile(spool, "w", zipfile.ZIP_STORED) as zf:
+            for start in range(0, len(entries), BATCH_FORM_TRANSFER_CONCURRENCY):
+                batch = entries[start:start + BATCH_FORM_TRANSFER_CONCURRENCY]
+                bodies = await asyncio.gather(*(storage.get_object(e["file_key"]) for e in batch))
+                for entry, body in zip(batch, bodies):
+                    zf.writestr(f"{entry['farmer_id']}_{entry['file_name']}", body)
+
+        size = spool.tell()
+        spool.seek(0)
+        upload = storage.StreamingUpload(zip_key, "application/zip")
+        try:
+            while chunk := spool.read(UPLOAD_READ_CHUNK_BYTES):
+                await upload.write(chunk)
+            await upload.complete()
+        except Exception:
+            await upload.abort()
+            raise
+    return zip_key, size
+
+
+async def _log_on_sessions(db: AsyncSession, forms: list[dict], agent_sessions: dict[str, UUID], scheme_id: UUID) -> None:
+    session_ids = {agent_sessions[e["farmer_id"]] for e in forms if e["farmer_id"] in agent_sessions}
+    if not session_ids:
+        return
+    result = await db.execute(select(AgentSession).where(AgentSession.id.in_(list(session_ids))))
+    now = datetime.now(timezone.utc).isoformat()
+    for session in result.scalars().all():
+        session.actions_taken = (session.actions_taken or []) + [
+            {"action": "batch_form_generated", "scheme_id": str(scheme_id), "at": now},
+        ]
+
+
+async def record_batch_forms(
+    db: AsyncSession,
+    entries: list[dict],
+    scheme_id: UUID,
+    generated_by: str = "agent",
+    agent_sessions: dict[str, UUID] | None = None,
+    bundle: bool = False,
+) -> dict:
+    """Insert the GeneratedForm rows for a finished batch and summarize it.
+
+    Each row is linked to the agent session (by KisaanSeva ID in
+    ``agent_sessions``) the farmer consented through, and the generation is
+    logged in that session's actions.
+    """
+    agent_sessions = agent_sessions or {}
+    generated = [e for e in entries if e["status"] == "generated"]
+    if generated:
+        await content_store.register_many(db, [
+            (e["content_hash"], e["file_key"], "application/pdf", e["size_bytes"]) for e in generated
+        ])
+        now = datetime.now(timezone.utc)
+        await db.execute(insert(GeneratedForm).values([
+            {
+                "id": uuid.uuid4(),
+                "farmer_id": UUID(e["farmer_uuid"]),
+                "scheme_id": scheme_id,
+                "file_key": e["file_key"],
+                "file_name": e["file_name"],
+                "generated_at": now,
+                "generated_by": GeneratedByType(generated_by),
+                "agent_session_id": agent_sessions.get(e["farmer_id"]),
+                "content_hash": e["content_hash"],
+            }
+            for e in generated
+        ]))
+
+    forms = [e for e in entries if e["status"] in ("generated", "reused")]
+    await _log_on_sessions(db, forms, agent_sessions, scheme_id)
+    await db.commit()
+
+    summary = {
+        "scheme_id": str(scheme_id),
+        "requested": len(entries),
+        "generated": len(generated),
+        "reused": len(forms) - len(generated),
+        "not_found": [e["farmer_id"] for e in entries if e["status"] == "not_found"],
+        "failed": [{"farmer_id": e["farmer_id"], "error": e["error"]} for e in entries if e["status"] == "failed"],
+        "forms": [{"farmer_id": e["farmer_id"], "file_key": e["file_key"]} for e in forms],
+        "zip_key": None,
+        "download_url": None,
+    }
+    if bundle and forms:
+        zip_key, size = await bundle_forms(forms, scheme_id)
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=BATCH_FORM_ZIP_TTL_SECONDS)
+        await content_store.register_expiring(db, zip_key, "application/zip", size, expires_at)
+        await db.commit()
+        summary["zip_key"] = zip_key
+        summary["download_url"] = f"/files/{zip_key}"
+
+    logger.info(
+        "Batch forms for scheme %s: %d generated, %d reused, %d failed, %d not found",
+        scheme_id, summary["generated"], summary["reused"], len(summary["failed"]), len(summary["not_found"]),
+    )
+    return summary
@@ -0,0 +1,170 @@
+"""
+Content-addressed object storage.
+
+Uploaded documents are addressed by the sha256 of their bytes, scoped to the
+farmer (see ``document_object_hash``), and generated forms by the sha256 of
+their normalized inputs (see ``form_content_hash``).
+Each hash maps to one ``StoredObject`` row and one S3 object, shared by every
+document or form with that hash and reference-counted; the S3 object is
+deleted when the last reference goes. Objects registered with an expiry
+(``register_expiring``) are instead deleted by ``delete_expired`` once it passes.
+"""
+
+import hashlib
+import json
+from datetime import datetime, timezone
+from uuid import UUID
+from sqlalchemy import select, update, delete
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.constants import PDF_FORM_TEMPLATE_VERSION
+from app.external import storage
+from app.models.storage import StoredObject
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def form_content_hash(kind: str, **inputs) -> str:
+    """Stable hash of everything that ends up in a generated form.
+
+    Keys are sorted and whitespace is fixed so dict ordering never changes the
+    hash; bumping PDF_FORM_TEMPLATE_VERSION invalidates every stored form.
+    """
+    payload = {"kind": kind, "template": PDF_FORM_TEMPLATE_VERSION, **inputs}
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def document_object_hash(farmer_id: UUID, checksum: str) -> str:
+    """Key of the stored object behind an uploaded document.
+
+    Uploads are only deduplicated within one farmer's documents. A shared
+    object would hand one farmer another's storage key (and KisaanSeva ID)
+    and let anyone test whether some farmer holds a given file.
+    """
+    return hashlib.sha256(f"document:{farmer_id}:{checksum}".encode()).hexdigest()
+
+
+async def register(
+    db: AsyncSession,
+    content_hash: str,
+    file_key: str,
+    content_type: str,
+    size_bytes: int,
+) -> StoredObject:
+    """Record a freshly written object, or take a reference on the one that
+    already has this hash. The caller must delete its own copy when the
+    returned ``file_key`` differs from the one it wrote."""
+    stmt = pg_insert(StoredObject).values(
+        content_hash=content_hash,
+        file_key=file_key,
+        content_type=content_type,
+        size_bytes=size_bytes,
+        ref_count=1,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[StoredObject.content_hash],
+        set_={"ref_count": StoredObject.ref_count + 1},
+    ).returning(StoredObject)
+    result = await db.execute(stmt.execution_options(populate_existing=True))
+    return result.scalar_one()
+
+
+async def release(db: AsyncSession, content_hash: str) -> list[str]:
+    """Drop one reference. Returns the S3 keys to delete once the caller has
+    committed, non-empty only when this was the last reference."""
+    result = await db.execute(
+        update(StoredObject)
+        .where(StoredObject.content_hash == content_hash)
+        .values(ref_count=StoredObject.ref_count - 1)
+        .returning(StoredObject.ref_count, StoredObject.file_key, StoredObject.thumbnail_key)
+        .execution_options(synchronize_session=False)
+    )
+    row = result.one_or_none()
+    if row is None or row.ref_count > 0:
+        return []
+    await db.execute(
+        delete(StoredObject)
+        .where(StoredObject.content_hash == content_hash, StoredObject.ref_count <= 0)
+        .execution_options(synchronize_session=False)
+    )
+    return [key for key in (row.file_key, row.thumbnail_key) if key]
+
+
+async def release_document(db: AsyncSession, farmer_id: UUID, checksum: str) -> list[str]:
+    """``release`` for an uploaded document. Objects that were already shared
+    between farmers before uploads were scoped are still keyed by the bare
+    checksum (migration 015)."""
+    scoped = document_object_hash(farmer_id, checksum)
+    if await get(db, scoped) is not None:
+        return await release(db, scoped)
+    return await release(db, checksum)
+
+
+async def register_expiring(
+    db: AsyncSession, file_key: str, content_type: str, size_bytes: int, expires_at: datetime,
+) -> None:
+    """Record an unshared object (keyed by its ``file_key``) that is deleted
+    once ``expires_at`` passes."""
+    db.add(StoredObject(
+        content_hash=hashlib.sha256(file_key.encode()).hexdigest(),
+        file_key=file_key,
+        content_type=content_type,
+        size_bytes=size_bytes,
+        ref_count=1,
+        expires_at=expires_at,
+    ))
+    await db.flush()
+
+
+async def delete_expired(db: AsyncSession, now: datetime | None = None) -> list[str]:
+    """Drop every expired object's row. Returns the S3 keys to delete once the
+    caller has committed."""
+    result = await db.execute(
+        delete(StoredObject)
+        .where(StoredObject.expires_at <= (now or datetime.now(timezone.utc)))
+        .returning(StoredObject.file_key, StoredObject.thumbnail_key)
+        .execution_options(synchronize_session=False)
+    )
+    return [key for row in result.all() for key in (row.file_key, row.thumbnail_key) if key]
+
+
+async def get(db: AsyncSession, content_hash: str) -> StoredObject | None:
+    result = await db.execute(select(StoredObject).where(StoredObject.content_hash == content_hash))
+    return result.scalar_one_or_none()
+
+
+async def delete_objects(keys: list[str]) -> None:
+    for key in keys:
+        try:
+            await storage.delete_object(key)
+        except Exception as e:
+            logger.warning("Failed to delete unreferenced object %s: %s", key, e)
+
+
+async def register_many(db: AsyncSession, objects: list[tuple[str, str, str, int]]) -> None:
+    """``register`` for many freshly written objects in one statement.
+
+    ``objects`` are (content_hash, file_key, content_type, size_bytes). Each
+    hash gains one reference per occurrence; callers write new objects under
+    their content hash, so an existing row already points at the same bytes.
+    """
+    counts: dict[str, int] = {}
+    rows: dict[str, dict] = {}
+    for content_hash, file_key, content_type, size_bytes in objects:
+        counts[content_hash] = counts.get(content_hash, 0) + 1
+        rows.setdefault(content_hash, {
+            "content_hash": content_hash,
+            "file_key": file_key,
+            "content_type": content_type,
+            "size_bytes": size_bytes,
+        })
+    if not rows:
+        return
+    stmt = pg_insert(StoredObject).values([{**row, "ref_count": counts[h]} for h, row in rows.items()])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[StoredObject.content_hash],
+        set_={"ref_count": StoredObject.ref_count + stmt.excluded.ref_count},
+    )
+    await db.execute(stmt)
@@ -1,30 +1,25 @@
+import hashlib
 import uuid
 import os
-from io import BytesIO
+from datetime import datetime, timezone
 from fastapi import UploadFile
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.farmer import FarmerDocument
-from app.core.constants import ALLOWED_DOC_EXTENSIONS, MAX_FILE_SIZE_BYTES, DocType
+from app.models.notification import GeneratedForm
+from app.core.constants import (
+    ALLOWED_DOC_EXTENSIONS, MAX_FILE_SIZE_BYTES, DOC_MAX_FILE_SIZE_BYTES, DOC_FILE_SIGNATURES,
+    DOC_CONTENT_TYPES, DOC_IMAGE_EXTENSIONS, UPLOAD_READ_CHUNK_BYTES, DocType,
+)
+from app.core.image_processing import compress_image
 from app.core.exceptions import InvalidFileException
-from app.config import settings
-import boto3
-from botocore.config import Config as BotoConfig
+from app.external import storage
+from app.services import content_store
 import logging
 
 logger = logging.getLogger(__name__)
 
 
-def _get_s3_client():
-    return boto3.client(
-        "s3",
-        endpoint_url=settings.S3_ENDPOINT_URL,
-        aws_access_key_id=settings.S3_ACCESS_KEY,
-        aws_secret_access_key=settings.S3_SECRET_KEY,
-        region_name=settings.S3_REGION,
-        config=BotoConfig(signature_version="s3v4"),
-    )
-
-
 def _validate_file(file: UploadFile) -> str:
     if not file.filename:
         raise InvalidFileException("File must have a name")
@@ -36,6 +31,38 @@ def _validate_file(file: UploadFile) -> str:
     return ext
 
 
+async def _stream_upload(
+    file: UploadFile,
+    upload: storage.StreamingUpload,
+    ext: str,
+    max_bytes: int,
+) -> tuple[int, str]:
+    """Copy the upload to storage chunk by chunk, rejecting it as soon as it is
+    too large or its leading bytes do not match the extension. Returns
+    (size, sha256 hex)."""
+    signature = DOC_FILE_SIGNATURES[ext]
+    head = b""
+    size = 0
+    digest = hashlib.sha256()
+    while chunk := await file.read(UPLOAD_READ_CHUNK_BYTES):
+        size += len(chunk)
+        if size > max_bytes:
+            raise InvalidFileException(f"File too large. Maximum size: {max_bytes // (1024*1024)}MB")
+        if len(head) < len(signature):
+            head += chunk[:len(signature) - len(head)]
+            if not signature.startswith(head):
+                raise InvalidFileException(f"File content does not match type '{ext}'")
+        digest.update(chunk)
+        await upload.write(chunk)
+
+    if size == 0:
+        raise InvalidFileException("File is empty")
+    if len(head) < len(signature):
+        raise InvalidFileException(f"File content does not match type '{ext}'")
+    await upload.complete()
+    return size, digest.hexdigest()
+
+
 async def upload_document(
     db: AsyncSession,
     farmer_id: uuid.UUID,
@@ -44,33 +71,41 @@ async def upload_document(
     file: UploadFile,
 ) -> FarmerDocument:
     ext = _validate_file(file)
-
-    content = await file.read()
-    if len(content) > MAX_FILE_SIZE_BYTES:
-        raise InvalidFileException(f"File too large. Maximum size: {MAX_FILE_SIZE_BYTES // (1024*1024)}MB")
+    max_bytes = DOC_MAX_FILE_SIZE_BYTES.get(doc_type, MAX_FILE_SIZE_BYTES)
 
     file_uuid = uuid.uuid4()
     file_key = f"documents/{farmer_kid}/{doc_type.value}/{file_uuid}{ext}"
 
+    content_type = DOC_CONTENT_TYPES[ext]
+    upload = storage.StreamingUpload(file_key, content_type)
     try:
-        s3 = _get_s3_client()
-        s3.put_object(
-            Bucket=settings.S3_BUCKET_NAME,
-            Key=file_key,
-            Body=content,
-            ContentType=file.content_type or "application/octet-stream",
-        )
-        logger.info("Uploaded document to S3: %s", file_key)
+        size, checksum = await _stream_upload(file, upload, ext, max_bytes)
+        logger.info("Uploaded document to S3: %s (%d bytes)", file_key, size)
+    except InvalidFileException:
+        await upload.abort()
+        raise
     except Exception as e:
+        await upload.abort()
         logger.error("S3 upload failed: %s", str(e))
         raise InvalidFileException("File upload failed. Please try again.")
 
+    obj = await content_store.register(
+        db, content_store.document_object_hash(farmer_id, checksum), file_key, content_type, size,
+    )
     doc = FarmerDocument(
         farmer_id=farmer_id,
         doc_type=doc_type,
-        file_key=file_key,
+        file_key=obj.file_key,
         file_name=file.filename,
+        size_bytes=size,
+        checksum_sha256=checksum,
     )
+    if obj.file_key != file_key:
+        # This farmer already uploaded the same bytes; keep one copy.
+        logger.info("Duplicate upload %s, reusing %s", file_key, obj.file_key)
+        await content_store.delete_objects([file_key])
+        if obj.thumbnail_key:
+            _apply_processed(doc, obj.file_key, obj.thumbnail_key, obj.size_bytes)
     db.add(doc)
     await db.flush()
     await db.refresh(doc)
@@ -78,15 +113,106 @@ async def upload_document(
     return doc
 
 
+def is_image_document(doc: FarmerDocument) -> bool:
+    return os.path.splitext(doc.file_key)[1].lower() in DOC_IMAGE_EXTENSIONS
+
+
+async def process_document_image(db: AsyncSession, doc_id: uuid.UUID) -> FarmerDocument | None:
+    """Store a compressed copy and a thumbnail of an uploaded photo.
+
+    The compressed JPEG replaces the original object only when it is smaller.
+    Every document of the farmer sharing the same stored object is updated together.
+    Returns None when the document is gone, not an image, or already processed.
+    """
+    doc = await db.get(FarmerDocument, doc_id)
+    if doc is None or doc.processed_at is not None or not is_image_document(doc):
+        return None
+
+    obj = (
+        await content_store.get(db, content_store.document_object_hash(doc.farmer_id, doc.checksum_sha256))
+        if doc.checksum_sha256 else None
+    )
+    if obj is not None and obj.thumbnail_key:
+        # A duplicate of this photo was already processed.
+        _apply_processed(doc, obj.file_key, obj.thumbnail_key, obj.size_bytes)
+        await db.commit()
+        return doc
+
+    original = await storage.get_object(doc.file_key)
+    compressed, thumbnail = compress_image(original)
+
+    base = os.path.splitext(doc.file_key)[0]
+    thumbnail_key = f"{base}.thumb.jpg"
+    await storage.put_object(thumbnail_key, thumbnail, "image/jpeg")
+
+    replaced_key = None
+    file_key, stored_size = doc.file_key, len(original)
+    if len(compressed) < len(original):
+        file_key, stored_size = f"{base}.web.jpg", len(compressed)
+        await storage.put_object(file_key, compressed, "image/jpeg")
+        replaced_key = doc.file_key
+
+    if obj is not None:
+        obj.file_key, obj.thumbnail_key, obj.size_bytes = file_key, thumbnail_key, stored_size
+        if replaced_key:
+            obj.content_type = "image/jpeg"
+        await db.execute(
+            update(FarmerDocument)
+            .where(
+                FarmerDocument.farmer_id == doc.farmer_id,
+                FarmerDocument.checksum_sha256 == doc.checksum_sha256,
+                FarmerDocument.processed_at.is_(None),
+            )
+            .values(
+                file_key=file_key,
+                thumbnail_key=thumbnail_key,
+                compressed_size_bytes=stored_size,
+                processed_at=datetime.now(timezone.utc),
+            )
+            .execution_options(synchronize_session=False)
+        )
+    _apply_processed(doc, file_key, thumbnail_key, stored_size)
+    await db.commit()
+
+    # Only drop the original once the rows point at the compressed copy.
+    if replaced_key:
+        await content_store.delete_objects([replaced_key])
+
+    logger.info(
+        "Processed document image %s: %d -> %d bytes, thumbnail %d bytes",
+        doc.id, len(original), stored_size, len(thumbnail),
+    )
+    return doc
+
+
+def _apply_processed(doc: FarmerDocument, file_key: str, thumbnail_key: str, stored_size: int) -> None:
+    doc.file_key = file_key
+    doc.thumbnail_key = thumbnail_key
+    doc.compressed_size_bytes = stored_size
+    doc.processed_at = datetime.now(timezone.utc)
+
+
+async def find_generated_form(db: AsyncSession, farmer_id: uuid.UUID, content_hash: str) -> GeneratedForm | None:
+    result = await db.execute(
+        select(GeneratedForm)
+        .where(GeneratedForm.farmer_id == farmer_id, GeneratedForm.content_hash == content_hash)
+        .order_by(GeneratedForm.generated_at.desc())
+        .limit(1)
+    )
+    return result.scalar_one_or_none()
+
+
+async def store_generated_pdf(db: AsyncSession, content_hash: str, file_key: str, pdf_bytes: bytes) -> str:
+    """Upload a rendered form under its content hash and take a reference on it.
+    Returns the key of the stored object."""
+    await upload_bytes_to_s3(pdf_bytes, file_key, "application/pdf")
+    obj = await content_store.register(db, content_hash, file_key, "application/pdf", len(pdf_bytes))
+    return obj.file_key
+
+
 async def upload_bytes_to_s3(data: bytes, file_key: str, content_type: str = "application/pdf") -> str:
     try:
-        s3 = _get_s3_client()
-        s3.put_object(
-            Bucket=settings.S3_BUCKET_NAME,
-            Key=file_key,
-            Body=data,
-            ContentType=content_type,
-        )
+        await storage.put_object(file_key, data, content_type)
         logger.info("Uploaded bytes to S3: %s (%d bytes)", file_key, len(data))
         return file_key
     except Exception as e:
@@ -96,13 +222,7 @@ async def upload_bytes_to_s3(data: bytes, file_key: str, content_type: str = "ap
 
 def generate_presigned_url(file_key: str, expiration: int = 3600) -> str:
     try:
-        s3 = _get_s3_client()
-        url = s3.generate_presigned_url(
-            "get_object",
-            Params={"Bucket": settings.S3_BUCKET_NAME, "Key": file_key},
-            ExpiresIn=expiration,
-        )
-        return url
+        return storage.presigned_get_url(file_key, expiration)
     except Exception as e:
         logger.error("Failed to generate presigned URL for %s: %s", file_key, str(e))
         return ""
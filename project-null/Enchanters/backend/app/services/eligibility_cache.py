@@ -0,0 +1,128 @@
+"""
+Materialized per-farmer eligibility cache.
+
+The scheme listing for a farmer only changes when their crops, profile or land
+change, or when the scheme catalogue changes. Results are stored in Redis
+(hot path) and in the ``farmer_eligibility_cache`` table (fallback when Redis
+is cold or unavailable), each tagged with the version they were computed
+against. The version combines the catalogue fingerprint the eligibility
+index rebuilds on, so cached and freshly ranked listings always agree, with
+the farmer's ``eligibility_version``. Farmer mutations bump that column in
+their own transaction: a listing computed from data read before the change
+committed is stored under the old version and can never be served after it.
+"""
+
+import hashlib
+import json
+from datetime import date, datetime, timezone
+from uuid import UUID
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.constants import ELIGIBILITY_CACHE_TTL_SECONDS
+from app.core.otp import get_redis
+from app.models.farmer import Farmer
+from app.models.scheme import FarmerEligibilityCache
+from app.services.eligibility_index import catalogue_fingerprint
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Bump when the shape of cached listing items changes so old entries are ignored.
+_CACHE_FORMAT = 2
+
+
+def _farmer_key(farmer_uuid: UUID) -> str:
+    return f"eligibility:farmer:{farmer_uuid}"
+
+
+async def get_listing_version(db: AsyncSession, farmer_uuid: UUID, today: date | None = None) -> str:
+    """Version tag a farmer's cached listing must carry to be served.
+
+    The farmer's version is read before their data is loaded for ranking, so
+    a listing is never stored under a version newer than the data behind it.
+    The date is part of the tag because listing order depends on which
+    deadlines are still open.
+    """
+    today = today or date.today()
+    catalogue = hashlib.sha1(repr(await catalogue_fingerprint(db)).encode()).hexdigest()[:16]
+    result = await db.execute(select(Farmer.eligibility_version).where(Farmer.id == farmer_uuid))
+    farmer_version = result.scalar_one_or_none() or 0
+    return f"{_CACHE_FORMAT}:{catalogue}:{farmer_version}:{today.isoformat()}"
+
+
+def _to_json(results: list[dict]) -> list[dict]:
+    """Normalize UUIDs, enums and dates so results round-trip through JSON."""
+    return json.loads(json.dumps(results, default=str))
+
+
+async def get_cached_listing(db: AsyncSession, farmer_uuid: UUID, version: str) -> list[dict] | None:
+    key = _farmer_key(farmer_uuid)
+    try:
+        r = await get_redis()
+        raw = await r.get(key)
+        if raw:
+            entry = json.loads(raw)
+            if entry.get("version") == version:
+                return entry["results"]
+    except Exception as e:
+        logger.warning("Eligibility cache read failed for %s: %s", farmer_uuid, e)
+
+    result = await db.execute(
+        select(FarmerEligibilityCache.results).where(
+            FarmerEligibilityCache.farmer_id == farmer_uuid,
+            FarmerEligibilityCache.catalogue_version == version,
+        )
+    )
+    results = result.scalar_one_or_none()
+    if results is None:
+        return None
+
+    try:
+        r = await get_redis()
+        await r.set(key, json.dumps({"version": version, "results": results}), ex=ELIGIBILITY_CACHE_TTL_SECONDS)
+    except Exception as e:
+        logger.warning("Eligibility cache backfill failed for %s: %s", farmer_uuid, e)
+    return results
+
+
+async def store_listing(db: AsyncSession, farmer_uuid: UUID, version: str, results: list[dict]) -> None:
+    payload = _to_json(results)
+
+    stmt = pg_insert(FarmerEligibilityCache).values(
+        farmer_id=farmer_uuid,
+        catalogue_version=version,
+        results=payload,
+        computed_at=datetime.now(timezone.utc),
+    )
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[FarmerEligibilityCache.farmer_id],
+            set_={
+                "catalogue_version": stmt.excluded.catalogue_version,
+                "results": stmt.excluded.results,
+                "computed_at": stmt.excluded.computed_at,
+            },
+        )
+    )
+
+    try:
+        r = await get_redis()
+        await r.set(
+            _farmer_key(farmer_uuid),
+            json.dumps({"version": version, "results": payload}),
+            ex=ELIGIBILITY_CACHE_TTL_SECONDS,
+        )
+    except Exception as e:
+        logger.warning("Eligibility cache write failed for %s: %s", farmer_uuid, e)
+
+
+async def invalidate_farmer_eligibility(db: AsyncSession, farmer_uuid: UUID) -> None:
+    """Make a farmer's cached listing stale after their crops, profile or land
+    change. Runs inside the caller's transaction."""
+    await db.execute(
+        update(Farmer)
+        .where(Farmer.id == farmer_uuid)
+        .values(eligibility_version=Farmer.eligibility_version + 1)
+        .execution_options(synchronize_session=False)
+    )
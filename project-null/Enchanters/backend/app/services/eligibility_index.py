@@ -0,0 +1,352 @@
+"""
+Compiled eligibility rule index.
+
+Every active scheme's eligibility rules are parsed once into typed predicates
+(crop/season sets, state/district/ownership/irrigation keys, numeric land
+thresholds) and grouped by RuleType. Matching a farmer against the whole
+catalogue is then a handful of dict lookups and two bisects instead of
+re-parsing every rule string on every request. The same compiled rules drive
+the batch path, which evaluates a whole cohort of farmers per rule using
+integer bitsets (one bit per farmer) instead of looping farmer by farmer.
+
+The index is held process-wide and rebuilt only when the catalogue fingerprint
+(scheme/rule/deadline counts and the latest update to each table) changes.
+``updated_at`` on all three tables is maintained by a database trigger, so
+in-place edits made outside the ORM move the fingerprint too. The fingerprint
+is re-read at most every ELIGIBILITY_FINGERPRINT_TTL_SECONDS per process.
+"""
+
+import time
+from bisect import bisect_left, bisect_right
+from datetime import date
+from functools import reduce
+from operator import or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func
+from sqlalchemy.orm import selectinload
+from app.models.scheme import Scheme, SchemeEligibility, SchemeDeadline
+from app.core.constants import RuleType, EligibilityStatus, ELIGIBILITY_FINGERPRINT_TTL_SECONDS
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Rule types matched by exact (lower-cased) value lookup.
+_KEYED_RULE_TYPES = (
+    RuleType.CROP, RuleType.SEASON, RuleType.STATE,
+    RuleType.DISTRICT, RuleType.OWNERSHIP, RuleType.IRRIGATION,
+)
+
+_FAR_FUTURE = date(9999, 12, 31)
+
+
+def _enum_value(value) -> str:
+    return value.value if hasattr(value, "value") else str(value)
+
+
+def _set_bits(mask: int):
+    """Yield the positions of the set bits in mask, lowest first."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def _parse_threshold(raw: str) -> float | None:
+    try:
+        return float(raw.replace(">=", "").replace("<=", "").strip())
+    except ValueError:
+        return None
+
+
+class CompiledRule:
+    """A single eligibility rule, parsed once."""
+
+    __slots__ = ("scheme_pos", "rule_type", "rule_value", "is_mandatory", "label", "kind", "key")
+
+    def __init__(self, scheme_pos: int, rule: SchemeEligibility):
+        self.scheme_pos = scheme_pos
+        self.rule_type = _enum_value(rule.rule_type)
+        self.rule_value = rule.rule_value
+        self.is_mandatory = bool(rule.is_mandatory)
+        self.label = f"{self.rule_type}={self.rule_value}"
+        # Parsed predicate: kind is None for rules that can never match
+        # (unknown type or unparseable land threshold).
+        self.kind: RuleType | None = None
+        self.key: str | float | None = None
+
+        try:
+            kind = RuleType(self.rule_type)
+        except ValueError:
+            return
+        rv = rule.rule_value.strip().lower()
+        if kind in _KEYED_RULE_TYPES:
+            self.kind, self.key = kind, rv
+        elif kind in (RuleType.LAND_MIN, RuleType.LAND_MAX):
+            threshold = _parse_threshold(rv)
+            if threshold is not None:
+                self.kind, self.key = kind, threshold
+
+
+class CompiledScheme:
+    """Listing fields, rule ids and sorted deadlines for one scheme."""
+
+    __slots__ = ("id", "item", "rule_ids", "mandatory_total", "close_dates")
+
+    def __init__(self, scheme: Scheme):
+        self.id = scheme.id
+        self.item = {
+            "id": scheme.id,
+            "name_en": scheme.name_en,
+            "name_hi": scheme.name_hi,
+            "ministry": scheme.ministry,
+            "benefit_type": _enum_value(scheme.benefit_type),
+            "benefit_amount": scheme.benefit_amount,
+            "is_active": scheme.is_active,
+        }
+        self.rule_ids: list[int] = []
+        self.mandatory_total = 0
+        self.close_dates = sorted(dl.close_date for dl in (scheme.deadlines or []) if dl.close_date)
+
+    def nearest_deadline(self, today: date) -> date | None:
+        i = bisect_left(self.close_dates, today)
+        return self.close_dates[i] if i < len(self.close_dates) else None
+
+
+class EligibilityIndex:
+    """Immutable, process-wide view of the active scheme catalogue's rules."""
+
+    def __init__(self, version: tuple = ()):
+        self.version = version
+        self.schemes: list[CompiledScheme] = []
+        self.positions: dict = {}
+        self.rules: list[CompiledRule] = []
+        self._keyed: dict[RuleType, dict[str, list[int]]] = {rt: {} for rt in _KEYED_RULE_TYPES}
+        self._land_min: list[tuple[float, int]] = []
+        self._land_max: list[tuple[float, int]] = []
+        self._land_min_values: list[float] = []
+        self._land_max_values: list[float] = []
+
+    @classmethod
+    def build(cls, schemes, version: tuple = ()) -> "EligibilityIndex":
+        index = cls(version)
+        for scheme in schemes:
+            index._add_scheme(scheme)
+        index._land_min.sort()
+        index._land_max.sort()
+        index._land_min_values = [t for t, _ in index._land_min]
+        index._land_max_values = [t for t, _ in index._land_max]
+        return index
+
+    def _add_scheme(self, scheme: Scheme) -> None:
+        pos = len(self.schemes)
+        compiled = CompiledScheme(scheme)
+        self.schemes.append(compiled)
+        self.positions[scheme.id] = pos
+
+        for rule in scheme.eligibility_rules or []:
+            rule_id = len(self.rules)
+            cr = CompiledRule(pos, rule)
+            self.rules.append(cr)
+            compiled.rule_ids.append(rule_id)
+            if cr.is_mandatory:
+                compiled.mandatory_total += 1
+
+            if cr.kind in self._keyed:
+                self._keyed[cr.kind].setdefault(cr.key, []).append(rule_id)
+            elif cr.kind == RuleType.LAND_MIN:
+                self._land_min.append((cr.key, rule_id))
+            elif cr.kind == RuleType.LAND_MAX:
+                self._land_max.append((cr.key, rule_id))
+
+    def matched_rule_ids(self, farmer_data: dict) -> set[int]:
+        """Return the ids of every rule in the catalogue that the farmer satisfies."""
+        keyed = self._keyed
+        passed: set[int] = set()
+
+        for crop in farmer_data.get("crops", []):
+            passed.update(keyed[RuleType.CROP].get(crop.lower(), ()))
+        for season in farmer_data.get("seasons", []):
+            passed.update(keyed[RuleType.SEASON].get(season.lower(), ()))
+
+        for rt, field in (
+            (RuleType.STATE, "state"),
+            (RuleType.DISTRICT, "district"),
+            (RuleType.OWNERSHIP, "ownership_type"),
+            (RuleType.IRRIGATION, "irrigation_type"),
+        ):
+            passed.update(keyed[rt].get(farmer_data.get(field, "").lower(), ()))
+
+        land = farmer_data.get("land_area_acres", 0)
+        passed.update(rid for _, rid in self._land_min[:bisect_right(self._land_min_values, land)])
+        passed.update(rid for _, rid in self._land_max[bisect_left(self._land_max_values, land):])
+        return passed
+
+    def _mandatory_matched(self, passed: set[int]) -> list[int]:
+        counts = [0] * len(self.schemes)
+        rules = self.rules
+        for rid in passed:
+            rule = rules[rid]
+            if rule.is_mandatory:
+                counts[rule.scheme_pos] += 1
+        return counts
+
+    @staticmethod
+    def _status_and_score(mandatory_total: int, mandatory_matched: int) -> tuple[EligibilityStatus, float]:
+        if mandatory_total == 0 or mandatory_matched == mandatory_total:
+            status = EligibilityStatus.ELIGIBLE
+        elif mandatory_matched > 0:
+            status = EligibilityStatus.PARTIAL
+        else:
+            status = EligibilityStatus.NOT_ELIGIBLE
+        score = 1.0 if mandatory_total == 0 else mandatory_matched / mandatory_total
+        return status, round(score, 3)
+
+    def rank(self, farmer_data: dict, today: date | None = None) -> list[dict]:
+        """Evaluate every scheme for a farmer and return listing items sorted by
+        match score (desc), nearest upcoming deadline, then scheme id."""
+        today = today or date.today()
+        passed = self.matched_rule_ids(farmer_data)
+        mandatory_matched = self._mandatory_matched(passed)
+        rules = self.rules
+
+        ranked = []
+        for pos, scheme in enumerate(self.schemes):
+            status, score = self._status_and_score(scheme.mandatory_total, mandatory_matched[pos])
+            matched, unmatched = [], []
+            for rid in scheme.rule_ids:
+                (matched if rid in passed else unmatched).append(rules[rid].label)
+
+            item = dict(scheme.item)
+            item["eligibility_status"] = status
+            item["match_score"] = score
+            item["matched_rules"] = matched
+            item["unmatched_rules"] = unmatched
+            item["nearest_deadline"] = scheme.nearest_deadline(today)
+            ranked.append((-score, item["nearest_deadline"] or _FAR_FUTURE, str(scheme.id), item))
+
+        ranked.sort(key=lambda r: r[:3])
+        return [r[3] for r in ranked]
+
+    def evaluate_batch(self, farmers: list[dict], positions: list[int] | None = None) -> list[tuple]:
+        """Evaluate a cohort of farmers against the catalogue in one pass.
+
+        Each farmer attribute becomes a column of bitmasks (bit i set when farmer
+        i has that crop/state/...), each rule resolves to one mask, and a
+        scheme's fully-eligible cohort is the AND of its mandatory rule masks.
+        Returns (scheme_pos, eligible_indices, [(partial_index, score), ...])
+        per scheme.
+        """
+        n = len(farmers)
+        everyone = (1 << n) - 1
+        columns: dict[RuleType, dict[str, int]] = {rt: {} for rt in _KEYED_RULE_TYPES}
+        lands = []
+
+        for i, fd in enumerate(farmers):
+            bit = 1 << i
+            for rt, values in (
+                (RuleType.CROP, fd.get("crops", [])),
+                (RuleType.SEASON, fd.get("seasons", [])),
+                (RuleType.STATE, [fd.get("state", "")]),
+                (RuleType.DISTRICT, [fd.get("district", "")]),
+                (RuleType.OWNERSHIP, [fd.get("ownership_type", "")]),
+                (RuleType.IRRIGATION, [fd.get("irrigation_type", "")]),
+            ):
+                col = columns[rt]
+                for v in values:
+                    v = v.lower()
+                    col[v] = col.get(v, 0) | bit
+            lands.append(fd.get("land_area_acres", 0))
+
+        order = sorted(range(n), key=lands.__getitem__)
+        sorted_lands = [lands[i] for i in order]
+        land_masks: dict[tuple, int] = {}
+
+        def _bits(indices) -> int:
+            return reduce(or_, (1 << i for i in indices), 0)
+
+        def rule_mask(rule: CompiledRule) -> int:
+            if rule.kind is None:
+                return 0
+            if rule.kind == RuleType.LAND_MIN:
+                key = (rule.kind, rule.key)
+                if key not in land_masks:
+                    land_masks[key] = _bits(order[bisect_left(sorted_lands, rule.key):])
+                return land_masks[key]
+            if rule.kind == RuleType.LAND_MAX:
+                key = (rule.kind, rule.key)
+                if key not in land_masks:
+                    land_masks[key] = _bits(order[:bisect_right(sorted_lands, rule.key)])
+                return land_masks[key]
+            return columns[rule.kind].get(rule.key, 0)
+
+        results = []
+        for pos in (range(len(self.schemes)) if positions is None else positions):
+            scheme = self.schemes[pos]
+            masks = [rule_mask(self.rules[rid]) for rid in scheme.rule_ids if self.rules[rid].is_mandatory]
+            if not masks:
+                results.append((pos, list(range(n)), []))
+                continue
+
+            eligible, any_match = everyone, 0
+            for m in masks:
+                eligible &= m
+                any_match |= m
+            partial = any_match & ~eligible
+
+            partial_idx = [
+                (i, round(sum(m >> i & 1 for m in masks) / len(masks), 3))
+                for i in _set_bits(partial)
+            ]
+            eligible_idx = list(_set_bits(eligible))
+            results.append((pos, eligible_idx, partial_idx))
+        return results
+
+
+_index: EligibilityIndex | None = None
+_fingerprint: tuple | None = None
+_fingerprint_read_at = 0.0
+
+
+async def _catalogue_fingerprint(db: AsyncSession) -> tuple:
+    """Single-row aggregate that changes whenever schemes, rules or deadlines do."""
+    result = await db.execute(
+        select(
+            select(func.count(Scheme.id)).where(Scheme.is_active == True).scalar_subquery(),
+            select(func.max(Scheme.updated_at)).scalar_subquery(),
+            select(func.count(SchemeEligibility.id)).scalar_subquery(),
+            select(func.max(SchemeEligibility.updated_at)).scalar_subquery(),
+            select(func.count(SchemeDeadline.id)).scalar_subquery(),
+            select(func.max(SchemeDeadline.updated_at)).scalar_subquery(),
+        )
+    )
+    return tuple(result.one())
+
+
+async def catalogue_fingerprint(db: AsyncSession) -> tuple:
+    """The catalogue fingerprint, re-read at most every ELIGIBILITY_FINGERPRINT_TTL_SECONDS."""
+    global _fingerprint, _fingerprint_read_at
+    now = time.monotonic()
+    if _fingerprint is None or now - _fingerprint_read_at >= ELIGIBILITY_FINGERPRINT_TTL_SECONDS:
+        _fingerprint = await _catalogue_fingerprint(db)
+        _fingerprint_read_at = now
+    return _fingerprint
+
+
+async def get_eligibility_index(db: AsyncSession) -> EligibilityIndex:
+    """Return the process-wide index, rebuilding it if the catalogue has changed."""
+    global _index
+    fingerprint = await catalogue_fingerprint(db)
+    if _index is not None and _index.version == fingerprint:
+        return _index
+
+    result = await db.execute(
+        select(Scheme)
+        .options(selectinload(Scheme.eligibility_rules), selectinload(Scheme.deadlines))
+        .where(Scheme.is_active == True)
+    )
+    _index = EligibilityIndex.build(result.scalars().all(), version=fingerprint)
+    logger.info(
+        "Eligibility index rebuilt: %d schemes, %d rules",
+        len(_index.schemes), len(_index.rules),
+    )
+    return _index
@@ -0,0 +1,172 @@
+"""
+SQL-side eligibility ranking.
+
+Evaluates every active scheme's rules against one farmer inside PostgreSQL and
+returns only the requested page of ranked listing items, so neither response
+time nor memory grows with the size of the catalogue. Rule semantics mirror
+``scheme_service._check_rule``: keyed rules compare the trimmed, lower-cased
+rule value; land rules strip ``>=``/``<=`` and never match when the threshold
+is not a number.
+"""
+
+from datetime import date
+from decimal import Decimal
+from uuid import UUID
+from sqlalchemy import (
+    ARRAY, Float, Numeric, String, and_, any_, bindparam, case, cast, func, literal, select, true, tuple_,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.scheme import Scheme, SchemeEligibility, SchemeDeadline
+from app.core.constants import RuleType, EligibilityStatus
+from app.services.eligibility_index import _FAR_FUTURE
+
+_NUMERIC_PATTERN = r"^[+-]?([0-9]+(\.[0-9]*)?|\.[0-9]+)$"
+
+
+def _rule_passed(farmer_data: dict):
+    """Boolean SQL expression: does the current scheme_eligibility row match the farmer?"""
+    rt = SchemeEligibility.rule_type
+    rv = func.lower(func.btrim(SchemeEligibility.rule_value))
+
+    threshold_text = func.btrim(func.replace(func.replace(rv, ">=", ""), "<=", ""))
+    threshold = cast(case((threshold_text.op("~")(_NUMERIC_PATTERN), threshold_text)), Float)
+    land = bindparam("land_area_acres", float(farmer_data.get("land_area_acres", 0)), type_=Float)
+
+    crops = bindparam("crops", [c.lower() for c in farmer_data.get("crops", [])], type_=ARRAY(String))
+    seasons = bindparam("seasons", [s.lower() for s in farmer_data.get("seasons", [])], type_=ARRAY(String))
+
+    def _equals(name: str, field: str):
+        return rv == bindparam(name, farmer_data.get(field, "").lower(), type_=String)
+
+    return func.coalesce(
+        case(
+            (rt == RuleType.CROP, rv == any_(crops)),
+            (rt == RuleType.SEASON, rv == any_(seasons)),
+            (rt == RuleType.LAND_MIN, land >= threshold),
+            (rt == RuleType.LAND_MAX, land <= threshold),
+            (rt == RuleType.STATE, _equals("state", "state")),
+            (rt == RuleType.DISTRICT, _equals("district", "district")),
+            (rt == RuleType.OWNERSHIP, _equals("ownership_type", "ownership_type")),
+            (rt == RuleType.IRRIGATION, _equals("irrigation_type", "irrigation_type")),
+            else_=False,
+        ),
+        False,
+    )
+
+
+def build_ranking_query(
+    farmer_data: dict,
+    today: date,
+    limit: int | None = None,
+    after: tuple[float, date, UUID] | None = None,
+):
+    """Build the single ranking query: per-scheme rule aggregates, nearest open
+    deadline, status and score, ordered by (score desc, deadline, id) and
+    resumed after the `after` key when paging."""
+    rule_eval = (
+        select(
+            SchemeEligibility.scheme_id.label("scheme_id"),
+            (SchemeEligibility.is_mandatory == true()).label("is_mandatory"),
+            func.concat(
+                func.lower(cast(SchemeEligibility.rule_type, String)), "=", SchemeEligibility.rule_value,
+            ).label("label"),
+            _rule_passed(farmer_data).label("passed"),
+        )
+        .join(Scheme, Scheme.id == SchemeEligibility.scheme_id)
+        .where(Scheme.is_active == True)
+        .cte("rule_eval")
+    )
+
+    rule_hits = (
+        select(
+            rule_eval.c.scheme_id,
+            func.count().filter(rule_eval.c.is_mandatory).label("mandatory_total"),
+            func.count().filter(and_(rule_eval.c.is_mandatory, rule_eval.c.passed)).label("mandatory_matched"),
+            func.array_agg(rule_eval.c.label).filter(rule_eval.c.passed).label("matched_rules"),
+            func.array_agg(rule_eval.c.label).filter(~rule_eval.c.passed).label("unmatched_rules"),
+        )
+        .group_by(rule_eval.c.scheme_id)
+        .cte("rule_hits")
+    )
+
+    next_deadline = (
+        select(
+            SchemeDeadline.scheme_id.label("scheme_id"),
+            func.min(SchemeDeadline.close_date).label("nearest_deadline"),
+        )
+        .where(SchemeDeadline.close_date >= bindparam("today", today))
+        .group_by(SchemeDeadline.scheme_id)
+        .cte("next_deadline")
+    )
+
+    mandatory_total = func.coalesce(rule_hits.c.mandatory_total, 0)
+    mandatory_matched = func.coalesce(rule_hits.c.mandatory_matched, 0)
+    score = case(
+        (mandatory_total == 0, literal(1, Numeric)),
+        else_=func.round(cast(mandatory_matched, Numeric) / mandatory_total, 3),
+    ).label("match_score")
+    status = case(
+        ((mandatory_total == 0) | (mandatory_matched == mandatory_total), EligibilityStatus.ELIGIBLE.value),
+        (mandatory_matched > 0, EligibilityStatus.PARTIAL.value),
+        else_=EligibilityStatus.NOT_ELIGIBLE.value,
+    )
+
+    ranked = (
+        select(
+            Scheme.id,
+            Scheme.name_en,
+            Scheme.name_hi,
+            Scheme.ministry,
+            Scheme.benefit_type,
+            Scheme.benefit_amount,
+            Scheme.is_active,
+            status.label("eligibility_status"),
+            score,
+            func.coalesce(rule_hits.c.matched_rules, cast([], ARRAY(String))).label("matched_rules"),
+            func.coalesce(rule_hits.c.unmatched_rules, cast([], ARRAY(String))).label("unmatched_rules"),
+            next_deadline.c.nearest_deadline,
+            func.coalesce(next_deadline.c.nearest_deadline, _FAR_FUTURE).label("deadline_key"),
+        )
+        .outerjoin(rule_hits, rule_hits.c.scheme_id == Scheme.id)
+        .outerjoin(next_deadline, next_deadline.c.scheme_id == Scheme.id)
+        .where(Scheme.is_active == True)
+        .subquery("ranked")
+    )
+
+    query = select(ranked).order_by(ranked.c.match_score.desc(), ranked.c.deadline_key, ranked.c.id)
+    if after is not None:
+        after_score, after_deadline, after_id = after
+        query = query.where(
+            tuple_(-ranked.c.match_score, ranked.c.deadline_key, ranked.c.id)
+            > tuple_(-Decimal(str(after_score)), after_deadline, after_id)
+        )
+    if limit is not None:
+        query = query.limit(limit)
+    return query
+
+
+async def rank_schemes_sql(
+    db: AsyncSession,
+    farmer_data: dict,
+    today: date,
+    limit: int | None = None,
+    after: tuple[float, date, UUID] | None = None,
+) -> list[dict]:
+    result = await db.execute(build_ranking_query(farmer_data, today, limit, after))
+    return [
+        {
+            "id": row.id,
+            "name_en": row.name_en,
+            "name_hi": row.name_hi,
+            "ministry": row.ministry,
+            "benefit_type": row.benefit_type.value if hasattr(row.benefit_type, "value") else str(row.benefit_type),
+            "benefit_amount": row.benefit_amount,
+            "is_active": row.is_active,
+            "eligibility_status": EligibilityStatus(row.eligibility_status),
+            "match_score": float(row.match_score),
+            "matched_rules": list(row.matched_rules),
+            "unmatched_rules": list(row.unmatched_rules),
+            "nearest_deadline": row.nearest_deadline,
+        }
+        for row in result.all()
+    ]
@@ -8,6 +8,9 @@ from app.models.notification import GeneratedForm
 from app.core.security import encrypt_value, decrypt_value
 from app.core.exceptions import NotFoundException, BadRequestException
 from app.external.india_post import lookup_pincode
+from app.services.eligibility_cache import invalidate_farmer_eligibility
+from app.services.principal_service import invalidate_farmer_principal_after_commit
+from app.services import content_store
 import logging
 
 logger = logging.getLogger(__name__)
@@ -33,7 +36,7 @@ async def update_farmer(db: AsyncSession, farmer_uuid: UUID, data: dict) -> Farm
     farmer = await get_farmer_full(db, farmer_uuid)
 
     if "pin_code" in data and data["pin_code"] and data["pin_code"] != farmer.pin_code:
-        location = await lookup_pincode(data["pin_code"])
+        location = await lookup_pincode(data["pin_code"], db)
         data["district"] = location.get("district", farmer.district)
         data["state"] = location.get("state", farmer.state)
 
@@ -43,6 +46,8 @@ async def update_farmer(db: AsyncSession, farmer_uuid: UUID, data: dict) -> Farm
 
     await db.flush()
     await db.refresh(farmer)
+    await invalidate_farmer_eligibility(db, farmer_uuid)
+    invalidate_farmer_principal_after_commit(db, farmer_uuid)
     logger.info("Farmer updated: %s", farmer.farmer_id)
     return farmer
 
@@ -74,6 +79,7 @@ async def create_or_update_profile(db: AsyncSession, farmer_uuid: UUID, data: di
 
     await db.flush()
     await db.refresh(profile)
+    await invalidate_farmer_eligibility(db, farmer_uuid)
     logger.info("Profile updated for farmer_uuid=%s", farmer_uuid)
     return profile
 
@@ -96,6 +102,7 @@ async def add_crop(db: AsyncSession, farmer_uuid: UUID, crop_name: str, season:
     db.add(crop)
     await db.flush()
     await db.refresh(crop)
+    await invalidate_farmer_eligibility(db, farmer_uuid)
     logger.info("Crop added: %s for farmer_uuid=%s", crop_name, farmer_uuid)
     return crop
 
@@ -109,6 +116,7 @@ async def remove_crop(db: AsyncSession, farmer_uuid: UUID, crop_id: UUID) -> dic
         raise NotFoundException("Crop")
     crop.is_active = False
     await db.flush()
+    await invalidate_farmer_eligibility(db, farmer_uuid)
     return {"message": "Crop removed"}
 
 
@@ -119,16 +127,21 @@ async def list_documents(db: AsyncSession, farmer_uuid: UUID) -> list[FarmerDocu
     return list(result.scalars().all())
 
 
-async def delete_document(db: AsyncSession, farmer_uuid: UUID, doc_id: UUID) -> dict:
+async def delete_document(db: AsyncSession, farmer_uuid: UUID, doc_id: UUID) -> list[str]:
+    """Delete a document row. Returns the storage keys it no longer shares
+    with anything; the caller deletes them once the transaction commits."""
     result = await db.execute(
         select(FarmerDocument).where(FarmerDocument.id == doc_id, FarmerDocument.farmer_id == farmer_uuid)
     )
     doc = result.scalar_one_or_none()
     if not doc:
         raise NotFoundException("Document")
+    unreferenced = (
+        await content_store.release_document(db, farmer_uuid, doc.checksum_sha256) if doc.checksum_sha256 else []
+    )
     await db.delete(doc)
     await db.flush()
-    return {"message": "Document deleted"}
+    return unreferenced
 
 
 async def get_access_log(db: AsyncSession, farmer_uuid: UUID) -> list[dict]:
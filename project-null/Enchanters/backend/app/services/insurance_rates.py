@@ -0,0 +1,196 @@
+"""
+Locally stored PMFBY rate notifications.
+
+``sync_tasks.sync_insurance_rates`` downloads each season's district × crop
+rates into ``insurance_rates``, replacing that season's previous set in one
+transaction. Premium requests, single and bulk, read an in-memory snapshot of
+the latest year for every season, reloaded per process every
+INSURANCE_RATE_SNAPSHOT_REFRESH_SECONDS, and never call PMFBY.
+"""
+
+import asyncio
+import time
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from typing import NamedTuple
+from sqlalchemy import select, delete, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.constants import (
+    Season, INSURANCE_RATE_SNAPSHOT_REFRESH_SECONDS, INSURANCE_RATE_SNAPSHOT_RETRY_SECONDS,
+)
+from app.database import async_session_factory
+from app.external.pmfby import fetch_rate_notifications, standard_rates, assign_company
+from app.models.insurance import InsuranceRate
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class NotifiedRate(NamedTuple):
+    state: str
+    year: int
+    sum_insured_per_hectare: float
+    farmer_premium_rate: float
+    actuarial_rate: float | None
+    insurance_company: str | None
+
+
+def _key(value: str) -> str:
+    return " ".join(value.lower().split())
+
+
+class RateSnapshot:
+    def __init__(self, rates: list[InsuranceRate]):
+        # (season, district, crop) -> rates for that district name in each state
+        self._rates: dict[tuple[str, str, str], list[NotifiedRate]] = {}
+        self.versions: dict[str, int] = {}
+        for r in rates:
+            self._rates.setdefault((r.season, _key(r.district), _key(r.crop)), []).append(NotifiedRate(
+                state=r.state,
+                year=r.year,
+                sum_insured_per_hectare=float(r.sum_insured_per_hectare),
+                farmer_premium_rate=float(r.farmer_premium_rate),
+                actuarial_rate=float(r.actuarial_rate) if r.actuarial_rate is not None else None,
+                insurance_company=r.insurance_company,
+            ))
+            self.versions[r.season] = max(self.versions.get(r.season, 0), r.year)
+
+    def __len__(self) -> int:
+        return sum(len(v) for v in self._rates.values())
+
+    def lookup(self, crop: str, season: str, district: str, state: str | None = None) -> NotifiedRate | None:
+        """Notified rate for the district. `state` picks between districts that
+        share a name; None if not notified or still ambiguous."""
+        candidates = self._rates.get((season.lower(), _key(district), _key(crop)))
+        if not candidates:
+            return None
+        if state:
+            for rate in candidates:
+                if _key(rate.state) == _key(state):
+                    return rate
+        return candidates[0] if len(candidates) == 1 else None
+
+
+def premium_from_notified_rate(
+    rate: NotifiedRate, crop: str, season: str, district: str, land_area_hectares: float,
+) -> dict:
+    """Premium from a notified rate. Notifications without an actuarial rate or
+    insurer fall back to the standard subsidy and insurer assignment, like
+    ``pmfby.calculate_premium_local``."""
+    sum_insured = rate.sum_insured_per_hectare * land_area_hectares
+    farmer_premium = sum_insured * rate.farmer_premium_rate / 100
+    if rate.actuarial_rate is not None:
+        govt_subsidy = sum_insured * max(rate.actuarial_rate - rate.farmer_premium_rate, 0) / 100
+    else:
+        govt_subsidy = sum_insured * standard_rates(crop, season)[1] / 100
+    return {
+        "sum_insured": round(sum_insured, 2),
+        "farmer_premium": round(farmer_premium, 2),
+        "govt_subsidy": round(govt_subsidy, 2),
+        "insurance_company": rate.insurance_company or assign_company(crop, season, district),
+        "premium_rate_percent": rate.farmer_premium_rate,
+        "source": "pmfby_rates",
+    }
+
+
+async def load_rate_snapshot(db: AsyncSession) -> RateSnapshot:
+    latest = (
+        select(InsuranceRate.season, func.max(InsuranceRate.year).label("year"))
+        .group_by(InsuranceRate.season)
+        .subquery()
+    )
+    result = await db.execute(
+        select(InsuranceRate).join(
+            latest, (InsuranceRate.season == latest.c.season) & (InsuranceRate.year == latest.c.year),
+        )
+    )
+    snapshot = RateSnapshot(result.scalars().all())
+    logger.info("Insurance rate snapshot loaded: %d rates, versions %s", len(snapshot), snapshot.versions)
+    return snapshot
+
+
+_snapshot: RateSnapshot | None = None
+_next_reload_at = 0.0
+_reload_lock = asyncio.Lock()
+
+
+async def get_rate_snapshot() -> RateSnapshot:
+    """Return the snapshot, reloading it once the refresh interval has passed.
+
+    Only one reload runs at a time; concurrent callers keep the current one.
+    """
+    global _snapshot, _next_reload_at
+    if _snapshot is not None and (time.monotonic() < _next_reload_at or _reload_lock.locked()):
+        return _snapshot
+
+    async with _reload_lock:
+        if _snapshot is not None and time.monotonic() < _next_reload_at:
+            return _snapshot
+        try:
+            async with async_session_factory() as db:
+                _snapshot = await load_rate_snapshot(db)
+            _next_reload_at = time.monotonic() + INSURANCE_RATE_SNAPSHOT_REFRESH_SECONDS
+        except Exception as e:
+            logger.warning("Insurance rate snapshot load failed, using standard rates: %s", e)
+            if _snapshot is None:
+                _snapshot = RateSnapshot([])
+            _next_reload_at = time.monotonic() + INSURANCE_RATE_SNAPSHOT_RETRY_SECONDS
+    return _snapshot
+
+
+def current_seasons(today: date | None = None) -> list[tuple[str, int]]:
+    """Season/year pairs whose notifications should be synced now. Rabi is
+    labelled by the year it is sown in, so January–June belongs to last year's rabi."""
+    today = today or date.today()
+    rabi_year = today.year if today.month >= 7 else today.year - 1
+    return [
+        (Season.KHARIF.value, today.year),
+        (Season.RABI.value, rabi_year),
+        (Season.ZAID.value, today.year),
+    ]
+
+
+def _decimal(value) -> Decimal | None:
+    if value is None or value == "":
+        return None
+    try:
+        return Decimal(str(value))
+    except InvalidOperation:
+        return None
+
+
+async def sync_season_rates(db: AsyncSession, season: str, year: int) -> int | None:
+    """Replace the stored rates for one season. Returns the number of rows
+    stored, or None (keeping the previous set) when the download failed."""
+    rates = await fetch_rate_notifications(season, year)
+    if rates is None:
+        return None
+
+    rows = {}
+    for item in rates:
+        si = _decimal(item["sum_insured_per_hectare"])
+        farmer_rate = _decimal(item["farmer_premium_rate"])
+        state, district, crop = (" ".join(str(item[k]).split()) for k in ("state", "district", "crop"))
+        if si is None or farmer_rate is None or not (state and district and crop):
+            continue
+        # Last notification wins if PMFBY repeats a district × crop.
+        rows[(_key(state), _key(district), _key(crop))] = InsuranceRate(
+            season=season,
+            year=year,
+            state=state,
+            district=district,
+            crop=crop,
+            sum_insured_per_hectare=si,
+            farmer_premium_rate=farmer_rate,
+            actuarial_rate=_decimal(item["actuarial_rate"]),
+            insurance_company=item["insurance_company"],
+        )
+    if not rows:
+        logger.info("No PMFBY rates notified yet for %s %s", season, year)
+        return 0
+
+    await db.execute(delete(InsuranceRate).where(InsuranceRate.season == season, InsuranceRate.year == year))
+    db.add_all(rows.values())
+    await db.flush()
+    logger.info("Stored %d PMFBY rates for %s %s", len(rows), season, year)
+    return len(rows)
@@ -1,23 +1,47 @@
+from typing import Iterator
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, tuple_
 from app.models.insurance import InsurancePlan
 from app.models.farmer import Farmer
 from app.models.notification import GeneratedForm
 from app.core.constants import LandUnit, LAND_CONVERSION, GeneratedByType
-from app.core.exceptions import NotFoundException
-from app.core.pdf_builder import build_insurance_form_pdf
-from app.external.pmfby import calculate_premium_from_api, calculate_premium_local
-from app.services.document_service import upload_bytes_to_s3
+from app.core.exceptions import NotFoundException, BadRequestException
+from app.services.pdf_renderer import render_insurance_form
+from app.external.pmfby import calculate_premium_local
+from app.services.document_service import find_generated_form, store_generated_pdf
+from app.services.content_store import form_content_hash
+from app.services.insurance_rates import get_rate_snapshot, premium_from_notified_rate
+from app.services.premium_quotes import quote_rows, stream_csv, stream_json
+from app.services import agent_service
 import logging
 
 logger = logging.getLogger(__name__)
 
 
-async def list_plans(db: AsyncSession) -> list[InsurancePlan]:
-    result = await db.execute(
-        select(InsurancePlan).where(InsurancePlan.is_active == True)
-    )
+def page_key(item) -> list:
+    """Keyset for insurance plan listings: (name_en, id)."""
+    return [item.name_en, str(item.id)]
+
+
+async def list_plans(
+    db: AsyncSession,
+    after: list | None = None,
+    limit: int | None = None,
+) -> list[InsurancePlan]:
+    query = select(InsurancePlan).where(InsurancePlan.is_active == True)
+    if after:
+        try:
+            name, last_id = after
+            query = query.where(tuple_(InsurancePlan.name_en, InsurancePlan.id) > tuple_(name, UUID(last_id)))
+        except (TypeError, ValueError):
+            raise BadRequestException("Invalid cursor")
+
+    query = query.order_by(InsurancePlan.name_en, InsurancePlan.id)
+    if limit is not None:
+        query = query.limit(limit)
+
+    result = await db.execute(query)
     return list(result.scalars().all())
 
 
@@ -37,32 +61,38 @@ async def calculate_premium(
     district: str,
     land_area: float,
     land_unit: str = "acre",
+    state: str | None = None,
 ) -> dict:
+    """Premium from the locally synced PMFBY notification for the district,
+    or from the standard rate tables where none is notified."""
     unit_enum = LandUnit(land_unit) if land_unit else LandUnit.ACRE
     factor = LAND_CONVERSION.get(unit_enum, 1.0)
     land_area_acres = land_area * factor
     land_area_hectares = land_area_acres / 2.47105
 
-    api_result = await calculate_premium_from_api(crop, season, district, land_area_hectares)
-    if api_result:
-        return {
-            "crop": crop,
-            "season": season,
-            "district": district,
-            "land_area": land_area,
-            **api_result,
-        }
-
-    local_result = calculate_premium_local(crop, season, district, land_area_hectares)
+    snapshot = await get_rate_snapshot()
+    rate = snapshot.lookup(crop, season, district, state)
+    if rate is not None:
+        result = premium_from_notified_rate(rate, crop, season, district, land_area_hectares)
+    else:
+        result = calculate_premium_local(crop, season, district, land_area_hectares)
     return {
         "crop": crop,
         "season": season,
         "district": district,
         "land_area": land_area,
-        **local_result,
+        **result,
     }
 
 
+async def stream_bulk_quotes(rows: list[dict], fmt: str = "json") -> Iterator[str]:
+    """Premium quotes for many rows, serialized incrementally as CSV or a JSON
+    array. Rows use the synced PMFBY notification where the district has one,
+    like ``calculate_premium``."""
+    quotes = quote_rows(rows, await get_rate_snapshot())
+    return stream_csv(quotes) if fmt == "csv" else stream_json(quotes)
+
+
 async def generate_insurance_form(
     db: AsyncSession,
     plan_id: UUID,
@@ -87,9 +117,22 @@ async def generate_insurance_form(
         "plan_type": plan.plan_type.value if hasattr(plan.plan_type, 'value') else str(plan.plan_type),
     }
 
-    pdf_bytes, filename = build_insurance_form_pdf(farmer_data, plan_data)
-    file_key = f"forms/{farmer.farmer_id}/insurance/{plan_id}/{filename}"
-    await upload_bytes_to_s3(pdf_bytes, file_key, "application/pdf")
+    content_hash = form_content_hash("insurance", farmer=farmer_data, plan=plan_data, generated_by=generated_by)
+    existing = await find_generated_form(db, farmer.id, content_hash)
+    if existing is not None:
+        logger.info("Insurance form unchanged, reusing %s", existing.file_key)
+        if agent_session_id:
+            await agent_service.log_session_form(db, agent_session_id, existing.file_key, reused=True, plan_id=plan_id)
+        return {
+            "file_key": existing.file_key,
+            "file_name": existing.file_name,
+            "download_url": f"/files/{existing.file_key}",
+            "message": "Insurance form generated successfully",
+        }
+
+    pdf_bytes, filename = await render_insurance_form(farmer_data, plan_data)
+    file_key = f"forms/{farmer.farmer_id}/insurance/{plan_id}/{content_hash}.pdf"
+    file_key = await store_generated_pdf(db, content_hash, file_key, pdf_bytes)
 
     form = GeneratedForm(
         farmer_id=farmer.id,
@@ -98,9 +141,12 @@ async def generate_insurance_form(
         file_name=filename,
         generated_by=GeneratedByType(generated_by),
         agent_session_id=agent_session_id,
+        content_hash=content_hash,
     )
     db.add(form)
     await db.flush()
+    if agent_session_id:
+        await agent_service.log_session_form(db, agent_session_id, file_key, reused=False, plan_id=plan_id)
 
     logger.info("Insurance form generated: %s", filename)
     return {
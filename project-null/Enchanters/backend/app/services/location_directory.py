@@ -0,0 +1,265 @@
+"""
+In-memory location directory.
+
+States, districts, sub-districts and PIN codes are loaded from the LGD and
+``pin_codes`` tables into sorted in-process structures, so listing and
+autocomplete requests are dict lookups and bisects with no database or
+outbound call. Villages (several hundred thousand rows) stay in Postgres and
+are searched through the ``lower(name)`` prefix index instead.
+
+Until ``scraper/import_locations.py`` has been run the directory is built from
+the bundled ``STATE_DISTRICTS`` table. Each process reloads it after
+LOCATION_DIRECTORY_REFRESH_SECONDS so a re-import is picked up without a
+restart.
+"""
+
+import asyncio
+import time
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from typing import NamedTuple
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.constants import (
+    INDIAN_STATES, LOCATION_DIRECTORY_REFRESH_SECONDS, LOCATION_DIRECTORY_RETRY_SECONDS,
+)
+from app.database import async_session_factory
+from app.external.lgd import STATE_DISTRICTS
+from app.models.location import PinCode, LgdState, LgdDistrict, LgdSubDistrict, LgdVillage
+import logging
+
+logger = logging.getLogger(__name__)
+
+_LEVEL_ORDER = {"state": 0, "district": 1, "sub_district": 2, "village": 3}
+
+# PIN prefixes (sorting district, then sub-office digits) used to place PINs
+# missing from the directory.
+_PIN_PREFIX_LENGTHS = (5, 4, 3)
+
+
+class LocationEntry(NamedTuple):
+    level: str
+    code: int | None
+    name: str
+    state: str | None = None
+    district: str | None = None
+    sub_district: str | None = None
+
+
+def _key(name: str) -> str:
+    return " ".join(name.lower().split())
+
+
+class LocationDirectory:
+    def __init__(
+        self,
+        states: list[LocationEntry],
+        districts: list[LocationEntry],
+        sub_districts: list[LocationEntry],
+        pins: list[tuple[str, str, str]],
+        source: str,
+    ):
+        self.source = source
+        self._states = sorted(states, key=lambda e: e.name)
+        self._state_names = {_key(e.name): e.name for e in self._states}
+
+        self._districts: dict[str, list[LocationEntry]] = defaultdict(list)
+        for e in sorted(districts, key=lambda e: e.name):
+            self._districts[_key(e.state)].append(e)
+
+        self._sub_districts: dict[tuple[str, str], list[LocationEntry]] = defaultdict(list)
+        for e in sorted(sub_districts, key=lambda e: e.name):
+            self._sub_districts[(_key(e.state), _key(e.district))].append(e)
+
+        entries = [*self._states, *districts, *sub_districts]
+        entries.sort(key=lambda e: (_key(e.name), _LEVEL_ORDER[e.level], e.name))
+        self._search_keys = [_key(e.name) for e in entries]
+        self._search_entries = entries
+
+        pins = sorted(pins)
+        self._pin_codes = [p for p, _, _ in pins]
+        self._pins = {p: (district, state) for p, district, state in pins}
+        votes: dict[str, Counter] = defaultdict(Counter)
+        for pincode, district, state in pins:
+            for n in _PIN_PREFIX_LENGTHS:
+                votes[pincode[:n]][(district, state)] += 1
+        # Keep a prefix only when every known PIN under it agrees.
+        self._pin_prefixes = {
+            prefix: counter.most_common(1)[0][0]
+            for prefix, counter in votes.items()
+            if len(counter) == 1
+        }
+
+    def states(self) -> list[str]:
+        return [e.name for e in self._states]
+
+    def has_state(self, state: str) -> bool:
+        return _key(state) in self._state_names
+
+    def districts(self, state: str) -> list[str]:
+        return [e.name for e in self._districts.get(_key(state), [])]
+
+    def sub_districts(self, state: str, district: str) -> list[LocationEntry]:
+        return self._sub_districts.get((_key(state), _key(district)), [])
+
+    def search(
+        self,
+        query: str,
+        level: str | None = None,
+        state: str | None = None,
+        limit: int = 20,
+    ) -> list[LocationEntry]:
+        """Entries whose name starts with `query`, states before districts before sub-districts."""
+        prefix = _key(query)
+        if not prefix:
+            return []
+        state_key = _key(state) if state else None
+        results = []
+        i = bisect_left(self._search_keys, prefix)
+        while i < len(self._search_keys) and self._search_keys[i].startswith(prefix):
+            entry = self._search_entries[i]
+            i += 1
+            if level and entry.level != level:
+                continue
+            if state_key and _key(entry.state or entry.name) != state_key:
+                continue
+            results.append(entry)
+            if len(results) >= limit:
+                break
+        return results
+
+    def pins_with_prefix(self, prefix: str, limit: int = 20) -> list[dict]:
+        i = bisect_left(self._pin_codes, prefix)
+        results = []
+        while i < len(self._pin_codes) and self._pin_codes[i].startswith(prefix) and len(results) < limit:
+            pincode = self._pin_codes[i]
+            district, state = self._pins[pincode]
+            results.append({"pincode": pincode, "district": district, "state": state})
+            i += 1
+        return results
+
+    def locate_pin(self, pincode: str) -> tuple[str, str] | None:
+        """(district, state) for a PIN: exact match, else the longest unambiguous prefix."""
+        exact = self._pins.get(pincode)
+        if exact is not None:
+            return exact
+        for n in _PIN_PREFIX_LENGTHS:
+            located = self._pin_prefixes.get(pincode[:n])
+            if located is not None:
+                return located
+        return None
+
+    @classmethod
+    def from_static(cls) -> "LocationDirectory":
+        return cls(*_static_entries(), pins=[], source="static")
+
+
+def _static_entries() -> tuple[list[LocationEntry], list[LocationEntry], list[LocationEntry]]:
+    states = [LocationEntry("state", None, name) for name in INDIAN_STATES]
+    districts = [
+        LocationEntry("district", None, name, state=state)
+        for state, names in STATE_DISTRICTS.items()
+        for name in names
+    ]
+    return states, districts, []
+
+
+async def load_location_directory(db: AsyncSession) -> LocationDirectory:
+    state_rows = (await db.execute(select(LgdState.code, LgdState.name))).all()
+    if state_rows:
+        district_rows = (await db.execute(
+            select(LgdDistrict.code, LgdDistrict.name, LgdState.name)
+            .join(LgdState, LgdState.code == LgdDistrict.state_code)
+        )).all()
+        sub_district_rows = (await db.execute(
+            select(LgdSubDistrict.code, LgdSubDistrict.name, LgdDistrict.name, LgdState.name)
+            .join(LgdDistrict, LgdDistrict.code == LgdSubDistrict.district_code)
+            .join(LgdState, LgdState.code == LgdDistrict.state_code)
+        )).all()
+        states = [LocationEntry("state", code, name) for code, name in state_rows]
+        districts = [LocationEntry("district", code, name, state=state) for code, name, state in district_rows]
+        sub_districts = [
+            LocationEntry("sub_district", code, name, state=state, district=district)
+            for code, name, district, state in sub_district_rows
+        ]
+        source = "lgd"
+    else:
+        states, districts, sub_districts = _static_entries()
+        source = "static"
+
+    pins = (await db.execute(select(PinCode.pincode, PinCode.district, PinCode.state))).all()
+    directory = LocationDirectory(states, districts, sub_districts, [tuple(p) for p in pins], source)
+    logger.info(
+        "Location directory loaded from %s: %d states, %d districts, %d sub-districts, %d PIN codes",
+        source, len(states), len(districts), len(sub_districts), len(pins),
+    )
+    return directory
+
+
+_directory: LocationDirectory | None = None
+_next_reload_at = 0.0
+_reload_lock = asyncio.Lock()
+
+
+def current_directory() -> LocationDirectory:
+    """The loaded directory, or the bundled static one if nothing is loaded yet."""
+    global _directory
+    if _directory is None:
+        _directory = LocationDirectory.from_static()
+    return _directory
+
+
+async def ensure_location_directory() -> LocationDirectory:
+    """Return the directory, reloading it from Postgres once the refresh interval has passed.
+
+    Only one reload runs at a time; concurrent callers keep using the current
+    directory meanwhile.
+    """
+    global _directory, _next_reload_at
+    if time.monotonic() < _next_reload_at or _reload_lock.locked():
+        return current_directory()
+
+    async with _reload_lock:
+        if time.monotonic() < _next_reload_at:
+            return current_directory()
+        try:
+            async with async_session_factory() as db:
+                _directory = await load_location_directory(db)
+            _next_reload_at = time.monotonic() + LOCATION_DIRECTORY_REFRESH_SECONDS
+        except Exception as e:
+            logger.warning("Location directory load failed, serving previous data: %s", e)
+            _next_reload_at = time.monotonic() + LOCATION_DIRECTORY_RETRY_SECONDS
+    return current_directory()
+
+
+async def search_villages(
+    db: AsyncSession,
+    query: str,
+    sub_district_code: int | None = None,
+    limit: int = 20,
+) -> list[LocationEntry]:
+    prefix = _key(query).replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    stmt = (
+        select(
+            LgdVillage.code, LgdVillage.name,
+            LgdSubDistrict.name.label("sub_district"),
+            LgdDistrict.name.label("district"),
+            LgdState.name.label("state"),
+        )
+        .join(LgdSubDistrict, LgdSubDistrict.code == LgdVillage.sub_district_code)
+        .join(LgdDistrict, LgdDistrict.code == LgdSubDistrict.district_code)
+        .join(LgdState, LgdState.code == LgdDistrict.state_code)
+        .where(func.lower(LgdVillage.name).like(f"{prefix}%", escape="\\"))
+        .order_by(func.lower(LgdVillage.name), LgdVillage.code)
+        .limit(limit)
+    )
+    if sub_district_code is not None:
+        stmt = stmt.where(LgdVillage.sub_district_code == sub_district_code)
+    rows = (await db.execute(stmt)).all()
+    return [
+        LocationEntry(
+            "village", row.code, row.name,
+            state=row.state, district=row.district, sub_district=row.sub_district,
+        )
+        for row in rows
+    ]
@@ -1,20 +1,47 @@
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.external.india_post import lookup_pincode
-from app.external.lgd import get_states, get_districts, get_districts_from_api
+from app.services.location_directory import current_directory, ensure_location_directory, search_villages
 import logging
 
 logger = logging.getLogger(__name__)
 
 
-async def get_pin_details(pincode: str) -> dict:
-    return await lookup_pincode(pincode)
+async def get_pin_details(db: AsyncSession, pincode: str) -> dict:
+    return await lookup_pincode(pincode, db)
 
 
 def list_states() -> list[str]:
-    return get_states()
+    return current_directory().states()
 
 
 async def list_districts(state: str) -> list[str]:
-    districts = await get_districts_from_api(state)
-    if not districts:
-        districts = get_districts(state)
-    return districts
+    directory = await ensure_location_directory()
+    return directory.districts(state)
+
+
+async def list_sub_districts(state: str, district: str) -> list[dict]:
+    directory = await ensure_location_directory()
+    return [{"code": e.code, "name": e.name} for e in directory.sub_districts(state, district)]
+
+
+async def search_locations(
+    db: AsyncSession,
+    query: str,
+    level: str | None = None,
+    state: str | None = None,
+    sub_district_code: int | None = None,
+    limit: int = 20,
+) -> list[dict]:
+    """Prefix autocomplete over states, districts and sub-districts (in memory),
+    or villages (indexed Postgres search) when level is "village"."""
+    if level == "village":
+        entries = await search_villages(db, query, sub_district_code, limit)
+    else:
+        directory = await ensure_location_directory()
+        entries = directory.search(query, level=level, state=state, limit=limit)
+    return [entry._asdict() for entry in entries]
+
+
+async def search_pins(prefix: str, limit: int = 20) -> list[dict]:
+    directory = await ensure_location_directory()
+    return directory.pins_with_prefix(prefix, limit)
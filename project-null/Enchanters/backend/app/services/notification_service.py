@@ -1,63 +1,262 @@
-from datetime import date, datetime, timezone
+"""
+Reminder scheduling and dispatch.
+
+Every reminder is given a delivery slot when it is created: an hour between
+REMINDER_DELIVERY_START_HOUR and REMINDER_DELIVERY_END_HOUR (IST) on its
+remind date, picked from the farmer id, so a day's reminders are spread
+evenly over the day instead of all going out at once. ``send_at`` is the
+slot's start, and a partial index on unsent reminders keeps finding due
+slots cheap however many sent reminders the table holds.
+
+``process_due_reminders`` runs every REMINDER_SLOT_INTERVAL_MINUTES for one
+channel bucket (MSG91 for SMS/WhatsApp, SMTP for email). It works through
+due reminders oldest slot first, in chunks of REMINDER_DISPATCH_CHUNK_SIZE.
+Each chunk is one join query that locks the reminders with ``FOR UPDATE SKIP
+LOCKED`` (so overlapping runs never send anything twice), one bulk send, and
+one bulk UPDATE marking the delivered reminders sent before the chunk
+commits. A run stops at the bucket's budget: REMINDER_SMS_RATE_SHARE of the
+SMS rate limit over one interval, or REMINDER_EMAILS_PER_RUN. Whatever is
+left waits for the next run and shows up in the queue lag gauges.
+
+A reminder that fails to send is moved to a later slot (``retry_send_at``) so
+it stops counting against the budget and the lag of the current one; after
+REMINDER_MAX_ATTEMPTS failures it is given up (``failed_at``) and leaves the
+partial index.
+"""
+
+import zlib
+from datetime import date, datetime, time, timedelta, timezone
+from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import func, select, tuple_, update
+from app.config import settings
 from app.models.notification import Reminder
 from app.models.farmer import Farmer
-from app.external.sms import send_sms
-from app.external.email import send_reminder_email
+from app.core.constants import (
+    ReminderChannel, REMINDER_DISPATCH_CHUNK_SIZE, REMINDER_DELIVERY_START_HOUR, REMINDER_DELIVERY_END_HOUR,
+    REMINDER_SLOT_INTERVAL_MINUTES, REMINDER_SMS_RATE_SHARE, REMINDER_EMAILS_PER_RUN,
+    REMINDER_MAX_ATTEMPTS, REMINDER_RETRY_DELAY_MINUTES,
+)
+from app.core.metrics import counter, gauge
+from app.external.sms import SmsRecipient, send_bulk_sms, template_id
+from app.external.email import reminder_email, send_bulk_email
+from app.services import sms_delivery
 import logging
 
 logger = logging.getLogger(__name__)
 
+IST = timezone(timedelta(hours=5, minutes=30), "IST")
 
-async def get_due_reminders(db: AsyncSession) -> list[Reminder]:
-    today = date.today()
-    result = await db.execute(
-        select(Reminder).where(
-            Reminder.sent == False,
-            Reminder.remind_date <= today,
+# Channel buckets, each dispatched and rate-limited on its own.
+REMINDER_BUCKETS = {
+    "sms": (ReminderChannel.SMS, ReminderChannel.WHATSAPP),  # both go out through MSG91
+    "email": (ReminderChannel.EMAIL,),
+}
+
+REMINDERS_DISPATCHED = counter(
+    "kisaanseva_reminders_dispatched_total", "Due reminders handled by bucket and outcome", ("bucket", "outcome"),
+)
+REMINDER_QUEUE_DEPTH = gauge(
+    "kisaanseva_reminder_queue_depth", "Unsent reminders whose slot has started", ("bucket",),
+)
+REMINDER_QUEUE_LAG = gauge(
+    "kisaanseva_reminder_queue_lag_seconds", "Age of the oldest due, unsent reminder slot", ("bucket",),
+)
+
+
+def reminder_send_at(remind_date: date, farmer_id: UUID) -> datetime:
+    """Start of the delivery slot for a farmer's reminder on ``remind_date``."""
+    hours = REMINDER_DELIVERY_END_HOUR - REMINDER_DELIVERY_START_HOUR
+    hour = REMINDER_DELIVERY_START_HOUR + zlib.crc32(str(farmer_id).encode()) % hours
+    return datetime.combine(remind_date, time(hour), IST).astimezone(timezone.utc)
+
+
+def retry_send_at(now: datetime, attempts: int) -> datetime:
+    """When to retry a reminder after its ``attempts``-th failure, moved to the
+    next delivery window if that falls outside this one."""
+    retry = (now + timedelta(minutes=REMINDER_RETRY_DELAY_MINUTES * attempts)).astimezone(IST)
+    if retry.hour < REMINDER_DELIVERY_START_HOUR:
+        retry = datetime.combine(retry.date(), time(REMINDER_DELIVERY_START_HOUR), IST)
+    elif retry.hour >= REMINDER_DELIVERY_END_HOUR:
+        retry = datetime.combine(retry.date() + timedelta(days=1), time(REMINDER_DELIVERY_START_HOUR), IST)
+    return retry.astimezone(timezone.utc)
+
+
+def bucket_budget(bucket: str) -> int:
+    """Most reminders one run may send for a bucket."""
+    if bucket == "sms":
+        return int(settings.SMS_MAX_MESSAGES_PER_SECOND * REMINDER_SLOT_INTERVAL_MINUTES * 60 * REMINDER_SMS_RATE_SHARE)
+    return REMINDER_EMAILS_PER_RUN
+
+
+def _due(now: datetime, bucket: str) -> list:
+    conditions = [
+        Reminder.sent == False,
+        Reminder.failed_at.is_(None),
+        Reminder.send_at <= now,
+        Reminder.channel.in_(REMINDER_BUCKETS[bucket]),
+    ]
+    if bucket == "email":
+        # Farmers without an address can't get email reminders; don't count them as backlog.
+        conditions.append(Farmer.email.isnot(None))
+    return conditions
+
+
+async def lock_due_reminders(
+    db: AsyncSession,
+    now: datetime,
+    bucket: str,
+    after: tuple[datetime, UUID] | None = None,
+    limit: int = REMINDER_DISPATCH_CHUNK_SIZE,
+) -> list:
+    """Lock the next chunk of a bucket's due reminders, oldest slot first,
+    with the farmer's contact details.
+
+    Rows locked by another worker are skipped; ``after`` (the last
+    ``(send_at, id)`` seen) keeps reminders that failed to send earlier in
+    this run from being picked up again.
+    """
+    stmt = (
+        select(
+            Reminder.id, Reminder.type, Reminder.remind_date, Reminder.channel, Reminder.send_at,
+            Reminder.attempts, Farmer.phone, Farmer.email,
         )
+        .join(Farmer, Farmer.id == Reminder.farmer_id)
+        .where(*_due(now, bucket))
+        .order_by(Reminder.send_at, Reminder.id)
+        .limit(limit)
+        .with_for_update(of=Reminder, skip_locked=True)
+    )
+    if after is not None:
+        stmt = stmt.where(tuple_(Reminder.send_at, Reminder.id) > after)
+    result = await db.execute(stmt)
+    return list(result.all())
+
+
+async def update_queue_metrics(db: AsyncSession, now: datetime, bucket: str) -> tuple[int, float]:
+    """Set the depth and lag gauges for a bucket; returns (depth, lag seconds)."""
+    result = await db.execute(
+        select(func.count(), func.min(Reminder.send_at))
+        .join(Farmer, Farmer.id == Reminder.farmer_id)
+        .where(*_due(now, bucket))
     )
-    return list(result.scalars().all())
+    depth, oldest = result.one()
+    lag = (now - oldest).total_seconds() if oldest else 0.0
+    REMINDER_QUEUE_DEPTH.set(depth, bucket=bucket)
+    REMINDER_QUEUE_LAG.set(lag, bucket=bucket)
+    return depth, lag
+
+
+async def send_sms_reminders(reminders: list, template: str) -> list[tuple]:
+    """Send a chunk's SMS reminders in bulk calls; returns the accepted
+    reminders with the request id that carried each."""
+    if not reminders:
+        return []
+    recipients = []
+    for r in reminders:
+        reminder_type = r.type.value
+        recipients.append(SmsRecipient(r.phone, {
+            # The default template carries the whole text in its OTP variable.
+            "OTP": f"KisaanSeva Reminder: You have an upcoming deadline for {reminder_type}. Please check the app.",
+            "type": reminder_type,
+            "date": r.remind_date.isoformat(),
+        }))
+    request_ids = await send_bulk_sms(template, recipients)
+    return [(r, request_id) for r, request_id in zip(reminders, request_ids) if request_id is not None]
+
 
+async def send_email_reminders(reminders: list) -> list[UUID]:
+    """Send a chunk's email reminders over the SMTP pool; returns the ids sent."""
+    reminders = [r for r in reminders if r.email]
+    messages = [
+        reminder_email(r.email, r.type.value, f"Deadline for {r.type.value}", r.remind_date.isoformat())
+        for r in reminders
+    ]
+    results = await send_bulk_email(messages)
+    return [r.id for r, ok in zip(reminders, results) if ok]
 
-async def send_reminder(db: AsyncSession, reminder: Reminder) -> bool:
-    farmer_result = await db.execute(
-        select(Farmer).where(Farmer.id == reminder.farmer_id)
+
+async def mark_reminders_sent(db: AsyncSession, reminder_ids: list[UUID]) -> None:
+    if not reminder_ids:
+        return
+    await db.execute(
+        update(Reminder)
+        .where(Reminder.id.in_(reminder_ids))
+        .values(sent=True, sent_at=datetime.now(timezone.utc))
+        .execution_options(synchronize_session=False)
     )
-    farmer = farmer_result.scalar_one_or_none()
-    if not farmer:
-        logger.warning("Farmer not found for reminder %s", reminder.id)
-        return False
-
-    channel = reminder.channel.value if hasattr(reminder.channel, 'value') else str(reminder.channel)
-    message = f"KisaanSeva Reminder: You have an upcoming deadline for {reminder.type.value}. Please check the app."
-
-    sent = False
-    if channel in ("sms", "whatsapp"):
-        sent = await send_sms(farmer.phone, message)
-    elif channel == "email" and farmer.email:
-        sent = await send_reminder_email(
-            farmer.email,
-            reminder.type.value,
-            f"Deadline for {reminder.type.value}",
-            reminder.remind_date.isoformat(),
+
+
+async def mark_reminders_failed(db: AsyncSession, reminders: list, now: datetime) -> int:
+    """Count a failed send for each reminder: retry it in a later slot, or give
+    it up after REMINDER_MAX_ATTEMPTS. Returns how many were given up."""
+    by_attempts: dict[int, list[UUID]] = {}
+    for r in reminders:
+        by_attempts.setdefault(r.attempts + 1, []).append(r.id)
+    given_up = 0
+    for attempts, ids in by_attempts.items():
+        if attempts >= REMINDER_MAX_ATTEMPTS:
+            values = {"attempts": attempts, "failed_at": now}
+            given_up += len(ids)
+        else:
+            values = {"attempts": attempts, "send_at": retry_send_at(now, attempts)}
+        await db.execute(
+            update(Reminder)
+            .where(Reminder.id.in_(ids))
+            .values(**values)
+            .execution_options(synchronize_session=False)
         )
+    return given_up
 
-    if sent:
-        reminder.sent = True
-        reminder.sent_at = datetime.now(timezone.utc)
-        await db.flush()
-        logger.info("Reminder %s sent via %s", reminder.id, channel)
 
-    return sent
+async def _send_chunk(db: AsyncSession, bucket: str, reminders: list) -> list[UUID]:
+    if bucket == "email":
+        return await send_email_reminders(reminders)
+    sms_template = template_id("reminder")
+    sms_sent = await send_sms_reminders(reminders, sms_template)
+    await sms_delivery.record_sent(
+        db, sms_template, [(request_id, r.phone, r.id) for r, request_id in sms_sent],
+    )
+    return [r.id for r, _ in sms_sent]
 
 
-async def process_due_reminders(db: AsyncSession) -> int:
-    reminders = await get_due_reminders(db)
+async def process_due_reminders(db: AsyncSession, bucket: str, now: datetime | None = None) -> int:
+    """Send a bucket's due reminders, up to its per-run budget. Commits after
+    each chunk, so a crash only re-sends the chunk that was in flight."""
+    now = now or datetime.now(timezone.utc)
+    budget = bucket_budget(bucket)
     sent_count = 0
-    for reminder in reminders:
-        if await send_reminder(db, reminder):
-            sent_count += 1
-    logger.info("Processed %d/%d due reminders", sent_count, len(reminders))
+    attempted = 0
+    after = None
+
+    while attempted < budget:
+        reminders = await lock_due_reminders(db, now, bucket, after, min(REMINDER_DISPATCH_CHUNK_SIZE, budget - attempted))
+        if not reminders:
+            break
+        try:
+            sent_ids = await _send_chunk(db, bucket, reminders)
+        except Exception as e:
+            logger.error("Sending %s reminders failed: %s", bucket, e)
+            sent_ids = []
+        await mark_reminders_sent(db, sent_ids)
+        sent = set(sent_ids)
+        failed = [r for r in reminders if r.id not in sent]
+        given_up = await mark_reminders_failed(db, failed, now)
+        await db.commit()
+
+        sent_count += len(sent_ids)
+        attempted += len(reminders)
+        after = (reminders[-1].send_at, reminders[-1].id)
+        REMINDERS_DISPATCHED.inc(len(sent_ids), bucket=bucket, outcome="sent")
+        REMINDERS_DISPATCHED.inc(len(failed) - given_up, bucket=bucket, outcome="retry")
+        REMINDERS_DISPATCHED.inc(given_up, bucket=bucket, outcome="dead")
+        if given_up:
+            logger.error("Gave up on %d %s reminders after %d attempts", given_up, bucket, REMINDER_MAX_ATTEMPTS)
+        logger.info("Reminder chunk done (%s): %d/%d sent", bucket, len(sent_ids), len(reminders))
+
+    depth, lag = await update_queue_metrics(db, now, bucket)
+    logger.info(
+        "Processed %d/%d due %s reminders; %d still due, oldest slot %.0fs behind",
+        sent_count, attempted, bucket, depth, lag,
+    )
     return sent_count
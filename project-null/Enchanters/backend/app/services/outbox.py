@@ -0,0 +1,208 @@
+"""
+Transactional notification outbox.
+
+Request handlers never call the SMS or email provider. ``enqueue`` adds a
+``NotificationOutbox`` row to the handler's own transaction, so the
+notification exists exactly when the signup/session it belongs to was
+committed, and survives a crash between commit and send.
+
+``drain_outbox`` sends pending rows: it locks a batch with ``FOR UPDATE SKIP
+LOCKED`` (API dispatchers and the Celery safety-net task can run side by
+side), sends SMS grouped by flow template through ``send_bulk_sms`` and
+emails through the SMTP pool, and reschedules failures with jittered
+exponential backoff until OUTBOX_MAX_ATTEMPTS, after which the row is
+dead-lettered (status ``dead``). OTPs older than OUTBOX_STALE_AFTER_SECONDS
+are dead-lettered without sending, since they can no longer be used.
+
+Each API process runs ``start_outbox_dispatcher``'s loop; a commit that
+enqueued something wakes it at once, otherwise it polls every
+OUTBOX_POLL_INTERVAL_SECONDS.
+"""
+
+import asyncio
+import random
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.core.constants import (
+    OutboxKind, OutboxStatus, OUTBOX_BATCH_SIZE, OUTBOX_MAX_ATTEMPTS, OUTBOX_RETRY_BASE_SECONDS,
+    OUTBOX_RETRY_MAX_SECONDS, OUTBOX_POLL_INTERVAL_SECONDS, OUTBOX_STALE_AFTER_SECONDS,
+)
+from app.core.metrics import counter
+from app.database import async_session_factory
+from app.external.email import otp_email, send_bulk_email
+from app.external.sms import otp_sms, agent_access_sms, send_bulk_sms
+from app.models.notification import NotificationOutbox
+import logging
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_NOTIFICATIONS = counter(
+    "kisaanseva_outbox_notifications_total", "Outbox notifications by kind and outcome", ("kind", "outcome"),
+)
+
+_PENDING_FLAG = "outbox_pending"
+
+
+def enqueue(db: AsyncSession, kind: OutboxKind, recipient: str, **payload) -> NotificationOutbox:
+    """Queue a notification in the caller's transaction."""
+    row = NotificationOutbox(kind=kind.value, recipient=recipient, payload=payload)
+    db.add(row)
+    db.sync_session.info[_PENDING_FLAG] = True
+    return row
+
+
+async def lock_pending(db: AsyncSession, now: datetime, limit: int = OUTBOX_BATCH_SIZE) -> list[NotificationOutbox]:
+    result = await db.execute(
+        select(NotificationOutbox)
+        .where(NotificationOutbox.status == OutboxStatus.PENDING.value, NotificationOutbox.next_attempt_at <= now)
+        .order_by(NotificationOutbox.next_attempt_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    return list(result.scalars().all())
+
+
+def _sms_message(row: NotificationOutbox):
+    if row.kind == OutboxKind.AGENT_ACCESS_SMS.value:
+        p = row.payload
+        return agent_access_sms(row.recipient, p["otp"], p["agent_name"], p["center"], p["purpose"])
+    return otp_sms(row.recipient, row.payload["otp"])
+
+
+async def _send_sms(rows: list[NotificationOutbox]) -> list[bool]:
+    by_template: dict[str, list[tuple[int, object]]] = {}
+    for i, row in enumerate(rows):
+        template, recipient = _sms_message(row)
+        by_template.setdefault(template, []).append((i, recipient))
+
+    results = [False] * len(rows)
+    for template, items in by_template.items():
+        request_ids = await send_bulk_sms(template, [recipient for _, recipient in items])
+        for (i, _), request_id in zip(items, request_ids):
+            results[i] = request_id is not None
+    return results
+
+
+async def _send_email(rows: list[NotificationOutbox]) -> list[bool]:
+    return await send_bulk_email([otp_email(row.recipient, row.payload["otp"]) for row in rows])
+
+
+def _retry_delay(attempts: int) -> float:
+    return random.uniform(0.5, 1.0) * min(OUTBOX_RETRY_MAX_SECONDS, OUTBOX_RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+
+
+def _settle(row: NotificationOutbox, ok: bool, now: datetime, error: str | None = None) -> None:
+    if ok:
+        row.status = OutboxStatus.SENT.value
+        row.sent_at = now
+        row.payload = {}
+        OUTBOX_NOTIFICATIONS.inc(kind=row.kind, outcome="sent")
+        return
+    row.attempts += 1
+    row.last_error = (error or "Provider did not accept the message")[:500]
+    if row.attempts >= OUTBOX_MAX_ATTEMPTS:
+        row.status = OutboxStatus.DEAD.value
+        row.payload = {}
+        OUTBOX_NOTIFICATIONS.inc(kind=row.kind, outcome="dead")
+        logger.error("Outbox %s %s dead-lettered after %d attempts: %s", row.kind, row.id, row.attempts, row.last_error)
+    else:
+        row.next_attempt_at = now + timedelta(seconds=_retry_delay(row.attempts))
+        OUTBOX_NOTIFICATIONS.inc(kind=row.kind, outcome="retry")
+
+
+async def dispatch_batch(db: AsyncSession, limit: int = OUTBOX_BATCH_SIZE) -> int:
+    """Send one locked batch and commit. Returns the number of rows handled."""
+    now = datetime.now(timezone.utc)
+    rows = await lock_pending(db, now, limit)
+    if not rows:
+        return 0
+
+    stale_before = now - timedelta(seconds=OUTBOX_STALE_AFTER_SECONDS)
+    live = []
+    for row in rows:
+        if row.created_at and row.created_at < stale_before:
+            row.status = OutboxStatus.DEAD.value
+            row.last_error = "Expired before it could be sent"
+            row.payload = {}
+            OUTBOX_NOTIFICATIONS.inc(kind=row.kind, outcome="expired")
+        else:
+            live.append(row)
+
+    sms_rows = [r for r in live if r.kind in (OutboxKind.OTP_SMS.value, OutboxKind.AGENT_ACCESS_SMS.value)]
+    email_rows = [r for r in live if r.kind == OutboxKind.OTP_EMAIL.value]
+    for group, send in ((sms_rows, _send_sms), (email_rows, _send_email)):
+        if not group:
+            continue
+        try:
+            results, error = await send(group), None
+        except Exception as e:
+            logger.error("Outbox send failed: %s", str(e))
+            results, error = [False] * len(group), str(e)
+        for row, ok in zip(group, results):
+            _settle(row, ok, now, error)
+
+    await db.commit()
+    return len(rows)
+
+
+async def drain_outbox(db: AsyncSession) -> int:
+    """Send everything currently due."""
+    handled = 0
+    while True:
+        n = await dispatch_batch(db)
+        handled += n
+        if n < OUTBOX_BATCH_SIZE:
+            return handled
+
+
+_wake: asyncio.Event | None = None
+_task: asyncio.Task | None = None
+
+
+@event.listens_for(Session, "after_commit")
+def _wake_dispatcher(session: Session) -> None:
+    if session.info.pop(_PENDING_FLAG, False) and _wake is not None:
+        _wake.set()
+
+
+@event.listens_for(Session, "after_rollback")
+def _clear_pending(session: Session) -> None:
+    session.info.pop(_PENDING_FLAG, None)
+
+
+async def _run_dispatcher() -> None:
+    while True:
+        try:
+            await asyncio.wait_for(_wake.wait(), timeout=OUTBOX_POLL_INTERVAL_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+        _wake.clear()
+        try:
+            async with async_session_factory() as db:
+                await drain_outbox(db)
+        except Exception as e:
+            logger.error("Outbox dispatch failed: %s", str(e))
+
+
+def start_outbox_dispatcher() -> None:
+    global _wake, _task
+    if _task is not None:
+        return
+    _wake = asyncio.Event()
+    _task = asyncio.get_running_loop().create_task(_run_dispatcher())
+    logger.info("Outbox dispatcher started")
+
+
+async def stop_outbox_dispatcher() -> None:
+    global _wake, _task
+    if _task is None:
+        return
+    _task.cancel()
+    try:
+        await _task
+    except asyncio.CancelledError:
+        pass
+    _task = None
+    _wake = None
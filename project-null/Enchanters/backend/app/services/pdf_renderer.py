@@ -0,0 +1,143 @@
+"""
+Form rendering off the event loop.
+
+ReportLab is CPU-bound, so the API renders forms in a pool of worker
+processes (PDF_RENDER_WORKERS per API process) started in the lifespan. Each
+worker compiles the form template when it starts, so the first render a
+worker serves is as fast as the rest.
+
+At most PDF_RENDER_MAX_PENDING renders may be running or queued per process.
+Beyond that a request waits up to PDF_RENDER_QUEUE_TIMEOUT_SECONDS for a slot
+and is then refused with 503, instead of piling up behind a burst of form
+generation.
+
+When no pool is running (Celery tasks, tests) renders go to a thread instead.
+"""
+
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from app.config import settings
+from app.core import pdf_builder
+from app.core.exceptions import ServiceBusyException
+from app.core.metrics import counter, gauge
+import logging
+
+logger = logging.getLogger(__name__)
+
+PDF_RENDER_QUEUE_DEPTH = gauge(
+    "kisaanseva_pdf_render_queue_depth", "Form renders waiting for a render slot",
+)
+PDF_RENDER_IN_FLIGHT = gauge(
+    "kisaanseva_pdf_render_in_flight", "Form renders running or queued in the render pool",
+)
+PDF_RENDERS = counter(
+    "kisaanseva_pdf_renders_total", "Form renders by form type and outcome", ("form", "outcome"),
+)
+PDF_RENDER_SECONDS = counter(
+    "kisaanseva_pdf_render_seconds_total", "Wall time spent rendering forms", ("form",),
+)
+
+_executor: ProcessPoolExecutor | None = None
+_slots: asyncio.Semaphore | None = None
+_waiting = 0
+_in_flight = 0
+
+
+def _warm_worker() -> None:
+    pdf_builder._template()
+
+
+def _new_pool() -> ProcessPoolExecutor:
+    # spawn, not fork: the API process has a running loop and pool threads.
+    return ProcessPoolExecutor(
+        max_workers=settings.PDF_RENDER_WORKERS,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_warm_worker,
+    )
+
+
+def start_pdf_renderer() -> None:
+    global _executor, _slots
+    if _executor is not None:
+        return
+    _executor = _new_pool()
+    _slots = asyncio.Semaphore(settings.PDF_RENDER_MAX_PENDING)
+    logger.info(
+        "PDF render pool started: %d workers, %d pending renders max",
+        settings.PDF_RENDER_WORKERS, settings.PDF_RENDER_MAX_PENDING,
+    )
+
+
+def stop_pdf_renderer() -> None:
+    global _executor, _slots
+    if _executor is not None:
+        _executor.shutdown(wait=True, cancel_futures=True)
+        _executor = None
+        _slots = None
+
+
+async def _acquire_slot(slots: asyncio.Semaphore, form: str) -> None:
+    global _waiting
+    _waiting += 1
+    PDF_RENDER_QUEUE_DEPTH.set(_waiting)
+    try:
+        await asyncio.wait_for(slots.acquire(), timeout=settings.PDF_RENDER_QUEUE_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        PDF_RENDERS.inc(form=form, outcome="rejected")
+        logger.warning("PDF render queue full, refusing %s form", form)
+        raise ServiceBusyException("Form generation is busy, please try again shortly")
+    finally:
+        _waiting -= 1
+        PDF_RENDER_QUEUE_DEPTH.set(_waiting)
+
+
+async def _render(form: str, fn, *args) -> tuple[bytes, str]:
+    global _in_flight, _executor
+    loop = asyncio.get_running_loop()
+    if _executor is None:
+        return await loop.run_in_executor(None, partial(fn, *args))
+
+    pool, slots = _executor, _slots
+    await _acquire_slot(slots, form)
+    _in_flight += 1
+    PDF_RENDER_IN_FLIGHT.set(_in_flight)
+    started = time.perf_counter()
+    try:
+        result = await loop.run_in_executor(pool, partial(fn, *args))
+    except BrokenProcessPool:
+        # A worker died (e.g. OOM-killed); replace the pool for the next request.
+        PDF_RENDERS.inc(form=form, outcome="failed")
+        if _executor is pool:
+            logger.error("PDF render pool broken, restarting")
+            pool.shutdown(wait=False, cancel_futures=True)
+            _executor = _new_pool()
+        raise
+    except Exception:
+        PDF_RENDERS.inc(form=form, outcome="failed")
+        raise
+    finally:
+        _in_flight -= 1
+        PDF_RENDER_IN_FLIGHT.set(_in_flight)
+        slots.release()
+    PDF_RENDERS.inc(form=form, outcome="ok")
+    PDF_RENDER_SECONDS.inc(time.perf_counter() - started, form=form)
+    return result
+
+
+async def render_scheme_form(
+    farmer_data: dict,
+    scheme_data: dict,
+    generated_by: str = "farmer",
+    agent_name: str | None = None,
+) -> tuple[bytes, str]:
+    return await _render(
+        "scheme", pdf_builder.build_scheme_form_pdf, farmer_data, scheme_data, generated_by, agent_name,
+    )
+
+
+async def render_insurance_form(farmer_data: dict, plan_data: dict) -> tuple[bytes, str]:
+    return await _render("insurance", pdf_builder.build_insurance_form_pdf, farmer_data, plan_data)
@@ -0,0 +1,176 @@
+"""
+Vectorized PMFBY premium quotes for bulk requests.
+
+The local rate tables (``PREMIUM_RATES``, ``SUM_INSURED_PER_HECTARE``,
+``COMMERCIAL_CROPS``) are compiled once into NumPy lookup arrays indexed by
+crop and season code. A bulk request maps each row to those codes and then
+computes sum insured, premium and subsidy for every row in a few array
+operations, with the same formula as ``pmfby.calculate_premium_local``. Rows
+whose district has a synced PMFBY notification in the rate snapshot are quoted
+from it instead, as single premium requests are.
+Results are streamed as CSV or JSON in chunks so large village quotes never
+build the whole response body in memory.
+"""
+
+import csv
+import io
+import json
+from typing import Iterable, Iterator
+import numpy as np
+from app.core.constants import LandUnit, LAND_CONVERSION, PREMIUM_QUOTE_STREAM_CHUNK
+from app.services.insurance_rates import RateSnapshot, premium_from_notified_rate
+from app.external.pmfby import (
+    PREMIUM_RATES, SUM_INSURED_PER_HECTARE, COMMERCIAL_CROPS,
+    DEFAULT_SUM_INSURED_PER_HECTARE, DEFAULT_PREMIUM_RATE, ACRES_PER_HECTARE, assign_company,
+)
+
+QUOTE_FIELDS = [
+    "crop", "season", "district", "land_area", "land_unit",
+    "sum_insured", "farmer_premium", "govt_subsidy", "insurance_company",
+    "premium_rate_percent", "source",
+]
+
+_CATEGORIES = ("food_grains_oilseeds", "commercial_horticultural")
+
+
+class PremiumTables:
+    """Rate tables as arrays; unknown crops and seasons map to the defaults
+    ``calculate_premium_local`` uses."""
+
+    def __init__(self):
+        crops = sorted(set(SUM_INSURED_PER_HECTARE) | COMMERCIAL_CROPS)
+        # Code 0 is "unknown crop".
+        self.crop_codes = {crop: i + 1 for i, crop in enumerate(crops)}
+        self.sum_insured_per_ha = np.array(
+            [DEFAULT_SUM_INSURED_PER_HECTARE]
+            + [SUM_INSURED_PER_HECTARE.get(c, DEFAULT_SUM_INSURED_PER_HECTARE) for c in crops],
+            dtype=np.float64,
+        )
+        self.is_commercial = np.array([False] + [c in COMMERCIAL_CROPS for c in crops], dtype=bool)
+
+        seasons = list(PREMIUM_RATES)
+        self.season_codes = {season: i for i, season in enumerate(seasons)}
+        self.default_season = self.season_codes["kharif"]
+        self.rates = np.array(
+            [[PREMIUM_RATES[s].get(cat, DEFAULT_PREMIUM_RATE) for cat in _CATEGORIES] for s in seasons],
+            dtype=np.float64,
+        )
+        self.acres_per_unit = {unit.value: factor for unit, factor in LAND_CONVERSION.items()}
+
+    def quote(
+        self,
+        crops: list[str],
+        seasons: list[str],
+        districts: list[str],
+        land_areas: list[float],
+        land_units: list[str],
+    ) -> dict[str, np.ndarray | list]:
+        crop_keys = [c.strip().lower() for c in crops]
+        crop_idx = np.fromiter((self.crop_codes.get(c, 0) for c in crop_keys), dtype=np.intp, count=len(crops))
+        season_idx = np.fromiter(
+            (self.season_codes.get(s.strip().lower(), self.default_season) for s in seasons),
+            dtype=np.intp, count=len(seasons),
+        )
+        acres_factor = np.fromiter(
+            (self.acres_per_unit.get(u, 1.0) for u in land_units), dtype=np.float64, count=len(land_units),
+        )
+        area_ha = np.asarray(land_areas, dtype=np.float64) * acres_factor / ACRES_PER_HECTARE
+
+        commercial = self.is_commercial[crop_idx]
+        rate = self.rates[season_idx, commercial.astype(np.intp)]
+        sum_insured = self.sum_insured_per_ha[crop_idx] * area_ha
+        farmer_premium = sum_insured * (rate / 100)
+        subsidy_rate = np.where(commercial, np.minimum(rate, 5.0), rate)
+        govt_subsidy = sum_insured * (subsidy_rate / 100) * 1.5
+
+        # Company assignment is a hash per distinct (crop, season, district).
+        companies: dict[tuple[str, str, str], str] = {}
+        insurance_company = []
+        for crop, season, district in zip(crop_keys, seasons, districts):
+            key = (crop, season.strip().lower(), district.strip().lower())
+            company = companies.get(key)
+            if company is None:
+                company = companies[key] = assign_company(*key)
+            insurance_company.append(company)
+
+        return {
+            "sum_insured": np.round(sum_insured, 2),
+            "farmer_premium": np.round(farmer_premium, 2),
+            "govt_subsidy": np.round(govt_subsidy, 2),
+            "premium_rate_percent": rate,
+            "insurance_company": insurance_company,
+            "land_area_hectares": area_ha,
+        }
+
+
+_tables: PremiumTables | None = None
+
+
+def get_premium_tables() -> PremiumTables:
+    global _tables
+    if _tables is None:
+        _tables = PremiumTables()
+    return _tables
+
+
+def quote_rows(rows: list[dict], snapshot: RateSnapshot | None = None) -> Iterator[dict]:
+    """Quote every row (plain-string crop/season/district/land_unit values);
+    yields one result dict per input row, in order."""
+    if not rows:
+        return
+    units = [r.get("land_unit") or LandUnit.ACRE.value for r in rows]
+    seasons = [r["season"] for r in rows]
+    result = get_premium_tables().quote(
+        [r["crop"] for r in rows], seasons, [r["district"] for r in rows],
+        [r["land_area"] for r in rows], units,
+    )
+    sum_insured = result["sum_insured"].tolist()
+    farmer_premium = result["farmer_premium"].tolist()
+    govt_subsidy = result["govt_subsidy"].tolist()
+    rate = result["premium_rate_percent"].tolist()
+    hectares = result["land_area_hectares"].tolist()
+    for i, row in enumerate(rows):
+        quote = {
+            "crop": row["crop"],
+            "season": seasons[i],
+            "district": row["district"],
+            "land_area": row["land_area"],
+            "land_unit": units[i],
+        }
+        notified = snapshot.lookup(row["crop"], seasons[i], row["district"]) if snapshot else None
+        if notified is not None:
+            quote.update(premium_from_notified_rate(notified, row["crop"], seasons[i], row["district"], hectares[i]))
+        else:
+            quote.update({
+                "sum_insured": sum_insured[i],
+                "farmer_premium": farmer_premium[i],
+                "govt_subsidy": govt_subsidy[i],
+                "insurance_company": result["insurance_company"][i],
+                "premium_rate_percent": rate[i],
+                "source": "local_calculation",
+            })
+        yield quote
+
+
+def stream_csv(quotes: Iterable[dict], chunk_size: int = PREMIUM_QUOTE_STREAM_CHUNK) -> Iterator[str]:
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=QUOTE_FIELDS, lineterminator="\n")
+    writer.writeheader()
+    for n, quote in enumerate(quotes, 1):
+        writer.writerow(quote)
+        if n % chunk_size == 0:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+    yield buf.getvalue()
+
+
+def stream_json(quotes: Iterable[dict], chunk_size: int = PREMIUM_QUOTE_STREAM_CHUNK) -> Iterator[str]:
+    parts = ["["]
+    for n, quote in enumerate(quotes):
+        parts.append(("," if n else "") + json.dumps(quote, separators=(",", ":")))
+        if len(parts) >= chunk_size:
+            yield "".join(parts)
+            parts = []
+    parts.append("]")
+    yield "".join(parts)
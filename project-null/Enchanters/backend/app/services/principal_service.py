@@ -0,0 +1,106 @@
+"""
+Cached identity of the authenticated farmer.
+
+Most endpoints only need to know who the caller is, not their crops, profile
+or documents. The principal is resolved per-process first, then from Redis,
+and only then from a column-only query on ``farmers``. Farmer updates drop
+the Redis copy and this process's copy once their transaction commits, so a
+concurrent request cannot re-cache the old row in between; other workers'
+local copies expire within PRINCIPAL_LOCAL_CACHE_TTL_SECONDS.
+"""
+
+import asyncio
+from uuid import UUID
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.core.cache import TTLCache
+from app.core.constants import (
+    PRINCIPAL_CACHE_TTL_SECONDS, PRINCIPAL_LOCAL_CACHE_TTL_SECONDS, PRINCIPAL_LOCAL_CACHE_MAXSIZE,
+)
+from app.core.otp import get_redis
+from app.models.farmer import Farmer
+from app.schemas.farmer import FarmerPrincipal
+import logging
+
+logger = logging.getLogger(__name__)
+
+_local = TTLCache(maxsize=PRINCIPAL_LOCAL_CACHE_MAXSIZE, ttl=PRINCIPAL_LOCAL_CACHE_TTL_SECONDS)
+
+_PENDING_KEY = "principal_invalidations"
+_tasks: set[asyncio.Task] = set()
+
+
+def _redis_key(farmer_uuid: UUID) -> str:
+    return f"principal:farmer:{farmer_uuid}"
+
+
+async def get_farmer_principal(db: AsyncSession, farmer_uuid: UUID) -> FarmerPrincipal | None:
+    principal = _local.get(farmer_uuid)
+    if principal is not None:
+        return principal
+
+    try:
+        r = await get_redis()
+        raw = await r.get(_redis_key(farmer_uuid))
+        if raw:
+            principal = FarmerPrincipal.model_validate_json(raw)
+            _local.set(farmer_uuid, principal)
+            return principal
+    except Exception as e:
+        logger.warning("Principal cache read failed for %s: %s", farmer_uuid, e)
+
+    result = await db.execute(
+        select(
+            Farmer.id, Farmer.farmer_id, Farmer.name, Farmer.phone,
+            Farmer.district, Farmer.state, Farmer.language_pref,
+        ).where(Farmer.id == farmer_uuid)
+    )
+    row = result.one_or_none()
+    if row is None:
+        return None
+
+    principal = FarmerPrincipal.model_validate(row)
+    _local.set(farmer_uuid, principal)
+    try:
+        r = await get_redis()
+        await r.set(_redis_key(farmer_uuid), principal.model_dump_json(), ex=PRINCIPAL_CACHE_TTL_SECONDS)
+    except Exception as e:
+        logger.warning("Principal cache write failed for %s: %s", farmer_uuid, e)
+    return principal
+
+
+async def invalidate_farmer_principal(farmer_uuid: UUID) -> None:
+    _local.pop(farmer_uuid)
+    try:
+        r = await get_redis()
+        await r.delete(_redis_key(farmer_uuid))
+    except Exception as e:
+        logger.warning("Principal cache invalidation failed for %s: %s", farmer_uuid, e)
+
+
+def invalidate_farmer_principal_after_commit(db: AsyncSession, farmer_uuid: UUID) -> None:
+    """Drop the farmer's cached principal once the caller's transaction commits."""
+    db.sync_session.info.setdefault(_PENDING_KEY, set()).add(farmer_uuid)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+    for farmer_uuid in pending:
+        _local.pop(farmer_uuid)
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    for farmer_uuid in pending:
+        task = loop.create_task(invalidate_farmer_principal(farmer_uuid))
+        _tasks.add(task)
+        task.add_done_callback(_tasks.discard)
+
+
+@event.listens_for(Session, "after_rollback")
+def _clear_pending(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
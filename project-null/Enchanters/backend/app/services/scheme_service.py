@@ -16,11 +16,19 @@ from app.models.farmer import Farmer, FarmerProfile, FarmerCrop
 from app.models.notification import Reminder, GeneratedForm
 from app.core.constants import (
     RuleType, LandUnit, LAND_CONVERSION, EligibilityStatus,
-    ReminderType, GeneratedByType,
+    ReminderType, GeneratedByType, ELIGIBILITY_BATCH_CHUNK_SIZE,
 )
+from app.config import settings
 from app.core.exceptions import NotFoundException, BadRequestException
-from app.core.pdf_builder import build_scheme_form_pdf
-from app.services.document_service import upload_bytes_to_s3
+from app.schemas.farmer import FarmerPrincipal
+from app.services.pdf_renderer import render_scheme_form
+from app.services.document_service import find_generated_form, store_generated_pdf
+from app.services.content_store import form_content_hash
+from app.services.eligibility_index import get_eligibility_index, _FAR_FUTURE
+from app.services.eligibility_cache import get_listing_version, get_cached_listing, store_listing
+from app.services.eligibility_sql import rank_schemes_sql
+from app.services.notification_service import reminder_send_at
+from app.services import agent_service
 import logging
 
 logger = logging.getLogger(__name__)
@@ -139,54 +147,95 @@ def evaluate_eligibility(scheme: Scheme, farmer_data: dict) -> dict:
     }
 
 
-def _build_farmer_data(farmer: Farmer) -> dict:
-    """Extract structured data from a Farmer ORM instance for eligibility checking."""
-    profile = farmer.profile
-    crops = farmer.crops or []
-    crop_names = [c.crop_name.lower() for c in crops if c.is_active]
-    seasons = list({c.season for c in crops if c.is_active})
-
-    land_area_acres = _normalize_land_to_acres(
-        farmer.land_area,
-        farmer.land_unit.value if hasattr(farmer.land_unit, 'value') else str(farmer.land_unit),
-    )
+def _farmer_data(
+    crops: list[tuple[str, str]],
+    state: str | None,
+    district: str | None,
+    land_area,
+    land_unit,
+    ownership_type=None,
+    irrigation_type=None,
+) -> dict:
+    """Build the eligibility-checking dict from a farmer's raw column values.
 
+    `crops` is a list of (crop_name, season) pairs for active crops only.
+    """
     data = {
-        "crops": crop_names,
-        "seasons": seasons,
-        "state": (farmer.state or "").strip(),
-        "district": (farmer.district or "").strip(),
-        "land_area_acres": land_area_acres,
+        "crops": [name.lower() for name, _ in crops],
+        "seasons": list({season for _, season in crops}),
+        "state": (state or "").strip(),
+        "district": (district or "").strip(),
+        "land_area_acres": _normalize_land_to_acres(
+            land_area,
+            land_unit.value if hasattr(land_unit, 'value') else str(land_unit),
+        ),
         "ownership_type": "",
         "irrigation_type": "",
     }
 
-    if profile:
-        if profile.ownership_type:
-            data["ownership_type"] = profile.ownership_type.value if hasattr(profile.ownership_type, 'value') else str(profile.ownership_type)
-        if profile.irrigation_type:
-            data["irrigation_type"] = profile.irrigation_type.value if hasattr(profile.irrigation_type, 'value') else str(profile.irrigation_type)
+    if ownership_type:
+        data["ownership_type"] = ownership_type.value if hasattr(ownership_type, 'value') else str(ownership_type)
+    if irrigation_type:
+        data["irrigation_type"] = irrigation_type.value if hasattr(irrigation_type, 'value') else str(irrigation_type)
 
     return data
 
 
+def page_key(item) -> list:
+    """Keyset for scheme listings: (match_score desc, nearest deadline, id)."""
+    return [item.match_score, (item.nearest_deadline or _FAR_FUTURE).isoformat(), str(item.id)]
+
+
+def _parse_page_key(after: list) -> tuple[float, date, UUID]:
+    try:
+        score, deadline, scheme_id = after
+        return float(score), date.fromisoformat(deadline), UUID(scheme_id)
+    except (TypeError, ValueError):
+        raise BadRequestException("Invalid cursor")
+
+
+def _rank_key(item: dict) -> tuple:
+    """In-memory equivalent of page_key's ordering; works on fresh and cached items."""
+    return (-item["match_score"], str(item.get("nearest_deadline") or _FAR_FUTURE), str(item["id"]))
+
+
+def _page(items: list[dict], limit: int | None, after: tuple | None) -> list[dict]:
+    if after is not None:
+        score, deadline, scheme_id = after
+        after_key = (-score, deadline.isoformat(), str(scheme_id))
+        items = [item for item in items if _rank_key(item) > after_key]
+    return items if limit is None else items[:limit]
+
+
 async def list_schemes_with_eligibility(
     db: AsyncSession,
-    farmer: Farmer,
+    farmer: FarmerPrincipal,
     crop: str | None = None,
     season: str | None = None,
     state: str | None = None,
     land_area: float | None = None,
+    after: list | None = None,
+    limit: int | None = None,
 ) -> list[dict]:
-    """List all active schemes with eligibility check for the given farmer."""
-    result = await db.execute(
-        select(Scheme)
-        .options(selectinload(Scheme.eligibility_rules), selectinload(Scheme.deadlines))
-        .where(Scheme.is_active == True)
-    )
-    schemes = result.scalars().all()
+    """List all active schemes with eligibility check for the given farmer.
+
+    In the default "index" mode rules are matched against the process-wide
+    compiled index, and unfiltered listings are served from the per-farmer
+    eligibility cache when it is current. In "sql" mode the ranking and
+    keyset pagination run in PostgreSQL so only the requested page is loaded.
+    """
+    today = date.today()
+    after_key = _parse_page_key(after) if after else None
+    use_sql = settings.SCHEME_EVALUATION_MODE == "sql"
+    use_cache = not use_sql and crop is None and season is None and state is None and land_area is None
 
-    farmer_data = _build_farmer_data(farmer)
+    if use_cache:
+        version = await get_listing_version(db, farmer.id, today)
+        cached = await get_cached_listing(db, farmer.id, version)
+        if cached is not None:
+            return _page(cached, limit, after_key)
+
+    farmer_data = await _load_farmer_data(db, farmer)
 
     if crop:
         farmer_data["crops"] = list(set(farmer_data["crops"] + [crop.lower()]))
@@ -197,45 +246,113 @@ async def list_schemes_with_eligibility(
     if land_area is not None:
         farmer_data["land_area_acres"] = land_area
 
-    results = []
-    today = date.today()
+    if use_sql:
+        return await rank_schemes_sql(db, farmer_data, today, limit=limit, after=after_key)
 
-    for scheme in schemes:
-        elig = evaluate_eligibility(scheme, farmer_data)
-
-        nearest_deadline = None
-        for dl in (scheme.deadlines or []):
-            if dl.close_date and dl.close_date >= today:
-                if nearest_deadline is None or dl.close_date < nearest_deadline:
-                    nearest_deadline = dl.close_date
-
-        results.append({
-            "id": scheme.id,
-            "name_en": scheme.name_en,
-            "name_hi": scheme.name_hi,
-            "ministry": scheme.ministry,
-            "benefit_type": scheme.benefit_type.value if hasattr(scheme.benefit_type, 'value') else str(scheme.benefit_type),
-            "benefit_amount": scheme.benefit_amount,
-            "is_active": scheme.is_active,
-            "eligibility_status": elig["status"],
-            "match_score": elig["score"],
-            "matched_rules": [f"{r['rule_type']}={r['rule_value']}" for r in elig["matched_rules"]],
-            "unmatched_rules": [f"{r['rule_type']}={r['rule_value']}" for r in elig["unmatched_rules"]],
-            "_deadline_proximity": nearest_deadline,
-        })
+    index = await get_eligibility_index(db)
+    results = index.rank(farmer_data, today)
+    if use_cache:
+        await store_listing(db, farmer.id, version, results)
+    return _page(results, limit, after_key)
 
-    results.sort(key=lambda x: (
-        -x["match_score"],
-        x["_deadline_proximity"] or date(9999, 12, 31),
-    ))
 
-    for r in results:
-        r.pop("_deadline_proximity", None)
+async def _load_farmer_data_chunk(db: AsyncSession, farmer_ids: list[str]) -> list[tuple[str, dict]]:
+    """Load eligibility data for a chunk of farmers with two column-only queries."""
+    result = await db.execute(
+        select(
+            Farmer.id, Farmer.farmer_id, Farmer.state, Farmer.district,
+            Farmer.land_area, Farmer.land_unit,
+            FarmerProfile.ownership_type, FarmerProfile.irrigation_type,
+        )
+        .outerjoin(FarmerProfile, FarmerProfile.farmer_id == Farmer.id)
+        .where(Farmer.farmer_id.in_(farmer_ids))
+    )
+    rows = result.all()
+    if not rows:
+        return []
 
-    return results
+    crops_result = await db.execute(
+        select(FarmerCrop.farmer_id, FarmerCrop.crop_name, FarmerCrop.season)
+        .where(FarmerCrop.farmer_id.in_([r.id for r in rows]), FarmerCrop.is_active == True)
+    )
+    crops_by_farmer: dict[UUID, list[tuple[str, str]]] = {}
+    for farmer_uuid, crop_name, crop_season in crops_result.all():
+        crops_by_farmer.setdefault(farmer_uuid, []).append((crop_name, crop_season))
+
+    return [
+        (
+            r.farmer_id,
+            _farmer_data(
+                crops_by_farmer.get(r.id, []), r.state, r.district,
+                r.land_area, r.land_unit, r.ownership_type, r.irrigation_type,
+            ),
+        )
+        for r in rows
+    ]
+
+
+async def _load_farmer_data(db: AsyncSession, farmer: FarmerPrincipal) -> dict:
+    """Eligibility data for one farmer via the column-only chunk loader."""
+    loaded = await _load_farmer_data_chunk(db, [farmer.farmer_id])
+    if not loaded:
+        raise NotFoundException("Farmer")
+    return loaded[0][1]
+
+
+async def evaluate_eligibility_batch(
+    db: AsyncSession,
+    farmer_ids: list[str],
+    scheme_ids: list[UUID] | None = None,
+) -> dict:
+    """Evaluate many farmers (by KisaanSeva farmer ID) against the scheme catalogue.
 
+    Farmers are loaded and evaluated in chunks of ELIGIBILITY_BATCH_CHUNK_SIZE so
+    memory stays bounded; each chunk is matched column-wise by the compiled index.
+    Returns the farmer x scheme matrix grouped by scheme.
+    """
+    index = await get_eligibility_index(db)
 
-async def get_scheme_detail(db: AsyncSession, scheme_id: UUID, farmer: Farmer) -> dict:
+    if scheme_ids:
+        positions = [index.positions[sid] for sid in dict.fromkeys(scheme_ids) if sid in index.positions]
+    else:
+        positions = list(range(len(index.schemes)))
+    cohorts = {pos: {"eligible": [], "partial": []} for pos in positions}
+
+    unique_ids = list(dict.fromkeys(farmer_ids))
+    found: set[str] = set()
+    for start in range(0, len(unique_ids), ELIGIBILITY_BATCH_CHUNK_SIZE):
+        chunk = await _load_farmer_data_chunk(db, unique_ids[start:start + ELIGIBILITY_BATCH_CHUNK_SIZE])
+        kids = [kid for kid, _ in chunk]
+        found.update(kids)
+        for pos, eligible_idx, partial_idx in index.evaluate_batch([fd for _, fd in chunk], positions):
+            cohorts[pos]["eligible"].extend(kids[i] for i in eligible_idx)
+            cohorts[pos]["partial"].extend({"farmer_id": kids[i], "score": score} for i, score in partial_idx)
+
+    schemes = []
+    for pos in positions:
+        scheme = index.schemes[pos]
+        eligible = cohorts[pos]["eligible"]
+        partial = cohorts[pos]["partial"]
+        schemes.append({
+            "scheme_id": str(scheme.id),
+            "scheme_name": scheme.item["name_en"],
+            "eligible_count": len(eligible),
+            "partial_count": len(partial),
+            "eligible_farmer_ids": eligible,
+            "partial_farmers": partial,
+        })
+
+    logger.info(
+        "Batch eligibility: %d farmers x %d schemes evaluated", len(found), len(positions)
+    )
+    return {
+        "farmers_evaluated": len(found),
+        "missing_farmer_ids": [fid for fid in unique_ids if fid not in found],
+        "schemes": schemes,
+    }
+
+
+async def get_scheme_detail(db: AsyncSession, scheme_id: UUID, farmer: FarmerPrincipal) -> dict:
     result = await db.execute(
         select(Scheme)
         .options(selectinload(Scheme.eligibility_rules), selectinload(Scheme.deadlines))
@@ -245,7 +362,7 @@ async def get_scheme_detail(db: AsyncSession, scheme_id: UUID, farmer: Farmer) -
     if not scheme:
         raise NotFoundException("Scheme")
 
-    farmer_data = _build_farmer_data(farmer)
+    farmer_data = await _load_farmer_data(db, farmer)
     elig = evaluate_eligibility(scheme, farmer_data)
 
     return {
@@ -288,7 +405,7 @@ async def get_scheme_detail(db: AsyncSession, scheme_id: UUID, farmer: Farmer) -
     }
 
 
-async def get_eligibility_breakdown(db: AsyncSession, scheme_id: UUID, farmer: Farmer) -> dict:
+async def get_eligibility_breakdown(db: AsyncSession, scheme_id: UUID, farmer: FarmerPrincipal) -> dict:
     result = await db.execute(
         select(Scheme)
         .options(selectinload(Scheme.eligibility_rules))
@@ -298,7 +415,7 @@ async def get_eligibility_breakdown(db: AsyncSession, scheme_id: UUID, farmer: F
     if not scheme:
         raise NotFoundException("Scheme")
 
-    farmer_data = _build_farmer_data(farmer)
+    farmer_data = await _load_farmer_data(db, farmer)
     elig = evaluate_eligibility(scheme, farmer_data)
 
     return {
@@ -314,21 +431,8 @@ async def get_eligibility_breakdown(db: AsyncSession, scheme_id: UUID, farmer: F
     }
 
 
-async def generate_scheme_form(
-    db: AsyncSession,
-    scheme_id: UUID,
-    farmer: Farmer,
-    generated_by: str = "farmer",
-    agent_name: str | None = None,
-    agent_session_id: UUID | None = None,
-) -> dict:
-    result = await db.execute(
-        select(Scheme).where(Scheme.id == scheme_id)
-    )
-    scheme = result.scalar_one_or_none()
-    if not scheme:
-        raise NotFoundException("Scheme")
-
+def scheme_form_inputs(farmer: Farmer, scheme: Scheme) -> tuple[dict, dict]:
+    """The farmer and scheme fields printed on a scheme application form."""
     farmer_data_for_pdf = {
         "farmer_id": farmer.farmer_id,
         "name": farmer.name,
@@ -359,13 +463,61 @@ async def generate_scheme_form(
         "benefit_amount": scheme.benefit_amount,
         "documents_required": scheme.documents_required or [],
     }
+    return farmer_data_for_pdf, scheme_data
+
+
+def scheme_form_hash(
+    farmer_data: dict,
+    scheme_data: dict,
+    generated_by: str = "farmer",
+    agent_name: str | None = None,
+) -> str:
+    return form_content_hash(
+        "scheme",
+        farmer=farmer_data,
+        scheme=scheme_data,
+        generated_by=generated_by,
+        agent_name=agent_name,
+    )
+
 
-    pdf_bytes, filename = build_scheme_form_pdf(
+async def generate_scheme_form(
+    db: AsyncSession,
+    scheme_id: UUID,
+    farmer: Farmer,
+    generated_by: str = "farmer",
+    agent_name: str | None = None,
+    agent_session_id: UUID | None = None,
+) -> dict:
+    result = await db.execute(
+        select(Scheme).where(Scheme.id == scheme_id)
+    )
+    scheme = result.scalar_one_or_none()
+    if not scheme:
+        raise NotFoundException("Scheme")
+
+    farmer_data_for_pdf, scheme_data = scheme_form_inputs(farmer, scheme)
+    content_hash = scheme_form_hash(farmer_data_for_pdf, scheme_data, generated_by, agent_name)
+    existing = await find_generated_form(db, farmer.id, content_hash)
+    if existing is not None:
+        logger.info("Scheme form unchanged, reusing %s for farmer %s", existing.file_key, farmer.farmer_id)
+        if agent_session_id:
+            await agent_service.log_session_form(
+                db, agent_session_id, existing.file_key, reused=True, scheme_id=scheme_id,
+            )
+        return {
+            "file_key": existing.file_key,
+            "file_name": existing.file_name,
+            "download_url": f"/files/{existing.file_key}",
+            "message": "Form generated successfully",
+        }
+
+    pdf_bytes, filename = await render_scheme_form(
         farmer_data_for_pdf, scheme_data, generated_by, agent_name
     )
 
-    file_key = f"forms/{farmer.farmer_id}/schemes/{scheme_id}/{filename}"
-    await upload_bytes_to_s3(pdf_bytes, file_key, "application/pdf")
+    file_key = f"forms/{farmer.farmer_id}/schemes/{scheme_id}/{content_hash}.pdf"
+    file_key = await store_generated_pdf(db, content_hash, file_key, pdf_bytes)
 
     form = GeneratedForm(
         farmer_id=farmer.id,
@@ -374,9 +526,12 @@ async def generate_scheme_form(
         file_name=filename,
         generated_by=GeneratedByType(generated_by),
         agent_session_id=agent_session_id,
+        content_hash=content_hash,
     )
     db.add(form)
     await db.flush()
+    if agent_session_id:
+        await agent_service.log_session_form(db, agent_session_id, file_key, reused=False, scheme_id=scheme_id)
 
     logger.info("Scheme form generated: %s for farmer %s", filename, farmer.farmer_id)
     return {
@@ -390,7 +545,7 @@ async def generate_scheme_form(
 async def create_scheme_reminder(
     db: AsyncSession,
     scheme_id: UUID,
-    farmer: Farmer,
+    farmer: FarmerPrincipal,
     channel: str,
 ) -> dict:
     result = await db.execute(
@@ -421,6 +576,7 @@ async def create_scheme_reminder(
         reference_id=scheme.id,
         remind_date=remind_date,
         channel=channel,
+        send_at=reminder_send_at(remind_date, farmer.id),
     )
     db.add(reminder)
     await db.flush()
@@ -0,0 +1,90 @@
+"""
+SMS delivery tracking.
+
+Bulk senders record one ``SmsDelivery`` row per recipient the provider
+accepted; MSG91 then calls the DLR webhook with per-number statuses for each
+request id, which ``apply_delivery_reports`` folds into those rows.
+"""
+
+import uuid
+from datetime import datetime, timezone
+from uuid import UUID
+from sqlalchemy import insert, update, bindparam
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.constants import SmsDeliveryStatus, MSG91_DLR_STATUS
+from app.core.metrics import counter
+from app.external.sms import DEV_REQUEST_ID
+from app.models.notification import SmsDelivery
+import logging
+
+logger = logging.getLogger(__name__)
+
+SMS_DELIVERY_REPORTS = counter(
+    "kisaanseva_sms_delivery_reports_total", "MSG91 delivery report entries by status", ("status",),
+)
+
+
+def _local_phone(number: str) -> str:
+    digits = "".join(ch for ch in str(number) if ch.isdigit())
+    return digits[2:] if len(digits) == 12 and digits.startswith("91") else digits
+
+
+async def record_sent(
+    db: AsyncSession,
+    template_id: str,
+    sent: list[tuple[str, str, UUID | None]],
+) -> int:
+    """Insert delivery rows for accepted (request_id, phone, reference_id) tuples."""
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "request_id": request_id,
+            "phone": phone,
+            "template_id": template_id,
+            "reference_id": reference_id,
+            "status": SmsDeliveryStatus.SENT.value,
+        }
+        for request_id, phone, reference_id in sent
+        if request_id and request_id != DEV_REQUEST_ID
+    ]
+    if rows:
+        await db.execute(insert(SmsDelivery).values(rows))
+    return len(rows)
+
+
+async def apply_delivery_reports(db: AsyncSession, reports: list[dict]) -> int:
+    """Apply MSG91 DLR entries ({request_id, number, status, desc}).
+
+    Entries with a pending status code are ignored; returns how many final
+    statuses were applied.
+    """
+    now = datetime.now(timezone.utc)
+    params = []
+    for report in reports:
+        status = MSG91_DLR_STATUS.get(str(report["status"]))
+        if status is None:
+            continue
+        SMS_DELIVERY_REPORTS.inc(status=status.value)
+        params.append({
+            "b_request_id": report["request_id"],
+            "b_phone": _local_phone(report["number"]),
+            "b_status": status.value,
+            "b_detail": (report.get("desc") or "")[:255] or None,
+            "b_delivered_at": now if status == SmsDeliveryStatus.DELIVERED else None,
+        })
+    if not params:
+        return 0
+
+    table = SmsDelivery.__table__
+    await db.execute(
+        update(table)
+        .where(table.c.request_id == bindparam("b_request_id"), table.c.phone == bindparam("b_phone"))
+        .values(
+            status=bindparam("b_status"),
+            status_detail=bindparam("b_detail"),
+            delivered_at=bindparam("b_delivered_at"),
+        ),
+        params,
+    )
+    logger.info("Applied %d SMS delivery reports", len(params))
+    return len(params)
@@ -1,12 +1,13 @@
 from uuid import UUID
 from datetime import date
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_, extract
+from sqlalchemy import select, and_, or_, extract, case, tuple_
 from app.models.subsidy import Subsidy
-from app.models.farmer import Farmer
+from app.schemas.farmer import FarmerPrincipal
 from app.models.notification import Reminder
 from app.core.constants import ReminderType
 from app.core.exceptions import NotFoundException, BadRequestException
+from app.services.notification_service import reminder_send_at
 import logging
 
 logger = logging.getLogger(__name__)
@@ -26,13 +27,32 @@ def _get_subsidy_status(s: Subsidy) -> str:
     return "open" if s.is_active else "closed"
 
 
+def _status_expr(today: date):
+    """SQL equivalent of _get_subsidy_status, so status can be filtered in the query."""
+    return case(
+        (Subsidy.open_date > today, "upcoming"),
+        (and_(Subsidy.open_date.isnot(None), Subsidy.close_date < today), "closed"),
+        (Subsidy.open_date.isnot(None), "open"),
+        (Subsidy.is_active == True, "open"),
+        else_="closed",
+    )
+
+
+def page_key(item) -> list:
+    """Keyset for subsidy listings: (name_en, id)."""
+    return [item.name_en, str(item.id)]
+
+
 async def list_subsidies(
     db: AsyncSession,
     category: str | None = None,
     state: str | None = None,
     status_filter: str | None = None,
+    after: list | None = None,
+    limit: int | None = None,
 ) -> list[dict]:
-    query = select(Subsidy).where(Subsidy.is_active == True)
+    status = _status_expr(date.today()).label("status")
+    query = select(Subsidy, status).where(Subsidy.is_active == True)
 
     if category:
         query = query.where(Subsidy.category == category)
@@ -40,16 +60,23 @@ async def list_subsidies(
         query = query.where(
             or_(Subsidy.state == state, Subsidy.state.is_(None), Subsidy.state == "")
         )
+    if status_filter:
+        query = query.where(status == status_filter)
+    if after:
+        try:
+            name, last_id = after
+            query = query.where(tuple_(Subsidy.name_en, Subsidy.id) > tuple_(name, UUID(last_id)))
+        except (TypeError, ValueError):
+            raise BadRequestException("Invalid cursor")
+
+    query = query.order_by(Subsidy.name_en, Subsidy.id)
+    if limit is not None:
+        query = query.limit(limit)
 
     result = await db.execute(query)
-    subsidies = result.scalars().all()
 
-    items = []
-    for s in subsidies:
-        st = _get_subsidy_status(s)
-        if status_filter and st != status_filter:
-            continue
-        items.append({
+    return [
+        {
             "id": s.id,
             "name_en": s.name_en,
             "name_hi": s.name_hi,
@@ -60,9 +87,9 @@ async def list_subsidies(
             "state": s.state,
             "is_active": s.is_active,
             "status": st,
-        })
-
-    return items
+        }
+        for s, st in result.all()
+    ]
 
 
 async def get_subsidy(db: AsyncSession, subsidy_id: UUID) -> dict:
@@ -129,7 +156,7 @@ async def get_calendar(db: AsyncSession, month: int, year: int) -> list[dict]:
 async def create_subsidy_reminder(
     db: AsyncSession,
     subsidy_id: UUID,
-    farmer: Farmer,
+    farmer: FarmerPrincipal,
     channel: str,
 ) -> dict:
     result = await db.execute(
@@ -159,6 +186,7 @@ async def create_subsidy_reminder(
         reference_id=s.id,
         remind_date=remind_date,
         channel=channel,
+        send_at=reminder_send_at(remind_date, farmer.id),
     )
     db.add(reminder)
     await db.flush()
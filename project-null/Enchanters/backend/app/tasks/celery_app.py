@@ -1,11 +1,18 @@
 from celery import Celery
 from celery.schedules import crontab
 from app.config import settings
+from app.core.constants import REMINDER_SLOT_INTERVAL_MINUTES
 
 celery_app = Celery(
     "kisaanseva",
     broker=settings.CELERY_BROKER_URL,
     backend=settings.CELERY_RESULT_BACKEND,
+    include=[
+        "app.tasks.notification_tasks",
+        "app.tasks.pdf_tasks",
+        "app.tasks.document_tasks",
+        "app.tasks.sync_tasks",
+    ],
 )
 
 celery_app.conf.update(
@@ -20,14 +27,26 @@ celery_app.conf.update(
 )
 
 celery_app.conf.beat_schedule = {
-    "process-reminders-daily": {
+    "process-reminder-slots": {
         "task": "app.tasks.notification_tasks.process_reminders",
-        "schedule": crontab(hour=8, minute=0),
+        "schedule": crontab(minute=f"*/{REMINDER_SLOT_INTERVAL_MINUTES}"),
     },
     "sync-external-data-weekly": {
         "task": "app.tasks.sync_tasks.sync_schemes",
         "schedule": crontab(day_of_week="sunday", hour=2, minute=0),
     },
+    "sync-insurance-rates-daily": {
+        "task": "app.tasks.sync_tasks.sync_insurance_rates",
+        "schedule": crontab(hour=3, minute=0),
+    },
+    "dispatch-outbox": {
+        "task": "app.tasks.notification_tasks.dispatch_outbox",
+        "schedule": 30.0,  # API processes dispatch immediately; this catches what they miss
+    },
+    "delete-expired-objects": {
+        "task": "app.tasks.pdf_tasks.delete_expired_objects",
+        "schedule": crontab(minute=0),
+    },
     "expire-stale-sessions": {
         "task": "app.tasks.notification_tasks.expire_stale_sessions",
         "schedule": crontab(minute="*/15"),
@@ -0,0 +1,43 @@
+import asyncio
+from uuid import UUID
+from app.tasks.celery_app import celery_app
+from app.database import async_session_factory
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _run_async(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+@celery_app.task(
+    name="app.tasks.document_tasks.process_document_image",
+    bind=True,
+    max_retries=3,
+    default_retry_delay=30,
+)
+def process_document_image(self, doc_id: str):
+    """Compress an uploaded document photo and render its thumbnail."""
+    async def _process():
+        from app.services.document_service import process_document_image as process
+        async with async_session_factory() as db:
+            return await process(db, UUID(doc_id))
+
+    try:
+        doc = _run_async(_process())
+    except Exception as e:
+        logger.error("Image processing failed for document %s: %s", doc_id, str(e))
+        raise self.retry(exc=e)
+    if doc is None:
+        return {"doc_id": doc_id, "status": "skipped"}
+    return {
+        "doc_id": doc_id,
+        "status": "processed",
+        "original_size": doc.size_bytes,
+        "compressed_size": doc.compressed_size_bytes,
+    }
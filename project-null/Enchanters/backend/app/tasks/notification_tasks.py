@@ -2,6 +2,7 @@ import asyncio
 from datetime import datetime, timedelta, timezone
 from app.tasks.celery_app import celery_app
 from app.database import async_session_factory
+from app.external.http import close_http_clients
 from sqlalchemy import select, update
 from app.models.agent import AgentSession
 from app.core.constants import AgentSessionStatus, AGENT_SESSION_TTL_MINUTES
@@ -15,28 +16,51 @@ def _run_async(coro):
     try:
         return loop.run_until_complete(coro)
     finally:
+        loop.run_until_complete(close_http_clients())
         loop.close()
 
 
 @celery_app.task(name="app.tasks.notification_tasks.process_reminders")
 def process_reminders():
-    """Process all due reminders and send notifications."""
-    async def _process():
+    """Send reminders whose delivery slot has started, each channel bucket
+    on its own session so a slow SMS run doesn't hold up email."""
+    from app.services.notification_service import REMINDER_BUCKETS, process_due_reminders
+
+    async def _process_bucket(bucket: str) -> int:
         async with async_session_factory() as db:
             try:
-                from app.services.notification_service import process_due_reminders
-                count = await process_due_reminders(db)
-                await db.commit()
-                logger.info("Processed %d reminders", count)
-                return count
+                return await process_due_reminders(db, bucket)
             except Exception as e:
                 await db.rollback()
-                logger.error("Reminder processing failed: %s", str(e))
+                logger.error("Reminder processing failed (%s): %s", bucket, str(e))
                 raise
 
+    async def _process():
+        counts = await asyncio.gather(*(_process_bucket(b) for b in REMINDER_BUCKETS))
+        logger.info("Processed %d reminders", sum(counts))
+        return sum(counts)
+
     return _run_async(_process())
 
 
+@celery_app.task(name="app.tasks.notification_tasks.dispatch_outbox")
+def dispatch_outbox():
+    """Send due outbox notifications; a safety net for the API dispatchers."""
+    async def _dispatch():
+        from app.services.outbox import drain_outbox
+        async with async_session_factory() as db:
+            return await drain_outbox(db)
+
+    try:
+        count = _run_async(_dispatch())
+        if count:
+            logger.info("Outbox task handled %d notifications", count)
+        return count
+    except Exception as e:
+        logger.error("Outbox dispatch failed: %s", str(e))
+        raise
+
+
 @celery_app.task(name="app.tasks.notification_tasks.expire_stale_sessions")
 def expire_stale_sessions():
     """Mark agent sessions as expired if past TTL."""
@@ -1,6 +1,9 @@
 import asyncio
+from uuid import UUID
+from celery import chord, group
 from app.tasks.celery_app import celery_app
 from app.database import async_session_factory
+from app.core.constants import BATCH_FORM_CHUNK_SIZE
 from app.core.pdf_builder import build_scheme_form_pdf, build_insurance_form_pdf
 from app.services.document_service import upload_bytes_to_s3
 import logging
@@ -42,14 +45,105 @@ def generate_insurance_pdf(farmer_data: dict, plan_data: dict, file_key: str):
         raise
 
 
+def _chunks(items: list, size: int) -> list[list]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+@celery_app.task(name="app.tasks.pdf_tasks.render_form_chunk")
+def render_form_chunk(
+    farmer_ids: list[str],
+    scheme_id: str,
+    generated_by: str = "agent",
+    agent_name: str | None = None,
+):
+    """Render and upload one chunk of a batch; rows are written by finish_batch_forms."""
+    async def _render():
+        from app.services.batch_forms import render_form_chunk as render_chunk
+        async with async_session_factory() as db:
+            return await render_chunk(db, farmer_ids, UUID(scheme_id), generated_by, agent_name)
+
+    return _run_async(_render())
+
+
+@celery_app.task(name="app.tasks.pdf_tasks.finish_batch_forms")
+def finish_batch_forms(
+    chunk_results: list[list[dict]],
+    scheme_id: str,
+    generated_by: str = "agent",
+    agent_sessions: dict[str, str] | None = None,
+    bundle: bool = True,
+):
+    """Chord callback: insert the batch's GeneratedForm rows and build the ZIP."""
+    async def _finish():
+        from app.services.batch_forms import record_batch_forms
+        async with async_session_factory() as db:
+            return await record_batch_forms(
+                db,
+                [entry for chunk in chunk_results for entry in chunk],
+                UUID(scheme_id),
+                generated_by,
+                {kid: UUID(sid) for kid, sid in (agent_sessions or {}).items()},
+                bundle,
+            )
+
+    try:
+        return _run_async(_finish())
+    except Exception as e:
+        logger.error("Batch form generation failed for scheme %s: %s", scheme_id, str(e))
+        raise
+
+
+def queue_batch_forms(
+    farmer_ids: list[str],
+    scheme_id: str,
+    generated_by: str = "agent",
+    agent_name: str | None = None,
+    agent_sessions: dict[str, str] | None = None,
+    bundle: bool = True,
+):
+    """Fan a batch out over the workers, BATCH_FORM_CHUNK_SIZE farmers per task.
+
+    ``agent_sessions`` maps each KisaanSeva ID to the consented agent session
+    the form is generated under, so it shows in the farmer's access log.
+    Returns the AsyncResult of the callback, whose result is the batch summary.
+    """
+    farmer_ids = list(dict.fromkeys(farmer_ids))
+    header = group(
+        render_form_chunk.s(chunk, scheme_id, generated_by, agent_name)
+        for chunk in _chunks(farmer_ids, BATCH_FORM_CHUNK_SIZE)
+    )
+    logger.info("Queueing batch forms for %d farmers in %d chunks", len(farmer_ids), len(header.tasks))
+    return chord(header)(finish_batch_forms.s(scheme_id, generated_by, agent_sessions, bundle))
+
+
 @celery_app.task(name="app.tasks.pdf_tasks.batch_generate_forms")
-def batch_generate_forms(farmer_ids: list[str]):
-    """Generate forms for multiple farmers (e.g., for CSC agent bulk requests)."""
-    results = []
-    for fid in farmer_ids:
-        try:
-            logger.info("Batch form generation for farmer %s", fid)
-            results.append({"farmer_id": fid, "status": "queued"})
-        except Exception as e:
-            results.append({"farmer_id": fid, "status": "failed", "error": str(e)})
-    return results
+def batch_generate_forms(
+    farmer_ids: list[str],
+    scheme_id: str,
+    generated_by: str = "agent",
+    agent_name: str | None = None,
+    bundle: bool = True,
+):
+    """Generate forms for multiple farmers (e.g., for CSC agent bulk requests).
+
+    Kept for callers that enqueue the task by name; returns the id of the
+    chord callback that will hold the batch summary.
+    """
+    result = queue_batch_forms(farmer_ids, scheme_id, generated_by, agent_name, bundle=bundle)
+    return {"task_id": result.id, "farmers": len(farmer_ids)}
+
+
+@celery_app.task(name="app.tasks.pdf_tasks.delete_expired_objects")
+def delete_expired_objects():
+    """Delete stored objects past their expiry (batch form ZIPs)."""
+    async def _delete():
+        from app.services import content_store
+        async with async_session_factory() as db:
+            keys = await content_store.delete_expired(db)
+            await db.commit()
+        await content_store.delete_objects(keys)
+        return len(keys)
+
+    deleted = _run_async(_delete())
+    logger.info("Deleted %d expired stored objects", deleted)
+    return deleted
@@ -1,6 +1,7 @@
 import asyncio
 from app.tasks.celery_app import celery_app
 from app.database import async_session_factory
+from app.external.http import close_http_clients
 import logging
 
 logger = logging.getLogger(__name__)
@@ -11,6 +12,7 @@ def _run_async(coro):
     try:
         return loop.run_until_complete(coro)
     finally:
+        loop.run_until_complete(close_http_clients())
         loop.close()
 
 
@@ -47,19 +49,31 @@ def sync_schemes():
 
 @celery_app.task(name="app.tasks.sync_tasks.sync_insurance_rates")
 def sync_insurance_rates():
-    """Sync insurance premium rates from PMFBY."""
+    """Download the current seasons' PMFBY rate notifications into
+    insurance_rates. Failures feed the PMFBY circuit breaker and keep the
+    previously synced rates in place."""
     async def _sync():
-        from app.external.pmfby import calculate_premium_from_api
-        try:
-            test = await calculate_premium_from_api("wheat", "rabi", "Agra", 1.0)
-            if test:
-                logger.info("PMFBY API is responsive, rates can be synced")
-            else:
-                logger.info("PMFBY API unavailable, using local rates")
-            return {"pmfby_available": test is not None}
-        except Exception as e:
-            logger.error("Insurance rate sync failed: %s", str(e))
-            return {"pmfby_available": False}
+        from app.external.circuit_breaker import OPEN
+        from app.external.pmfby import breaker
+        from app.services.insurance_rates import current_seasons, sync_season_rates
+
+        synced = {}
+        async with async_session_factory() as db:
+            for season, year in current_seasons():
+                try:
+                    count = await sync_season_rates(db, season, year)
+                    await db.commit()
+                except Exception as e:
+                    await db.rollback()
+                    logger.error("Insurance rate sync failed for %s %s: %s", season, year, str(e))
+                    count = None
+                synced[f"{season}-{year}"] = count
+                if count is None and breaker.state == OPEN:
+                    break  # PMFBY is down; don't wait on the remaining seasons
+
+        available = any(count is not None for count in synced.values())
+        logger.info("PMFBY rate sync: %s (circuit %s)", synced, breaker.state)
+        return {"pmfby_available": available, "synced": synced, "circuit": breaker.state}
 
     return _run_async(_sync())
 
@@ -0,0 +1,77 @@
+"""
+fake_msg91.py — Local stand-in for the MSG91 flow API
+=====================================================
+Accepts flow calls (single or bulk ``recipients``), answers after a fixed
+latency, can fail the first N calls (or a random share of them) with 500 so
+retries can be exercised, and can post delivery reports back to the app's
+DLR webhook. ``GET /stats`` returns call and message counts.
+
+Usage (from backend/ directory):
+    python -m benchmarks.fake_msg91 --port 9091 --latency-ms 80
+    MSG91_API_URL=http://127.0.0.1:9091/api/v5 MSG91_AUTH_KEY=fake celery -A app.tasks.celery_app worker
+"""
+
+import argparse
+import asyncio
+import random
+import uuid
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+
+def create_app(
+    latency: float = 0.05,
+    fail_first: int = 0,
+    failure_rate: float = 0.0,
+    dlr_url: str | None = None,
+    seed: int = 0,
+) -> FastAPI:
+    app = FastAPI(title="fake-msg91")
+    app.state.calls = 0
+    app.state.messages = 0
+    app.state.accepted = []  # (request_id, template_id, recipients)
+    rng = random.Random(seed)
+
+    async def post_dlr(request_id: str, recipients: list[dict]) -> None:
+        await asyncio.sleep(latency)
+        report = [{"number": r["mobiles"], "status": "1", "desc": "DELIVERED"} for r in recipients]
+        async with httpx.AsyncClient() as client:
+            await client.post(dlr_url, json={"data": [{"requestId": request_id, "report": report}]})
+
+    @app.post("/api/v5/flow/")
+    async def flow(request: Request):
+        body = await request.json()
+        await asyncio.sleep(latency)
+        app.state.calls += 1
+        if app.state.calls <= fail_first or rng.random() < failure_rate:
+            return JSONResponse({"type": "error", "message": "Temporary failure"}, status_code=500)
+
+        recipients = body.get("recipients") or [{"mobiles": body.get("mobiles")}]
+        request_id = uuid.uuid4().hex[:24]
+        app.state.messages += len(recipients)
+        app.state.accepted.append((request_id, body.get("template_id"), recipients))
+        if dlr_url:
+            asyncio.create_task(post_dlr(request_id, recipients))
+        return {"type": "success", "message": request_id}
+
+    @app.get("/stats")
+    async def stats():
+        return {"calls": app.state.calls, "messages": app.state.messages}
+
+    return app
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Fake MSG91 flow API")
+    parser.add_argument("--port", type=int, default=9091)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--dlr-url", default=None, help="e.g. http://127.0.0.1:8000/api/v1/webhooks/msg91/dlr?token=...")
+    args = parser.parse_args()
+    uvicorn.run(
+        create_app(args.latency_ms / 1000, failure_rate=args.failure_rate, dlr_url=args.dlr_url),
+        host="127.0.0.1", port=args.port, log_level="warning",
+    )
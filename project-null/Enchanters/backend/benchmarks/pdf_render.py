@@ -0,0 +1,76 @@
+"""
+pdf_render.py — Form render throughput, cold vs warm template
+=============================================================
+"Cold" clears the compiled template before every render, which is what each
+render paid before styles and static sections were cached; "warm" reuses it.
+
+Usage (from backend/ directory):
+    python -m benchmarks.pdf_render --renders 500
+"""
+
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent          # backend/
+sys.path.insert(0, str(ROOT))
+
+from app.core import pdf_builder
+
+FARMER = {
+    "farmer_id": "KS-MH-2025-001",
+    "name": "Ramesh Patil",
+    "phone": "9876543210",
+    "district": "Pune",
+    "state": "Maharashtra",
+    "pin_code": "411001",
+    "land_area": "2.50",
+    "land_unit": "acre",
+    "aadhaar_masked": "1234",
+    "bank_ifsc": "SBIN0001234",
+    "crops": [
+        {"crop_name": "wheat", "season": "rabi", "year": 2025},
+        {"crop_name": "soybean", "season": "kharif", "year": 2025},
+    ],
+}
+SCHEME = {
+    "name_en": "PM-KISAN",
+    "ministry": "Ministry of Agriculture and Farmers Welfare",
+    "benefit_type": "cash",
+    "benefit_amount": "6000",
+    "documents_required": ["aadhaar", "land_record", "bank_passbook"],
+}
+PLAN = {"name_en": "Pradhan Mantri Fasal Bima Yojana", "plan_type": "pmfby"}
+
+FORMS = {
+    "scheme": lambda: pdf_builder.build_scheme_form_pdf(FARMER, SCHEME, "agent", "CSC Agent"),
+    "insurance": lambda: pdf_builder.build_insurance_form_pdf(FARMER, PLAN),
+}
+
+
+def renders_per_second(render, n: int, cold: bool) -> float:
+    render()
+    start = time.perf_counter()
+    for _ in range(n):
+        if cold:
+            pdf_builder.clear_template_cache()
+        render()
+    return n / (time.perf_counter() - start)
+
+
+def run(renders: int) -> None:
+    logging.disable(logging.INFO)
+    print(f"  {'form':<10} {'cold/s':>10} {'warm/s':>10} {'speedup':>8}")
+    for name, render in FORMS.items():
+        cold = renders_per_second(render, renders, cold=True)
+        warm = renders_per_second(render, renders, cold=False)
+        print(f"  {name:<10} {cold:>10.1f} {warm:>10.1f} {warm / cold:>7.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark PDF form rendering")
+    parser.add_argument("--renders", type=int, default=300)
+    args = parser.parse_args()
+    run(args.renders)
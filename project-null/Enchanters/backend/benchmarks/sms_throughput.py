@@ -0,0 +1,84 @@
+"""
+sms_throughput.py — Reminder SMS throughput, one call per message vs bulk
+=========================================================================
+Starts the fake MSG91 server (benchmarks/fake_msg91.py) on a local port and
+sends the same reminders twice: one ``send_sms`` call per phone, as reminders
+went out before, and one ``send_bulk_sms`` for the whole set.
+
+Usage (from backend/ directory):
+    python -m benchmarks.sms_throughput --messages 2000 --latency-ms 80
+"""
+
+import argparse
+import asyncio
+import logging
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent          # backend/
+sys.path.insert(0, str(ROOT))
+
+import uvicorn
+from app.config import settings
+from app.external import sms
+from app.external.http import close_http_clients
+from benchmarks.fake_msg91 import create_app
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_fake(latency: float) -> tuple[uvicorn.Server, int]:
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(create_app(latency), host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, port
+
+
+async def per_message(phones: list[str]) -> float:
+    start = time.perf_counter()
+    for phone in phones:
+        await sms.send_sms(phone, "KisaanSeva Reminder: You have an upcoming deadline for scheme.")
+    return len(phones) / (time.perf_counter() - start)
+
+
+async def bulk(phones: list[str]) -> float:
+    recipients = [sms.SmsRecipient(p, {"OTP": "KisaanSeva Reminder"}) for p in phones]
+    start = time.perf_counter()
+    await sms.send_bulk_sms(settings.MSG91_TEMPLATE_ID, recipients)
+    return len(phones) / (time.perf_counter() - start)
+
+
+async def run(messages: int, latency: float) -> None:
+    phones = [f"9{i:09d}" for i in range(messages)]
+    single = await per_message(phones)
+    batched = await bulk(phones)
+    await close_http_clients()
+    print(f"  {'mode':<12} {'msgs/s':>10}")
+    print(f"  {'per-message':<12} {single:>10.1f}")
+    print(f"  {'bulk':<12} {batched:>10.1f}   ({batched / single:.1f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark SMS sending against a fake MSG91")
+    parser.add_argument("--messages", type=int, default=1000)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    server, port = start_fake(args.latency_ms / 1000)
+    settings.MSG91_API_URL = f"http://127.0.0.1:{port}/api/v5"
+    settings.MSG91_AUTH_KEY = "fake"
+    settings.SMS_MAX_MESSAGES_PER_SECOND = 1_000_000
+    try:
+        asyncio.run(run(args.messages, args.latency_ms / 1000))
+    finally:
+        server.should_exit = True
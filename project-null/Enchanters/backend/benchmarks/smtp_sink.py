@@ -0,0 +1,110 @@
+"""
+smtp_sink.py — Local SMTP server that accepts and records every message
+=======================================================================
+Speaks enough SMTP for smtplib (EHLO, AUTH PLAIN/LOGIN, MAIL, RCPT, DATA,
+RSET, NOOP, QUIT), without TLS, and counts connections, logins and messages,
+so tests and benchmarks can see how many handshakes a send pattern costs.
+An optional per-command delay stands in for network round trips.
+
+Usage (from backend/ directory):
+    python -m benchmarks.smtp_sink --port 2525
+    SMTP_HOST=127.0.0.1 SMTP_PORT=2525 SMTP_USE_TLS=false SMTP_USER=u SMTP_PASSWORD=p ...
+"""
+
+import argparse
+import socketserver
+import threading
+import time
+
+
+class SmtpSink:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, delay: float = 0.0):
+        self.delay = delay
+        self.connections = 0
+        self.logins = 0
+        self.messages: list[tuple[str, list[str], str]] = []  # (sender, recipients, data)
+        self._lock = threading.Lock()
+        sink = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def reply(self, line: str) -> None:
+                if sink.delay:
+                    time.sleep(sink.delay)
+                self.wfile.write(f"{line}\r\n".encode())
+
+            def handle(self) -> None:
+                with sink._lock:
+                    sink.connections += 1
+                sender, recipients = None, []
+                self.reply("220 sink ESMTP")
+                while True:
+                    raw = self.rfile.readline()
+                    if not raw:
+                        return
+                    line = raw.decode().rstrip("\r\n")
+                    verb = line.split(" ", 1)[0].upper()
+                    if verb in ("EHLO", "HELO"):
+                        self.wfile.write(b"250-sink\r\n250-AUTH PLAIN LOGIN\r\n")
+                        self.reply("250 8BITMIME")
+                    elif verb == "AUTH":
+                        if line.upper().startswith("AUTH LOGIN"):
+                            self.reply("334 VXNlcm5hbWU6")
+                            self.rfile.readline()
+                            self.reply("334 UGFzc3dvcmQ6")
+                            self.rfile.readline()
+                        with sink._lock:
+                            sink.logins += 1
+                        self.reply("235 Authentication successful")
+                    elif verb == "MAIL":
+                        sender, recipients = line.split(":", 1)[1].split()[0].strip("<>"), []
+                        self.reply("250 OK")
+                    elif verb == "RCPT":
+                        recipients.append(line.split(":", 1)[1].split()[0].strip("<>"))
+                        self.reply("250 OK")
+                    elif verb == "DATA":
+                        self.reply("354 End data with <CR><LF>.<CR><LF>")
+                        lines = []
+                        while (data := self.rfile.readline().decode()) not in (".\r\n", ""):
+                            lines.append(data)
+                        with sink._lock:
+                            sink.messages.append((sender, recipients, "".join(lines)))
+                        self.reply("250 OK queued")
+                    elif verb in ("RSET", "NOOP"):
+                        self.reply("250 OK")
+                    elif verb == "QUIT":
+                        self.reply("221 Bye")
+                        return
+                    else:
+                        self.reply("502 Command not implemented")
+
+        socketserver.ThreadingTCPServer.allow_reuse_address = True
+        self._server = socketserver.ThreadingTCPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self.host, self.port = self._server.server_address
+
+    def start(self) -> "SmtpSink":
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "SmtpSink":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local SMTP sink")
+    parser.add_argument("--port", type=int, default=2525)
+    parser.add_argument("--delay-ms", type=float, default=0)
+    args = parser.parse_args()
+    sink = SmtpSink(port=args.port, delay=args.delay_ms / 1000)
+    print(f"SMTP sink listening on {sink.host}:{sink.port}")
+    try:
+        sink._server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"{sink.connections} connections, {sink.logins} logins, {len(sink.messages)} messages")
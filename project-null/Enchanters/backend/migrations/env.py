@@ -16,10 +16,12 @@ sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 from app.database import Base
 from app.models import (
     Farmer, FarmerProfile, FarmerCrop, FarmerDocument,
-    Scheme, SchemeEligibility, SchemeDeadline,
-    InsurancePlan, Subsidy,
+    Scheme, SchemeEligibility, SchemeDeadline, FarmerEligibilityCache,
+    InsurancePlan, InsuranceRate, Subsidy,
     Agent, AgentSession,
-    Reminder, GeneratedForm,
+    PinCode, LgdState, LgdDistrict, LgdSubDistrict, LgdVillage,
+    Reminder, GeneratedForm, SmsDelivery, NotificationOutbox,
+    StoredObject,
 )
 
 target_metadata = Base.metadata
@@ -0,0 +1,30 @@
+"""Per-farmer eligibility cache
+
+Revision ID: 002_eligibility_cache
+Revises: 001_initial
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = "002_eligibility_cache"
+down_revision: Union[str, None] = "001_initial"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "farmer_eligibility_cache",
+        sa.Column("farmer_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("farmers.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("catalogue_version", sa.String(64), nullable=False),
+        sa.Column("results", postgresql.JSONB, nullable=False),
+        sa.Column("computed_at", sa.DateTime(timezone=True), server_default=sa.text("now()")),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("farmer_eligibility_cache")
@@ -0,0 +1,24 @@
+"""Indexes for SQL-side eligibility ranking
+
+Revision ID: 003_scheme_rule_indexes
+Revises: 002_eligibility_cache
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+from alembic import op
+
+revision: str = "003_scheme_rule_indexes"
+down_revision: Union[str, None] = "002_eligibility_cache"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_scheme_eligibility_scheme_id", "scheme_eligibility", ["scheme_id"])
+    op.create_index("ix_scheme_deadlines_scheme_id_close_date", "scheme_deadlines", ["scheme_id", "close_date"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_scheme_deadlines_scheme_id_close_date", table_name="scheme_deadlines")
+    op.drop_index("ix_scheme_eligibility_scheme_id", table_name="scheme_eligibility")
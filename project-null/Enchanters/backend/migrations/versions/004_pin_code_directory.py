@@ -0,0 +1,31 @@
+"""India Post PIN code directory
+
+Revision ID: 004_pin_code_directory
+Revises: 003_scheme_rule_indexes
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = "004_pin_code_directory"
+down_revision: Union[str, None] = "003_scheme_rule_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "pin_codes",
+        sa.Column("pincode", sa.String(6), primary_key=True),
+        sa.Column("district", sa.String(100), nullable=False, server_default=""),
+        sa.Column("state", sa.String(100), nullable=False, server_default=""),
+        sa.Column("post_offices", postgresql.JSONB, nullable=False, server_default=sa.text("'[]'::jsonb")),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()")),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("pin_codes")
@@ -0,0 +1,57 @@
+"""LGD location directory and PIN prefix index
+
+Revision ID: 005_lgd_location_directory
+Revises: 004_pin_code_directory
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "005_lgd_location_directory"
+down_revision: Union[str, None] = "004_pin_code_directory"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "lgd_states",
+        sa.Column("code", sa.Integer, primary_key=True, autoincrement=False),
+        sa.Column("name", sa.String(100), nullable=False),
+    )
+    op.create_table(
+        "lgd_districts",
+        sa.Column("code", sa.Integer, primary_key=True, autoincrement=False),
+        sa.Column("state_code", sa.Integer, sa.ForeignKey("lgd_states.code", ondelete="CASCADE"), nullable=False),
+        sa.Column("name", sa.String(100), nullable=False),
+    )
+    op.create_index("ix_lgd_districts_state_code", "lgd_districts", ["state_code"])
+    op.create_table(
+        "lgd_sub_districts",
+        sa.Column("code", sa.Integer, primary_key=True, autoincrement=False),
+        sa.Column("district_code", sa.Integer, sa.ForeignKey("lgd_districts.code", ondelete="CASCADE"), nullable=False),
+        sa.Column("name", sa.String(100), nullable=False),
+    )
+    op.create_index("ix_lgd_sub_districts_district_code", "lgd_sub_districts", ["district_code"])
+    op.create_table(
+        "lgd_villages",
+        sa.Column("code", sa.Integer, primary_key=True, autoincrement=False),
+        sa.Column(
+            "sub_district_code", sa.Integer,
+            sa.ForeignKey("lgd_sub_districts.code", ondelete="CASCADE"), nullable=False,
+        ),
+        sa.Column("name", sa.String(150), nullable=False),
+    )
+    op.create_index("ix_lgd_villages_sub_district_code", "lgd_villages", ["sub_district_code"])
+    op.execute("CREATE INDEX ix_lgd_villages_name_prefix ON lgd_villages (lower(name) varchar_pattern_ops)")
+    op.execute("CREATE INDEX ix_pin_codes_pincode_prefix ON pin_codes (pincode varchar_pattern_ops)")
+
+
+def downgrade() -> None:
+    op.drop_index("ix_pin_codes_pincode_prefix", table_name="pin_codes")
+    op.drop_table("lgd_villages")
+    op.drop_table("lgd_sub_districts")
+    op.drop_table("lgd_districts")
+    op.drop_table("lgd_states")
@@ -0,0 +1,42 @@
+"""PMFBY insurance rate notifications
+
+Revision ID: 006_insurance_rates
+Revises: 005_lgd_location_directory
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = "006_insurance_rates"
+down_revision: Union[str, None] = "005_lgd_location_directory"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "insurance_rates",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("season", sa.String(10), nullable=False),
+        sa.Column("year", sa.Integer, nullable=False),
+        sa.Column("state", sa.String(100), nullable=False),
+        sa.Column("district", sa.String(100), nullable=False),
+        sa.Column("crop", sa.String(100), nullable=False),
+        sa.Column("sum_insured_per_hectare", sa.Numeric(12, 2), nullable=False),
+        sa.Column("farmer_premium_rate", sa.Numeric(5, 2), nullable=False),
+        sa.Column("actuarial_rate", sa.Numeric(5, 2)),
+        sa.Column("insurance_company", sa.String(200)),
+        sa.Column("synced_at", sa.DateTime(timezone=True), server_default=sa.text("now()")),
+    )
+    op.create_index(
+        "ux_insurance_rates_season_year_state_district_crop",
+        "insurance_rates", ["season", "year", "state", "district", "crop"], unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ux_insurance_rates_season_year_state_district_crop", table_name="insurance_rates")
+    op.drop_table("insurance_rates")
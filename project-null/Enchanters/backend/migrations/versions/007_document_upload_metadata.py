@@ -0,0 +1,25 @@
+"""Size and checksum of uploaded farmer documents
+
+Revision ID: 007_document_upload_metadata
+Revises: 006_insurance_rates
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "007_document_upload_metadata"
+down_revision: Union[str, None] = "006_insurance_rates"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("farmer_documents", sa.Column("size_bytes", sa.BigInteger))
+    op.add_column("farmer_documents", sa.Column("checksum_sha256", sa.String(64)))
+
+
+def downgrade() -> None:
+    op.drop_column("farmer_documents", "checksum_sha256")
+    op.drop_column("farmer_documents", "size_bytes")
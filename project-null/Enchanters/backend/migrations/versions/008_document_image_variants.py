@@ -0,0 +1,27 @@
+"""Compressed image and thumbnail variants of farmer documents
+
+Revision ID: 008_document_image_variants
+Revises: 007_document_upload_metadata
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "008_document_image_variants"
+down_revision: Union[str, None] = "007_document_upload_metadata"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("farmer_documents", sa.Column("compressed_size_bytes", sa.BigInteger))
+    op.add_column("farmer_documents", sa.Column("thumbnail_key", sa.String(500)))
+    op.add_column("farmer_documents", sa.Column("processed_at", sa.DateTime(timezone=True)))
+
+
+def downgrade() -> None:
+    op.drop_column("farmer_documents", "processed_at")
+    op.drop_column("farmer_documents", "thumbnail_key")
+    op.drop_column("farmer_documents", "compressed_size_bytes")
@@ -0,0 +1,40 @@
+"""Content-addressed stored objects and generated form hashes
+
+Revision ID: 009_content_addressed_objects
+Revises: 008_document_image_variants
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "009_content_addressed_objects"
+down_revision: Union[str, None] = "008_document_image_variants"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "stored_objects",
+        sa.Column("content_hash", sa.String(64), primary_key=True),
+        sa.Column("file_key", sa.String(500), nullable=False, unique=True),
+        sa.Column("thumbnail_key", sa.String(500)),
+        sa.Column("content_type", sa.String(100), nullable=False),
+        sa.Column("size_bytes", sa.BigInteger, nullable=False),
+        sa.Column("ref_count", sa.Integer, nullable=False, server_default="1"),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()")),
+    )
+    op.add_column("generated_forms", sa.Column("content_hash", sa.String(64)))
+    op.create_index(
+        "ix_generated_forms_farmer_content_hash", "generated_forms", ["farmer_id", "content_hash"],
+    )
+    op.create_index("ix_farmer_documents_checksum_sha256", "farmer_documents", ["checksum_sha256"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_farmer_documents_checksum_sha256", table_name="farmer_documents")
+    op.drop_index("ix_generated_forms_farmer_content_hash", table_name="generated_forms")
+    op.drop_column("generated_forms", "content_hash")
+    op.drop_table("stored_objects")
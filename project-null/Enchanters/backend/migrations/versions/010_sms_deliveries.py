@@ -0,0 +1,39 @@
+"""SMS delivery tracking from MSG91 delivery reports
+
+Revision ID: 010_sms_deliveries
+Revises: 009_content_addressed_objects
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = "010_sms_deliveries"
+down_revision: Union[str, None] = "009_content_addressed_objects"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "sms_deliveries",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("request_id", sa.String(64), nullable=False),
+        sa.Column("phone", sa.String(15), nullable=False),
+        sa.Column("template_id", sa.String(64)),
+        sa.Column("reference_id", postgresql.UUID(as_uuid=True)),
+        sa.Column("status", sa.String(20), nullable=False, server_default="sent"),
+        sa.Column("status_detail", sa.String(255)),
+        sa.Column("sent_at", sa.DateTime(timezone=True), server_default=sa.text("now()")),
+        sa.Column("delivered_at", sa.DateTime(timezone=True)),
+    )
+    op.create_index("ix_sms_deliveries_request_phone", "sms_deliveries", ["request_id", "phone"])
+    op.create_index("ix_sms_deliveries_reference_id", "sms_deliveries", ["reference_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_sms_deliveries_reference_id", table_name="sms_deliveries")
+    op.drop_index("ix_sms_deliveries_request_phone", table_name="sms_deliveries")
+    op.drop_table("sms_deliveries")
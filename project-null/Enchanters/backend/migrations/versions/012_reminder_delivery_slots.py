@@ -0,0 +1,40 @@
+"""Hourly delivery slots for reminders
+
+Revision ID: 012_reminder_delivery_slots
+Revises: 011_notification_outbox
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "012_reminder_delivery_slots"
+down_revision: Union[str, None] = "011_notification_outbox"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("reminders", sa.Column("send_at", sa.DateTime(timezone=True), nullable=True))
+    # Spread existing reminders over the 09:00-20:00 IST slots by farmer. This
+    # approximates notification_service.reminder_send_at (crc32 over the hours
+    # in app.core.constants) with hashtext, so an existing reminder may land in
+    # a different hour than a new one for the same farmer; either is a valid slot.
+    op.execute(
+        """
+        UPDATE reminders
+        SET send_at = (remind_date + make_interval(hours => 9 + abs(hashtext(farmer_id::text)) % 11))
+                      AT TIME ZONE 'Asia/Kolkata'
+        """
+    )
+    op.alter_column("reminders", "send_at", nullable=False)
+    op.create_index(
+        "ix_reminders_unsent_send_at", "reminders", ["send_at", "id"],
+        postgresql_where=sa.text("sent = false"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_reminders_unsent_send_at", table_name="reminders")
+    op.drop_column("reminders", "send_at")
@@ -0,0 +1,50 @@
+"""Track updates to scheme rules and deadlines for the catalogue fingerprint
+
+Revision ID: 013_catalogue_updated_at
+Revises: 012_reminder_delivery_slots
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "013_catalogue_updated_at"
+down_revision: Union[str, None] = "012_reminder_delivery_slots"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_TABLES = ("schemes", "scheme_eligibility", "scheme_deadlines")
+
+
+def upgrade() -> None:
+    for table in ("scheme_eligibility", "scheme_deadlines"):
+        op.add_column(
+            table,
+            sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()")),
+        )
+    # Keep updated_at current for edits made outside the ORM (psql, admin scripts),
+    # so the eligibility index and listing cache see them.
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION touch_updated_at() RETURNS trigger AS $$
+        BEGIN
+            NEW.updated_at = now();
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    for table in _TABLES:
+        op.execute(
+            f"CREATE TRIGGER {table}_touch_updated_at BEFORE UPDATE ON {table} "
+            f"FOR EACH ROW EXECUTE FUNCTION touch_updated_at()"
+        )
+
+
+def downgrade() -> None:
+    for table in _TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_touch_updated_at ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS touch_updated_at()")
+    for table in ("scheme_deadlines", "scheme_eligibility"):
+        op.drop_column(table, "updated_at")
@@ -0,0 +1,26 @@
+"""Per-farmer version for cached eligibility listings
+
+Revision ID: 014_farmer_eligibility_version
+Revises: 013_catalogue_updated_at
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "014_farmer_eligibility_version"
+down_revision: Union[str, None] = "013_catalogue_updated_at"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "farmers",
+        sa.Column("eligibility_version", sa.Integer, nullable=False, server_default="0"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("farmers", "eligibility_version")
@@ -0,0 +1,52 @@
+"""Scope stored document objects to the farmer
+
+Revision ID: 015_farmer_scoped_documents
+Revises: 014_farmer_eligibility_version
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+from alembic import op
+
+revision: str = "015_farmer_scoped_documents"
+down_revision: Union[str, None] = "014_farmer_eligibility_version"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Same as content_store.document_object_hash.
+_SCOPED = "encode(sha256(('document:' || {farmer} || ':' || {checksum})::bytea), 'hex')"
+
+
+def upgrade() -> None:
+    # Re-key objects used by a single farmer. Objects already shared between
+    # farmers keep their bare checksum key (content_store.release_document
+    # falls back to it); splitting them would mean copying S3 objects.
+    op.execute(
+        f"""
+        UPDATE stored_objects so
+        SET content_hash = {_SCOPED.format(farmer="d.farmer_id", checksum="so.content_hash")}
+        FROM (
+            SELECT checksum_sha256, min(farmer_id::text) AS farmer_id
+            FROM farmer_documents
+            WHERE checksum_sha256 IS NOT NULL
+            GROUP BY checksum_sha256
+            HAVING count(DISTINCT farmer_id) = 1
+        ) d
+        WHERE so.content_hash = d.checksum_sha256
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute(
+        f"""
+        UPDATE stored_objects so
+        SET content_hash = d.checksum_sha256
+        FROM (
+            SELECT DISTINCT farmer_id::text AS farmer_id, checksum_sha256
+            FROM farmer_documents
+            WHERE checksum_sha256 IS NOT NULL
+        ) d
+        WHERE so.content_hash = {_SCOPED.format(farmer="d.farmer_id", checksum="d.checksum_sha256")}
+        """
+    )
@@ -0,0 +1,35 @@
+"""Retry and give up on failing reminders
+
+Revision ID: 016_reminder_attempts
+Revises: 015_farmer_scoped_documents
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "016_reminder_attempts"
+down_revision: Union[str, None] = "015_farmer_scoped_documents"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("reminders", sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"))
+    op.add_column("reminders", sa.Column("failed_at", sa.DateTime(timezone=True), nullable=True))
+    op.drop_index("ix_reminders_unsent_send_at", table_name="reminders")
+    op.create_index(
+        "ix_reminders_unsent_send_at", "reminders", ["send_at", "id"],
+        postgresql_where=sa.text("sent = false AND failed_at IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_reminders_unsent_send_at", table_name="reminders")
+    op.create_index(
+        "ix_reminders_unsent_send_at", "reminders", ["send_at", "id"],
+        postgresql_where=sa.text("sent = false"),
+    )
+    op.drop_column("reminders", "failed_at")
+    op.drop_column("reminders", "attempts")
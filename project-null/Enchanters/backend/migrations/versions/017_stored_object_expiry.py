@@ -0,0 +1,28 @@
+"""Expiry for unshared stored objects (batch form ZIPs)
+
+Revision ID: 017_stored_object_expiry
+Revises: 016_reminder_attempts
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "017_stored_object_expiry"
+down_revision: Union[str, None] = "016_reminder_attempts"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("stored_objects", sa.Column("expires_at", sa.DateTime(timezone=True), nullable=True))
+    op.create_index(
+        "ix_stored_objects_expires_at", "stored_objects", ["expires_at"],
+        postgresql_where=sa.text("expires_at IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_stored_objects_expires_at", table_name="stored_objects")
+    op.drop_column("stored_objects", "expires_at")
@@ -0,0 +1,128 @@
+"""
+import_locations.py — Load the LGD location hierarchy (and PIN directory)
+=========================================================================
+Reads the CSV downloads from the Local Government Directory
+(https://lgdirectory.gov.in → Download Directory) and upserts them into the
+``lgd_states``, ``lgd_districts``, ``lgd_sub_districts`` and ``lgd_villages``
+tables. Location endpoints serve from these tables through the in-memory
+location directory and never call LGD at request time.
+
+Usage (from backend/ directory):
+    python -m scraper.import_locations --states states.csv --districts districts.csv \\
+        --sub-districts subdistricts.csv --villages villages.csv
+    python -m scraper.import_locations --pincodes pincode_directory.csv
+
+Files are loaded parent-first, so any subset may be given as long as the
+parents already exist. Environment: reads backend/.env automatically.
+"""
+
+import argparse
+import asyncio
+import csv
+import re
+import sys
+from pathlib import Path
+from typing import Iterator
+
+ROOT = Path(__file__).resolve().parent.parent          # backend/
+sys.path.insert(0, str(ROOT))
+
+from dotenv import load_dotenv
+load_dotenv(ROOT / ".env", override=True)
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from app.database import async_session_factory
+from app.models.location import LgdState, LgdDistrict, LgdSubDistrict, LgdVillage
+
+CHUNK_SIZE = 5000
+
+# level -> (model, parent level, parent column on the model)
+LEVELS = {
+    "state": (LgdState, None, None),
+    "district": (LgdDistrict, "state", "state_code"),
+    "subdistrict": (LgdSubDistrict, "district", "district_code"),
+    "village": (LgdVillage, "subdistrict", "sub_district_code"),
+}
+
+
+def _header_key(header: str) -> str:
+    # "Sub-District Name (In English)" -> "subdistrictnameinenglish"
+    return re.sub(r"[^a-z0-9]", "", (header or "").lower())
+
+
+def read_level(path: Path, level: str) -> Iterator[dict]:
+    """Yield table rows for one LGD level from its CSV download."""
+    _, parent, parent_column = LEVELS[level]
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        for raw in csv.DictReader(f):
+            row = {_header_key(k): (v or "").strip() for k, v in raw.items() if k}
+            code = row.get(f"{level}code", "")
+            name = row.get(f"{level}nameinenglish") or row.get(f"{level}name", "")
+            if not code.isdigit() or not name:
+                continue
+            out = {"code": int(code), "name": " ".join(name.split())}
+            if parent:
+                parent_code = row.get(f"{parent}code", "")
+                if not parent_code.isdigit():
+                    continue
+                out[parent_column] = int(parent_code)
+            yield out
+
+
+async def _upsert(db, model, rows: list[dict]) -> None:
+    stmt = pg_insert(model).values(rows)
+    update_cols = {c: stmt.excluded[c] for c in rows[0] if c != "code"}
+    await db.execute(stmt.on_conflict_do_update(index_elements=[model.code], set_=update_cols))
+
+
+async def import_level(path: Path, level: str, chunk_size: int = CHUNK_SIZE) -> int:
+    model = LEVELS[level][0]
+    total = 0
+    async with async_session_factory() as db:
+        # Keyed by code: one INSERT .. ON CONFLICT cannot touch the same row twice.
+        chunk: dict[int, dict] = {}
+        for row in read_level(path, level):
+            chunk[row["code"]] = row
+            if len(chunk) >= chunk_size:
+                await _upsert(db, model, list(chunk.values()))
+                total += len(chunk)
+                chunk = {}
+        if chunk:
+            await _upsert(db, model, list(chunk.values()))
+            total += len(chunk)
+        await db.commit()
+    return total
+
+
+async def run(paths: dict[str, Path | None], pincodes: Path | None = None) -> None:
+    for level in LEVELS:
+        path = paths.get(level)
+        if path is None:
+            continue
+        count = await import_level(path, level)
+        print(f"  OK  {LEVELS[level][0].__tablename__:<20} {count:>8} rows from {path.name}")
+
+    if pincodes is not None:
+        from scraper.prewarm_pincodes import run as prewarm_pincodes
+        await prewarm_pincodes(pincodes)
+
+    print("  Location directory reloads in each API process within LOCATION_DIRECTORY_REFRESH_SECONDS")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import LGD states/districts/sub-districts/villages and PIN codes")
+    parser.add_argument("--states", type=Path)
+    parser.add_argument("--districts", type=Path)
+    parser.add_argument("--sub-districts", type=Path)
+    parser.add_argument("--villages", type=Path)
+    parser.add_argument("--pincodes", type=Path, help="India Post All India Pincode Directory CSV")
+    args = parser.parse_args()
+    asyncio.run(run(
+        {
+            "state": args.states,
+            "district": args.districts,
+            "subdistrict": args.sub_districts,
+            "village": args.villages,
+        },
+        pincodes=args.pincodes,
+    ))
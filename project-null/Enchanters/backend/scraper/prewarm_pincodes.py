@@ -0,0 +1,160 @@
+"""
+prewarm_pincodes.py — Load the India Post PIN code directory
+============================================================
+Reads the "All India Pincode Directory" CSV published by India Post on
+data.gov.in, upserts one row per PIN into ``pin_codes`` and primes the Redis
+PIN cache, so signup and profile updates resolve locations without calling
+the India Post API.
+
+Usage (from backend/ directory):
+    python -m scraper.prewarm_pincodes path/to/pincode_directory.csv
+    python -m scraper.prewarm_pincodes directory.csv --skip-redis
+
+Environment: reads backend/.env automatically.
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent          # backend/
+sys.path.insert(0, str(ROOT))
+
+from dotenv import load_dotenv
+load_dotenv(ROOT / ".env", override=True)
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from app.database import async_session_factory
+from app.models.location import PinCode
+from app.core.constants import INDIAN_STATES, PINCODE_CACHE_TTL_SECONDS
+from app.core.otp import get_redis
+from app.external.india_post import pincode_result
+
+CHUNK_SIZE = 1000
+
+# Column names differ between releases of the directory; map them to one set.
+_COLUMN_ALIASES = {
+    "pincode": "pincode",
+    "officename": "name",
+    "officetype": "branch_type",
+    "delivery": "delivery_status",
+    "deliverystatus": "delivery_status",
+    "divisionname": "division",
+    "regionname": "region",
+    "taluk": "block",
+    "district": "district",
+    "districtname": "district",
+    "statename": "state",
+}
+
+_STATE_NAMES = {s.lower(): s for s in INDIAN_STATES}
+
+_BRANCH_TYPES = {"HO": "Head Post Office", "SO": "Sub Post Office", "BO": "Branch Office"}
+
+
+def _normalize_state(raw: str) -> str:
+    raw = " ".join(raw.replace("&", "and").split())
+    return _STATE_NAMES.get(raw.lower(), raw.title())
+
+
+def _normalize_row(row: dict) -> dict:
+    out = {}
+    for key, value in row.items():
+        field = _COLUMN_ALIASES.get((key or "").strip().lower().replace("_", ""))
+        if field:
+            out[field] = (value or "").strip()
+    return out
+
+
+def parse_directory(path: Path) -> dict[str, dict]:
+    """Group directory rows by PIN into lookup results shaped like the API's."""
+    entries: dict[str, dict] = {}
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        for raw in csv.DictReader(f):
+            row = _normalize_row(raw)
+            pincode = row.get("pincode", "")
+            if len(pincode) != 6 or not pincode.isdigit():
+                continue
+
+            entry = entries.get(pincode)
+            if entry is None:
+                entry = pincode_result(
+                    pincode,
+                    row.get("district", "").title(),
+                    _normalize_state(row.get("state", "")),
+                    [],
+                )
+                entries[pincode] = entry
+
+            branch = row.get("branch_type", "")
+            entry["post_offices"].append({
+                "name": row.get("name", "").removesuffix(" B.O").removesuffix(" S.O").removesuffix(" H.O"),
+                "branch_type": _BRANCH_TYPES.get(branch.upper().replace(".", ""), branch),
+                "delivery_status": row.get("delivery_status", "").title(),
+                "division": row.get("division", "").removesuffix(" Division"),
+                "region": row.get("region", "").removesuffix(" Region"),
+                "block": row.get("block", ""),
+            })
+    return entries
+
+
+async def _store_chunk(db, chunk: list[dict]) -> None:
+    now = datetime.now(timezone.utc)
+    stmt = pg_insert(PinCode).values([
+        {
+            "pincode": e["pincode"],
+            "district": e["district"],
+            "state": e["state"],
+            "post_offices": e["post_offices"],
+            "updated_at": now,
+        }
+        for e in chunk
+    ])
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[PinCode.pincode],
+            set_={
+                "district": stmt.excluded.district,
+                "state": stmt.excluded.state,
+                "post_offices": stmt.excluded.post_offices,
+                "updated_at": stmt.excluded.updated_at,
+            },
+        )
+    )
+
+
+async def _prime_redis(chunk: list[dict]) -> None:
+    r = await get_redis()
+    pipe = r.pipeline(transaction=False)
+    for e in chunk:
+        pipe.set(f"pincode:{e['pincode']}", json.dumps(e), ex=PINCODE_CACHE_TTL_SECONDS)
+    await pipe.execute()
+
+
+async def run(path: Path, skip_redis: bool = False, chunk_size: int = CHUNK_SIZE) -> None:
+    entries = list(parse_directory(path).values())
+    print(f"  Parsed {len(entries)} PIN codes from {path.name}")
+
+    async with async_session_factory() as db:
+        for i in range(0, len(entries), chunk_size):
+            await _store_chunk(db, entries[i:i + chunk_size])
+        await db.commit()
+    print(f"  OK  pin_codes upserted")
+
+    if not skip_redis:
+        for i in range(0, len(entries), chunk_size):
+            await _prime_redis(entries[i:i + chunk_size])
+        print(f"  OK  Redis PIN cache primed")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load the India Post PIN directory into Postgres and Redis")
+    parser.add_argument("path", type=Path, help="All India Pincode Directory CSV")
+    parser.add_argument("--skip-redis", action="store_true", help="Only load the pin_codes table")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+    asyncio.run(run(args.path, skip_redis=args.skip_redis, chunk_size=args.chunk_size))
@@ -24,7 +24,9 @@ import pytest
 from httpx import AsyncClient, ASGITransport
 
 from app.main import app
-from app.api.deps import get_db, get_current_farmer, get_current_agent
+from app.api.deps import (
+    get_db, get_current_farmer, get_current_principal, get_current_farmer_id, get_current_agent,
+)
 from app.core.security import create_access_token, create_refresh_token
 
 # ── Stable UUIDs used across the whole test session ──────────────────────────
@@ -112,6 +114,10 @@ async def _override_get_current_farmer():
     return TEST_FARMER
 
 
+async def _override_get_current_farmer_id():
+    return FARMER_UUID
+
+
 async def _override_get_current_agent():
     return TEST_AGENT
 
@@ -123,6 +129,8 @@ async def client():
     """HTTP test client with DB and auth dependencies overridden."""
     app.dependency_overrides[get_db] = _override_get_db
     app.dependency_overrides[get_current_farmer] = _override_get_current_farmer
+    app.dependency_overrides[get_current_principal] = _override_get_current_farmer
+    app.dependency_overrides[get_current_farmer_id] = _override_get_current_farmer_id
     app.dependency_overrides[get_current_agent] = _override_get_current_agent
 
     transport = ASGITransport(app=app)
@@ -136,7 +144,7 @@ async def client():
 async def unauth_client():
     """HTTP test client where ONLY get_db is overridden.
 
-    'get_current_farmer' / 'get_current_agent' are left as-is so HTTPBearer
+    The auth dependencies are left as-is so HTTPBearer
     rejects requests that arrive without a valid Authorization header (403).
     """
     app.dependency_overrides[get_db] = _override_get_db
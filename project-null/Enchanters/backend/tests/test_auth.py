@@ -1,7 +1,8 @@
 """test_auth.py — Tests for /api/v1/auth/* endpoints."""
 
+import asyncio
 import pytest
-from unittest.mock import patch, AsyncMock
+from unittest.mock import patch, AsyncMock, MagicMock
 from httpx import AsyncClient
 
 from app.core.exceptions import ConflictException, NotFoundException, BadRequestException
@@ -278,3 +279,72 @@ class TestLogout:
     async def test_logout_unauthenticated(self, unauth_client: AsyncClient):
         resp = await unauth_client.post(self.BASE)
         assert resp.status_code == 403
+
+
+# ── Principal cache ───────────────────────────────────────────────────────────
+
+class TestPrincipalCache:
+    def test_ttl_cache_expires_and_evicts_lru(self):
+        from app.core.cache import TTLCache
+
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1 and cache.get("c") == 3
+
+        with patch("app.core.cache.time.monotonic", return_value=10**9):
+            assert cache.get("a") is None
+
+    @pytest.mark.asyncio
+    async def test_principal_served_from_cache_after_first_load(self):
+        from types import SimpleNamespace
+        from unittest.mock import MagicMock
+        from app.services import principal_service
+
+        row = SimpleNamespace(
+            id=FARMER_UUID, farmer_id=FARMER_KID, name="Raju Test", phone="9876543210",
+            district="Ahmedabad", state="Gujarat", language_pref="hi",
+        )
+        db = AsyncMock()
+        db.execute.return_value = MagicMock(one_or_none=MagicMock(return_value=row))
+        redis = AsyncMock()
+        redis.get.return_value = None
+        principal_service._local.clear()
+
+        with patch.object(principal_service, "get_redis", new_callable=AsyncMock, return_value=redis):
+            first = await principal_service.get_farmer_principal(db, FARMER_UUID)
+            second = await principal_service.get_farmer_principal(db, FARMER_UUID)
+            await principal_service.invalidate_farmer_principal(FARMER_UUID)
+
+        assert first == second and first.farmer_id == FARMER_KID
+        assert db.execute.await_count == 1
+        redis.set.assert_awaited_once()
+        redis.delete.assert_awaited_once()
+        assert len(principal_service._local) == 0
+
+    @pytest.mark.asyncio
+    async def test_principal_is_dropped_only_after_commit(self):
+        from sqlalchemy.orm import Session
+        from app.schemas.farmer import FarmerPrincipal
+        from app.services import principal_service
+
+        principal = FarmerPrincipal(
+            id=FARMER_UUID, farmer_id=FARMER_KID, name="Raju Test", phone="9876543210",
+            district="Ahmedabad", state="Gujarat", language_pref="hi",
+        )
+        principal_service._local.set(FARMER_UUID, principal)
+        session = Session()
+        db = MagicMock(sync_session=session)
+        redis = AsyncMock()
+
+        with patch.object(principal_service, "get_redis", new_callable=AsyncMock, return_value=redis):
+            principal_service.invalidate_farmer_principal_after_commit(db, FARMER_UUID)
+            assert principal_service._local.get(FARMER_UUID) == principal
+            session.commit()
+            await asyncio.gather(*principal_service._tasks)
+
+        assert principal_service._local.get(FARMER_UUID) is None
+        redis.delete.assert_awaited_once()
@@ -0,0 +1,221 @@
+"""test_external.py — Tests for app/external/* integration plumbing (no network)."""
+
+import asyncio
+import threading
+import time
+from unittest.mock import MagicMock, patch
+import pytest
+
+from app.external import http, storage
+
+
+class TestHttpClientRegistry:
+    @pytest.mark.asyncio
+    async def test_client_is_reused_within_a_loop(self):
+        first = http.get_client("india_post")
+        assert http.get_client("india_post") is first
+        assert http.get_client("msg91") is not first
+        await http.close_http_clients()
+        assert first.is_closed
+        assert http.get_client("india_post") is not first
+        await http.close_http_clients()
+
+    def test_each_event_loop_gets_its_own_client(self):
+        async def _get():
+            client = http.get_client("pmfby")
+            await http.close_http_clients()
+            return client
+
+        a = asyncio.run(_get())
+        b = asyncio.run(_get())
+        assert a is not b
+        assert a.is_closed and b.is_closed
+
+    def test_per_upstream_timeouts(self):
+        for name, (timeout, _, _) in http.UPSTREAMS.items():
+            assert http._build_client(name).timeout.read == timeout
+
+
+class TestSingleFlight:
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_calls_share_one_request(self):
+        from app.external.singleflight import SingleFlight, SINGLEFLIGHT_CALLS
+
+        flight = SingleFlight("test-share")
+        calls = 0
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {"ok": True}
+
+        results = await asyncio.gather(*(flight.do("k", fetch) for _ in range(5)))
+        assert calls == 1
+        assert all(r == {"ok": True} for r in results)
+        assert SINGLEFLIGHT_CALLS.value(group="test-share", role="coalesced") == 4
+        assert flight.in_flight() == 0
+
+        await flight.do("k", fetch)
+        assert calls == 2
+
+    @pytest.mark.asyncio
+    async def test_errors_reach_every_waiter(self):
+        from app.external.singleflight import SingleFlight
+
+        flight = SingleFlight("test-error")
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("upstream down")
+
+        results = await asyncio.gather(flight.do("k", fail), flight.do("k", fail), return_exceptions=True)
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+    @pytest.mark.asyncio
+    async def test_cancelled_leader_does_not_cancel_followers(self):
+        from app.external.singleflight import SingleFlight
+
+        flight = SingleFlight("test-cancel")
+
+        async def fetch():
+            await asyncio.sleep(0.02)
+            return 42
+
+        leader = asyncio.create_task(flight.do("k", fetch))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flight.do("k", fetch))
+        await asyncio.sleep(0)
+        leader.cancel()
+        assert await follower == 42
+
+    @pytest.mark.asyncio
+    async def test_pincode_misses_are_coalesced(self):
+        from unittest.mock import AsyncMock, patch
+        from app.external import india_post
+
+        india_post.PINCODE_CACHE.clear()
+        redis = AsyncMock()
+        redis.get.return_value = None
+        result = {"pincode": "411001", "district": "Pune", "state": "Maharashtra",
+                  "country": "India", "post_offices": []}
+
+        async def slow_fetch(pincode):
+            await asyncio.sleep(0.01)
+            return result
+
+        with patch.object(india_post, "get_redis", new_callable=AsyncMock, return_value=redis), \
+             patch.object(india_post, "_fetch_pincode", side_effect=slow_fetch) as fetch:
+            results = await asyncio.gather(*(india_post.lookup_pincode("411001") for _ in range(10)))
+
+        assert fetch.call_count == 1
+        assert all(r["district"] == "Pune" for r in results)
+
+
+class TestMetrics:
+    def test_render_prometheus_text(self):
+        from app.core.metrics import counter, render_metrics
+
+        c = counter("kisaanseva_test_events_total", "Test events", ("kind",))
+        c.inc(kind='a"b')
+        c.inc(2, kind="plain")
+        text = render_metrics()
+        assert "# TYPE kisaanseva_test_events_total counter" in text
+        assert 'kisaanseva_test_events_total{kind="a\\"b"} 1' in text
+        assert 'kisaanseva_test_events_total{kind="plain"} 2' in text
+        assert counter("kisaanseva_test_events_total", "Test events", ("kind",)) is c
+
+
+class TestCircuitBreaker:
+    @staticmethod
+    def _redis():
+        from unittest.mock import AsyncMock
+
+        redis = AsyncMock()
+        redis.get.return_value = None
+        return redis
+
+    @pytest.mark.asyncio
+    async def test_opens_after_consecutive_failures_then_probes(self):
+        from unittest.mock import AsyncMock, patch
+        from app.external import circuit_breaker
+        from app.external.circuit_breaker import CircuitBreaker, CLOSED, OPEN, HALF_OPEN
+
+        redis = self._redis()
+        with patch.object(circuit_breaker, "get_redis", new_callable=AsyncMock, return_value=redis):
+            breaker = CircuitBreaker("test-upstream", failure_threshold=2, reset_seconds=30)
+            await breaker.record_failure()
+            assert breaker.state == CLOSED and await breaker.allow()
+            await breaker.record_failure()
+            assert breaker.state == OPEN
+            assert not await breaker.allow()
+            redis.set.assert_awaited_once()
+
+            with patch.object(circuit_breaker.time, "monotonic", return_value=circuit_breaker.time.monotonic() + 31):
+                breaker._shared_checked_at = float("-inf")
+                assert breaker.state == HALF_OPEN
+                assert await breaker.allow()          # the single probe
+                assert not await breaker.allow()
+                await breaker.record_success()
+            assert breaker.state == CLOSED
+            redis.delete.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_open_state_is_shared_through_redis(self):
+        import time
+        from unittest.mock import AsyncMock, patch
+        from app.external import circuit_breaker
+        from app.external.circuit_breaker import CircuitBreaker, OPEN
+
+        redis = self._redis()
+        redis.get.return_value = str(time.time() + 20)
+        with patch.object(circuit_breaker, "get_redis", new_callable=AsyncMock, return_value=redis):
+            breaker = CircuitBreaker("test-shared")
+            assert not await breaker.allow()
+        assert breaker.state == OPEN
+
+    @pytest.mark.asyncio
+    async def test_failed_rate_download_opens_pmfby_circuit(self):
+        from unittest.mock import AsyncMock, MagicMock, patch
+        import httpx
+        from app.external import pmfby
+
+        client = MagicMock()
+        client.get = AsyncMock(side_effect=httpx.ConnectError("down"))
+        with patch.object(pmfby, "get_client", return_value=client), \
+             patch.object(pmfby.breaker, "trip", new_callable=AsyncMock) as trip:
+            assert await pmfby.fetch_rate_notifications("kharif", 2026) is None
+        trip.assert_awaited_once()
+
+
+class TestObjectStorage:
+    def test_client_is_shared(self):
+        with patch.object(storage, "_client", None):
+            assert storage.get_s3_client() is storage.get_s3_client()
+
+    @pytest.mark.asyncio
+    async def test_upload_runs_off_the_event_loop(self):
+        s3 = MagicMock()
+        upload_threads = []
+
+        def slow_put(**kwargs):
+            upload_threads.append(threading.current_thread())
+            time.sleep(0.2)
+
+        s3.put_object.side_effect = slow_put
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        with patch.object(storage, "get_s3_client", return_value=s3):
+            task = asyncio.create_task(ticker())
+            await storage.put_object("documents/x.pdf", b"%PDF", "application/pdf")
+            task.cancel()
+
+        assert upload_threads[0] is not threading.current_thread()
+        assert ticks >= 5
+        assert s3.put_object.call_args.kwargs["Key"] == "documents/x.pdf"
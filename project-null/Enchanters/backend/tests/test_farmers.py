@@ -1,12 +1,20 @@
 """test_farmers.py — Tests for /api/v1/farmers/* endpoints."""
 
+import hashlib
+import io
 import uuid
 import pytest
+from fastapi import UploadFile
 from unittest.mock import patch, AsyncMock, MagicMock
 from httpx import AsyncClient
 from datetime import datetime, timezone
 
-from app.core.exceptions import NotFoundException
+from app.core.constants import DocType
+from app.core.exceptions import NotFoundException, InvalidFileException
+from app.external import storage
+from app.models.farmer import FarmerDocument
+from app.models.storage import StoredObject
+from app.services import document_service, content_store
 from tests.conftest import FARMER_UUID, FARMER_KID
 
 
@@ -288,13 +296,15 @@ class TestDocuments:
         with patch(
             "app.api.v1.farmers.farmer_service.delete_document",
             new_callable=AsyncMock,
-            return_value={"message": "Document deleted"},
-        ):
+            return_value=["documents/a.jpg"],
+        ), patch("app.api.v1.farmers.content_store.delete_objects", new_callable=AsyncMock) as delete:
             resp = await client.delete(
                 f"{self.LIST_URL}/{self.DOC_ID}",
                 headers=auth_headers,
             )
         assert resp.status_code == 200
+        assert resp.json() == {"message": "Document deleted"}
+        delete.assert_awaited_once_with(["documents/a.jpg"])
 
     @pytest.mark.asyncio
     async def test_delete_document_not_found(self, client: AsyncClient, auth_headers: dict):
@@ -310,6 +320,252 @@ class TestDocuments:
         assert resp.status_code == 404
 
 
+def _register_new(db, content_hash, file_key, content_type, size_bytes):
+    return StoredObject(
+        content_hash=content_hash, file_key=file_key, content_type=content_type,
+        size_bytes=size_bytes, ref_count=1,
+    )
+
+
+@pytest.fixture
+def new_content():
+    with patch.object(content_store, "register", AsyncMock(side_effect=_register_new)):
+        yield
+
+
+@pytest.mark.usefixtures("new_content")
+class TestDocumentUpload:
+    @staticmethod
+    def _db():
+        db = MagicMock()
+        db.flush = AsyncMock()
+        db.refresh = AsyncMock()
+        return db
+
+    @staticmethod
+    def _s3():
+        s3 = MagicMock()
+        s3.create_multipart_upload.return_value = {"UploadId": "up-1"}
+        s3.upload_part.side_effect = lambda **kw: {"ETag": f"etag-{kw['PartNumber']}"}
+        return s3
+
+    @pytest.mark.asyncio
+    async def test_small_upload_is_a_single_put(self):
+        content = b"%PDF-1.4 small"
+        s3 = self._s3()
+        with patch.object(storage, "get_s3_client", return_value=s3):
+            doc = await document_service.upload_document(
+                self._db(), FARMER_UUID, FARMER_KID, DocType.AADHAAR,
+                UploadFile(io.BytesIO(content), filename="aadhaar.pdf"),
+            )
+        s3.put_object.assert_called_once()
+        assert s3.put_object.call_args.kwargs["ContentType"] == "application/pdf"
+        s3.create_multipart_upload.assert_not_called()
+        assert doc.size_bytes == len(content)
+        assert doc.checksum_sha256 == hashlib.sha256(content).hexdigest()
+
+    @pytest.mark.asyncio
+    async def test_large_upload_streams_multipart(self):
+        content = b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * 400  # ~100 KB
+        s3 = self._s3()
+        with patch.object(storage, "get_s3_client", return_value=s3), \
+             patch.object(document_service, "UPLOAD_READ_CHUNK_BYTES", 8 * 1024), \
+             patch.object(storage, "S3_MULTIPART_PART_BYTES", 32 * 1024):
+            doc = await document_service.upload_document(
+                self._db(), FARMER_UUID, FARMER_KID, DocType.LAND_PROOF,
+                UploadFile(io.BytesIO(content), filename="khatauni.png"),
+            )
+        s3.put_object.assert_not_called()
+        assert s3.upload_part.call_count == 4
+        sent = b"".join(c.kwargs["Body"] for c in s3.upload_part.call_args_list)
+        assert sent == content
+        parts = s3.complete_multipart_upload.call_args.kwargs["MultipartUpload"]["Parts"]
+        assert [p["PartNumber"] for p in parts] == [1, 2, 3, 4]
+        assert doc.checksum_sha256 == hashlib.sha256(content).hexdigest()
+
+    @pytest.mark.asyncio
+    async def test_oversized_upload_is_rejected_before_it_is_read(self):
+        body = io.BytesIO(b"%PDF-" + b"0" * (6 * 1024 * 1024))
+        s3 = self._s3()
+        with patch.object(storage, "get_s3_client", return_value=s3), \
+             patch.object(storage, "S3_MULTIPART_PART_BYTES", 1024 * 1024):
+            with pytest.raises(InvalidFileException, match="too large"):
+                await document_service.upload_document(
+                    self._db(), FARMER_UUID, FARMER_KID, DocType.AADHAAR,
+                    UploadFile(body, filename="aadhaar.pdf"),
+                )
+        assert body.tell() < len(body.getvalue())
+        s3.abort_multipart_upload.assert_called_once()
+        s3.complete_multipart_upload.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_content_must_match_extension(self):
+        s3 = self._s3()
+        with patch.object(storage, "get_s3_client", return_value=s3):
+            with pytest.raises(InvalidFileException, match="does not match"):
+                await document_service.upload_document(
+                    self._db(), FARMER_UUID, FARMER_KID, DocType.PHOTO,
+                    UploadFile(io.BytesIO(b"MZ\x90\x00 not a jpeg"), filename="photo.jpg"),
+                )
+        s3.put_object.assert_not_called()
+
+
+class TestContentDeduplication:
+    @pytest.mark.asyncio
+    async def test_duplicate_upload_reuses_stored_object(self):
+        existing = StoredObject(
+            content_hash="h", file_key="documents/KS/aadhaar/first.jpg",
+            thumbnail_key="documents/KS/aadhaar/first.thumb.jpg", content_type="image/jpeg",
+            size_bytes=900, ref_count=2,
+        )
+        db = TestDocumentUpload._db()
+        with patch.object(storage, "get_s3_client", return_value=TestDocumentUpload._s3()), \
+             patch.object(content_store, "register", AsyncMock(return_value=existing)), \
+             patch.object(storage, "delete_object", AsyncMock()) as delete:
+            doc = await document_service.upload_document(
+                db, FARMER_UUID, FARMER_KID, DocType.AADHAAR,
+                UploadFile(io.BytesIO(b"\xff\xd8\xff same photo"), filename="aadhaar.jpg"),
+            )
+        uploaded_key = delete.call_args.args[0]
+        assert uploaded_key.startswith(f"documents/{FARMER_KID}/aadhaar/")
+        assert doc.file_key == "documents/KS/aadhaar/first.jpg"
+        assert doc.thumbnail_key == "documents/KS/aadhaar/first.thumb.jpg"
+        assert doc.processed_at is not None
+
+    @pytest.mark.asyncio
+    async def test_same_bytes_from_two_farmers_are_stored_separately(self):
+        other_farmer = uuid.uuid4()
+        hashes = []
+        for farmer_uuid in (FARMER_UUID, other_farmer):
+            register = AsyncMock(side_effect=lambda db, h, key, *a: StoredObject(
+                content_hash=h, file_key=key, content_type="image/jpeg", size_bytes=10, ref_count=1,
+            ))
+            with patch.object(storage, "get_s3_client", return_value=TestDocumentUpload._s3()), \
+                 patch.object(content_store, "register", register):
+                doc = await document_service.upload_document(
+                    TestDocumentUpload._db(), farmer_uuid, FARMER_KID, DocType.AADHAAR,
+                    UploadFile(io.BytesIO(b"\xff\xd8\xff same photo"), filename="aadhaar.jpg"),
+                )
+            hashes.append(register.call_args.args[1])
+            assert hashes[-1] == content_store.document_object_hash(farmer_uuid, doc.checksum_sha256)
+        assert hashes[0] != hashes[1]
+
+    @pytest.mark.asyncio
+    async def test_release_falls_back_to_legacy_shared_object(self):
+        with patch.object(content_store, "get", AsyncMock(return_value=None)), \
+             patch.object(content_store, "release", AsyncMock(return_value=[])) as release:
+            await content_store.release_document(MagicMock(), FARMER_UUID, "h")
+        release.assert_awaited_once()
+        assert release.call_args.args[1] == "h"
+
+    @pytest.mark.asyncio
+    async def test_deleting_last_reference_removes_objects(self):
+        from app.services import farmer_service
+        doc = FarmerDocument(id=uuid.uuid4(), farmer_id=FARMER_UUID, checksum_sha256="h")
+        result = MagicMock()
+        result.scalar_one_or_none.return_value = doc
+        db = MagicMock()
+        db.execute = AsyncMock(return_value=result)
+        db.delete = AsyncMock()
+        db.flush = AsyncMock()
+        db.commit = AsyncMock()
+        with patch.object(content_store, "release", AsyncMock(return_value=["a.jpg", "a.thumb.jpg"])), \
+             patch.object(storage, "delete_object", AsyncMock()) as delete:
+            unreferenced = await farmer_service.delete_document(db, FARMER_UUID, doc.id)
+        assert unreferenced == ["a.jpg", "a.thumb.jpg"]
+        db.commit.assert_not_called()  # get_db commits; the router deletes the objects afterwards
+        delete.assert_not_called()
+
+    def test_form_hash_ignores_key_order(self):
+        a = content_store.form_content_hash("scheme", farmer={"name": "Raju", "district": "Pune"}, scheme={"x": 1})
+        b = content_store.form_content_hash("scheme", scheme={"x": 1}, farmer={"district": "Pune", "name": "Raju"})
+        c = content_store.form_content_hash("scheme", farmer={"name": "Raju", "district": "Nashik"}, scheme={"x": 1})
+        assert a == b != c
+
+    @pytest.mark.asyncio
+    async def test_register_is_an_upsert_that_counts_references(self):
+        from sqlalchemy.dialects import postgresql
+        db = MagicMock()
+        db.execute = AsyncMock(return_value=MagicMock())
+        await content_store.register(db, "h", "k", "application/pdf", 10)
+        sql = str(db.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+        assert "ON CONFLICT (content_hash) DO UPDATE" in sql
+        assert "ref_count = (stored_objects.ref_count +" in sql
+
+
+class TestDocumentImages:
+    @staticmethod
+    def _photo(size=(600, 800)) -> bytes:
+        from PIL import Image
+        import random
+        rnd = random.Random(1)
+        img = Image.new("RGB", size)
+        img.putdata([(rnd.randrange(256), 120, 60) for _ in range(size[0] * size[1])])
+        out = io.BytesIO()
+        img.save(out, format="PNG")
+        return out.getvalue()
+
+    def test_compress_image_bounds_resolution(self):
+        from PIL import Image
+        from app.core.image_processing import compress_image
+        with patch("app.core.image_processing.DOC_IMAGE_MAX_DIMENSION", 400):
+            compressed, thumbnail = compress_image(self._photo())
+        img = Image.open(io.BytesIO(compressed))
+        assert img.format == "JPEG" and max(img.size) == 400
+        assert max(Image.open(io.BytesIO(thumbnail)).size) == 320
+
+    @pytest.mark.asyncio
+    async def test_process_replaces_original_with_smaller_copy(self):
+        original = self._photo()
+        doc = FarmerDocument(
+            id=uuid.uuid4(), farmer_id=FARMER_UUID, doc_type=DocType.LAND_PROOF,
+            file_key="documents/KS/land_proof/abc.png", file_name="land.png", size_bytes=len(original),
+        )
+        db = MagicMock()
+        db.get = AsyncMock(return_value=doc)
+        db.commit = AsyncMock()
+        with patch.object(storage, "get_object", AsyncMock(return_value=original)), \
+             patch.object(storage, "put_object", AsyncMock()) as put, \
+             patch.object(storage, "delete_object", AsyncMock()) as delete:
+            result = await document_service.process_document_image(db, doc.id)
+
+        assert result is doc
+        assert {c.args[0] for c in put.call_args_list} == {
+            "documents/KS/land_proof/abc.thumb.jpg", "documents/KS/land_proof/abc.web.jpg",
+        }
+        assert doc.file_key == "documents/KS/land_proof/abc.web.jpg"
+        assert doc.thumbnail_key == "documents/KS/land_proof/abc.thumb.jpg"
+        assert doc.compressed_size_bytes < doc.size_bytes
+        assert doc.processed_at is not None
+        delete.assert_awaited_once_with("documents/KS/land_proof/abc.png")
+
+    @pytest.mark.asyncio
+    async def test_pdfs_are_not_processed(self):
+        doc = FarmerDocument(id=uuid.uuid4(), file_key="documents/KS/aadhaar/a.pdf")
+        db = MagicMock()
+        db.get = AsyncMock(return_value=doc)
+        with patch.object(storage, "get_object", AsyncMock()) as get:
+            assert await document_service.process_document_image(db, doc.id) is None
+        get.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_photo_upload_queues_processing(self, client: AsyncClient, auth_headers: dict):
+        doc = FarmerDocument(
+            id=uuid.uuid4(), doc_type=DocType.PHOTO, file_key="documents/KS/photo/p.jpg",
+            file_name="p.jpg", uploaded_at=datetime.now(timezone.utc), verified=False,
+        )
+        with patch("app.api.v1.farmers.upload_document", new_callable=AsyncMock, return_value=doc), \
+             patch("app.tasks.document_tasks.process_document_image.delay") as delay:
+            resp = await client.post(
+                "/api/v1/farmers/me/documents",
+                data={"doc_type": "photo"},
+                files={"file": ("p.jpg", b"\xff\xd8\xff", "image/jpeg")},
+                headers=auth_headers,
+            )
+        assert resp.status_code == 201
+        delay.assert_called_once_with(str(doc.id))
+
+
 # ── GET /me/access-log ────────────────────────────────────────────────────────
 
 class TestAccessLog:
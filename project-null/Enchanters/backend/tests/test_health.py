@@ -15,3 +15,11 @@ async def test_health_endpoint(client: AsyncClient):
 async def test_docs_available(client: AsyncClient):
     response = await client.get("/docs")
     assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint(client: AsyncClient):
+    response = await client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "kisaanseva_singleflight_calls_total" in response.text
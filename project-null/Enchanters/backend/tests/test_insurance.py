@@ -211,3 +211,95 @@ class TestGenerateInsuranceForm:
         ):
             resp = await client.post(self.url(), headers=auth_headers)
         assert resp.status_code == 404
+
+
+# ── Synced PMFBY rate snapshot ───────────────────────────────────────────────
+
+class TestRateSnapshot:
+    @staticmethod
+    def _rate(state, district, crop="Wheat", season="rabi", year=2025, si=40000, farmer=1.5, actuarial=6.5):
+        from types import SimpleNamespace
+
+        return SimpleNamespace(
+            season=season, year=year, state=state, district=district, crop=crop,
+            sum_insured_per_hectare=si, farmer_premium_rate=farmer, actuarial_rate=actuarial,
+            insurance_company="SBI General Insurance",
+        )
+
+    def test_lookup_disambiguates_shared_district_names(self):
+        from app.services.insurance_rates import RateSnapshot
+
+        snapshot = RateSnapshot([
+            self._rate("Bihar", "Aurangabad", si=30000),
+            self._rate("Maharashtra", "Aurangabad", si=45000),
+            self._rate("Uttar Pradesh", "Agra"),
+        ])
+        assert snapshot.lookup("wheat", "rabi", " agra ").state == "Uttar Pradesh"
+        assert snapshot.lookup("wheat", "rabi", "Aurangabad") is None
+        assert snapshot.lookup("wheat", "rabi", "Aurangabad", "maharashtra").sum_insured_per_hectare == 45000
+        assert snapshot.lookup("wheat", "kharif", "Agra") is None
+        assert snapshot.versions == {"rabi": 2025}
+
+    @pytest.mark.asyncio
+    async def test_premium_uses_notified_rate_without_calling_pmfby(self):
+        from app.services import insurance_service
+        from app.services.insurance_rates import RateSnapshot
+
+        snapshot = RateSnapshot([self._rate("Uttar Pradesh", "Agra")])
+        with patch.object(insurance_service, "get_rate_snapshot", new_callable=AsyncMock, return_value=snapshot):
+            notified = await insurance_service.calculate_premium("wheat", "rabi", "Agra", 1, "hectare")
+            fallback = await insurance_service.calculate_premium("wheat", "rabi", "Pune", 1, "hectare")
+
+        assert notified["source"] == "pmfby_rates"
+        assert notified["sum_insured"] == 40000.0
+        assert notified["farmer_premium"] == 600.0
+        assert notified["govt_subsidy"] == 2000.0
+        assert fallback["source"] == "local_calculation"
+
+    def test_partial_notification_falls_back_to_standard_subsidy_and_insurer(self):
+        from app.external.pmfby import assign_company, calculate_premium_local
+        from app.services.insurance_rates import RateSnapshot, premium_from_notified_rate
+
+        partial = self._rate("Uttar Pradesh", "Agra", si=30000, actuarial=None)
+        partial.insurance_company = None
+        rate = RateSnapshot([partial]).lookup("wheat", "rabi", "Agra")
+        premium = premium_from_notified_rate(rate, "wheat", "rabi", "Agra", 1.0)
+        local = calculate_premium_local("wheat", "rabi", "Agra", 1.0)
+
+        assert premium["sum_insured"] == 30000.0
+        assert premium["govt_subsidy"] == pytest.approx(local["govt_subsidy"] * 30000 / local["sum_insured"])
+        assert premium["govt_subsidy"] > 0
+        assert premium["insurance_company"] == assign_company("wheat", "rabi", "Agra")
+
+    @pytest.mark.asyncio
+    async def test_sync_keeps_previous_rates_when_download_fails(self):
+        from app.services import insurance_rates
+
+        db = AsyncMock()
+        with patch.object(insurance_rates, "fetch_rate_notifications", new_callable=AsyncMock, return_value=None):
+            assert await insurance_rates.sync_season_rates(db, "rabi", 2025) is None
+        db.execute.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_sync_replaces_season_and_skips_bad_rows(self):
+        from app.services import insurance_rates
+
+        rates = [
+            {"state": "Uttar Pradesh", "district": "Agra", "crop": "Wheat", "sum_insured_per_hectare": "40000",
+             "farmer_premium_rate": 1.5, "actuarial_rate": 6.5, "insurance_company": "SBI General Insurance"},
+            {"state": "Uttar Pradesh", "district": "Agra", "crop": "Mustard", "sum_insured_per_hectare": "n/a",
+             "farmer_premium_rate": 1.5, "actuarial_rate": None, "insurance_company": None},
+        ]
+        db = AsyncMock(add_all=MagicMock())
+        with patch.object(insurance_rates, "fetch_rate_notifications", new_callable=AsyncMock, return_value=rates):
+            assert await insurance_rates.sync_season_rates(db, "rabi", 2025) == 1
+        db.execute.assert_awaited_once()  # delete of the previous rabi 2025 set
+        stored = list(db.add_all.call_args[0][0])
+        assert [(r.district, r.crop) for r in stored] == [("Agra", "Wheat")]
+
+    def test_current_seasons_labels_rabi_by_sowing_year(self):
+        from datetime import date
+        from app.services.insurance_rates import current_seasons
+
+        assert ("rabi", 2025) in current_seasons(date(2026, 3, 1))
+        assert ("rabi", 2026) in current_seasons(date(2026, 10, 1))
@@ -156,3 +156,183 @@ class TestListDistricts:
         assert resp.status_code == 200
         data = resp.json()
         assert "Pune" in data["districts"]
+
+
+# ── PIN code cache tiers ──────────────────────────────────────────────────────
+
+class TestPincodeCache:
+    RESULT = {
+        "pincode": "380001", "district": "Ahmedabad", "state": "Gujarat",
+        "country": "India", "post_offices": [],
+    }
+
+    @pytest.mark.asyncio
+    async def test_api_result_is_cached_and_reused(self):
+        from app.external import india_post
+
+        india_post.PINCODE_CACHE.clear()
+        redis = AsyncMock()
+        redis.get.return_value = None
+        with patch.object(india_post, "get_redis", new_callable=AsyncMock, return_value=redis), \
+             patch.object(india_post, "_fetch_pincode", new_callable=AsyncMock, return_value=self.RESULT) as fetch:
+            first = await india_post.lookup_pincode("380001")
+            second = await india_post.lookup_pincode("380001")
+
+        assert first == second == self.RESULT
+        fetch.assert_awaited_once()
+        assert redis.set.call_args.kwargs["ex"] == india_post.PINCODE_CACHE_TTL_SECONDS
+
+    @pytest.mark.asyncio
+    async def test_unknown_pin_is_negatively_cached(self):
+        from app.external import india_post
+
+        india_post.PINCODE_CACHE.clear()
+        redis = AsyncMock()
+        redis.get.return_value = None
+        with patch.object(india_post, "get_redis", new_callable=AsyncMock, return_value=redis), \
+             patch.object(india_post, "_fetch_pincode", new_callable=AsyncMock, return_value=None) as fetch:
+            result = await india_post.lookup_pincode("380999")
+            await india_post.lookup_pincode("380999")
+
+        assert result["state"] == "Gujarat" and result["district"] == ""
+        fetch.assert_awaited_once()
+        assert redis.set.call_args.kwargs["ex"] == india_post.PINCODE_NEGATIVE_CACHE_TTL_SECONDS
+
+    @pytest.mark.asyncio
+    async def test_directory_table_is_used_before_api(self):
+        from types import SimpleNamespace
+        from app.external import india_post
+
+        india_post.PINCODE_CACHE.clear()
+        row = SimpleNamespace(pincode="413501", district="Solapur", state="Maharashtra", post_offices=[])
+        db = AsyncMock()
+        db.get.return_value = row
+        with patch.object(india_post, "get_redis", new_callable=AsyncMock, side_effect=ConnectionError("down")), \
+             patch.object(india_post, "_fetch_pincode", new_callable=AsyncMock) as fetch:
+            result = await india_post.lookup_pincode("413501", db)
+
+        assert result["district"] == "Solapur"
+        fetch.assert_not_called()
+
+    def test_parse_directory_groups_offices_by_pin(self, tmp_path):
+        from scraper.prewarm_pincodes import parse_directory
+
+        csv_file = tmp_path / "pincodes.csv"
+        csv_file.write_text(
+            "circlename,regionname,divisionname,officename,pincode,officetype,delivery,district,statename\n"
+            "Gujarat Circle,Ahmedabad HQ Region,Ahmedabad City Division,Ahmedabad GPO,380001,HO,Delivery,AHMEDABAD,GUJARAT\n"
+            "Gujarat Circle,Ahmedabad HQ Region,Ahmedabad City Division,Relief Road S.O,380001,SO,Delivery,AHMEDABAD,GUJARAT\n"
+            "J&K Circle,Jammu Region,Jammu Division,Gandhinagar S.O,180004,SO,Delivery,JAMMU,JAMMU & KASHMIR\n"
+            "bad,row,,,12,,,,\n",
+            encoding="utf-8",
+        )
+        entries = parse_directory(csv_file)
+
+        assert set(entries) == {"380001", "180004"}
+        assert entries["380001"]["district"] == "Ahmedabad"
+        assert entries["380001"]["state"] == "Gujarat"
+        assert len(entries["380001"]["post_offices"]) == 2
+        assert entries["380001"]["post_offices"][1]["name"] == "Relief Road"
+        assert entries["180004"]["state"] == "Jammu and Kashmir"
+
+
+# ── Location directory / autocomplete ─────────────────────────────────────────
+
+class TestLocationDirectory:
+    @staticmethod
+    def _directory():
+        from app.services.location_directory import LocationDirectory, LocationEntry
+
+        return LocationDirectory(
+            states=[LocationEntry("state", 24, "Gujarat"), LocationEntry("state", 27, "Maharashtra")],
+            districts=[
+                LocationEntry("district", 438, "Ahmedabad", state="Gujarat"),
+                LocationEntry("district", 474, "Ahmednagar", state="Maharashtra"),
+                LocationEntry("district", 490, "Pune", state="Maharashtra"),
+            ],
+            sub_districts=[
+                LocationEntry("sub_district", 3801, "Ahmedabad City", state="Gujarat", district="Ahmedabad"),
+                LocationEntry("sub_district", 4202, "Haveli", state="Maharashtra", district="Pune"),
+            ],
+            pins=[
+                ("380001", "Ahmedabad", "Gujarat"),
+                ("380009", "Ahmedabad", "Gujarat"),
+                ("411001", "Pune", "Maharashtra"),
+            ],
+            source="test",
+        )
+
+    def test_prefix_search_orders_by_name_then_level(self):
+        results = self._directory().search("ahm")
+        assert [(e.name, e.level) for e in results] == [
+            ("Ahmedabad", "district"), ("Ahmedabad City", "sub_district"), ("Ahmednagar", "district"),
+        ]
+
+    def test_search_filters_by_level_and_state(self):
+        directory = self._directory()
+        assert [e.name for e in directory.search("ahm", state="maharashtra")] == ["Ahmednagar"]
+        assert [e.name for e in directory.search("ahm", level="sub_district")] == ["Ahmedabad City"]
+        assert directory.search("   ") == []
+
+    def test_districts_and_sub_districts_by_name(self):
+        directory = self._directory()
+        assert directory.districts("maharashtra") == ["Ahmednagar", "Pune"]
+        assert [e.code for e in directory.sub_districts("Maharashtra", "pune")] == [4202]
+
+    def test_pin_prefix_search_and_location(self):
+        directory = self._directory()
+        assert [p["pincode"] for p in directory.pins_with_prefix("3800")] == ["380001", "380009"]
+        assert directory.locate_pin("411001") == ("Pune", "Maharashtra")
+        # Unknown PIN placed by its nearest unambiguous prefix.
+        assert directory.locate_pin("380015") == ("Ahmedabad", "Gujarat")
+        assert directory.locate_pin("999999") is None
+
+    def test_read_lgd_csv_level(self, tmp_path):
+        from scraper.import_locations import read_level
+
+        csv_file = tmp_path / "subdistricts.csv"
+        csv_file.write_text(
+            "S.No.,State Code,District Code,District Name (In English),Sub-District Code,Sub-District Name (In English)\n"
+            "1,27,490,Pune,4202,  Haveli \n"
+            "2,27,490,Pune,,Missing code\n",
+            encoding="utf-8",
+        )
+        rows = list(read_level(csv_file, "subdistrict"))
+        assert rows == [{"code": 4202, "name": "Haveli", "district_code": 490}]
+
+
+class TestLocationSearchEndpoints:
+    @pytest.mark.asyncio
+    async def test_search_locations(self, client: AsyncClient):
+        results = [{"level": "district", "code": 490, "name": "Pune", "state": "Maharashtra",
+                    "district": None, "sub_district": None}]
+        with patch(
+            "app.services.location_service.search_locations",
+            new_callable=AsyncMock,
+            return_value=results,
+        ) as search:
+            resp = await client.get("/api/v1/location/search", params={"q": "pu", "level": "district"})
+        assert resp.status_code == 200
+        assert resp.json()["results"][0]["name"] == "Pune"
+        assert search.call_args[0][1:3] == ("pu", "district")
+
+    @pytest.mark.asyncio
+    async def test_search_rejects_unknown_level(self, client: AsyncClient):
+        resp = await client.get("/api/v1/location/search", params={"q": "pu", "level": "country"})
+        assert resp.status_code == 422
+
+    @pytest.mark.asyncio
+    async def test_pin_prefix_search(self, client: AsyncClient):
+        with patch(
+            "app.services.location_service.search_pins",
+            new_callable=AsyncMock,
+            return_value=[{"pincode": "411001", "district": "Pune", "state": "Maharashtra"}],
+        ):
+            resp = await client.get("/api/v1/location/pins", params={"prefix": "411"})
+        assert resp.status_code == 200
+        assert resp.json()["results"][0]["pincode"] == "411001"
+
+    @pytest.mark.asyncio
+    async def test_pin_prefix_must_be_digits(self, client: AsyncClient):
+        resp = await client.get("/api/v1/location/pins", params={"prefix": "41a"})
+        assert resp.status_code == 422
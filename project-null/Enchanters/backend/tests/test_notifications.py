@@ -0,0 +1,349 @@
+"""test_notifications.py — Tests for reminder dispatch and notification delivery."""
+
+import asyncio
+import uuid
+import pytest
+from datetime import date, datetime, timedelta, timezone
+from unittest.mock import patch, AsyncMock, MagicMock
+from app.core.constants import ReminderType, ReminderChannel
+
+
+def _reminder_row(channel=ReminderChannel.SMS, email="raju@test.com"):
+    return MagicMock(
+        id=uuid.uuid4(), type=ReminderType.SCHEME, remind_date=date(2026, 6, 1),
+        send_at=datetime(2026, 6, 1, 5, 30, tzinfo=timezone.utc),
+        channel=channel, phone="9876543210", email=email, attempts=0,
+    )
+
+
+NOW = datetime(2026, 6, 1, 8, 0, tzinfo=timezone.utc)
+
+
+class TestReminderDispatch:
+    def test_slots_spread_farmers_over_the_delivery_window(self):
+        from app.services.notification_service import IST, reminder_send_at
+        slots = {reminder_send_at(date(2026, 6, 1), uuid.uuid4()) for _ in range(500)}
+        hours = {s.astimezone(IST).hour for s in slots}
+        assert hours == set(range(9, 20))
+        assert all(s.astimezone(IST).date() == date(2026, 6, 1) and s.minute % 30 == 0 for s in slots)
+        farmer = uuid.uuid4()
+        assert reminder_send_at(date(2026, 6, 1), farmer) == reminder_send_at(date(2026, 6, 1), farmer)
+
+    def test_due_query_skips_locked_rows(self):
+        from sqlalchemy.dialects import postgresql
+        from app.services import notification_service
+        db = MagicMock(execute=AsyncMock(return_value=MagicMock(all=MagicMock(return_value=[]))))
+        asyncio.run(notification_service.lock_due_reminders(db, NOW, "sms", (NOW, uuid.uuid4())))
+        sql = str(db.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+        assert "JOIN farmers" in sql
+        assert "FOR UPDATE OF reminders SKIP LOCKED" in sql
+        assert "(reminders.send_at, reminders.id) >" in sql
+        assert "ORDER BY reminders.send_at, reminders.id" in sql
+        # Matches the partial index predicate, so only unsent rows are scanned.
+        assert "reminders.sent = false" in sql
+        assert "reminders.failed_at IS NULL" in sql
+
+    @pytest.mark.asyncio
+    async def test_chunks_are_sent_and_marked_in_bulk(self):
+        from app.services import notification_service
+        sms, failed, whatsapp = _reminder_row(), _reminder_row(), _reminder_row(ReminderChannel.WHATSAPP)
+        chunks = [[sms, failed], [whatsapp], []]
+        db = MagicMock(commit=AsyncMock())
+
+        with patch.object(notification_service, "lock_due_reminders", AsyncMock(side_effect=chunks)) as lock, \
+             patch.object(notification_service, "send_bulk_sms", AsyncMock(side_effect=[["req-1", None], ["req-2"]])) as bulk, \
+             patch.object(notification_service.sms_delivery, "record_sent", AsyncMock()) as record, \
+             patch.object(notification_service, "mark_reminders_sent", AsyncMock()) as mark, \
+             patch.object(notification_service, "mark_reminders_failed", AsyncMock(return_value=0)) as mark_failed, \
+             patch.object(notification_service, "update_queue_metrics", AsyncMock(return_value=(1, 0.0))):
+            sent = await notification_service.process_due_reminders(db, "sms", NOW)
+
+        assert sent == 2
+        assert [r.phone for r in bulk.call_args_list[0].args[1]] == [sms.phone, failed.phone]
+        assert [c.args[1] for c in mark.call_args_list] == [[sms.id], [whatsapp.id]]
+        assert [c.args[1] for c in mark_failed.call_args_list] == [[failed], []]
+        assert record.call_args_list[0].args[2] == [("req-1", sms.phone, sms.id)]
+        assert db.commit.await_count == 2
+        assert [c.args[3] for c in lock.call_args_list] == [
+            None, (failed.send_at, failed.id), (whatsapp.send_at, whatsapp.id),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_email_bucket_stops_at_run_budget(self):
+        from app.services import notification_service
+        rows = [_reminder_row(ReminderChannel.EMAIL) for _ in range(3)]
+        db = MagicMock(commit=AsyncMock())
+
+        with patch.object(notification_service, "REMINDER_EMAILS_PER_RUN", 3), \
+             patch.object(notification_service, "REMINDER_DISPATCH_CHUNK_SIZE", 2), \
+             patch.object(notification_service, "lock_due_reminders", AsyncMock(side_effect=[rows[:2], rows[2:]])) as lock, \
+             patch.object(notification_service, "send_bulk_email", AsyncMock(side_effect=[[True, True], [True]])) as emails, \
+             patch.object(notification_service, "send_bulk_sms", AsyncMock()) as bulk, \
+             patch.object(notification_service, "mark_reminders_sent", AsyncMock()), \
+             patch.object(notification_service, "mark_reminders_failed", AsyncMock(return_value=0)), \
+             patch.object(notification_service, "update_queue_metrics", AsyncMock(return_value=(7, 60.0))):
+            sent = await notification_service.process_due_reminders(db, "email", NOW)
+
+        assert sent == 3
+        assert [c.args[4] for c in lock.call_args_list] == [2, 1]
+        assert emails.await_count == 2
+        bulk.assert_not_awaited()
+
+    def test_retries_stay_inside_the_delivery_window(self):
+        from app.services.notification_service import IST, retry_send_at
+        morning = datetime(2026, 6, 1, 10, 0, tzinfo=IST)
+        assert retry_send_at(morning, 2) == datetime(2026, 6, 1, 12, 0, tzinfo=IST)
+        evening = datetime(2026, 6, 1, 19, 30, tzinfo=IST)
+        assert retry_send_at(evening, 1) == datetime(2026, 6, 2, 9, 0, tzinfo=IST)
+
+    @pytest.mark.asyncio
+    async def test_failed_reminders_are_retried_then_given_up(self):
+        from sqlalchemy.dialects import postgresql
+        from app.services import notification_service
+        first, last = _reminder_row(), _reminder_row()
+        last.attempts = notification_service.REMINDER_MAX_ATTEMPTS - 1
+        db = MagicMock(execute=AsyncMock())
+
+        given_up = await notification_service.mark_reminders_failed(db, [first, last], NOW)
+
+        assert given_up == 1
+        retry_sql, dead_sql = (
+            str(c.args[0].compile(dialect=postgresql.dialect())) for c in db.execute.call_args_list
+        )
+        assert "send_at=" in retry_sql and "failed_at" not in retry_sql
+        assert "failed_at=" in dead_sql and "send_at" not in dead_sql
+
+    def test_sms_budget_leaves_rate_headroom(self):
+        from app.config import settings
+        from app.services.notification_service import bucket_budget
+        with patch.object(settings, "SMS_MAX_MESSAGES_PER_SECOND", 100):
+            assert bucket_budget("sms") == 100 * 5 * 60 // 2
+
+    @pytest.mark.asyncio
+    async def test_queue_metrics_report_depth_and_lag(self):
+        from app.services import notification_service
+        result = MagicMock(one=MagicMock(return_value=(42, NOW - timedelta(minutes=90))))
+        db = MagicMock(execute=AsyncMock(return_value=result))
+        assert await notification_service.update_queue_metrics(db, NOW, "sms") == (42, 5400.0)
+        assert notification_service.REMINDER_QUEUE_DEPTH.value(bucket="sms") == 42
+        assert notification_service.REMINDER_QUEUE_LAG.value(bucket="sms") == 5400.0
+
+
+class TestBulkSms:
+    @pytest.fixture
+    def fake_msg91(self):
+        import httpx
+        from benchmarks.fake_msg91 import create_app
+        from app.external import sms
+
+        def make(**kwargs):
+            app = create_app(latency=0, **kwargs)
+            client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://fake")
+            stack.enter_context(patch.object(sms, "get_client", return_value=client))
+            return app
+
+        from contextlib import ExitStack
+        with ExitStack() as stack, \
+             patch.object(sms.settings, "MSG91_API_URL", "http://fake/api/v5"), \
+             patch.object(sms.settings, "MSG91_AUTH_KEY", "test-key"), \
+             patch.object(sms.settings, "SMS_PROVIDER", "msg91"), \
+             patch.object(sms, "_retry_delay", return_value=0), \
+             patch.dict(sms._limiters, {"msg91": sms.RateLimiter(1_000_000)}):
+            yield make
+
+    @pytest.mark.asyncio
+    async def test_recipients_are_sent_in_batches(self, fake_msg91):
+        from app.external import sms
+        app = fake_msg91()
+        recipients = [sms.SmsRecipient(f"9{i:09d}", {"OTP": "hi"}) for i in range(2500)]
+        with patch.object(sms, "SMS_BULK_BATCH_SIZE", 1000):
+            request_ids = await sms.send_bulk_sms("tmpl-1", recipients)
+        assert app.state.calls == 3
+        assert app.state.messages == 2500
+        assert len(set(request_ids)) == 3 and None not in request_ids
+        assert app.state.accepted[0][2][0] == {"mobiles": "91" + recipients[0].phone, "OTP": "hi"}
+
+    @pytest.mark.asyncio
+    async def test_failed_calls_are_retried(self, fake_msg91):
+        from app.external import sms
+        app = fake_msg91(fail_first=2)
+        request_ids = await sms.send_bulk_sms("tmpl-1", [sms.SmsRecipient("9876543210", {})])
+        assert app.state.calls == 3
+        assert request_ids[0] == app.state.accepted[0][0]
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_max_retries(self, fake_msg91):
+        from app.external import sms
+        app = fake_msg91(fail_first=100)
+        assert await sms.send_bulk_sms("tmpl-1", [sms.SmsRecipient("9876543210", {})]) == [None]
+        assert app.state.calls == sms.SMS_BULK_MAX_RETRIES + 1
+
+    def test_rate_limiter_spaces_reservations(self):
+        from app.external.sms import RateLimiter
+        limiter = RateLimiter(100)
+        assert limiter.reserve(50) == 0
+        assert limiter.reserve(100) == pytest.approx(0.5, abs=0.01)
+        assert limiter.reserve(1) == pytest.approx(1.5, abs=0.01)
+
+
+class TestDeliveryReports:
+    URL = "/api/v1/webhooks/msg91/dlr"
+    BODY = {"data": [{"requestId": "req-1", "report": [
+        {"number": "919876543210", "status": "1", "desc": "DELIVERED"},
+        {"number": "919876543211", "status": "8", "desc": "PENDING"},
+        {"number": "919876543212", "status": "16", "desc": "REJECTED"},
+    ]}]}
+
+    @pytest.mark.asyncio
+    async def test_reports_update_deliveries(self, client):
+        from app.services import sms_delivery
+        db = MagicMock(execute=AsyncMock())
+        apply = sms_delivery.apply_delivery_reports
+
+        async def apply_with_mock_db(_, reports):
+            return await apply(db, reports)
+
+        with patch("app.api.v1.webhooks.settings.MSG91_WEBHOOK_TOKEN", "secret"), \
+             patch.object(sms_delivery, "apply_delivery_reports", apply_with_mock_db):
+            resp = await client.post(self.URL, params={"token": "secret"}, json=self.BODY)
+        assert resp.status_code == 200
+        assert resp.json() == {"applied": 2}
+        params = db.execute.call_args.args[1]
+        assert [(p["b_phone"], p["b_status"]) for p in params] == [("9876543210", "delivered"), ("9876543212", "failed")]
+
+    @pytest.mark.asyncio
+    async def test_rejects_bad_token(self, client):
+        with patch("app.api.v1.webhooks.settings.MSG91_WEBHOOK_TOKEN", "secret"):
+            resp = await client.post(self.URL, params={"token": "wrong"}, json=self.BODY)
+        assert resp.status_code == 403
+
+
+class TestSmtpPool:
+    @pytest.fixture
+    def sink(self):
+        from benchmarks.smtp_sink import SmtpSink
+        from app.external import email
+        with SmtpSink() as sink, \
+             patch.object(email.settings, "SMTP_HOST", sink.host), \
+             patch.object(email.settings, "SMTP_PORT", sink.port), \
+             patch.object(email.settings, "SMTP_USE_TLS", False), \
+             patch.object(email.settings, "SMTP_USER", "user"), \
+             patch.object(email.settings, "SMTP_PASSWORD", "secret"), \
+             patch.object(email.settings, "SMTP_POOL_SIZE", 2):
+            email.close_email()
+            yield sink
+            email.close_email()
+
+    @pytest.mark.asyncio
+    async def test_connections_are_reused(self, sink):
+        from app.external import email
+        assert await email.send_otp_email("a@test.com", "123456")
+        assert await email.send_reminder_email("b@test.com", "scheme", "PM-KISAN", "2026-06-01")
+        assert sink.connections == 1 and sink.logins == 1
+        assert [m[1] for m in sink.messages] == [["a@test.com"], ["b@test.com"]]
+        assert "123456" in sink.messages[0][2]
+
+    @pytest.mark.asyncio
+    async def test_bulk_send_batches_per_connection(self, sink):
+        from app.external import email
+        messages = [email.EmailMessage(f"farmer{i}@test.com", "Reminder", "<p>hi</p>") for i in range(120)]
+        assert await email.send_bulk_email(messages) == [True] * 120
+        assert len(sink.messages) == 120
+        assert sink.connections == 2
+
+    @pytest.mark.asyncio
+    async def test_connection_is_replaced_after_message_cap(self, sink):
+        from app.external import email
+        messages = [email.EmailMessage(f"farmer{i}@test.com", "Reminder", "<p>hi</p>") for i in range(25)]
+        with patch.object(email, "SMTP_MAX_MESSAGES_PER_CONNECTION", 10):
+            assert all(await email.send_bulk_email(messages))
+        assert sink.connections == 3
+
+    @pytest.mark.asyncio
+    async def test_idle_connections_are_not_reused(self, sink):
+        from app.external import email
+        with patch.object(email, "SMTP_IDLE_TIMEOUT_SECONDS", 0):
+            await email.send_email("a@test.com", "s", "b")
+            await email.send_email("b@test.com", "s", "b")
+        assert sink.connections == 2
+
+
+def _outbox_row(kind, recipient, attempts=0, age_seconds=0, **payload):
+    from datetime import datetime, timedelta, timezone
+    from app.models.notification import NotificationOutbox
+    return NotificationOutbox(
+        id=uuid.uuid4(), kind=kind.value, recipient=recipient, payload=payload, status="pending",
+        attempts=attempts, created_at=datetime.now(timezone.utc) - timedelta(seconds=age_seconds),
+    )
+
+
+class TestOutbox:
+    @pytest.mark.asyncio
+    async def test_signup_enqueues_otps_instead_of_sending(self):
+        from app.services import auth_service
+        from app.models.notification import NotificationOutbox
+        no_farmer = MagicMock()
+        no_farmer.scalar_one_or_none.return_value = None
+        db = MagicMock(execute=AsyncMock(return_value=no_farmer), flush=AsyncMock())
+        db.sync_session.info = {}
+        with patch.object(auth_service, "lookup_pincode", AsyncMock(return_value={"district": "Pune", "state": "MH"})), \
+             patch.object(auth_service, "generate_farmer_id", AsyncMock(return_value="KS-MH-2026-001")), \
+             patch.object(auth_service, "send_and_store_otp", AsyncMock(side_effect=["111111", "222222"])):
+            await auth_service.signup_farmer(db, "Raju", "9876543210", "411001", 2.0, "acre", "raju@test.com")
+        queued = [c.args[0] for c in db.add.call_args_list if isinstance(c.args[0], NotificationOutbox)]
+        assert [(r.kind, r.recipient, r.payload) for r in queued] == [
+            ("otp_sms", "9876543210", {"otp": "111111"}),
+            ("otp_email", "raju@test.com", {"otp": "222222"}),
+        ]
+        assert db.sync_session.info["outbox_pending"] is True
+
+    @pytest.mark.asyncio
+    async def test_batch_is_sent_and_failures_rescheduled(self):
+        from datetime import datetime, timezone
+        from app.core.constants import OutboxKind
+        from app.services import outbox
+        ok_sms = _outbox_row(OutboxKind.OTP_SMS, "9876543210", otp="111111")
+        bad_sms = _outbox_row(OutboxKind.OTP_SMS, "9876543211", otp="222222")
+        access = _outbox_row(OutboxKind.AGENT_ACCESS_SMS, "9876543212", otp="333333",
+                             agent_name="Asha", center="CSC 1", purpose="PM-KISAN")
+        mail = _outbox_row(OutboxKind.OTP_EMAIL, "raju@test.com", otp="444444")
+        db = MagicMock(commit=AsyncMock())
+
+        with patch.object(outbox, "lock_pending", AsyncMock(return_value=[ok_sms, bad_sms, access, mail])), \
+             patch.object(outbox, "send_bulk_sms", AsyncMock(return_value=["req-1", None, "req-1"])) as sms, \
+             patch.object(outbox, "send_bulk_email", AsyncMock(return_value=[True])):
+            assert await outbox.dispatch_batch(db) == 4
+
+        assert len(sms.call_args.args[1]) == 3  # one template, one bulk call
+        assert (ok_sms.status, ok_sms.payload) == ("sent", {})
+        assert (access.status, mail.status) == ("sent", "sent")
+        assert (bad_sms.status, bad_sms.attempts) == ("pending", 1)
+        assert bad_sms.next_attempt_at > datetime.now(timezone.utc)
+        assert bad_sms.payload == {"otp": "222222"}
+        db.commit.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_dead_letters_after_max_attempts_and_expired_otps(self):
+        from app.core.constants import OutboxKind, OUTBOX_MAX_ATTEMPTS, OUTBOX_STALE_AFTER_SECONDS
+        from app.services import outbox
+        last_try = _outbox_row(OutboxKind.OTP_SMS, "9876543210", attempts=OUTBOX_MAX_ATTEMPTS - 1, otp="1")
+        expired = _outbox_row(OutboxKind.OTP_SMS, "9876543211", age_seconds=OUTBOX_STALE_AFTER_SECONDS + 1, otp="2")
+        db = MagicMock(commit=AsyncMock())
+        with patch.object(outbox, "lock_pending", AsyncMock(return_value=[last_try, expired])), \
+             patch.object(outbox, "send_bulk_sms", AsyncMock(side_effect=RuntimeError("provider down"))) as sms:
+            await outbox.dispatch_batch(db)
+        assert [r.phone for r in sms.call_args.args[1]] == ["9876543210"]
+        assert (last_try.status, last_try.last_error, last_try.payload) == ("dead", "provider down", {})
+        assert (expired.status, expired.payload) == ("dead", {})
+
+    @pytest.mark.asyncio
+    async def test_commit_wakes_dispatcher(self):
+        from app.services import outbox
+        wake = asyncio.Event()
+        session = MagicMock(info={"outbox_pending": True})
+        with patch.object(outbox, "_wake", wake):
+            outbox._wake_dispatcher(session)
+            assert wake.is_set()
+            wake.clear()
+            outbox._wake_dispatcher(session)  # flag is consumed by the first commit
+            assert not wake.is_set()
@@ -99,6 +99,51 @@ class TestListSchemes:
         call_kwargs = mock_svc.call_args.kwargs
         assert call_kwargs.get("season") == "kharif"
 
+    @pytest.mark.asyncio
+    async def test_list_schemes_pagination(self, client: AsyncClient, auth_headers: dict):
+        from app.core.pagination import encode_cursor, decode_cursor
+
+        cursor = encode_cursor([0.5, "2099-01-01", str(SCHEME_ID)])
+        with patch(
+            "app.api.v1.schemes.scheme_service.list_schemes_with_eligibility",
+            new_callable=AsyncMock,
+            return_value=[_make_scheme_list_item()],
+        ) as mock_svc:
+            resp = await client.get(self.URL + f"?limit=1&cursor={cursor}", headers=auth_headers)
+        assert resp.status_code == 200
+        call_kwargs = mock_svc.call_args.kwargs
+        assert call_kwargs.get("limit") == 1
+        assert call_kwargs.get("after") == [0.5, "2099-01-01", str(SCHEME_ID)]
+        next_key = decode_cursor(resp.headers["X-Next-Cursor"])
+        assert next_key[2] == str(SCHEME_ID)
+
+    @pytest.mark.asyncio
+    async def test_list_schemes_field_projection(self, client: AsyncClient, auth_headers: dict):
+        with patch(
+            "app.api.v1.schemes.scheme_service.list_schemes_with_eligibility",
+            new_callable=AsyncMock,
+            return_value=[_make_scheme_list_item()],
+        ):
+            resp = await client.get(self.URL + "?fields=id,name_en", headers=auth_headers)
+        assert resp.status_code == 200
+        assert set(resp.json()[0]) == {"id", "name_en"}
+        assert "X-Next-Cursor" not in resp.headers
+
+    @pytest.mark.asyncio
+    async def test_list_schemes_invalid_cursor(self, client: AsyncClient, auth_headers: dict):
+        resp = await client.get(self.URL + "?cursor=%%%", headers=auth_headers)
+        assert resp.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_list_schemes_unknown_field(self, client: AsyncClient, auth_headers: dict):
+        resp = await client.get(self.URL + "?fields=id,password", headers=auth_headers)
+        assert resp.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_list_schemes_invalid_limit(self, client: AsyncClient, auth_headers: dict):
+        resp = await client.get(self.URL + "?limit=0", headers=auth_headers)
+        assert resp.status_code == 422
+
     @pytest.mark.asyncio
     async def test_list_schemes_unauthenticated(self, unauth_client: AsyncClient):
         resp = await unauth_client.get(self.URL)
@@ -217,6 +262,130 @@ class TestGenerateForm:
         assert resp.status_code == 404
 
 
+    @pytest.mark.asyncio
+    async def test_unchanged_form_is_not_rebuilt(self):
+        from app.services import scheme_service
+        from tests.conftest import _make_farmer
+        scheme = MagicMock()
+        scheme.id = SCHEME_ID
+        scheme.name_en = "PM-KISAN"
+        scheme.ministry = "Agriculture"
+        scheme.benefit_type = "cash"
+        scheme.benefit_amount = 6000
+        scheme.documents_required = []
+        result = MagicMock()
+        result.scalar_one_or_none.return_value = scheme
+        db = MagicMock()
+        db.execute = AsyncMock(return_value=result)
+        existing = MagicMock(file_key="forms/KS/schemes/abc.pdf", file_name="KS_pm-kisan_20260101.pdf")
+        with patch.object(scheme_service, "find_generated_form", AsyncMock(return_value=existing)) as find, \
+             patch.object(scheme_service, "render_scheme_form") as render:
+            resp = await scheme_service.generate_scheme_form(db, SCHEME_ID, _make_farmer())
+        render.assert_not_called()
+        assert resp["file_key"] == "forms/KS/schemes/abc.pdf"
+        assert resp["file_name"] == "KS_pm-kisan_20260101.pdf"
+        assert len(find.call_args.args[2]) == 64
+
+    @pytest.mark.asyncio
+    async def test_reused_form_is_logged_on_the_agent_session(self):
+        from app.models.agent import AgentSession
+        from app.services import scheme_service
+        from tests.conftest import _make_farmer
+        scheme = MagicMock(id=SCHEME_ID, name_en="PM-KISAN", ministry="Agriculture",
+                           benefit_type="cash", benefit_amount=6000, documents_required=[])
+        session = AgentSession(id=uuid.uuid4(), actions_taken=[], forms_downloaded=[])
+        db = MagicMock(flush=AsyncMock())
+        db.execute = AsyncMock(return_value=MagicMock(scalar_one_or_none=MagicMock(return_value=scheme)))
+        db.get = AsyncMock(return_value=session)
+        existing = MagicMock(file_key="forms/KS/schemes/abc.pdf", file_name="abc.pdf")
+        with patch.object(scheme_service, "find_generated_form", AsyncMock(return_value=existing)):
+            await scheme_service.generate_scheme_form(
+                db, SCHEME_ID, _make_farmer(), "agent", "Asha", agent_session_id=session.id,
+            )
+        assert session.forms_downloaded == ["forms/KS/schemes/abc.pdf"]
+        action = session.actions_taken[0]
+        assert action["action"] == "form_generated" and action["reused"] is True
+        assert action["scheme_id"] == str(SCHEME_ID)
+
+
+class TestPdfBuilder:
+    FARMER = {
+        "farmer_id": "KS-MH-2025-001", "name": "Raju", "phone": "9876543210",
+        "district": "Pune", "state": "Maharashtra", "pin_code": "411001",
+        "land_area": "2.5", "land_unit": "acre",
+        "crops": [{"crop_name": "wheat", "season": "rabi", "year": 2025}],
+    }
+    SCHEME = {
+        "name_en": "PM-KISAN", "ministry": "Agriculture", "benefit_type": "cash",
+        "benefit_amount": "6000", "documents_required": ["aadhaar", "land_record"],
+    }
+
+    def test_scheme_form_renders_with_required_documents(self):
+        from pdfrw import PdfReader
+        from app.core.pdf_builder import build_scheme_form_pdf
+        pdf, filename = build_scheme_form_pdf(self.FARMER, self.SCHEME, "agent", "CSC Agent")
+        assert pdf.startswith(b"%PDF")
+        assert len(PdfReader(fdata=pdf).pages) == 1
+        assert filename.startswith("KS-MH-2025-001_PM-KISAN_")
+
+    def test_static_sections_are_laid_out_once(self):
+        from reportlab.platypus import Paragraph
+        from app.core import pdf_builder
+        pdf_builder.clear_template_cache()
+        pdf_builder.build_insurance_form_pdf(self.FARMER, {"name_en": "PMFBY", "plan_type": "pmfby"})
+        with patch.object(Paragraph, "breakLines", autospec=True, side_effect=Paragraph.breakLines) as breaks:
+            pdf_builder.build_insurance_form_pdf(self.FARMER, {"name_en": "PMFBY", "plan_type": "pmfby"})
+        texts = [" ".join(call.args[0].frags[0].text.split()) for call in breaks.call_args_list]
+        assert "KisaanSeva - Insurance Enrollment Form" not in texts
+        assert any(t.startswith("Plan: PMFBY") for t in texts)
+
+
+class TestPdfRenderer:
+    @pytest.mark.asyncio
+    async def test_renders_in_worker_process(self):
+        from app.services import pdf_renderer
+        with patch.object(pdf_renderer.settings, "PDF_RENDER_WORKERS", 1):
+            pdf_renderer.start_pdf_renderer()
+            try:
+                before = pdf_renderer.PDF_RENDERS.value(form="insurance", outcome="ok")
+                pdf, filename = await pdf_renderer.render_insurance_form(
+                    TestPdfBuilder.FARMER, {"name_en": "PMFBY", "plan_type": "pmfby"},
+                )
+            finally:
+                pdf_renderer.stop_pdf_renderer()
+        assert pdf.startswith(b"%PDF")
+        assert filename.startswith("KS-MH-2025-001_insurance_pmfby_")
+        assert pdf_renderer.PDF_RENDERS.value(form="insurance", outcome="ok") == before + 1
+
+    @pytest.mark.asyncio
+    async def test_full_queue_is_refused(self):
+        import asyncio
+        import threading
+        from concurrent.futures import ThreadPoolExecutor
+        from app.core.exceptions import ServiceBusyException
+        from app.services import pdf_renderer
+        release = threading.Event()
+
+        def slow_render(*args):
+            release.wait(5)
+            return b"%PDF", "form.pdf"
+
+        pool = ThreadPoolExecutor(max_workers=1)
+        with patch.object(pdf_renderer, "_executor", pool), \
+             patch.object(pdf_renderer, "_slots", asyncio.Semaphore(1)), \
+             patch.object(pdf_renderer.settings, "PDF_RENDER_QUEUE_TIMEOUT_SECONDS", 0.05):
+            first = asyncio.create_task(pdf_renderer._render("scheme", slow_render))
+            await asyncio.sleep(0.01)
+            assert pdf_renderer.PDF_RENDER_IN_FLIGHT.value() == 1
+            with pytest.raises(ServiceBusyException):
+                await pdf_renderer._render("scheme", slow_render)
+            release.set()
+            assert await first == (b"%PDF", "form.pdf")
+        pool.shutdown()
+        assert pdf_renderer.PDF_RENDER_IN_FLIGHT.value() == 0
+        assert pdf_renderer.PDF_RENDER_QUEUE_DEPTH.value() == 0
+
+
 # ── POST /schemes/{id}/remind ─────────────────────────────────────────────────
 
 class TestReminder:
@@ -245,3 +414,256 @@ class TestReminder:
             headers=auth_headers,
         )
         assert resp.status_code == 422
+
+
+# ── Compiled eligibility index ───────────────────────────────────────────────
+
+def _make_rule(rule_type, rule_value, is_mandatory=True):
+    rule = MagicMock()
+    rule.rule_type = rule_type
+    rule.rule_value = rule_value
+    rule.is_mandatory = is_mandatory
+    return rule
+
+
+def _make_scheme(name, rules, close_dates=()):
+    scheme = MagicMock()
+    scheme.id = uuid.uuid4()
+    scheme.name_en = name
+    scheme.name_hi = None
+    scheme.ministry = "Agriculture"
+    scheme.benefit_type = "cash"
+    scheme.benefit_amount = None
+    scheme.is_active = True
+    scheme.eligibility_rules = rules
+    deadlines = []
+    for d in close_dates:
+        dl = MagicMock()
+        dl.close_date = d
+        deadlines.append(dl)
+    scheme.deadlines = deadlines
+    return scheme
+
+
+class TestEligibilityIndex:
+    FARMER_DATA = {
+        "crops": ["wheat", "rice"],
+        "seasons": ["rabi"],
+        "state": "Gujarat",
+        "district": "Ahmedabad",
+        "land_area_acres": 4.0,
+        "ownership_type": "owned",
+        "irrigation_type": "",
+    }
+
+    def _catalogue(self):
+        return [
+            _make_scheme("No rules", []),
+            _make_scheme("Wheat in Gujarat", [
+                _make_rule("crop", " Wheat "),
+                _make_rule("state", "gujarat"),
+            ], close_dates=[date(2099, 3, 1)]),
+            _make_scheme("Small farmers", [
+                _make_rule("land_max", "<= 5"),
+                _make_rule("land_min", ">=1"),
+                _make_rule("irrigation", "drip", is_mandatory=False),
+            ], close_dates=[date(2099, 1, 1)]),
+            _make_scheme("Partial", [
+                _make_rule("crop", "cotton"),
+                _make_rule("ownership", "owned"),
+            ]),
+            _make_scheme("Bad threshold", [_make_rule("land_min", "two acres")]),
+            _make_scheme("Other district", [_make_rule("district", "Surat")]),
+        ]
+
+    def test_index_matches_rule_by_rule_evaluation(self):
+        from app.services.eligibility_index import EligibilityIndex
+        from app.services.scheme_service import evaluate_eligibility
+
+        schemes = self._catalogue()
+        ranked = EligibilityIndex.build(schemes).rank(self.FARMER_DATA, date(2025, 1, 1))
+        by_name = {item["name_en"]: item for item in ranked}
+
+        for scheme in schemes:
+            expected = evaluate_eligibility(scheme, self.FARMER_DATA)
+            item = by_name[scheme.name_en]
+            assert item["eligibility_status"] == expected["status"]
+            assert item["match_score"] == expected["score"]
+            assert item["matched_rules"] == [
+                f"{r['rule_type']}={r['rule_value']}" for r in expected["matched_rules"]
+            ]
+            assert item["unmatched_rules"] == [
+                f"{r['rule_type']}={r['rule_value']}" for r in expected["unmatched_rules"]
+            ]
+
+    def test_index_ranks_by_score_then_deadline(self):
+        from app.services.eligibility_index import EligibilityIndex
+
+        ranked = EligibilityIndex.build(self._catalogue()).rank(self.FARMER_DATA, date(2025, 1, 1))
+        names = [item["name_en"] for item in ranked]
+        assert names[:3] == ["Small farmers", "Wheat in Gujarat", "No rules"]
+        assert names[3] == "Partial"
+        assert set(names[4:]) == {"Bad threshold", "Other district"}
+
+    def test_batch_evaluation_matches_single_farmer_ranking(self):
+        from app.services.eligibility_index import EligibilityIndex
+
+        index = EligibilityIndex.build(self._catalogue())
+        farmers = [
+            self.FARMER_DATA,
+            {**self.FARMER_DATA, "crops": ["cotton"], "land_area_acres": 8.0, "state": "Punjab"},
+            {**self.FARMER_DATA, "district": "surat", "land_area_acres": 0.5, "ownership_type": ""},
+        ]
+
+        batch = {pos: (eligible, dict(partial)) for pos, eligible, partial in index.evaluate_batch(farmers)}
+        for i, farmer_data in enumerate(farmers):
+            by_name = {item["name_en"]: item for item in index.rank(farmer_data)}
+            for pos, scheme in enumerate(index.schemes):
+                item = by_name[scheme.item["name_en"]]
+                eligible, partial = batch[pos]
+                if item["eligibility_status"] == "eligible":
+                    assert i in eligible
+                elif item["eligibility_status"] == "partial":
+                    assert partial[i] == item["match_score"]
+                else:
+                    assert i not in eligible and i not in partial
+
+
+    @pytest.mark.asyncio
+    async def test_fingerprint_tracks_rule_and_deadline_edits(self):
+        from sqlalchemy.dialects import postgresql
+        from app.services import eligibility_index
+
+        db = MagicMock(execute=AsyncMock(return_value=MagicMock(one=MagicMock(return_value=(1, None, 2, None, 3, None)))))
+        with patch.object(eligibility_index, "_fingerprint", None):
+            assert await eligibility_index.catalogue_fingerprint(db) == (1, None, 2, None, 3, None)
+            await eligibility_index.catalogue_fingerprint(db)
+
+        db.execute.assert_awaited_once()  # second read served from the per-process copy
+        sql = str(db.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+        assert "max(scheme_eligibility.updated_at)" in sql
+        assert "max(scheme_deadlines.updated_at)" in sql
+
+
+class TestEligibilityCache:
+    @pytest.mark.asyncio
+    async def test_listing_served_from_cache_skips_index(self):
+        from app.services import scheme_service
+
+        cached = [_make_scheme_list_item()]
+        farmer = MagicMock(id=FARMER_UUID)
+        with patch.object(scheme_service, "get_listing_version", new_callable=AsyncMock, return_value="v"), \
+             patch.object(scheme_service, "get_cached_listing", new_callable=AsyncMock, return_value=cached), \
+             patch.object(scheme_service, "get_eligibility_index", new_callable=AsyncMock) as get_index:
+            result = await scheme_service.list_schemes_with_eligibility(AsyncMock(), farmer)
+
+        assert result == cached
+        get_index.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_filtered_listing_bypasses_cache(self):
+        from app.services import scheme_service
+
+        index = MagicMock()
+        index.rank.return_value = []
+        farmer = MagicMock(id=FARMER_UUID)
+        farmer_data = dict(TestEligibilityIndex.FARMER_DATA)
+        with patch.object(scheme_service, "_load_farmer_data", new_callable=AsyncMock, return_value=farmer_data), \
+             patch.object(scheme_service, "get_cached_listing", new_callable=AsyncMock) as get_cached, \
+             patch.object(scheme_service, "store_listing", new_callable=AsyncMock) as store, \
+             patch.object(scheme_service, "get_eligibility_index", new_callable=AsyncMock, return_value=index):
+            await scheme_service.list_schemes_with_eligibility(AsyncMock(), farmer, crop="wheat")
+
+        get_cached.assert_not_called()
+        store.assert_not_called()
+        assert "wheat" in index.rank.call_args[0][0]["crops"]
+
+    @pytest.mark.asyncio
+    async def test_adding_crop_invalidates_cached_listing(self):
+        from app.services import farmer_service
+
+        with patch.object(farmer_service, "invalidate_farmer_eligibility", new_callable=AsyncMock) as invalidate:
+            await farmer_service.add_crop(AsyncMock(add=MagicMock()), FARMER_UUID, "Wheat", "rabi", 2025)
+
+        invalidate.assert_awaited_once()
+        assert invalidate.call_args[0][1] == FARMER_UUID
+
+
+    @pytest.mark.asyncio
+    async def test_invalidation_bumps_farmer_version_in_transaction(self):
+        from sqlalchemy.dialects import postgresql
+        from app.services.eligibility_cache import invalidate_farmer_eligibility
+
+        db = AsyncMock()
+        await invalidate_farmer_eligibility(db, FARMER_UUID)
+        sql = str(db.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+        assert sql.startswith("UPDATE farmers SET eligibility_version=(farmers.eligibility_version +")
+        db.commit.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_listing_version_follows_catalogue_and_farmer(self):
+        from app.services import eligibility_cache
+
+        def db_with(farmer_version):
+            return MagicMock(execute=AsyncMock(return_value=MagicMock(
+                scalar_one_or_none=MagicMock(return_value=farmer_version),
+            )))
+
+        async def version(fingerprint, farmer_version):
+            with patch.object(eligibility_cache, "catalogue_fingerprint", AsyncMock(return_value=fingerprint)):
+                return await eligibility_cache.get_listing_version(db_with(farmer_version), FARMER_UUID, date(2026, 6, 1))
+
+        base = await version((1, "t1"), 3)
+        assert base == await version((1, "t1"), 3)
+        assert base != await version((1, "t2"), 3)  # rule or deadline edited
+        assert base != await version((1, "t1"), 4)  # farmer's crops changed
+
+
+class TestSqlRanking:
+    FARMER_DATA = TestEligibilityIndex.FARMER_DATA
+
+    def test_ranking_query_compiles_for_postgres(self):
+        from sqlalchemy.dialects import postgresql
+        from app.services.eligibility_sql import build_ranking_query
+
+        after = (0.5, date(2099, 1, 1), SCHEME_ID)
+        query = build_ranking_query(self.FARMER_DATA, date(2025, 1, 1), limit=20, after=after)
+        compiled = query.compile(dialect=postgresql.dialect())
+        sql = str(compiled)
+
+        assert "WITH rule_eval AS" in sql
+        assert "ORDER BY ranked.match_score DESC, ranked.deadline_key, ranked.id" in sql
+        assert "(-ranked.match_score, ranked.deadline_key, ranked.id) >" in sql
+        assert "LIMIT" in sql
+        assert compiled.params["crops"] == ["wheat", "rice"]
+        assert compiled.params["state"] == "gujarat"
+        assert compiled.params["land_area_acres"] == 4.0
+        assert compiled.params["today"] == date(2025, 1, 1)
+
+    @pytest.mark.asyncio
+    async def test_sql_mode_bypasses_index_and_cache(self):
+        from app.services import scheme_service
+
+        farmer = MagicMock(id=FARMER_UUID)
+        with patch.object(scheme_service.settings, "SCHEME_EVALUATION_MODE", "sql"), \
+             patch.object(scheme_service, "_load_farmer_data", new_callable=AsyncMock, return_value={}), \
+             patch.object(scheme_service, "rank_schemes_sql", new_callable=AsyncMock, return_value=[]) as rank_sql, \
+             patch.object(scheme_service, "get_cached_listing", new_callable=AsyncMock) as get_cached, \
+             patch.object(scheme_service, "get_eligibility_index", new_callable=AsyncMock) as get_index:
+            await scheme_service.list_schemes_with_eligibility(
+                AsyncMock(), farmer, limit=10, after=[0.5, "2099-01-01", str(SCHEME_ID)],
+            )
+
+        get_cached.assert_not_called()
+        get_index.assert_not_called()
+        assert rank_sql.call_args.kwargs == {"limit": 10, "after": (0.5, date(2099, 1, 1), SCHEME_ID)}
+
+    def test_in_memory_paging_resumes_after_cursor_key(self):
+        from app.services.eligibility_index import EligibilityIndex
+        from app.services.scheme_service import _page
+
+        ranked = EligibilityIndex.build(TestEligibilityIndex()._catalogue()).rank(self.FARMER_DATA, date(2025, 1, 1))
+        first = _page(ranked, 2, None)
+        last = first[-1]
+        after = (last["match_score"], last["nearest_deadline"] or date(9999, 12, 31), last["id"])
+        assert first + _page(ranked, None, after) == ranked
@@ -0,0 +1,348 @@
+"""test_service.py — Tests for /api/v1/service/* (agent portal) endpoints."""
+
+import uuid
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch, AsyncMock, MagicMock
+from httpx import AsyncClient
+
+
+SCHEME_ID = uuid.UUID("cccccccc-cccc-cccc-cccc-cccccccccccc")
+
+
+# ── POST /service/eligibility/batch ───────────────────────────────────────────
+
+class TestBatchEligibility:
+    URL = "/api/v1/service/eligibility/batch"
+
+    @pytest.mark.asyncio
+    async def test_batch_eligibility_success(self, client: AsyncClient, agent_auth_headers: dict):
+        matrix = {
+            "farmers_evaluated": 2,
+            "missing_farmer_ids": ["KS-XX-0000-000"],
+            "schemes": [
+                {
+                    "scheme_id": str(SCHEME_ID),
+                    "scheme_name": "PM-KISAN",
+                    "eligible_count": 1,
+                    "partial_count": 1,
+                    "eligible_farmer_ids": ["KS-MH-2025-001"],
+                    "partial_farmers": [{"farmer_id": "KS-MH-2025-002", "score": 0.5}],
+                }
+            ],
+        }
+        with patch(
+            "app.api.v1.service.scheme_service.evaluate_eligibility_batch",
+            new_callable=AsyncMock,
+            return_value=matrix,
+        ) as mock_svc, patch("app.api.v1.service.agent_service.require_consent", new_callable=AsyncMock):
+            resp = await client.post(
+                self.URL,
+                json={"farmer_ids": ["KS-MH-2025-001", "KS-MH-2025-002", "KS-XX-0000-000"]},
+                headers=agent_auth_headers,
+            )
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data["farmers_evaluated"] == 2
+        assert data["schemes"][0]["eligible_farmer_ids"] == ["KS-MH-2025-001"]
+        assert mock_svc.call_args.args[1] == ["KS-MH-2025-001", "KS-MH-2025-002", "KS-XX-0000-000"]
+
+    @pytest.mark.asyncio
+    async def test_batch_eligibility_requires_consent(self, client: AsyncClient, agent_auth_headers: dict):
+        with patch("app.api.v1.service.agent_service.consented_farmer_sessions", new_callable=AsyncMock,
+                   return_value={"KS-MH-2025-001": uuid.uuid4()}), \
+             patch("app.api.v1.service.scheme_service.evaluate_eligibility_batch", new_callable=AsyncMock) as mock_svc:
+            resp = await client.post(
+                self.URL, json={"farmer_ids": ["KS-MH-2025-001", "KS-MH-2025-002"]}, headers=agent_auth_headers,
+            )
+        assert resp.status_code == 403
+        assert "KS-MH-2025-002" in resp.json()["detail"]
+        mock_svc.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_batch_eligibility_is_sized_to_consent(self, client: AsyncClient, agent_auth_headers: dict):
+        from app.core.constants import ELIGIBILITY_BATCH_MAX_FARMERS
+        ids = [f"KS-MH-2025-{i:04d}" for i in range(ELIGIBILITY_BATCH_MAX_FARMERS + 1)]
+        resp = await client.post(self.URL, json={"farmer_ids": ids}, headers=agent_auth_headers)
+        assert resp.status_code == 422
+
+    def test_consent_query_only_counts_live_sessions(self):
+        import asyncio
+        from sqlalchemy.dialects import postgresql
+        from app.services import agent_service
+        db = MagicMock(execute=AsyncMock(return_value=MagicMock(all=MagicMock(return_value=[]))))
+        asyncio.run(agent_service.consented_farmer_sessions(db, uuid.uuid4(), ["KS-MH-2025-001"]))
+        sql = str(db.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+        assert "agent_sessions.agent_id =" in sql
+        assert "agent_sessions.otp_verified_at IS NOT NULL" in sql
+        assert "agent_sessions.session_start >" in sql
+
+    @pytest.mark.asyncio
+    async def test_batch_eligibility_requires_farmers(self, client: AsyncClient, agent_auth_headers: dict):
+        resp = await client.post(self.URL, json={"farmer_ids": []}, headers=agent_auth_headers)
+        assert resp.status_code == 422
+
+    @pytest.mark.asyncio
+    async def test_batch_eligibility_unauthenticated(self, unauth_client: AsyncClient):
+        resp = await unauth_client.post(self.URL, json={"farmer_ids": ["KS-MH-2025-001"]})
+        assert resp.status_code == 403
+
+
+# ── POST /service/forms/batch ─────────────────────────────────────────────────
+
+class TestBatchForms:
+    URL = "/api/v1/service/forms/batch"
+
+    @pytest.mark.asyncio
+    async def test_batch_forms_queued(self, client: AsyncClient, agent_auth_headers: dict):
+        session_id = uuid.uuid4()
+        with patch("app.tasks.pdf_tasks.queue_batch_forms", return_value=MagicMock(id="task-1")) as queue, \
+             patch("app.api.v1.service.agent_service.consented_farmer_sessions", new_callable=AsyncMock,
+                   return_value={"KS-MH-2025-001": session_id}), \
+             patch("app.api.v1.service.agent_service.record_task_owner", new_callable=AsyncMock) as owner:
+            resp = await client.post(
+                self.URL,
+                json={"farmer_ids": ["KS-MH-2025-001"], "scheme_id": str(SCHEME_ID)},
+                headers=agent_auth_headers,
+            )
+        assert resp.status_code == 202
+        assert resp.json() == {"task_id": "task-1", "status": "queued"}
+        assert queue.call_args.args[:3] == (["KS-MH-2025-001"], str(SCHEME_ID), "agent")
+        assert queue.call_args.kwargs["bundle"] is True
+        assert queue.call_args.kwargs["agent_sessions"] == {"KS-MH-2025-001": str(session_id)}
+        owner.assert_awaited_once()
+        assert owner.call_args.args[0] == "task-1"
+
+    @pytest.mark.asyncio
+    async def test_batch_forms_require_consent(self, client: AsyncClient, agent_auth_headers: dict):
+        with patch("app.tasks.pdf_tasks.queue_batch_forms") as queue, \
+             patch("app.api.v1.service.agent_service.consented_farmer_sessions", new_callable=AsyncMock,
+                   return_value={}):
+            resp = await client.post(
+                self.URL,
+                json={"farmer_ids": ["KS-MH-2025-001"], "scheme_id": str(SCHEME_ID)},
+                headers=agent_auth_headers,
+            )
+        assert resp.status_code == 403
+        queue.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_rows_are_linked_to_consented_sessions(self):
+        from app.services import batch_forms
+        session_id = uuid.uuid4()
+        entries = [{"farmer_id": "KS-0", "farmer_uuid": str(uuid.uuid4()), "status": "generated",
+                    "content_hash": "0" * 64, "file_key": "forms/0.pdf", "file_name": "0.pdf", "size_bytes": 6}]
+        session = MagicMock(id=session_id, actions_taken=[])
+        sessions = MagicMock()
+        sessions.scalars.return_value.all.return_value = [session]
+        db = MagicMock(execute=AsyncMock(side_effect=[None, sessions]), commit=AsyncMock())
+
+        with patch.object(batch_forms.content_store, "register_many", AsyncMock()):
+            await batch_forms.record_batch_forms(db, entries, SCHEME_ID, agent_sessions={"KS-0": session_id})
+
+        rows = db.execute.call_args_list[0].args[0].compile().params
+        assert rows["agent_session_id_m0"] == session_id
+        assert session.actions_taken[0]["action"] == "batch_form_generated"
+
+    def test_batch_is_split_into_chunks(self):
+        from app.tasks import pdf_tasks
+        farmer_ids = [f"KS-MH-2025-{i:03d}" for i in range(120)]
+        with patch.object(pdf_tasks, "chord") as chord:
+            pdf_tasks.queue_batch_forms(farmer_ids + farmer_ids[:5], str(SCHEME_ID))
+        header = chord.call_args.args[0]
+        assert [len(sig.args[0]) for sig in header.tasks] == [50, 50, 20]
+
+    @pytest.mark.asyncio
+    async def test_chunk_reuses_unchanged_forms(self):
+        from app.services import batch_forms, scheme_service
+        from tests.conftest import _make_farmer
+        scheme = MagicMock(id=SCHEME_ID, name_en="PM-KISAN", ministry="Agriculture",
+                           benefit_type="cash", benefit_amount=6000, documents_required=[])
+        fresh, unchanged = _make_farmer(), _make_farmer()
+        fresh.farmer_id, fresh.id = "KS-MH-2025-002", uuid.uuid4()
+        farmer_data, scheme_data = scheme_service.scheme_form_inputs(unchanged, scheme)
+        existing = MagicMock(
+            farmer_id=unchanged.id, file_key="forms/old.pdf", file_name="old.pdf",
+            content_hash=scheme_service.scheme_form_hash(farmer_data, scheme_data, "agent", "Asha"),
+        )
+        farmers, forms = MagicMock(), MagicMock()
+        farmers.scalars.return_value.all.return_value = [fresh, unchanged]
+        forms.all.return_value = [existing]
+        db = MagicMock()
+        db.get = AsyncMock(return_value=scheme)
+        db.execute = AsyncMock(side_effect=[farmers, forms])
+
+        with patch.object(batch_forms, "build_scheme_form_pdf", return_value=(b"%PDF-1", "new.pdf")) as build, \
+             patch.object(batch_forms.storage, "put_object", AsyncMock()) as put:
+            entries = await batch_forms.render_form_chunk(
+                db, ["KS-MH-2025-002", unchanged.farmer_id, "KS-XX-0000-000"], SCHEME_ID, "agent", "Asha",
+            )
+
+        assert [e["status"] for e in entries] == ["generated", "reused", "not_found"]
+        build.assert_called_once()
+        put.assert_awaited_once()
+        assert entries[0]["file_key"] == f"forms/KS-MH-2025-002/schemes/{SCHEME_ID}/{entries[0]['content_hash']}.pdf"
+        assert entries[1]["file_key"] == "forms/old.pdf"
+
+    @pytest.mark.asyncio
+    async def test_record_inserts_rows_once_and_bundles_zip(self):
+        import io
+        import zipfile
+        from app.services import batch_forms
+        entries = [
+            {"farmer_id": f"KS-{i}", "farmer_uuid": str(uuid.uuid4()), "status": "generated",
+             "content_hash": f"{i:064d}", "file_key": f"forms/{i}.pdf", "file_name": f"{i}.pdf", "size_bytes": 6}
+            for i in range(3)
+        ] + [{"farmer_id": "KS-9", "status": "failed", "error": "Render failed"}]
+        written = io.BytesIO()
+        upload = MagicMock(write=AsyncMock(side_effect=written.write), complete=AsyncMock(), abort=AsyncMock())
+        db = MagicMock(execute=AsyncMock(), commit=AsyncMock())
+
+        with patch.object(batch_forms.content_store, "register_many", AsyncMock()) as register, \
+             patch.object(batch_forms.content_store, "register_expiring", AsyncMock()) as expiring, \
+             patch.object(batch_forms.storage, "get_object", AsyncMock(return_value=b"%PDF-1")), \
+             patch.object(batch_forms.storage, "StreamingUpload", return_value=upload):
+            summary = await batch_forms.record_batch_forms(db, entries, SCHEME_ID, bundle=True)
+
+        db.execute.assert_awaited_once()
+        assert db.commit.await_count == 2
+        zip_key, content_type, size, expires_at = expiring.call_args.args[1:]
+        assert (zip_key, content_type, size) == (summary["zip_key"], "application/zip", len(written.getvalue()))
+        assert expires_at > datetime.now(timezone.utc) + timedelta(hours=23)
+        assert len(register.call_args.args[1]) == 3
+        assert summary["generated"] == 3
+        assert summary["failed"] == [{"farmer_id": "KS-9", "error": "Render failed"}]
+        assert summary["zip_key"].startswith(f"forms/batches/{SCHEME_ID}/")
+        upload.complete.assert_awaited_once()
+        with zipfile.ZipFile(io.BytesIO(written.getvalue())) as zf:
+            assert sorted(zf.namelist()) == ["KS-0_0.pdf", "KS-1_1.pdf", "KS-2_2.pdf"]
+
+
+    @pytest.mark.asyncio
+    async def test_expired_objects_are_deleted_after_commit(self):
+        from sqlalchemy.dialects import postgresql
+        from app.services import content_store
+        rows = [MagicMock(file_key="forms/batches/a.zip", thumbnail_key=None)]
+        db = MagicMock(execute=AsyncMock(return_value=MagicMock(all=MagicMock(return_value=rows))))
+        assert await content_store.delete_expired(db) == ["forms/batches/a.zip"]
+        sql = str(db.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+        assert "DELETE FROM stored_objects WHERE stored_objects.expires_at <=" in sql
+
+# ── GET /service/tasks/{task_id} ─────────────────────────────────────────────
+
+class TestTaskStatus:
+    @pytest.fixture
+    def redis(self):
+        store = {}
+        fake = MagicMock()
+        fake.set = AsyncMock(side_effect=lambda key, value, ex=None: store.__setitem__(key, value))
+        fake.get = AsyncMock(side_effect=store.get)
+        with patch("app.services.agent_service.get_redis", AsyncMock(return_value=fake)):
+            yield store
+
+    @pytest.mark.asyncio
+    async def test_owner_reads_result(self, client: AsyncClient, agent_auth_headers: dict, redis):
+        from app.services import agent_service
+        from tests.conftest import TEST_AGENT
+        await agent_service.record_task_owner("task-1", TEST_AGENT.id)
+        result = MagicMock(status="SUCCESS", result={"generated": 1})
+        result.successful.return_value = True
+        with patch("celery.result.AsyncResult", return_value=result):
+            resp = await client.get("/api/v1/service/tasks/task-1", headers=agent_auth_headers)
+        assert resp.status_code == 200
+        assert resp.json()["result"] == {"generated": 1}
+
+    @pytest.mark.asyncio
+    async def test_other_agents_task_is_hidden(self, client: AsyncClient, agent_auth_headers: dict, redis):
+        from app.services import agent_service
+        await agent_service.record_task_owner("task-2", uuid.uuid4())
+        with patch("celery.result.AsyncResult") as async_result:
+            resp = await client.get("/api/v1/service/tasks/task-2", headers=agent_auth_headers)
+            missing = await client.get("/api/v1/service/tasks/unknown", headers=agent_auth_headers)
+        assert resp.status_code == missing.status_code == 404
+        async_result.assert_not_called()
+
+
+# ── POST /service/insurance/quotes ────────────────────────────────────────────
+
+class TestBulkPremiumQuotes:
+    URL = "/api/v1/service/insurance/quotes"
+
+    ROWS = [
+        {"crop": "Wheat", "season": "rabi", "district": "Agra", "land_area": 2.5},
+        {"crop": "cotton", "season": "kharif", "district": "Akola", "land_area": 1, "land_unit": "hectare"},
+        {"crop": "quinoa", "season": "zaid", "district": "Pune", "land_area": 3, "land_unit": "bigha"},
+    ]
+
+    def test_vectorized_quotes_match_single_calculation(self):
+        from app.core.constants import LAND_CONVERSION, LandUnit
+        from app.external.pmfby import calculate_premium_local
+        from app.services.premium_quotes import quote_rows
+
+        rows = [{**r, "land_unit": r.get("land_unit", "acre")} for r in self.ROWS]
+        for row, quote in zip(rows, quote_rows(rows)):
+            hectares = row["land_area"] * LAND_CONVERSION[LandUnit(row["land_unit"])] / 2.47105
+            single = calculate_premium_local(row["crop"], row["season"], row["district"], hectares)
+            for field in ("sum_insured", "farmer_premium", "govt_subsidy", "premium_rate_percent"):
+                assert quote[field] == pytest.approx(single[field])
+            assert quote["insurance_company"] == single["insurance_company"]
+
+    def test_company_assignment_is_deterministic(self):
+        from app.external.pmfby import calculate_premium_local
+
+        first = calculate_premium_local("wheat", "rabi", "Agra", 1.0)["insurance_company"]
+        assert all(
+            calculate_premium_local("Wheat", "rabi", "agra", 2.0)["insurance_company"] == first
+            for _ in range(5)
+        )
+
+    @pytest.fixture(autouse=True)
+    def _no_notified_rates(self):
+        from app.services import insurance_service
+        from app.services.insurance_rates import RateSnapshot
+
+        with patch.object(insurance_service, "get_rate_snapshot", new_callable=AsyncMock, return_value=RateSnapshot([])):
+            yield
+
+    def test_notified_district_uses_synced_rate(self):
+        from types import SimpleNamespace
+        from app.services.insurance_rates import RateSnapshot
+        from app.services.premium_quotes import quote_rows
+
+        snapshot = RateSnapshot([SimpleNamespace(
+            season="rabi", year=2025, state="Uttar Pradesh", district="Agra", crop="Wheat",
+            sum_insured_per_hectare=40000, farmer_premium_rate=1.5, actuarial_rate=6.5,
+            insurance_company="SBI General Insurance",
+        )])
+        rows = [{**r, "land_unit": "hectare"} for r in self.ROWS]
+        notified, local, _ = quote_rows(rows, snapshot)
+        assert notified["source"] == "pmfby_rates"
+        assert notified["sum_insured"] == 100000.0
+        assert notified["insurance_company"] == "SBI General Insurance"
+        assert local["source"] == "local_calculation"
+
+    @pytest.mark.asyncio
+    async def test_bulk_quotes_json(self, client: AsyncClient, agent_auth_headers: dict):
+        resp = await client.post(self.URL, json={"rows": self.ROWS}, headers=agent_auth_headers)
+        assert resp.status_code == 200
+        data = resp.json()
+        assert [q["crop"] for q in data] == ["Wheat", "cotton", "quinoa"]
+        assert data[1]["premium_rate_percent"] == 5.0
+        assert data[2]["land_unit"] == "bigha"
+
+    @pytest.mark.asyncio
+    async def test_bulk_quotes_csv(self, client: AsyncClient, agent_auth_headers: dict):
+        resp = await client.post(
+            self.URL, params={"format": "csv"}, json={"rows": self.ROWS * 800}, headers=agent_auth_headers,
+        )
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/csv")
+        lines = resp.text.strip().split("\n")
+        assert lines[0].startswith("crop,season,district,land_area")
+        assert len(lines) == 1 + 2400
+
+    @pytest.mark.asyncio
+    async def test_bulk_quotes_rejects_bad_rows(self, client: AsyncClient, agent_auth_headers: dict):
+        rows = [{**self.ROWS[0], "land_area": 0}]
+        resp = await client.post(self.URL, json={"rows": rows}, headers=agent_auth_headers)
+        assert resp.status_code == 422
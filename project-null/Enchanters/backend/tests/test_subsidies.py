@@ -105,6 +105,34 @@ class TestListSubsidies:
         call_kwargs = mock_svc.call_args.kwargs
         assert call_kwargs.get("status_filter") == "open"
 
+    @pytest.mark.asyncio
+    async def test_list_subsidies_invalid_status(self, client: AsyncClient, auth_headers: dict):
+        resp = await client.get(self.URL + "?status=pending", headers=auth_headers)
+        assert resp.status_code == 422
+
+    @pytest.mark.asyncio
+    async def test_list_subsidies_page_with_projection(self, client: AsyncClient, auth_headers: dict):
+        from app.core.pagination import decode_cursor
+
+        with patch(
+            "app.api.v1.subsidies.subsidy_service.list_subsidies",
+            new_callable=AsyncMock,
+            return_value=[_make_subsidy_list_item()],
+        ) as mock_svc:
+            resp = await client.get(self.URL + "?limit=1&fields=id,name_en,status", headers=auth_headers)
+        assert resp.status_code == 200
+        assert resp.json() == [{"id": str(SUBSIDY_ID), "name_en": "Soil Health Card Scheme", "status": "open"}]
+        assert mock_svc.call_args.kwargs.get("limit") == 1
+        assert decode_cursor(resp.headers["X-Next-Cursor"]) == ["Soil Health Card Scheme", str(SUBSIDY_ID)]
+
+    def test_status_filter_is_computed_in_sql(self):
+        from sqlalchemy.dialects import postgresql
+        from app.services.subsidy_service import _status_expr
+
+        sql = str(_status_expr(date(2025, 6, 1)).compile(dialect=postgresql.dialect()))
+        assert "subsidies.open_date >" in sql
+        assert "subsidies.close_date <" in sql
+
     @pytest.mark.asyncio
     async def test_list_subsidies_unauthenticated(self, unauth_client: AsyncClient):
         resp = await unauth_client.get(self.URL)